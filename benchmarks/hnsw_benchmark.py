@@ -0,0 +1,68 @@
+"""
+Compares the HNSW index with exact search on synthetic embeddings.
+
+For each corpus size, builds an HNSW graph and reports its build time, then
+query throughput and recall@k for several ef_search values next to the exact
+float32 scan the flat index performs:
+
+    poetry run python -m benchmarks.hnsw_benchmark --sizes 10000 50000 --ef-search 16 64 256
+"""
+import argparse
+import tempfile
+import time
+
+from benchmarks.quantization_benchmark import synthetic_embeddings
+from src.infrastructure.adapters.vector_indexes.hnsw_index import HnswIndex
+from src.infrastructure.adapters.vector_indexes.quantization import (
+    QuantizedVectors,
+    recall_at_k,
+)
+
+
+def run(sizes, dim: int, queries: int, top_k: int, m: int, ef_construction: int, ef_search_values, seed: int) -> None:
+    print(f"{'vectors':>10} {'index':>8} {'ef':>6} {'build s':>9} {'QPS':>9} {'recall@' + str(top_k):>10}")
+    for size in sizes:
+        vectors = synthetic_embeddings(size, dim, seed)
+        query_vectors = synthetic_embeddings(queries, dim, seed + 1)
+
+        exact = QuantizedVectors.from_vectors(vectors)
+        start = time.perf_counter()
+        exact_rows = [exact.top_k(query, top_k)[0] for query in query_vectors]
+        elapsed = time.perf_counter() - start
+        print(f"{size:>10} {'flat':>8} {'-':>6} {'-':>9} {queries / elapsed:>9.0f} {1.0:>10.3f}")
+
+        with tempfile.TemporaryDirectory() as directory:
+            index = HnswIndex(directory, m=m, ef_construction=ef_construction)
+            start = time.perf_counter()
+            index.add([str(row) for row in range(size)], vectors)
+            build_seconds = time.perf_counter() - start
+
+            for ef_search in ef_search_values:
+                start = time.perf_counter()
+                rows = [
+                    [int(chunk_id) for chunk_id, _ in index.search(query, top_k, ef_search=ef_search)]
+                    for query in query_vectors
+                ]
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{size:>10} {'hnsw':>8} {ef_search:>6} {build_seconds:>9.1f} "
+                    f"{queries / elapsed:>9.0f} {recall_at_k(exact_rows, rows):>10.3f}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HNSW index against exact search.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5_000, 20_000])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=100)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.sizes, args.dim, args.queries, args.top_k, args.m, args.ef_construction, args.ef_search, args.seed)
+
+
+if __name__ == "__main__":
+    main()
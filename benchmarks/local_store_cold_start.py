@@ -0,0 +1,76 @@
+"""
+Measures how quickly a fresh process can serve a search from a local store.
+
+Builds a FileSystemChunkStore with synthetic chunks and random embeddings,
+then times opening it and answering the first query, as a new CLI or server
+process would:
+
+    poetry run python -m benchmarks.local_store_cold_start --chunks 200000
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.domain.models.chunk import Chunk
+from src.infrastructure.adapters.chunk_stores.file_system_chunk_store import FileSystemChunkStore
+
+
+class RandomEmbeddings(Embeddings):
+    """Unit-norm random vectors; the benchmark only measures I/O and scanning."""
+
+    def __init__(self, dim: int, seed: int = 0):
+        self.dim = dim
+        self.rng = np.random.default_rng(seed)
+
+    def _vectors(self, count: int) -> np.ndarray:
+        vectors = self.rng.standard_normal((count, self.dim)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def embed_documents(self, texts):
+        return self._vectors(len(texts))
+
+    def embed_query(self, text):
+        return self._vectors(1)[0].tolist()
+
+
+def run(chunks: int, batch_size: int, dim: int, top_k: int) -> None:
+    embeddings = RandomEmbeddings(dim)
+    with tempfile.TemporaryDirectory() as directory:
+        store = FileSystemChunkStore(directory, embeddings=embeddings)
+        start = time.perf_counter()
+        for first in range(0, chunks, batch_size):
+            store.save([
+                Chunk(content=f"Synthetic chunk {i} " + "lorem ipsum " * 40, metadata={"source": f"doc_{i // 50}.md", "chunk_index": i % 50})
+                for i in range(first, min(first + batch_size, chunks))
+            ])
+        print(f"ingested {chunks} chunks in {time.perf_counter() - start:.2f}s")
+
+        query = embeddings.embed_query("query")
+        start = time.perf_counter()
+        cold = FileSystemChunkStore(directory, embeddings=embeddings)
+        opened = time.perf_counter()
+        results = cold.search(query, top_k=top_k)
+        searched = time.perf_counter()
+        cold.search(query, top_k=top_k)
+        warm = time.perf_counter()
+
+        print(f"open store:        {(opened - start) * 1000:8.2f} ms")
+        print(f"first search:      {(searched - opened) * 1000:8.2f} ms ({len(results)} results)")
+        print(f"warm search:       {(warm - searched) * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local store cold start.")
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+    run(args.chunks, args.batch_size, args.dim, args.top_k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compares float32, float16 and int8 vector storage on synthetic embeddings.
+
+Reports the index footprint, query throughput and recall@k of each mode
+against exact float32 search. With rescoring the footprint includes the
+float32 copy kept next to the quantized codes:
+
+    poetry run python -m benchmarks.quantization_benchmark --sizes 10000 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.domain.models.enums import VectorQuantization
+from src.infrastructure.adapters.vector_indexes.quantization import (
+    QuantizedVectors,
+    recall_at_k,
+)
+
+
+def synthetic_embeddings(count: int, dim: int, seed: int) -> np.ndarray:
+    """Unit-norm vectors drawn around a few hundred topics, like real chunk embeddings."""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((256, dim)).astype(np.float32)
+    vectors = topics[rng.integers(0, len(topics), count)] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def run(sizes, dim: int, queries: int, top_k: int, seed: int) -> None:
+    print(f"{'vectors':>10} {'mode':>8} {'rescore':>8} {'MiB':>9} {'ratio':>6} {'QPS':>9} {'recall@' + str(top_k):>10}")
+    for size in sizes:
+        vectors = synthetic_embeddings(size, dim, seed)
+        query_vectors = synthetic_embeddings(queries, dim, seed + 1)
+        exact = QuantizedVectors.from_vectors(vectors)
+        exact_rows = [exact.top_k(query, top_k)[0] for query in query_vectors]
+
+        for mode in VectorQuantization:
+            quantized = QuantizedVectors.from_vectors(vectors, mode)
+            for rescore in ([False] if mode == VectorQuantization.FLOAT32 else [False, True]):
+                full_precision = vectors if rescore else None
+                nbytes = quantized.nbytes + (vectors.nbytes if rescore else 0)
+                start = time.perf_counter()
+                rows = [quantized.search(query, top_k, full_precision=full_precision)[0] for query in query_vectors]
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{size:>10} {mode.value:>8} {str(rescore):>8} "
+                    f"{nbytes / 2**20:>9.1f} {exact.nbytes / nbytes:>5.1f}x "
+                    f"{queries / elapsed:>9.0f} {recall_at_k(exact_rows, rows):>10.3f}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quantized vector storage.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.sizes, args.dim, args.queries, args.top_k, args.seed)
+
+
+if __name__ == "__main__":
+    main()
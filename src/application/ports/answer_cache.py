@@ -0,0 +1,22 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from domain.models.answer import AnswerCacheStats
+
+
+class AnswerCache(ABC):
+    """
+    Generated answers keyed by the question and a hash of the context they
+    were generated from, so any change in what retrieval returns misses.
+    """
+
+    @abstractmethod
+    def get(self, question: str, context_hash: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def put(self, question: str, context_hash: str, answer: str) -> None:
+        pass
+
+    @abstractmethod
+    def stats(self) -> AnswerCacheStats:
+        pass
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 from src.domain.models.chunk import Chunk
+from src.domain.models.compaction import CompactionReport
 
 
 class ChunkStore(ABC):
@@ -7,14 +9,56 @@ class ChunkStore(ABC):
     def save(self, chunks: list[Chunk]):
         pass
 
+    @abstractmethod
+    def get(self, chunk_id: str) -> Optional[Chunk]:
+        pass
+
     @abstractmethod
     def delete(self, chunk_id: str):
         pass
 
+    def delete_many(self, chunk_ids: list[str]):
+        """
+        Deletes several chunks. Stores that can remove them in one write
+        override this; the default deletes one by one.
+        """
+        for chunk_id in chunk_ids:
+            self.delete(chunk_id)
+
     @abstractmethod
-    def search(self, query_embedding: list[float], top_k: int = 5) -> list[Chunk]:
+    def search(
+        self,
+        query_embedding: list[float],
+        top_k: int = 5,
+        filter: Optional[dict] = None,
+        include_embeddings: bool = False,
+    ) -> list[Chunk]:
+        """
+        The top_k chunks by similarity, best first, each with its score.
+        ``include_embeddings`` also returns the stored vector of every chunk.
+        """
+        pass
+
+    def search_many(
+        self, query_embeddings: list[list[float]], top_k: int = 5, filter: Optional[dict] = None
+    ) -> list[list[Chunk]]:
+        """
+        One ranking per query embedding. Stores that can score several
+        queries in one pass override this; the default searches one by one.
+        """
+        return [self.search(query_embedding, top_k=top_k, filter=filter) for query_embedding in query_embeddings]
+
+    @abstractmethod
+    def lexical_search(self, query: str, top_k: int = 5, filter: Optional[dict] = None) -> list[Chunk]:
         pass
 
     @abstractmethod
     def clear(self):
         pass
+
+    def compact(self) -> CompactionReport:
+        """
+        Rewrites the live records into fresh files and drops the dead ones.
+        Only stores that manage their own files support it.
+        """
+        raise ValueError(f"{type(self).__name__} does not support compaction.")
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Collection, List
 from domain.models.document import Document
 
 
 class DocumentLoader(ABC):
     @abstractmethod
-    def load(self, source: str) -> List[Document]:
+    def load(self, source: str, exclude: Collection[str] = ()) -> List[Document]:
+        """Loads every file under ``source`` except the paths in ``exclude``."""
         pass
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator
+from domain.models.watch import FileState
+
+
+class FileWatcher(ABC):
+    @abstractmethod
+    def scan(self, source: str) -> Dict[str, FileState]:
+        """The state of every file under ``source``, keyed by the path the document loader reports."""
+        pass
+
+    @abstractmethod
+    def watch(self, source: str) -> Iterator[Dict[str, FileState]]:
+        """
+        Yields a snapshot of ``source`` right away, then again every time
+        the tree has changed and stayed unchanged for the debounce period.
+        """
+        pass
@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from src.domain.models.chunk import Chunk
+
+
+class Reranker(ABC):
+    @abstractmethod
+    def rerank(
+        self, query: str, query_embedding: Optional[List[float]], chunks: List[Chunk], top_k: int
+    ) -> List[Chunk]:
+        """
+        The top_k of ``chunks`` for ``query``, best first, each with its
+        reranking score. Chunks may carry their stored ``embedding``;
+        ``query_embedding`` is None when the search made no embedding call.
+        """
+        pass
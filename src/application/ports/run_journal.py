@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from domain.models.chunk import Chunk
+from domain.models.ingestion import IngestionCheckpoint
+
+
+class RunJournal(ABC):
+    @abstractmethod
+    def start(self, run: Dict[str, Any]) -> None:
+        """Begins a new run described by ``run``, discarding any previous one."""
+        pass
+
+    @abstractmethod
+    def resume(self, run: Dict[str, Any]) -> IngestionCheckpoint:
+        """Reads back the checkpoint of the same run; a missing or different run is a ValueError."""
+        pass
+
+    @abstractmethod
+    def commit(
+        self,
+        chunk_ids: List[str],
+        completed_files: List[str],
+        partial_files: Optional[Dict[str, List[Chunk]]] = None,
+    ) -> None:
+        """
+        Durably records a batch of stored chunks, the files it completed and
+        all the chunks of the files it stored only part of.
+        """
+        pass
+
+    @abstractmethod
+    def finish(self) -> None:
+        pass
+
+    def close(self) -> None:
+        """Lets go of a run that stopped unfinished, so another can resume it; finishing closes too."""
+        pass
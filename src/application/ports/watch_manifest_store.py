@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from domain.models.watch import WatchManifest
+
+
+class WatchManifestStore(ABC):
+    @abstractmethod
+    def read(self) -> Optional[WatchManifest]:
+        """The manifest last written, or None when the store was never watched."""
+        pass
+
+    @abstractmethod
+    def write(self, manifest: WatchManifest) -> None:
+        """Replaces the manifest atomically: a crash leaves either the old or the new one."""
+        pass
@@ -0,0 +1,129 @@
+import asyncio
+from itertools import islice
+from typing import AsyncIterator, Iterable, List, Optional
+from google.genai.errors import APIError
+from langchain_google_genai._common import GoogleGenerativeAIError
+from application.use_cases.compression_use_case import CompressionUseCase
+from application.use_cases.storage_use_case import StorageUseCase
+from application.use_cases.talk_use_case import TalkUseCase
+from src.domain.models.answer import QuestionResult
+from src.domain.models.chunk import Chunk
+from src.domain.models.enums import SearchMode
+
+DEFAULT_CONCURRENCY = 8
+# Questions retrieved together with one search_many call
+DEFAULT_RETRIEVAL_BATCH_SIZE = 64
+# Failures reported on the affected questions: unreachable stores and APIs
+# (OSError covers connection errors and timeouts), rejected requests and
+# Gemini API errors. Anything else is a bug and stops the run.
+RETRIEVAL_ERRORS = (OSError, RuntimeError, ValueError, GoogleGenerativeAIError, APIError)
+GENERATION_ERRORS = (OSError, RuntimeError, ValueError, GoogleGenerativeAIError, APIError)
+
+
+class BatchTalkUseCase:
+    """
+    Answers many questions concurrently.
+
+    Questions are retrieved in batches (one batched embedding call and one
+    scoring pass each) on a worker thread, while up to ``concurrency``
+    answers are generated at a time on the event loop. Retrieval of the next
+    batch overlaps with the generations of the previous one, and results are
+    yielded as they complete, so they do not follow the input order. A
+    failed retrieval or generation is reported on the questions it affects,
+    while unexpected errors propagate; answers still running when the caller
+    stops iterating, or when an error propagates, are cancelled.
+    """
+
+    def __init__(
+        self,
+        storage_use_case: StorageUseCase,
+        talk_use_case: TalkUseCase,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        batch_size: int = DEFAULT_RETRIEVAL_BATCH_SIZE,
+        compression_use_case: Optional[CompressionUseCase] = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("The concurrency must be at least 1.")
+        self.storage_use_case = storage_use_case
+        self.talk_use_case = talk_use_case
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.compression_use_case = compression_use_case
+
+    async def answer_all(
+        self,
+        questions: Iterable[str],
+        top_k: int = 5,
+        mode: SearchMode = SearchMode.VECTOR,
+        filter: Optional[dict] = None,
+        mmr_lambda: Optional[float] = None,
+        rerank_candidates: Optional[int] = None,
+    ) -> AsyncIterator[QuestionResult]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        questions = iter(questions)
+        pending = set()
+        index = 0
+        try:
+            while batch := list(islice(questions, self.batch_size)):
+                try:
+                    query_embeddings = None
+                    if self.compression_use_case is not None and mode != SearchMode.LEXICAL:
+                        # Embedded once, for retrieval and for scoring the sentences
+                        query_embeddings = await asyncio.to_thread(self.storage_use_case.embed_queries, batch)
+                    rankings = await self.storage_use_case.asearch_many(
+                        batch, top_k, mode, filter, mmr_lambda, rerank_candidates,
+                        query_embeddings=query_embeddings,
+                    )
+                except RETRIEVAL_ERRORS as e:
+                    # A failed retrieval fails its own questions, not the whole run
+                    for question in batch:
+                        yield QuestionResult(index, question, error=str(e))
+                        index += 1
+                    continue
+                for position, (question, chunks) in enumerate(zip(batch, rankings)):
+                    query_embedding = None if query_embeddings is None else query_embeddings[position]
+                    pending.add(asyncio.create_task(self._answer(index, question, chunks, query_embedding, semaphore)))
+                    index += 1
+
+                if pending:
+                    done, pending = await asyncio.wait(pending, timeout=0)
+                    for task in done:
+                        yield task.result()
+                # Bound the questions waiting for the model, so a huge file is not retrieved all at once
+                while len(pending) > self.batch_size:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            # Reached with answers still running when the caller stops iterating or a yield raises
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _answer(
+        self,
+        index: int,
+        question: str,
+        chunks: List[Chunk],
+        query_embedding: Optional[List[float]],
+        semaphore: asyncio.Semaphore,
+    ) -> QuestionResult:
+        context = self.talk_use_case.pack(chunks)
+        sources = list(dict.fromkeys(str(chunk.metadata.get("source", "")) for chunk in context.chunks))
+        compression = None
+        async with semaphore:
+            try:
+                if self.compression_use_case is not None:
+                    context, compression = await asyncio.to_thread(
+                        self.compression_use_case.compress, question, context, query_embedding
+                    )
+                answer = await self.talk_use_case.aanswer(question, context)
+            except GENERATION_ERRORS as e:
+                # One failed generation must not abort a batch of thousands
+                return QuestionResult(index, question, sources=sources, error=str(e), compression=compression)
+        return QuestionResult(index, question, answer=answer, sources=sources, compression=compression)
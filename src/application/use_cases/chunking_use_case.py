@@ -9,6 +9,7 @@ from src.domain.strategies.structure_based_chunking import (
 )
 from src.domain.strategies.semantic_chunking import SemanticChunkingStrategy
 from src.domain.models.chunk import Chunk
+from src.domain.models.document import Document
 
 
 class ChunkingUseCase:
@@ -28,7 +29,15 @@ class ChunkingUseCase:
         loader_mode: str = "single",
     ) -> List[Chunk]:
         documents = self.document_loader.load(source)
+        return self.chunk(documents, strategy_name, strategy_config)
 
+    def chunk(
+        self,
+        documents: List[Document],
+        strategy_name: str,
+        strategy_config: Dict[str, Any],
+    ) -> List[Chunk]:
+        """Chunks already loaded documents with the named strategy."""
         strategy_class = self.strategies.get(strategy_name)
         if not strategy_class:
             raise ValueError(f"Invalid strategy: {strategy_name}")
@@ -0,0 +1,86 @@
+import time
+from dataclasses import replace
+from typing import Callable, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+from src.domain.models.context import CompressionReport, PackedContext
+from src.domain.services.context_packing import estimate_tokens
+from src.domain.services.sentence_compression import select_sentences, split_sentences
+
+DEFAULT_COMPRESSION_TOKEN_BUDGET = 1000
+# Assumed prompt tokens a hosted model processes per second; the latency saved is estimated from it, not measured
+DEFAULT_PROMPT_TOKENS_PER_SECOND = 2000.0
+
+
+class CompressionUseCase:
+    """
+    Extractive compression of a packed context: the sentences of its chunks
+    are scored against the question and only the best ones that fit the
+    token budget are kept, in their original order.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        token_budget: int = DEFAULT_COMPRESSION_TOKEN_BUDGET,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+    ):
+        if token_budget < 1:
+            raise ValueError("The compression token budget must be at least 1.")
+        self.embeddings = embeddings
+        self.token_budget = token_budget
+        self.count_tokens = count_tokens
+
+    def compress(
+        self, query: str, context: PackedContext, query_embedding: Optional[List[float]] = None
+    ) -> Tuple[PackedContext, CompressionReport]:
+        """
+        Compresses ``context`` for ``query``. Pass the ``query_embedding``
+        retrieval used, so only the sentences are embedded.
+        """
+        started = time.perf_counter()
+        sentences, owners = [], []
+        for position, chunk in enumerate(context.chunks):
+            for sentence in split_sentences(chunk.content):
+                sentences.append(sentence)
+                owners.append(position)
+
+        tokens_before = sum(self.count_tokens(sentence) for sentence in sentences)
+        if tokens_before <= self.token_budget:
+            # Already within budget: the context is kept as is, without an embedding call
+            return context, CompressionReport(
+                tokens_before=tokens_before,
+                tokens_after=tokens_before,
+                sentences_before=len(sentences),
+                sentences_after=len(sentences),
+                seconds=time.perf_counter() - started,
+            )
+
+        if query_embedding is None:
+            query_embedding = self.embeddings.embed_query(query)
+        # All sentences go in one batched call
+        kept = select_sentences(
+            sentences,
+            query_embedding,
+            self.embeddings.embed_documents(sentences),
+            self.token_budget,
+            self.count_tokens,
+        )
+
+        kept_by_chunk = {}
+        for index in kept:
+            kept_by_chunk.setdefault(owners[index], []).append(sentences[index])
+        chunks = [
+            replace(chunk, content=" ".join(kept_by_chunk[position]))
+            for position, chunk in enumerate(context.chunks)
+            if position in kept_by_chunk
+        ]
+        tokens_after = sum(self.count_tokens(sentences[index]) for index in kept)
+        compressed = replace(context, chunks=chunks, tokens=sum(self.count_tokens(chunk.content) for chunk in chunks))
+        report = CompressionReport(
+            tokens_before=tokens_before,
+            tokens_after=tokens_after,
+            sentences_before=len(sentences),
+            sentences_after=len(kept),
+            seconds=time.perf_counter() - started,
+        )
+        return compressed, report
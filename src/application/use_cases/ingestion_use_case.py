@@ -0,0 +1,112 @@
+from typing import Any, Dict, List, Optional
+from application.ports.run_journal import RunJournal
+from application.use_cases.chunking_use_case import ChunkingUseCase
+from application.use_cases.storage_use_case import StorageUseCase
+from src.domain.models.chunk import Chunk
+from src.domain.models.ingestion import IngestionCheckpoint, IngestionReport
+from src.domain.services.chunk_identity import chunk_id
+
+# Chunks embedded and saved per journaled commit
+DEFAULT_INGESTION_BATCH_SIZE = 256
+
+
+class IngestionUseCase:
+    """
+    Loads, chunks and saves a source in journaled batches.
+
+    After every saved batch the journal records its chunk ids and the files
+    whose last chunk it held; a file split across batches is journaled with
+    all its chunks the first time. Resuming an interrupted run skips completed
+    files at load time, takes the chunks of a split file from the journal
+    instead of chunking it again, and skips already committed chunks, so
+    nothing stored before the interruption is embedded again.
+    """
+
+    def __init__(
+        self,
+        chunking_use_case: ChunkingUseCase,
+        storage_use_case: StorageUseCase,
+        journal: RunJournal,
+        batch_size: int = DEFAULT_INGESTION_BATCH_SIZE,
+    ):
+        if batch_size < 1:
+            raise ValueError("The ingestion batch size must be at least 1.")
+        self.chunking_use_case = chunking_use_case
+        self.storage_use_case = storage_use_case
+        self.journal = journal
+        self.batch_size = batch_size
+
+    def execute(
+        self,
+        source: str,
+        strategy_name: str,
+        strategy_config: Dict[str, Any],
+        resume: bool = False,
+    ) -> IngestionReport:
+        run = {"source": source, "strategy": strategy_name, "config": strategy_config}
+        if resume:
+            checkpoint = self.journal.resume(run)
+        else:
+            checkpoint = IngestionCheckpoint()
+            self.journal.start(run)
+
+        try:
+            documents = self.chunking_use_case.document_loader.load(
+                source, exclude=checkpoint.completed_files | set(checkpoint.partial_files)
+            )
+            chunks = self.chunking_use_case.chunk(documents, strategy_name, strategy_config)
+            report = IngestionReport(
+                chunks_saved=0, files_completed=0, files_skipped=len(checkpoint.completed_files)
+            )
+
+            batch: List[Chunk] = []
+            completed: List[str] = []
+            journaled = set(checkpoint.partial_files)
+            # The file the interrupted run was saving comes first
+            groups = {**checkpoint.partial_files, **self._group_by_file(documents, chunks)}
+            for file_name, file_chunks in groups.items():
+                remaining = [chunk for chunk in file_chunks if chunk_id(chunk) not in checkpoint.committed_chunk_ids]
+                report.chunks_skipped += len(file_chunks) - len(remaining)
+                if not remaining:
+                    completed.append(file_name)
+                for position, chunk in enumerate(remaining, start=1):
+                    batch.append(chunk)
+                    if position == len(remaining):
+                        completed.append(file_name)
+                    if len(batch) == self.batch_size:
+                        partial = None
+                        if position < len(remaining) and file_name not in journaled:
+                            partial = {file_name: file_chunks}
+                            journaled.add(file_name)
+                        self._commit(batch, completed, report, partial)
+                        batch, completed = [], []
+            if batch or completed:
+                self._commit(batch, completed, report)
+
+            self.journal.finish()
+        finally:
+            # A failed batch leaves the run resumable by a later ingestion
+            self.journal.close()
+        return report
+
+    def _commit(
+        self,
+        batch: List[Chunk],
+        completed: List[str],
+        report: IngestionReport,
+        partial: Optional[Dict[str, List[Chunk]]] = None,
+    ) -> None:
+        if batch:
+            self.storage_use_case.save(batch)
+        # Only once the store holds the batch may the journal vouch for it
+        self.journal.commit([chunk_id(chunk) for chunk in batch], completed, partial)
+        report.chunks_saved += len(batch)
+        report.files_completed += len(completed)
+
+    @staticmethod
+    def _group_by_file(documents, chunks: List[Chunk]) -> Dict[str, List[Chunk]]:
+        """Chunks per source file in document order; files without chunks map to an empty list."""
+        groups: Dict[str, List[Chunk]] = {document.metadata.get("source", ""): [] for document in documents}
+        for chunk in chunks:
+            groups.setdefault(chunk.metadata.get("source", ""), []).append(chunk)
+        return groups
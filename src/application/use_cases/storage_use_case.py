@@ -1,31 +1,270 @@
-from typing import List
+import asyncio
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional
 from src.domain.models.chunk import Chunk
-from src.domain.models.enums import StorageType
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from src.domain.models.compaction import CompactionReport
+from src.domain.models.enums import LocalIndexType, SearchMode, StorageType, VectorQuantization
+from src.domain.services.chunk_identity import chunk_id
+from src.domain.services.diversification import maximal_marginal_relevance
+from src.domain.services.metadata_filter import validate_where
+from src.domain.services.rank_fusion import reciprocal_rank_fusion
+from langchain_core.embeddings import Embeddings
 from infrastructure.adapters.chunk_stores.chroma_chunk_store import (
     ChromaChunkStore,
 )
-from infrastructure.adapters.chunk_stores.file_system_chunk_store import (
-    FileSystemChunkStore,
+from infrastructure.adapters.chunk_stores.local_chunk_stores import (
+    open_local_chunk_store,
 )
+from infrastructure.adapters.chunk_stores.sharded_chunk_store import (
+    open_sharded_chunk_store,
+)
+from infrastructure.adapters.embeddings.cached_query_embeddings import (
+    build_query_embeddings,
+)
+from infrastructure.adapters.rerankers.feature_reranker import FeatureReranker
+from application.ports.reranker import Reranker
+
+# Each ranking fed to the fusion is this many times deeper than the final top_k
+HYBRID_CANDIDATE_FACTOR = 4
+
+# MMR picks the final top_k from this many times as many vector candidates
+MMR_CANDIDATE_FACTOR = 4
+
+
+def _check_mmr_mode(mode: SearchMode, mmr_lambda: Optional[float]) -> None:
+    if mmr_lambda is not None and mode != SearchMode.VECTOR:
+        raise ValueError(f"MMR re-ranks vector search results; it cannot be combined with the '{mode.value}' mode.")
+
+
+def _check_rerank(top_k: int, rerank_candidates: Optional[int], mmr_lambda: Optional[float]) -> None:
+    if rerank_candidates is None:
+        return
+    if mmr_lambda is not None:
+        raise ValueError("Reranking and MMR both reorder the candidates; use one of them.")
+    if rerank_candidates < top_k:
+        raise ValueError(f"Rerank at least top_k={top_k} candidates, got {rerank_candidates}.")
 
 
 class StorageUseCase:
-    def __init__(self, store_type: StorageType, output_loc: str = None):
-        if store_type == StorageType.LOCAL:
-            self.chunk_store = FileSystemChunkStore(output_loc)
+    def __init__(
+        self,
+        store_type: StorageType,
+        output_loc: str = None,
+        embeddings: Embeddings = None,
+        quantization: VectorQuantization = VectorQuantization.FLOAT32,
+        index_type: Optional[LocalIndexType] = None,
+        index_options: Optional[Dict[str, Any]] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        persist_directory: Optional[str] = None,
+        shards: Optional[int] = None,
+        reranker: Optional[Reranker] = None,
+    ):
+        sharded_store = open_sharded_chunk_store(
+            store_type,
+            output_loc,
+            shards=shards,
+            quantization=quantization,
+            index_type=index_type,
+            index_options=index_options,
+            persist_directory=persist_directory,
+        )
+        if sharded_store is not None:
+            self.chunk_store = sharded_store
+        elif store_type == StorageType.LOCAL:
+            self.chunk_store = open_local_chunk_store(
+                output_loc,
+                index_type=index_type,
+                quantization=quantization,
+                index_options=index_options,
+            )
         else:
-            self.chunk_store = ChromaChunkStore(output_loc)
+            self.chunk_store = ChromaChunkStore(output_loc, persist_directory=persist_directory, progress=progress)
+        self._embeddings = embeddings
+        self.reranker = reranker or FeatureReranker()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """
+        Lazily initializes the cached query embeddings, so commands that
+        never search (save, clean) don't need an embeddings client.
+        """
+        if self._embeddings is None:
+            self._embeddings = build_query_embeddings()
+        return self._embeddings
 
     def save(self, chunks: List[Chunk]) -> None:
         self.chunk_store.save(chunks)
 
-    def search(self, query: str, top_k: int = 5) -> List[Chunk]:
+    def delete(self, chunk_ids: List[str]) -> None:
+        self.chunk_store.delete_many(chunk_ids)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        mode: SearchMode = SearchMode.VECTOR,
+        filter: Optional[dict] = None,
+        mmr_lambda: Optional[float] = None,
+        rerank_candidates: Optional[int] = None,
+        query_embedding: Optional[List[float]] = None,
+    ) -> List[Chunk]:
+        """
+        Retrieves the top_k chunks for a query.
+
+        VECTOR ranks by embedding similarity, LEXICAL by BM25 (no embedding
+        call at all) and HYBRID fuses both rankings with reciprocal rank fusion.
+        ``filter`` restricts every ranking to chunks whose metadata matches it.
+        With ``mmr_lambda`` a vector search re-ranks a deeper candidate pool
+        with maximal marginal relevance, so near-duplicate chunks (e.g. from
+        overlapping splits) do not crowd out the rest of the top_k.
+        With ``rerank_candidates`` the mode retrieves that many candidates
+        and the reranker keeps the top_k best of them.
+        A ``query_embedding`` the caller already has replaces the embedding call.
+        """
+        validate_where(filter)
+        _check_mmr_mode(mode, mmr_lambda)
+        _check_rerank(top_k, rerank_candidates, mmr_lambda)
+        if query_embedding is None and mode != SearchMode.LEXICAL:
+            # Repeated queries are answered from the cache without a round-trip
+            query_embedding = self.embeddings.embed_query(query)
+        if rerank_candidates is not None:
+            return self._reranked_search(query, query_embedding, top_k, mode, filter, rerank_candidates)
+        if mmr_lambda is not None:
+            return self._diversified_search(query_embedding, top_k, filter, mmr_lambda)
+        if mode == SearchMode.LEXICAL:
+            return self.chunk_store.lexical_search(query, top_k=top_k, filter=filter)
+        if mode == SearchMode.HYBRID:
+            candidates = top_k * HYBRID_CANDIDATE_FACTOR
+            lexical = self.chunk_store.lexical_search(query, top_k=candidates, filter=filter)
+            vector = self.chunk_store.search(query_embedding, top_k=candidates, filter=filter)
+            return reciprocal_rank_fusion([lexical, vector])[:top_k]
 
         # Retrieve relevant chunks
-        relevant_chunks = self.chunk_store.search(query, top_k=top_k)
+        relevant_chunks = self.chunk_store.search(query_embedding, top_k=top_k, filter=filter)
 
         return relevant_chunks
 
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        mode: SearchMode = SearchMode.VECTOR,
+        filter: Optional[dict] = None,
+        mmr_lambda: Optional[float] = None,
+        rerank_candidates: Optional[int] = None,
+        query_embeddings: Optional[List[List[float]]] = None,
+    ) -> List[List[Chunk]]:
+        """
+        ``search`` for a batch of queries, one ranking per query in order.
+
+        All queries are embedded in one batched call, unless the caller passes
+        ``query_embeddings``, and the store scores them together; lexical
+        rankings need no embeddings and run per query.
+        """
+        validate_where(filter)
+        _check_mmr_mode(mode, mmr_lambda)
+        _check_rerank(top_k, rerank_candidates, mmr_lambda)
+        if not queries:
+            return []
+        if query_embeddings is None:
+            query_embeddings = [None] * len(queries) if mode == SearchMode.LEXICAL else self.embed_queries(queries)
+        if rerank_candidates is not None:
+            return [
+                self._reranked_search(query, query_embedding, top_k, mode, filter, rerank_candidates)
+                for query, query_embedding in zip(queries, query_embeddings)
+            ]
+        if mode == SearchMode.LEXICAL:
+            return [self.chunk_store.lexical_search(query, top_k=top_k, filter=filter) for query in queries]
+        if mmr_lambda is not None:
+            return [
+                self._diversified_search(query_embedding, top_k, filter, mmr_lambda)
+                for query_embedding in query_embeddings
+            ]
+        if mode == SearchMode.HYBRID:
+            candidates = top_k * HYBRID_CANDIDATE_FACTOR
+            vector = self.chunk_store.search_many(query_embeddings, top_k=candidates, filter=filter)
+            return [
+                reciprocal_rank_fusion(
+                    [self.chunk_store.lexical_search(query, top_k=candidates, filter=filter), ranking]
+                )[:top_k]
+                for query, ranking in zip(queries, vector)
+            ]
+        return self.chunk_store.search_many(query_embeddings, top_k=top_k, filter=filter)
+
+    async def asearch(
+        self,
+        query: str,
+        top_k: int = 5,
+        mode: SearchMode = SearchMode.VECTOR,
+        filter: Optional[dict] = None,
+        mmr_lambda: Optional[float] = None,
+        rerank_candidates: Optional[int] = None,
+        query_embedding: Optional[List[float]] = None,
+    ) -> List[Chunk]:
+        """``search`` on a worker thread, so an event loop keeps serving other questions meanwhile."""
+        return await asyncio.to_thread(
+            self.search, query, top_k, mode, filter, mmr_lambda, rerank_candidates, query_embedding
+        )
+
+    async def asearch_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        mode: SearchMode = SearchMode.VECTOR,
+        filter: Optional[dict] = None,
+        mmr_lambda: Optional[float] = None,
+        rerank_candidates: Optional[int] = None,
+        query_embeddings: Optional[List[List[float]]] = None,
+    ) -> List[List[Chunk]]:
+        """``search_many`` on a worker thread."""
+        return await asyncio.to_thread(
+            self.search_many, queries, top_k, mode, filter, mmr_lambda, rerank_candidates, query_embeddings
+        )
+
+    def _reranked_search(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]],
+        top_k: int,
+        mode: SearchMode,
+        filter: Optional[dict],
+        candidates: int,
+    ) -> List[Chunk]:
+        """Retrieves ``candidates`` chunks, with their stored vectors where the mode has them, and reranks them."""
+        if mode == SearchMode.LEXICAL:
+            pool = self.chunk_store.lexical_search(query, top_k=candidates, filter=filter)
+        else:
+            pool = self.chunk_store.search(query_embedding, top_k=candidates, filter=filter, include_embeddings=True)
+            if mode == SearchMode.HYBRID:
+                vectors = {chunk_id(chunk): chunk.embedding for chunk in pool}
+                lexical = self.chunk_store.lexical_search(query, top_k=candidates, filter=filter)
+                pool = [
+                    replace(chunk, embedding=vectors.get(chunk_id(chunk)))
+                    for chunk in reciprocal_rank_fusion([lexical, pool])[:candidates]
+                ]
+        reranked = self.reranker.rerank(query, query_embedding, pool, top_k)
+        return [replace(chunk, embedding=None) for chunk in reranked]
+
+    def _diversified_search(
+        self, query_embedding: List[float], top_k: int, filter: Optional[dict], mmr_lambda: float
+    ) -> List[Chunk]:
+        candidates = self.chunk_store.search(
+            query_embedding, top_k=top_k * MMR_CANDIDATE_FACTOR, filter=filter, include_embeddings=True
+        )
+        picked = maximal_marginal_relevance(
+            query_embedding, [chunk.embedding for chunk in candidates], top_k, mmr_lambda
+        )
+        return [replace(candidates[index], embedding=None) for index in picked]
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """The query embeddings ``search_many`` would compute, in one batched call where the model allows."""
+        if hasattr(self.embeddings, "embed_queries"):
+            return self.embeddings.embed_queries(queries)
+        return [self.embeddings.embed_query(query) for query in queries]
+
+    def compact(self) -> CompactionReport:
+        """Reclaims the space of deleted and superseded records; local stores only."""
+        return self.chunk_store.compact()
+
     def clear(self) -> None:
         self.chunk_store.clear()
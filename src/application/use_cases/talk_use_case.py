@@ -1,6 +1,16 @@
-from typing import List
+import time
+from typing import Callable, Generator, Iterator, List, Optional
 from pathlib import Path
+from application.ports.answer_cache import AnswerCache
+from src.domain.models.answer import Answer
 from src.domain.models.chunk import Chunk
+from src.domain.models.context import PackedContext
+from src.domain.services.context_packing import (
+    DEFAULT_CONTEXT_TOKEN_BUDGET,
+    estimate_tokens,
+    pack_context,
+)
+from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.runnables import Runnable
@@ -18,14 +28,26 @@ except FileNotFoundError as e:
     print(f"FATAL: Could not load query template. {e}")
     raise
 
+DEFAULT_CHAT_MODEL = "gemini-2.5-flash"
+NO_CONTEXT_ANSWER = "No relevant information found to answer the query. Please try rephrasing your question."
+
 
 class TalkUseCase:
-    def __init__(self):
+    def __init__(
+        self,
+        context_tokens: Optional[int] = DEFAULT_CONTEXT_TOKEN_BUDGET,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+        chat_model: Optional[BaseChatModel] = None,
+        answer_cache: Optional[AnswerCache] = None,
+    ):
+        self.context_tokens = context_tokens
+        self.count_tokens = count_tokens
+        self.answer_cache = answer_cache
         # The chain is the core of your use case. Define it once.
         # This is a sequence of operations: prompt -> model -> output_parser
         self.chain: Runnable = (
             ChatPromptTemplate.from_template(QUERY_TEMPLATE_CONTENT)
-            | ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.0) # Updated model name for best practice
+            | (chat_model or ChatGoogleGenerativeAI(model=DEFAULT_CHAT_MODEL, temperature=0.0)) # Updated model name for best practice
             | StrOutputParser()
         )
 
@@ -33,16 +55,115 @@ class TalkUseCase:
         """
         Executes the question-answering chain using the provided query and context.
         """
-        context = "\n\n".join([chunk.content for chunk in relevant_chunks])
+        return self.answer(query, self.pack(relevant_chunks))
+
+    def pack(self, relevant_chunks: List[Chunk]) -> PackedContext:
+        """
+        Merges overlapping and duplicate chunks and keeps the best ones that
+        fit the context token budget, so a large top_k no longer inflates the prompt.
+        """
+        return pack_context(relevant_chunks, self.context_tokens, self.count_tokens)
 
+    def answer(self, query: str, context: PackedContext) -> str:
         # A simple guard clause is cleaner
-        if not context:
-            return "No relevant information found to answer the query. Please try rephrasing your question."
+        if not context.chunks:
+            return NO_CONTEXT_ANSWER
+
+        cached = self._cached_answer(query, context)
+        if cached is not None:
+            return cached
 
         # The chain is invoked with a dictionary matching the variables in the template
         response = self.chain.invoke({
-            "context": context,
+            "context": context.content,
             "question": query
         })
 
-        return response
\ No newline at end of file
+        self._cache_answer(query, context, response)
+        return response
+
+    def stream(self, query: str, context: PackedContext) -> Iterator[str]:
+        """Yields the answer piece by piece as the model generates it."""
+        if not context.chunks:
+            yield NO_CONTEXT_ANSWER
+            return
+        yield from self.chain.stream({"context": context.content, "question": query})
+
+    def answer_streaming(
+        self, query: str, context: PackedContext, on_token: Callable[[str], None]
+    ) -> Answer:
+        """
+        Streams the answer into ``on_token`` and measures the time to the
+        first token and to the end of the generation.
+        """
+        pieces = self.timed_stream(query, context)
+        while True:
+            try:
+                on_token(next(pieces))
+            except StopIteration as finished:
+                return finished.value
+
+    def timed_stream(self, query: str, context: PackedContext) -> Generator[str, None, Answer]:
+        """
+        Yields the answer piece by piece, from the answer cache when it has
+        it, and returns the timed ``Answer`` when the generation is done.
+        """
+        started = time.perf_counter()
+        cached = self._cached_answer(query, context)
+        if cached is not None:
+            yield cached
+            elapsed = time.perf_counter() - started
+            return Answer(text=cached, first_token_seconds=elapsed, total_seconds=elapsed, cached=True)
+
+        pieces = []
+        first_token_seconds = None
+        for piece in self.stream(query, context):
+            if first_token_seconds is None and piece:
+                first_token_seconds = time.perf_counter() - started
+            pieces.append(piece)
+            yield piece
+        total_seconds = time.perf_counter() - started
+        self._cache_answer(query, context, "".join(pieces))
+        return Answer(
+            text="".join(pieces),
+            first_token_seconds=total_seconds if first_token_seconds is None else first_token_seconds,
+            total_seconds=total_seconds,
+        )
+
+    async def aanswer(self, query: str, context: PackedContext) -> Answer:
+        """
+        ``answer_streaming`` for an event loop: the chain is consumed with
+        ``astream``, so many questions can wait on the model concurrently.
+        """
+        started = time.perf_counter()
+        cached = self._cached_answer(query, context)
+        if cached is not None:
+            elapsed = time.perf_counter() - started
+            return Answer(text=cached, first_token_seconds=elapsed, total_seconds=elapsed, cached=True)
+        if not context.chunks:
+            elapsed = time.perf_counter() - started
+            return Answer(text=NO_CONTEXT_ANSWER, first_token_seconds=elapsed, total_seconds=elapsed)
+
+        pieces = []
+        first_token_seconds = None
+        async for piece in self.chain.astream({"context": context.content, "question": query}):
+            if first_token_seconds is None and piece:
+                first_token_seconds = time.perf_counter() - started
+            pieces.append(piece)
+        total_seconds = time.perf_counter() - started
+        self._cache_answer(query, context, "".join(pieces))
+        return Answer(
+            text="".join(pieces),
+            first_token_seconds=total_seconds if first_token_seconds is None else first_token_seconds,
+            total_seconds=total_seconds,
+        )
+
+    def _cached_answer(self, query: str, context: PackedContext) -> Optional[str]:
+        if self.answer_cache is None or not context.chunks:
+            return None
+        return self.answer_cache.get(query, context.digest)
+
+    def _cache_answer(self, query: str, context: PackedContext, answer: str) -> None:
+        # The canned reply for an empty context is cheap and must not shadow real answers
+        if self.answer_cache is not None and context.chunks:
+            self.answer_cache.put(query, context.digest, answer)
@@ -0,0 +1,173 @@
+import json
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set
+from application.ports.file_watcher import FileWatcher
+from application.ports.watch_manifest_store import WatchManifestStore
+from application.use_cases.chunking_use_case import ChunkingUseCase
+from application.use_cases.ingestion_use_case import DEFAULT_INGESTION_BATCH_SIZE
+from application.use_cases.storage_use_case import StorageUseCase
+from src.domain.models.chunk import Chunk
+from src.domain.models.watch import FileState, IndexedFile, SyncReport, WatchManifest
+from src.domain.services.chunk_identity import chunk_id
+from src.domain.services.tree_diff import diff_tree
+
+
+class WatchUseCase:
+    """
+    Keeps a store in step with a directory tree.
+
+    Every snapshot of the tree is compared with a manifest of the files
+    already indexed (their size, modification time and chunk ids). Only new
+    and modified files are loaded and chunked, all in one loader call; of
+    their chunks, those whose content-addressed id is already stored are
+    kept, and only the rest are embedded and saved. Chunks that a file no
+    longer produces, and every chunk of a deleted file, are removed. A
+    changed file that fails to load keeps its chunks and manifest entry, so
+    the next sync tries it again. The manifest is rewritten after each
+    committed batch, so a restarted watch picks up where the last one stopped.
+    """
+
+    def __init__(
+        self,
+        chunking_use_case: ChunkingUseCase,
+        storage_use_case: StorageUseCase,
+        manifest_store: WatchManifestStore,
+        watcher: FileWatcher,
+        batch_size: int = DEFAULT_INGESTION_BATCH_SIZE,
+    ):
+        if batch_size < 1:
+            raise ValueError("The ingestion batch size must be at least 1.")
+        self.chunking_use_case = chunking_use_case
+        self.storage_use_case = storage_use_case
+        self.manifest_store = manifest_store
+        self.watcher = watcher
+        self.batch_size = batch_size
+        self._manifest: Optional[WatchManifest] = None
+
+    def run(
+        self,
+        source: str,
+        strategy_name: str,
+        strategy_config: Dict[str, Any],
+        on_sync: Callable[[SyncReport], None],
+    ) -> None:
+        """
+        Syncs the tree as it is now, then after every settled change, until
+        interrupted. A failed sync is reported through ``on_sync`` and the
+        watch goes on; its files are retried by the next sync.
+        """
+        for snapshot in self.watcher.watch(source):
+            started = time.perf_counter()
+            try:
+                report = self.sync(source, strategy_name, strategy_config, snapshot)
+            except Exception as e:
+                # An embedding or store outage must not end a long-running watch
+                report = SyncReport(error=f"{type(e).__name__}: {e}", seconds=time.perf_counter() - started)
+            on_sync(report)
+
+    def sync(
+        self,
+        source: str,
+        strategy_name: str,
+        strategy_config: Dict[str, Any],
+        snapshot: Optional[Mapping[str, FileState]] = None,
+    ) -> SyncReport:
+        started = time.perf_counter()
+        snapshot = self.watcher.scan(source) if snapshot is None else snapshot
+        manifest = self._load_manifest({"source": source, "strategy": strategy_name, "config": strategy_config})
+        changed, removed = diff_tree(
+            {path: indexed.state for path, indexed in manifest.files.items()}, snapshot
+        )
+        report = SyncReport()
+
+        if removed:
+            stale = [chunk for path in removed for chunk in manifest.files[path].chunk_ids]
+            self.storage_use_case.delete(stale)
+            for path in removed:
+                del manifest.files[path]
+            self.manifest_store.write(manifest)
+            report.files_removed = len(removed)
+            report.chunks_deleted += len(stale)
+
+        if changed:
+            # Every file that did not change is excluded, so the loader reads the changed ones in parallel
+            changed_set = set(changed)
+            unchanged = [path for path in snapshot if path not in changed_set]
+            documents = self.chunking_use_case.document_loader.load(source, exclude=unchanged)
+            # The loader reports a file it cannot read and leaves it out; that must not empty it from the store
+            loaded = {str(document.metadata.get("source", "")) for document in documents}
+            report.files_skipped = sum(path not in loaded for path in changed)
+            changed = [path for path in changed if path in loaded]
+            chunks = self.chunking_use_case.chunk(documents, strategy_name, strategy_config) if documents else []
+            by_file: Dict[str, List[Chunk]] = {path: [] for path in changed}
+            for chunk in chunks:
+                by_file.setdefault(str(chunk.metadata.get("source", "")), []).append(chunk)
+
+            batch: List[Chunk] = []
+            stale: List[str] = []
+            indexed: Dict[str, IndexedFile] = {}
+            for path in changed:
+                kept, new_chunks, dropped, chunk_ids = self._plan(manifest.files.get(path), by_file[path])
+                batch.extend(new_chunks)
+                stale.extend(dropped)
+                indexed[path] = IndexedFile(snapshot[path], chunk_ids)
+                report.chunks_kept += kept
+                if len(batch) >= self.batch_size:
+                    self._commit(manifest, batch, stale, indexed, report)
+                    batch, stale, indexed = [], [], {}
+            if batch or stale or indexed:
+                self._commit(manifest, batch, stale, indexed, report)
+
+        report.seconds = time.perf_counter() - started
+        return report
+
+    @staticmethod
+    def _plan(previous: Optional[IndexedFile], chunks: List[Chunk]):
+        """
+        Splits the new chunks of a file into those already stored and those
+        to save, and lists the stored ones it no longer has.
+        """
+        stored: Set[str] = set(previous.chunk_ids) if previous else set()
+        unique: Dict[str, Chunk] = {}
+        for chunk in chunks:
+            unique.setdefault(chunk_id(chunk), chunk)
+        new_chunks = [chunk for chunk_key, chunk in unique.items() if chunk_key not in stored]
+        dropped = [chunk_key for chunk_key in stored if chunk_key not in unique]
+        return len(unique) - len(new_chunks), new_chunks, dropped, list(unique)
+
+    def _commit(
+        self,
+        manifest: WatchManifest,
+        batch: List[Chunk],
+        stale: List[str],
+        indexed: Dict[str, IndexedFile],
+        report: SyncReport,
+    ) -> None:
+        # Save before deleting, so a file being edited is never missing from the store
+        if batch:
+            self.storage_use_case.save(batch)
+        if stale:
+            self.storage_use_case.delete(stale)
+        # Only once the store holds the batch may the manifest vouch for it
+        manifest.files.update(indexed)
+        self.manifest_store.write(manifest)
+        report.files_indexed += len(indexed)
+        report.chunks_saved += len(batch)
+        report.chunks_deleted += len(stale)
+
+    def _load_manifest(self, run: Dict[str, Any]) -> WatchManifest:
+        """
+        The manifest of this run. One written with another strategy or config
+        still lists what is stored, but every file is marked to be re-chunked.
+        """
+        run = json.loads(json.dumps(run, sort_keys=True, default=str))
+        if self._manifest is not None and self._manifest.run == run:
+            return self._manifest
+        manifest = self._manifest or self.manifest_store.read()
+        if manifest is None:
+            manifest = WatchManifest(run=run)
+        elif manifest.run != run:
+            files = {path: IndexedFile(None, indexed.chunk_ids) for path, indexed in manifest.files.items()}
+            manifest = WatchManifest(run=run, files=files)
+        self._manifest = manifest
+        return manifest
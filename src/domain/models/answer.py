@@ -0,0 +1,41 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+from src.domain.models.context import CompressionReport
+
+
+@dataclass
+class Answer:
+    """A generated answer and how long the model took to produce it."""
+    text: str
+    # Seconds from sending the prompt to the first streamed token, and to the last
+    first_token_seconds: float
+    total_seconds: float
+    # Served from the answer cache instead of the model
+    cached: bool = False
+
+
+@dataclass
+class AnswerCacheStats:
+    """Lookups an answer cache served, by exact key, by a similar question, or not at all."""
+    hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.semantic_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.hits + self.semantic_hits) / self.lookups if self.lookups else 0.0
+
+
+@dataclass
+class QuestionResult:
+    """The outcome of one question of a batch; ``error`` is set instead of ``answer`` when it failed."""
+    index: int
+    question: str
+    answer: Optional[Answer] = None
+    sources: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    compression: Optional[CompressionReport] = None
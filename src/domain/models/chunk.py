@@ -1,8 +1,12 @@
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 
 @dataclass
 class Chunk:
     content: str
     metadata: Dict[str, Any]
+    score: Optional[float] = None
+    id: Optional[str] = None
+    # Only filled when a search is asked to return the stored vectors
+    embedding: Optional[List[float]] = None
@@ -1,13 +1,21 @@
-from dataclasses import dataclass
-from typing import Dict, Any
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
 
-from domain.models.enums import StorageType
+from domain.models.enums import LocalIndexType, SearchMode, StorageType, VectorQuantization
+from domain.services.context_packing import DEFAULT_CONTEXT_TOKEN_BUDGET
 
 @dataclass
 class StorageConfig:
     """Configuration for data storage."""
     storage_type: StorageType
     location: str
+    quantization: VectorQuantization = VectorQuantization.FLOAT32
+    index_type: Optional[LocalIndexType] = None
+    index_options: Dict[str, Any] = field(default_factory=dict)
+    # ChromaDB directory; None falls back to CHROMA_PERSIST_DIRECTORY or ./chroma_db
+    persist_directory: Optional[str] = None
+    # Number of hash partitions for a new store; existing stores record their own
+    shards: Optional[int] = None
 
 @dataclass
 class ChunkingConfig:
@@ -15,9 +23,21 @@ class ChunkingConfig:
     source_path: str
     strategy: str
     strategy_config: Dict[str, Any]
+    # Continue the run journaled in the store instead of starting over
+    resume: bool = False
 
 @dataclass
 class TalkConfig:
     """Configuration for the 'talk' or 'search' tasks."""
     query: str
-    top_k: int
\ No newline at end of file
+    top_k: int
+    mode: SearchMode = SearchMode.VECTOR
+    where: Optional[Dict[str, Any]] = None
+    # Relevance/diversity trade-off of MMR re-ranking; None keeps plain similarity order
+    mmr_lambda: Optional[float] = None
+    # Candidates retrieved before reranking down to top_k; None skips the reranker
+    rerank_candidates: Optional[int] = None
+    # Token budget of the packed context; None keeps every retrieved passage
+    context_tokens: Optional[int] = DEFAULT_CONTEXT_TOKEN_BUDGET
+    # Token budget of sentence compression; None sends the packed context as is
+    compress_tokens: Optional[int] = None
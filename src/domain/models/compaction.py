@@ -0,0 +1,39 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+
+@dataclass
+class CompactionReport:
+    """Outcome of rewriting the live records of a store into fresh files."""
+    records: int
+    bytes_before: int
+    bytes_after: int
+    # Mean seconds to read one record by id, from a freshly opened store
+    read_seconds_before: float
+    read_seconds_after: float
+
+    @property
+    def bytes_reclaimed(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    @property
+    def read_speedup(self) -> float:
+        return self.read_seconds_before / self.read_seconds_after if self.read_seconds_after else 1.0
+
+    @classmethod
+    def combine(cls, reports: Sequence["CompactionReport"]) -> "CompactionReport":
+        """Sums several reports (e.g. one per shard); latencies are weighted by record count."""
+        records = sum(report.records for report in reports)
+
+        def mean_latency(attribute: str) -> float:
+            if not records:
+                return 0.0
+            return sum(getattr(report, attribute) * report.records for report in reports) / records
+
+        return cls(
+            records=records,
+            bytes_before=sum(report.bytes_before for report in reports),
+            bytes_after=sum(report.bytes_after for report in reports),
+            read_seconds_before=mean_latency("read_seconds_before"),
+            read_seconds_after=mean_latency("read_seconds_after"),
+        )
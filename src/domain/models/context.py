@@ -0,0 +1,55 @@
+import hashlib
+from dataclasses import dataclass
+from typing import List
+from src.domain.models.chunk import Chunk
+
+CONTEXT_SEPARATOR = "\n\n"
+
+
+@dataclass
+class PackedContext:
+    """The chunks sent to the model as context, after merging and budgeting."""
+    chunks: List[Chunk]
+    tokens: int
+    # What retrieval returned, before duplicates, overlaps and the budget were applied
+    input_chunks: int
+    input_tokens: int
+
+    @property
+    def content(self) -> str:
+        return CONTEXT_SEPARATOR.join(chunk.content for chunk in self.chunks)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.input_tokens - self.tokens
+
+    @property
+    def digest(self) -> str:
+        """Hash of the packed text; it changes whenever retrieval returns something else."""
+        return hashlib.sha256(self.content.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CompressionReport:
+    """How much of a packed context sentence compression kept, and what it cost."""
+    tokens_before: int
+    tokens_after: int
+    sentences_before: int
+    sentences_after: int
+    seconds: float
+
+    @property
+    def ratio(self) -> float:
+        """Share of the tokens kept; 1.0 when nothing was removed."""
+        return self.tokens_after / self.tokens_before if self.tokens_before else 1.0
+
+    @property
+    def tokens_removed(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def estimated_seconds_saved(self, prompt_tokens_per_second: float) -> float:
+        """
+        Prompt processing time saved at an assumed model throughput, net of
+        the compression itself. An estimate: the model is not timed.
+        """
+        return self.tokens_removed / prompt_tokens_per_second - self.seconds
@@ -14,3 +14,21 @@ class SemanticChunkingThresholdType(str, Enum):
     STANDARD_DEVIATION = "standard_deviation"
     INTERQUARTILE = "interquartile"
     ABSOLUTE = "absolute"
+
+
+class VectorQuantization(str, Enum):
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
+    INT8 = "int8"
+
+
+class LocalIndexType(str, Enum):
+    FLAT = "flat"
+    HNSW = "hnsw"
+    IVF_PQ = "ivf_pq"
+
+
+class SearchMode(str, Enum):
+    VECTOR = "vector"
+    LEXICAL = "lexical"
+    HYBRID = "hybrid"
@@ -0,0 +1,23 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+from src.domain.models.chunk import Chunk
+
+
+@dataclass
+class IngestionCheckpoint:
+    """What a journaled ingestion run has durably stored so far."""
+    completed_files: Set[str] = field(default_factory=set)
+    committed_chunk_ids: Set[str] = field(default_factory=set)
+    # Every chunk of the files a commit split, so resuming needn't chunk them again
+    partial_files: Dict[str, List[Chunk]] = field(default_factory=dict)
+    finished: bool = False
+
+
+@dataclass
+class IngestionReport:
+    """Outcome of one (possibly resumed) ingestion run."""
+    chunks_saved: int
+    files_completed: int
+    # Work an interrupted run had already committed, skipped without re-embedding
+    files_skipped: int = 0
+    chunks_skipped: int = 0
@@ -0,0 +1,43 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+class FileState(NamedTuple):
+    """What a poll sees of a file; a file whose state is unchanged is not read again."""
+    mtime_ns: int
+    size: int
+
+
+@dataclass
+class IndexedFile:
+    """A file of a watched tree and the chunks it currently has in the store."""
+    # None when the file must be indexed again regardless of its state
+    state: Optional[FileState]
+    chunk_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class WatchManifest:
+    """The run a watched store was indexed with and its indexed files by path."""
+    run: Dict[str, Any]
+    files: Dict[str, IndexedFile] = field(default_factory=dict)
+
+
+@dataclass
+class SyncReport:
+    """Outcome of bringing the store up to date with one snapshot of the tree."""
+    files_indexed: int = 0
+    files_removed: int = 0
+    chunks_saved: int = 0
+    chunks_deleted: int = 0
+    # Chunks of changed files whose content did not change, kept without re-embedding
+    chunks_kept: int = 0
+    # Changed files that loaded no document; left as indexed, so a later sync retries them
+    files_skipped: int = 0
+    # Set when the sync failed; what it committed before failing stays committed
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.files_indexed or self.files_removed)
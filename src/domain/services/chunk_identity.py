@@ -0,0 +1,24 @@
+import hashlib
+from src.domain.models.chunk import Chunk
+
+
+def chunk_id(chunk: Chunk) -> str:
+    """
+    Returns a content-addressed id for a chunk.
+
+    The id hashes the chunk's source and content, so saving the same document
+    twice yields the same ids and chunks from different documents never collide,
+    regardless of how each strategy numbers its chunk_index.
+    """
+    if chunk.id:
+        return chunk.id
+    digest = hashlib.sha256()
+    digest.update(str(chunk.metadata.get("source", "")).encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(chunk.content.encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def source_key(source: str) -> str:
+    """Short stable key of a source path, naming the files that belong to one source's runs."""
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
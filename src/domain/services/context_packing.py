@@ -0,0 +1,130 @@
+import math
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional
+from src.domain.models.chunk import Chunk
+from src.domain.models.context import PackedContext
+
+DEFAULT_CONTEXT_TOKEN_BUDGET = 4000
+# Rough size of an English token, used when no tokenizer is supplied
+CHARS_PER_TOKEN = 4
+# Shorter suffix/prefix matches between neighbouring chunks are taken as chance, not overlap
+MIN_TEXT_OVERLAP = 16
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximates the token count of a text from its length."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class _Span:
+    """A run of neighbouring chunks of one source, merged into one passage."""
+    chunk: Chunk
+    rank: int
+    start: Optional[int]
+    last_index: Optional[int]
+    scores: List[float] = field(default_factory=list)
+
+    @property
+    def end(self) -> Optional[int]:
+        return None if self.start is None else self.start + len(self.chunk.content)
+
+
+def _text_overlap(left: str, right: str) -> int:
+    """Length of the longest suffix of ``left`` that is also a prefix of ``right``."""
+    for length in range(min(len(left), len(right)), MIN_TEXT_OVERLAP - 1, -1):
+        if left.endswith(right[:length]):
+            return length
+    return 0
+
+
+def _merge(span: _Span, chunk: Chunk, rank: int) -> bool:
+    """
+    Appends ``chunk`` to ``span`` when it continues the same passage: its
+    ``start_index`` offset overlaps or touches the span, or, without offsets,
+    its ``chunk_index`` follows the span's last one.
+    """
+    start = chunk.metadata.get("start_index")
+    index = chunk.metadata.get("chunk_index")
+    if span.start is not None and start is not None:
+        if start > span.end:
+            return False
+        content = span.chunk.content + chunk.content[span.end - start:]
+    elif span.last_index is not None and index == span.last_index + 1:
+        overlap = _text_overlap(span.chunk.content, chunk.content)
+        content = span.chunk.content + (chunk.content[overlap:] if overlap else "\n" + chunk.content)
+        # The merged text no longer maps onto offsets
+        span.start = None
+    else:
+        return False
+
+    span.chunk = replace(span.chunk, content=content, id=None)
+    span.rank = min(span.rank, rank)
+    span.last_index = index
+    if chunk.score is not None:
+        span.scores.append(chunk.score)
+    return True
+
+
+def _position(item) -> tuple:
+    rank, chunk = item
+    start = chunk.metadata.get("start_index")
+    index = chunk.metadata.get("chunk_index")
+    return (start is None, start or 0, index is None, index or 0, rank)
+
+
+def pack_context(
+    chunks: List[Chunk],
+    token_budget: Optional[int] = DEFAULT_CONTEXT_TOKEN_BUDGET,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+) -> PackedContext:
+    """
+    Packs retrieved chunks (best first) into a prompt context.
+
+    Exact duplicates are dropped, overlapping or adjacent chunks of the same
+    source are merged into one passage, and passages are then taken in the
+    order of their best chunk while they fit ``token_budget``; one that does
+    not fit is skipped so a smaller, lower ranked one can still use the room.
+    A ``token_budget`` of None keeps every passage.
+    """
+    if token_budget is not None and token_budget < 1:
+        raise ValueError("The context token budget must be at least 1.")
+
+    unique: Dict[str, tuple] = {}
+    for rank, chunk in enumerate(chunks):
+        unique.setdefault(chunk.content.strip(), (rank, chunk))
+
+    by_source: Dict[str, list] = {}
+    for rank, chunk in unique.values():
+        by_source.setdefault(str(chunk.metadata.get("source", "")), []).append((rank, chunk))
+
+    spans: List[_Span] = []
+    for items in by_source.values():
+        current: Optional[_Span] = None
+        for rank, chunk in sorted(items, key=_position):
+            if current is not None and _merge(current, chunk, rank):
+                continue
+            current = _Span(
+                chunk=chunk,
+                rank=rank,
+                start=chunk.metadata.get("start_index"),
+                last_index=chunk.metadata.get("chunk_index"),
+                scores=[] if chunk.score is None else [chunk.score],
+            )
+            spans.append(current)
+
+    packed = []
+    used = 0
+    for span in sorted(spans, key=lambda span: span.rank):
+        tokens = count_tokens(span.chunk.content)
+        if token_budget is not None and used + tokens > token_budget:
+            continue
+        packed.append(replace(span.chunk, score=max(span.scores) if span.scores else span.chunk.score))
+        used += tokens
+
+    return PackedContext(
+        chunks=packed,
+        tokens=used,
+        input_chunks=len(chunks),
+        input_tokens=sum(count_tokens(chunk.content) for chunk in chunks),
+    )
@@ -0,0 +1,47 @@
+from typing import List, Sequence
+
+import numpy as np
+
+DEFAULT_MMR_LAMBDA = 0.5
+
+
+def maximal_marginal_relevance(
+    query_embedding: Sequence[float],
+    candidate_embeddings: Sequence[Sequence[float]],
+    k: int,
+    lambda_mult: float = DEFAULT_MMR_LAMBDA,
+) -> List[int]:
+    """
+    Picks k diverse candidates with maximal marginal relevance.
+
+    Each step takes the candidate maximizing
+    ``lambda_mult * sim(query, c) - (1 - lambda_mult) * max sim(c, selected)``
+    with cosine similarities. The candidate-to-candidate matrix is computed
+    once and the running redundancy is updated with one vector maximum per
+    pick. Returns candidate indices in pick order; 1.0 is plain relevance
+    order and 0.0 maximal diversity.
+    """
+    if not 0.0 <= lambda_mult <= 1.0:
+        raise ValueError(f"The MMR lambda must be between 0 and 1, got {lambda_mult}")
+    candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+    if k <= 0 or len(candidates) == 0:
+        return []
+    candidates = candidates / np.maximum(np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12)
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+
+    selected = [int(np.argmax(relevance))]
+    redundancy = similarity[selected[0]].copy()
+    available = np.ones(len(candidates), dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < min(k, len(candidates)):
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+    return selected
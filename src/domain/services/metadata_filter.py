@@ -0,0 +1,70 @@
+from typing import Any, Dict, List, Optional
+
+COMPARISON_OPERATORS = ("$eq", "$ne", "$in", "$nin")
+LOGICAL_OPERATORS = ("$and", "$or")
+
+
+def validate_where(where: Optional[Dict[str, Any]]) -> None:
+    """
+    Checks a metadata filter written in Chroma's ``where`` syntax:
+    ``{"source": "a.md"}``, ``{"tags": {"$in": ["ops", "api"]}}`` and
+    ``{"$and": [...]}`` / ``{"$or": [...]}``. Several top-level fields
+    mean all of them must match.
+    """
+    if where is None:
+        return
+    if not isinstance(where, dict) or not where:
+        raise ValueError(f"A filter must be a non-empty JSON object, got {where!r}")
+    for field, condition in where.items():
+        if field in LOGICAL_OPERATORS:
+            if not isinstance(condition, list) or not condition:
+                raise ValueError(f"'{field}' expects a non-empty list of filters")
+            for clause in condition:
+                validate_where(clause)
+        elif field.startswith("$"):
+            raise ValueError(f"Unknown filter operator '{field}'")
+        elif isinstance(condition, dict):
+            if len(condition) != 1 or next(iter(condition)) not in COMPARISON_OPERATORS:
+                raise ValueError(
+                    f"Condition on '{field}' must use one of {', '.join(COMPARISON_OPERATORS)}, got {condition!r}"
+                )
+            operator, operand = next(iter(condition.items()))
+            if operator in ("$in", "$nin") and not isinstance(operand, list):
+                raise ValueError(f"'{operator}' on '{field}' expects a list")
+
+
+def field_values(metadata: Dict[str, Any], field: str) -> List[Any]:
+    """The values of a metadata field; list-valued fields such as tags yield every element."""
+    if field not in metadata:
+        return []
+    value = metadata[field]
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """
+    Evaluates a filter against chunk metadata. For list-valued fields,
+    ``$eq`` means the list contains the value and ``$in`` that it contains
+    any of the values.
+    """
+    if not where:
+        return True
+    for field, condition in where.items():
+        if field == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif field == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        else:
+            operator, operand = next(iter(condition.items())) if isinstance(condition, dict) else ("$eq", condition)
+            values = field_values(metadata, field)
+            if operator == "$eq" and operand not in values:
+                return False
+            if operator == "$ne" and operand in values:
+                return False
+            if operator == "$in" and not any(value in operand for value in values):
+                return False
+            if operator == "$nin" and any(value in operand for value in values):
+                return False
+    return True
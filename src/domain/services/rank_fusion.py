@@ -0,0 +1,30 @@
+from dataclasses import replace
+from typing import List
+from src.domain.models.chunk import Chunk
+from src.domain.services.chunk_identity import chunk_id
+
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: List[List[Chunk]], k: int = RRF_K) -> List[Chunk]:
+    """
+    Merges ranked result lists with reciprocal rank fusion.
+
+    Each chunk scores ``sum(1 / (k + rank))`` over the lists it appears in, so
+    only ranks matter and BM25 and cosine scores never have to be calibrated
+    against each other. The fused score replaces ``Chunk.score``.
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, chunk in enumerate(ranking, start=1):
+            key = chunk_id(chunk)
+            if key not in fused:
+                fused[key] = [replace(chunk, score=0.0), 0.0]
+            fused[key][1] += 1.0 / (k + rank)
+
+    results = []
+    # sorted() is stable, so ties keep the order of first appearance
+    for chunk, score in sorted(fused.values(), key=lambda entry: -entry[1]):
+        chunk.score = score
+        results.append(chunk)
+    return results
@@ -0,0 +1,42 @@
+import re
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+# A sentence ends at ., ! or ? followed by whitespace; line breaks also end one,
+# so list items and headings of markdown chunks are scored on their own
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\s*\n+\s*")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Splits a text into its non-empty sentences."""
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+def select_sentences(
+    sentences: Sequence[str],
+    query_embedding: Sequence[float],
+    sentence_embeddings: Sequence[Sequence[float]],
+    token_budget: int,
+    count_tokens: Callable[[str], int],
+) -> List[int]:
+    """
+    The indices, in original order, of the sentences most similar to the
+    query that fit ``token_budget`` together. Sentences are taken by cosine
+    similarity; one that does not fit is skipped for a shorter one.
+    """
+    if not sentences:
+        return []
+    vectors = np.asarray(sentence_embeddings, dtype=np.float32)
+    query = np.asarray(query_embedding, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+    similarities = (vectors @ query) / np.where(norms > 0, norms, 1.0)
+
+    kept = []
+    used = 0
+    for index in np.argsort(-similarities, kind="stable"):
+        tokens = count_tokens(sentences[index])
+        if used + tokens <= token_budget:
+            kept.append(int(index))
+            used += tokens
+    return sorted(kept)
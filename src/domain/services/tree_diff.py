@@ -0,0 +1,16 @@
+from typing import List, Mapping, Optional, Tuple
+from src.domain.models.watch import FileState
+
+
+def diff_tree(
+    indexed: Mapping[str, Optional[FileState]], current: Mapping[str, FileState]
+) -> Tuple[List[str], List[str]]:
+    """
+    Compares the indexed state of a tree with a fresh snapshot.
+
+    Returns the paths to index (new files, and files whose size or
+    modification time differ) and the paths that are gone, both sorted.
+    """
+    changed = sorted(path for path, state in current.items() if indexed.get(path) != state)
+    removed = sorted(path for path in indexed if path not in current)
+    return changed, removed
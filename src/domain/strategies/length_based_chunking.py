@@ -24,11 +24,14 @@ class LengthBasedChunkingStrategy(ChunkingStrategy):
                 chunk_size=self.chunk_size,
                 chunk_overlap=self.chunk_overlap,
                 separator="",
+                # Offsets let the context packer merge overlapping neighbours
+                add_start_index=True,
             )
         elif self.mode == LengthBasedChunkingMode.TOKEN:
             splitter = TokenTextSplitter(
                 chunk_size=self.chunk_size,
                 chunk_overlap=self.chunk_overlap,
+                add_start_index=True,
             )
         else:
             raise ValueError(f"Invalid mode: {self.mode}")
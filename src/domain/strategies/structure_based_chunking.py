@@ -47,6 +47,12 @@ class StructureBasedChunkingStrategy(ChunkingStrategy):
 
             # Step 4: Iterate through the collected sub-chunks to create final Chunk objects
             for i, sub_chunk in enumerate(doc_sub_chunks):
+                # One indexable field for the section, e.g. "Setup > Install"
+                header_path = " > ".join(
+                    sub_chunk.metadata[name] for _, name in self.headers_to_split if name in sub_chunk.metadata
+                )
+                if header_path:
+                    sub_chunk.metadata["header_path"] = header_path
                 chunk = Chunk(
                     content=sub_chunk.page_content,
                     metadata={
@@ -0,0 +1,217 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from application.ports.answer_cache import AnswerCache
+from domain.models.answer import AnswerCacheStats
+from infrastructure.adapters.embeddings.cached_query_embeddings import normalize_query
+
+DEFAULT_MAX_ANSWERS = 1024
+DEFAULT_ANSWER_TTL_SECONDS = 24 * 60 * 60
+ANSWER_CACHE_DB_NAME = "answers.sqlite3"
+
+
+@dataclass
+class _Entry:
+    context_hash: str
+    answer: str
+    created_at: float
+    # Unit-length question embedding; only kept when the semantic layer is on
+    embedding: Optional[np.ndarray] = None
+
+
+class TtlAnswerCache(AnswerCache):
+    """
+    LRU cache of generated answers with a time to live.
+
+    Exact lookups key on the chat model, the context hash and the normalized
+    question. With a ``similarity_threshold`` a miss falls back to the cached
+    questions of the same context: the most similar one is reused when the
+    cosine similarity of the question embeddings reaches the threshold.
+    Entries live in memory and, when a cache directory is given, in a SQLite
+    file from which the freshest ones are reloaded on start.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int = DEFAULT_MAX_ANSWERS,
+        ttl_seconds: float = DEFAULT_ANSWER_TTL_SECONDS,
+        cache_dir: Optional[str] = None,
+        embeddings: Optional[Embeddings] = None,
+        similarity_threshold: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if similarity_threshold is not None:
+            if embeddings is None:
+                raise ValueError("The semantic answer cache needs embeddings to compare questions.")
+            if not 0.0 < similarity_threshold <= 1.0:
+                raise ValueError(f"similarity_threshold must be in (0, 1], got {similarity_threshold}.")
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.clock = clock
+
+        self._stats = AnswerCacheStats()
+        self._memory: OrderedDict[str, _Entry] = OrderedDict()
+        self._by_context: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        if cache_dir:
+            cache_path = Path(cache_dir)
+            cache_path.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(cache_path / ANSWER_CACHE_DB_NAME, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, context_hash TEXT NOT NULL, answer TEXT NOT NULL, "
+                "embedding BLOB, created_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._connection.commit()
+            self._load()
+
+    def cache_key(self, question: str, context_hash: str) -> str:
+        """Returns the exact-match key of a question asked over a context."""
+        payload = f"{self.model_name}\x00{context_hash}\x00{normalize_query(question)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, question: str, context_hash: str) -> Optional[str]:
+        key = self.cache_key(question, context_hash)
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is not None:
+                self._touch(key)
+                self._stats.hits += 1
+                return entry.answer
+            if self.similarity_threshold is None or not self._by_context.get(context_hash):
+                self._stats.misses += 1
+                return None
+
+        # Embedding happens outside the lock; the query embeddings are cached as well
+        embedding = self._embed(question)
+        with self._lock:
+            key = self._most_similar(context_hash, embedding)
+            if key is None:
+                self._stats.misses += 1
+                return None
+            self._touch(key)
+            self._stats.semantic_hits += 1
+            return self._memory[key].answer
+
+    def put(self, question: str, context_hash: str, answer: str) -> None:
+        key = self.cache_key(question, context_hash)
+        embedding = self._embed(question) if self.similarity_threshold is not None else None
+        with self._lock:
+            entry = _Entry(context_hash, answer, self.clock(), embedding)
+            self._remember(key, entry)
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO answers "
+                    "(key, model, context_hash, answer, embedding, created_at, used_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        self.model_name,
+                        context_hash,
+                        answer,
+                        None if embedding is None else embedding.tobytes(),
+                        entry.created_at,
+                        entry.created_at,
+                    ),
+                )
+                self._connection.commit()
+
+    def stats(self) -> AnswerCacheStats:
+        with self._lock:
+            return AnswerCacheStats(self._stats.hits, self._stats.semantic_hits, self._stats.misses)
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _most_similar(self, context_hash: str, embedding: np.ndarray) -> Optional[str]:
+        keys = [key for key in list(self._by_context.get(context_hash, ())) if self._live_entry(key) is not None]
+        keys = [key for key in keys if self._memory[key].embedding is not None]
+        if not keys:
+            return None
+        similarities = np.stack([self._memory[key].embedding for key in keys]) @ embedding
+        best = int(np.argmax(similarities))
+        return keys[best] if similarities[best] >= self.similarity_threshold else None
+
+    def _live_entry(self, key: str) -> Optional[_Entry]:
+        """The entry under ``key``, dropping it first if its time to live has passed."""
+        entry = self._memory.get(key)
+        if entry is not None and self.clock() - entry.created_at > self.ttl_seconds:
+            self._forget([key])
+            return None
+        return entry
+
+    def _touch(self, key: str) -> None:
+        self._memory.move_to_end(key)
+        if self._connection is not None:
+            self._connection.execute("UPDATE answers SET used_at = ? WHERE key = ?", (self.clock(), key))
+            self._connection.commit()
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        """Inserts into the in-memory LRU, evicting the least recently used entries when full."""
+        if key in self._memory:
+            self._by_context[self._memory[key].context_hash].discard(key)
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        self._by_context.setdefault(entry.context_hash, set()).add(key)
+        evicted = list(self._memory)[: max(0, len(self._memory) - self.max_entries)]
+        self._forget(evicted)
+
+    def _forget(self, keys) -> None:
+        for key in keys:
+            entry = self._memory.pop(key)
+            hashes = self._by_context.get(entry.context_hash)
+            hashes.discard(key)
+            if not hashes:
+                del self._by_context[entry.context_hash]
+        if keys and self._connection is not None:
+            self._connection.executemany("DELETE FROM answers WHERE key = ?", [(key,) for key in keys])
+            self._connection.commit()
+
+    def _load(self) -> None:
+        """Drops expired rows and reloads the most recently used ones that fit in memory."""
+        oldest = self.clock() - self.ttl_seconds
+        self._connection.execute("DELETE FROM answers WHERE created_at < ?", (oldest,))
+        self._connection.commit()
+        rows = self._connection.execute(
+            "SELECT key, context_hash, answer, embedding, created_at FROM answers "
+            "WHERE model = ? ORDER BY used_at DESC LIMIT ?",
+            (self.model_name, self.max_entries),
+        ).fetchall()
+        for key, context_hash, answer, blob, created_at in reversed(rows):
+            embedding = None if blob is None else np.frombuffer(blob, dtype=np.float32)
+            self._remember(key, _Entry(context_hash, answer, created_at, embedding))
+
+
+def build_answer_cache(
+    model_name: str, embeddings: Optional[Embeddings] = None, cache_dir: Optional[str] = None
+) -> TtlAnswerCache:
+    """
+    Creates the answer cache used by talk. ANSWER_CACHE_DIR makes it
+    persistent, ANSWER_CACHE_SIZE and ANSWER_CACHE_TTL_SECONDS bound it, and
+    ANSWER_CACHE_SIMILARITY turns on the semantic layer with that threshold.
+    """
+    cache_dir = cache_dir or os.getenv("ANSWER_CACHE_DIR")
+    similarity = os.getenv("ANSWER_CACHE_SIMILARITY")
+    return TtlAnswerCache(
+        model_name=model_name,
+        max_entries=int(os.getenv("ANSWER_CACHE_SIZE", DEFAULT_MAX_ANSWERS)),
+        ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", DEFAULT_ANSWER_TTL_SECONDS)),
+        cache_dir=cache_dir,
+        embeddings=embeddings if similarity else None,
+        similarity_threshold=float(similarity) if similarity else None,
+    )
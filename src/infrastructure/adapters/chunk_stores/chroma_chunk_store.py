@@ -1,19 +1,78 @@
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional
 from langchain_chroma import Chroma
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_core.documents import Document
 from src.application.ports.chunk_store import ChunkStore
 from src.domain.models.chunk import Chunk
+from src.domain.services.chunk_identity import chunk_id as make_chunk_id
+from src.infrastructure.adapters.chunk_stores.chroma_client_registry import (
+    get_client,
+    release_client,
+    resolve_persist_directory,
+)
+from src.infrastructure.adapters.chunk_stores.store_lock import StoreLock
+from src.infrastructure.adapters.embeddings.cached_query_embeddings import (
+    DEFAULT_EMBEDDING_MODEL,
+)
+from src.infrastructure.adapters.lexical_indexes.bm25_index import BM25Index
 
 DEFAULT_COLLECTION_NAME = "rag_docs"
+LEXICAL_DIR = "lexical"
+LOCKS_DIR = "locks"
+# Chroma's batch limit with SQLite's default of 32766 bound variables per statement
+DEFAULT_MAX_BATCH_SIZE = 5461
+DEFAULT_WRITE_WORKERS = 4
+
+
+def to_chroma_where(where: dict = None) -> dict | None:
+    """Chroma accepts a single top-level field per filter, so several fields become an explicit ``$and``."""
+    if not where or len(where) == 1:
+        return where
+    return {"$and": [{field: condition} for field, condition in where.items()]}
+
 
 class ChromaChunkStore(ChunkStore):
-    def __init__(self, collection_name: str = None):
+    """
+    Stores chunks in a Chroma collection, with a BM25 index next to it.
+
+    Writes to a collection hold an exclusive file lock, so several ingestion
+    workers may save into it together without interleaving the collection
+    and its lexical index. Lexical searches hold the lock shared and reload
+    the BM25 index once another store has committed.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = None,
+        persist_directory: str = None,
+        max_batch_size: int = None,
+        write_workers: int = DEFAULT_WRITE_WORKERS,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ):
         self.collection_name = collection_name or DEFAULT_COLLECTION_NAME
-        self.persist_directory = "./chroma_db"
+        self.persist_directory = resolve_persist_directory(persist_directory)
+        self._max_batch_size = max_batch_size
+        self.write_workers = write_workers
+        # Called with (saved, total) chunk counts after every written batch
+        self.progress = progress
         self._embeddings = None
         self._vector_store = None
+        self._lexical_index = None
+        self._lock = None
+        self._generation = None
+
+    @property
+    def lock(self) -> StoreLock:
+        """The collection's write lock, kept next to the Chroma database."""
+        path = Path(self.persist_directory) / LOCKS_DIR / f"{self.collection_name}.lock"
+        if self._lock is None or self._lock.path != path:
+            self._lock = StoreLock(str(path))
+        return self._lock
 
     @property
     def embeddings(self) -> GoogleGenerativeAIEmbeddings:
@@ -22,7 +81,8 @@ class ChromaChunkStore(ChunkStore):
         The model is only created when this property is first accessed.
         """
         if self._embeddings is None:
-            self._embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+            model_name = os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+            self._embeddings = GoogleGenerativeAIEmbeddings(model=model_name)
         return self._embeddings
 
     @property
@@ -30,50 +90,206 @@ class ChromaChunkStore(ChunkStore):
         """
         Lazily initializes and returns the Chroma vector store.
         The vector store is only created when this property is first accessed,
-        which also triggers the initialization of the embeddings model.
+        which also triggers the initialization of the embeddings model. It is
+        a handle on the collection through the directory's shared client.
         """
         if self._vector_store is None:
             self._vector_store = Chroma(
                 collection_name=self.collection_name,
-                persist_directory=self.persist_directory,
+                client=get_client(self.persist_directory),
                 embedding_function=self.embeddings,
             )
         return self._vector_store
 
+    @property
+    def lexical_index(self) -> BM25Index:
+        """BM25 index of the collection, kept next to the Chroma database."""
+        if self._lexical_index is None:
+            self._lexical_index = BM25Index(Path(self.persist_directory) / LEXICAL_DIR / self.collection_name)
+        return self._lexical_index
+
+    @property
+    def max_batch_size(self) -> int:
+        """The largest batch the Chroma client accepts, unless set explicitly."""
+        if self._max_batch_size is None:
+            get_max_batch_size = getattr(getattr(self.vector_store, "_client", None), "get_max_batch_size", None)
+            size = get_max_batch_size() if callable(get_max_batch_size) else None
+            self._max_batch_size = size if isinstance(size, int) and size > 0 else DEFAULT_MAX_BATCH_SIZE
+        return self._max_batch_size
+
     def save(self, chunks: list[Chunk]):
-        """Adds a list of chunks to the vector store."""
-        documents = []
-        chunk_ids = []
-        for chunk in chunks:
-            chunk_id = f"{chunk.metadata.get('source', 'doc')}_{chunk.metadata.get('chunk_index', 0)}"
-            document = Document(page_content=chunk.content, metadata=chunk.metadata)
-            documents.append(document)
-            chunk_ids.append(chunk_id)
-
-        # Accessing self.vector_store will trigger lazy initialization if needed
-        self.vector_store.add_documents(documents=documents, ids=chunk_ids)
+        """
+        Upserts chunks under content-addressed ids, so re-running an ingest
+        replaces chunks instead of failing on existing ids. Chunks are split
+        into batches Chroma accepts, and batches are embedded and written in
+        parallel. langchain-chroma embeds inside ``add_documents``, so
+        concurrent saves into one collection also embed one after another.
+        """
+        # Identical chunks share an id, and Chroma rejects duplicate ids within a batch
+        unique = {make_chunk_id(chunk): chunk for chunk in chunks}
+        if not unique:
+            return
+        chunk_ids = list(unique)
+        documents = [Document(page_content=chunk.content, metadata=chunk.metadata) for chunk in unique.values()]
+
+        # langchain-chroma writes documents with upsert; opening the store here
+        # keeps its lazy initialization out of the worker threads
+        vector_store = self.vector_store
+        batch_size = self.max_batch_size
+        batches = [(start, min(start + batch_size, len(chunk_ids))) for start in range(0, len(chunk_ids), batch_size)]
+        saved = 0
+        with self._writing(), ThreadPoolExecutor(max_workers=max(1, min(self.write_workers, len(batches)))) as pool:
+            futures = {
+                pool.submit(vector_store.add_documents, documents=documents[start:stop], ids=chunk_ids[start:stop]): stop - start
+                for start, stop in batches
+            }
+            for future in as_completed(futures):
+                future.result()
+                saved += futures[future]
+                if self.progress:
+                    self.progress(saved, len(chunk_ids))
+
+            self.lexical_index.add(chunk_ids, [document.page_content for document in documents])
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """Holds the collection's lock exclusively, first dropping a lexical index another store changed."""
+        with self.lock.exclusive() as generation:
+            if generation != self._generation:
+                self._lexical_index = None
+            try:
+                yield
+            finally:
+                self._generation = generation + 1
+
+    def get(
+        self,
+        chunk_id: str,
+        where: dict = None,
+        limit: int = None,
+        offset: int = None,
+        where_document: dict = None,
+        include: list[str] = None,
+    ) -> Chunk | None:
+        """Retrieves a single chunk by its ID, or None if it does not exist."""
+        results = self.vector_store.get(
+            ids=[chunk_id],
+            where=where,
+            limit=limit,
+            offset=offset,
+            where_document=where_document,
+            include=include,
+        )
+        if not results or not results.get("ids"):
+            return None
+        return Chunk(
+            content=results["documents"][0],
+            metadata=results["metadatas"][0],
+            id=results["ids"][0],
+        )
 
     def delete(self, chunk_id: str, where: dict = None, where_document: dict = None):
         """Deletes a single chunk by its ID."""
-        self.vector_store.delete(
-            ids=[chunk_id], where=where, where_document=where_document
-        )
+        with self._writing():
+            self.vector_store.delete(
+                ids=[chunk_id], where=where, where_document=where_document
+            )
+            self.lexical_index.delete([chunk_id])
+
+    def delete_many(self, chunk_ids: list[str]):
+        if not chunk_ids:
+            return
+        with self._writing():
+            for start in range(0, len(chunk_ids), self.max_batch_size):
+                self.vector_store.delete(ids=chunk_ids[start:start + self.max_batch_size])
+            self.lexical_index.delete(chunk_ids)
 
     def search(
         self,
-        query: str,
+        query_embedding: list[float],
         top_k: int = 5,
-        filter: dict = None
+        filter: dict = None,
+        include_embeddings: bool = False,
     ) -> list[Chunk]:
-        """Searches for similar chunks using a query string."""
+        """
+        Searches for similar chunks using a precomputed query embedding.
+        Chroma applies the filter inside its HNSW search.
+        """
+        return self._query([query_embedding], top_k, filter, include_embeddings)[0]
 
-        docs = self.vector_store.similarity_search(
-            query=query,
-            k=top_k,
-            filter=filter
+    def search_many(
+        self,
+        query_embeddings: list[list[float]],
+        top_k: int = 5,
+        filter: dict = None
+    ) -> list[list[Chunk]]:
+        """Searches for several query embeddings with a single Chroma query request."""
+        if len(query_embeddings) == 0:
+            return []
+        return self._query(query_embeddings, top_k, filter)
+
+    def _query(
+        self, query_embeddings: list[list[float]], top_k: int, filter: dict = None, include_embeddings: bool = False
+    ) -> list[list[Chunk]]:
+        """
+        One collection query for all embeddings. Distances are turned into
+        relevance scores (higher is better) with the function LangChain picks
+        for the collection's distance metric.
+        """
+        include = ["documents", "metadatas", "distances"] + (["embeddings"] if include_embeddings else [])
+        results = self.vector_store._collection.query(
+            query_embeddings=[list(map(float, embedding)) for embedding in query_embeddings],
+            n_results=top_k,
+            where=to_chroma_where(filter),
+            include=include,
         )
+        relevance = self.vector_store._select_relevance_score_fn()
+        embeddings = results.get("embeddings") if include_embeddings else None
+        rankings = []
+        for query_number, ids in enumerate(results["ids"]):
+            ranking = []
+            for position, chunk_id in enumerate(ids):
+                ranking.append(Chunk(
+                    content=results["documents"][query_number][position],
+                    metadata=results["metadatas"][query_number][position] or {},
+                    score=float(relevance(results["distances"][query_number][position])),
+                    id=chunk_id,
+                    embedding=list(map(float, embeddings[query_number][position])) if embeddings is not None else None,
+                ))
+            rankings.append(ranking)
+        return rankings
 
-        return [Chunk(content=doc.page_content, metadata=doc.metadata) for doc in docs]
+    def lexical_search(self, query: str, top_k: int = 5, filter: dict = None) -> list[Chunk]:
+        """
+        BM25 search over the collection's chunk contents. The matching chunks
+        are read back from Chroma in one call, which also applies the filter.
+        """
+        with self.lock.shared() as generation:
+            if generation != self._generation:
+                self._lexical_index = None
+                self._generation = generation
+            return self._lexical_search(query, top_k, filter)
+
+    def _lexical_search(self, query: str, top_k: int, filter: dict = None) -> list[Chunk]:
+        live_count = len(self.lexical_index)
+        fetch_k = top_k
+        while True:
+            ranked = self.lexical_index.search(query, fetch_k)
+            if not ranked:
+                return []
+            found = self.vector_store.get(ids=[chunk_id for chunk_id, _ in ranked], where=to_chroma_where(filter))
+            documents = {
+                chunk_id: (content, metadata)
+                for chunk_id, content, metadata in zip(found["ids"], found["documents"], found["metadatas"])
+            }
+            results = [
+                Chunk(content=documents[chunk_id][0], metadata=documents[chunk_id][1], score=score, id=chunk_id)
+                for chunk_id, score in ranked
+                if chunk_id in documents
+            ][:top_k]
+            if len(results) == top_k or fetch_k >= live_count:
+                return results
+            fetch_k *= 4
 
     def clear(self):
         """
@@ -82,15 +298,20 @@ class ChromaChunkStore(ChunkStore):
         lazily re-initialized on the next access.
         """
         if self.collection_name:
-            try:
-                # self.vector_store property will initialize if it hasn't already
-                self.vector_store.delete_collection()
-            except Exception:
-                # Handle cases where the collection might not exist
-                pass
+            with self._writing():
+                try:
+                    # self.vector_store property will initialize if it hasn't already
+                    self.vector_store.delete_collection()
+                except Exception:
+                    # Handle cases where the collection might not exist
+                    pass
+                shutil.rmtree(Path(self.persist_directory) / LEXICAL_DIR / self.collection_name, ignore_errors=True)
         else:
             if os.path.exists(self.persist_directory):
+                # Later stores on this directory must not reuse a client of the deleted database
+                release_client(self.persist_directory)
                 shutil.rmtree(self.persist_directory)
 
         # Invalidate the vector store instance. It will be recreated on next access.
-        self._vector_store = None
\ No newline at end of file
+        self._vector_store = None
+        self._lexical_index = None
\ No newline at end of file
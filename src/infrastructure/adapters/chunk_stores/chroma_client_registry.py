@@ -0,0 +1,42 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict
+import chromadb
+from chromadb.api.shared_system_client import SharedSystemClient
+
+DEFAULT_PERSIST_DIRECTORY = "./chroma_db"
+
+_clients: Dict[str, chromadb.ClientAPI] = {}
+_lock = threading.Lock()
+
+
+def resolve_persist_directory(persist_directory: str = None) -> str:
+    """The explicit directory, else ``CHROMA_PERSIST_DIRECTORY``, else ``./chroma_db``."""
+    return persist_directory or os.getenv("CHROMA_PERSIST_DIRECTORY", DEFAULT_PERSIST_DIRECTORY)
+
+
+def get_client(persist_directory: str) -> chromadb.ClientAPI:
+    """
+    Returns the process-wide persistent client for a directory, starting it
+    on first use. Every store on that directory shares the client, so
+    opening another collection costs no client start-up.
+    """
+    key = str(Path(persist_directory).resolve())
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = chromadb.PersistentClient(path=key)
+            _clients[key] = client
+        return client
+
+
+def release_client(persist_directory: str) -> None:
+    """
+    Forgets the client of a directory, e.g. before the directory is deleted,
+    so the next use starts a fresh one instead of writing to removed files.
+    """
+    with _lock:
+        if _clients.pop(str(Path(persist_directory).resolve()), None) is not None:
+            # Chroma caches its own system per path as well
+            SharedSystemClient.clear_system_cache()
@@ -1,42 +1,423 @@
+import copy
 import json
-from typing import List
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
 from pathlib import Path
 import shutil
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from application.ports.chunk_store import ChunkStore
 from domain.models.chunk import Chunk
+from domain.models.compaction import CompactionReport
+from domain.models.enums import LocalIndexType, VectorQuantization
+from domain.services.chunk_identity import chunk_id as make_chunk_id
+from domain.services.metadata_filter import matches_where
+from infrastructure.adapters.embeddings.cached_query_embeddings import (
+    DEFAULT_EMBEDDING_MODEL,
+)
+from infrastructure.adapters.chunk_stores.metadata_index import MetadataIndex
+from infrastructure.adapters.chunk_stores.segment_log import SegmentLog
+from infrastructure.adapters.chunk_stores.store_lock import LOCK_FILE, StoreLock
+from infrastructure.adapters.lexical_indexes.bm25_index import BM25Index
+from infrastructure.adapters.vector_indexes.flat_vector_index import FlatVectorIndex
 
 DEFAULT_OUTPUT_DIR = "./output_chunks"
+SEGMENTS_DIR = "segments"
+VECTORS_DIR = "vectors"
+LEXICAL_DIR = "lexical"
+METADATA_DIR = "metadata"
+STORE_INFO_FILE = "store.json"
+# The batch being written, kept until every file of the store holds it
+BATCH_JOURNAL_FILE = "pending_batch.npz"
+# Records copied per batch by compact(), and ids timed to report read latency
+COMPACTION_BATCH_SIZE = 8192
+READ_SAMPLE_SIZE = 1000
+
+
+def read_store_info(output_dir: str) -> dict:
+    """The ``store.json`` of a local store: its index type and, once compacted, its data directory."""
+    info_path = Path(output_dir) / STORE_INFO_FILE
+    if not info_path.exists():
+        return {}
+    return json.loads(info_path.read_text(encoding="utf-8"))
+
+
+def write_store_info(output_dir: str, info: dict) -> None:
+    """Replaces ``store.json`` atomically, so readers see either the old or the new layout."""
+    temporary = Path(output_dir) / f"{STORE_INFO_FILE}.tmp"
+    temporary.write_text(json.dumps(info), encoding="utf-8")
+    os.replace(temporary, Path(output_dir) / STORE_INFO_FILE)
+
+
+def read_index_type(output_dir: str) -> Optional[LocalIndexType]:
+    """The index type recorded by the first save into a local store, if any."""
+    index = read_store_info(output_dir).get("index")
+    return LocalIndexType(index) if index else None
+
+
+def _directory_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file()) if path.exists() else 0
+
+
+def _mean_read_seconds(segments_dir: Path, ids: List[str]) -> float:
+    """Mean time of reading one record by id through a freshly opened segment log."""
+    if not ids:
+        return 0.0
+    segments = SegmentLog(segments_dir)
+    start = time.perf_counter()
+    for chunk_id in ids:
+        segments.get(chunk_id)
+    return (time.perf_counter() - start) / len(ids)
+
 
 class FileSystemChunkStore(ChunkStore):
-    def __init__(self, output_dir: str = None):
+    """
+    Stores chunks in append-only segment files with a vector index next to them.
+    Chunk ids are content-addressed, so re-saving a document replaces its
+    chunks instead of adding duplicates. A secondary index over common
+    metadata fields lets filtered searches score only the matching chunks.
+
+    Any number of stores, in any number of processes, may share a directory.
+    Writes are serialized by an exclusive file lock; reads hold it shared and
+    reopen the data first whenever another store committed since.
+
+    A save or delete touches several files, so each batch is first written
+    whole to a journal, fsynced and renamed into place, and the journal is
+    removed once every file holds the batch. A writer that fails or dies in
+    between leaves the journal behind; the next store to read or write the
+    directory replays it before going on. Readers therefore see a batch
+    either not at all or complete, never half of it.
+    """
+
+    index_type = LocalIndexType.FLAT
+    # Keyword arguments that --index-config may pass to this store
+    index_options: tuple = ("rescore",)
+    # Subdirectories holding the data of an uncompacted store
+    data_dirs: tuple = (SEGMENTS_DIR, VECTORS_DIR, LEXICAL_DIR, METADATA_DIR)
+
+    def __init__(
+        self,
+        output_dir: str = None,
+        embeddings: Embeddings = None,
+        quantization: VectorQuantization = VectorQuantization.FLOAT32,
+        rescore: bool = False,
+    ):
         self.output_dir = Path(output_dir or DEFAULT_OUTPUT_DIR)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._embeddings = embeddings
+        self.quantization = quantization
+        # Keep float32 copies of quantized vectors to rescore candidates exactly
+        self.rescore = rescore
+        self.lock = StoreLock(str(self.output_dir / LOCK_FILE))
+        # Read before opening, so a commit landing meanwhile makes the first read reopen
+        self._generation = self.lock.generation()
+        # Set while this store applies a batch, so its own nested reads do not replay it
+        self._applying = False
+        self._open_indexes()
+
+    def _open_indexes(self, data_dir: Optional[Path] = None) -> None:
+        """Opens the data under ``data_dir``; by default the directory ``store.json`` points to."""
+        self.data_dir = data_dir or self.output_dir / read_store_info(self.output_dir).get("data", "")
+        self.segments = SegmentLog(self.data_dir / SEGMENTS_DIR)
+        self.vector_index = FlatVectorIndex(self.data_dir / VECTORS_DIR, self.quantization, self.rescore)
+        self.lexical_index = BM25Index(self.data_dir / LEXICAL_DIR)
+        self.metadata_index = MetadataIndex(self.data_dir / METADATA_DIR)
+
+    @contextmanager
+    def _reading(self) -> Iterator[None]:
+        """Holds the lock shared, on data that is current as of the last commit by any store."""
+        while True:
+            with self.lock.shared() as generation:
+                # Under the shared lock a journal means its writer failed, not that it is busy
+                if self._applying or not self._journal_path.exists():
+                    if generation != self._generation:
+                        self._open_indexes()
+                        self._generation = generation
+                    yield
+                    return
+            with self._writing():
+                pass  # replays the journal
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """Holds the lock exclusively, replaying a batch a failed writer left behind first."""
+        with self.lock.exclusive() as generation:
+            if generation != self._generation:
+                self._open_indexes()
+            self._generation = generation
+            try:
+                if not self._applying and self._journal_path.exists():
+                    self._replay_batch()
+                yield
+            except BaseException:
+                # The open indexes may hold part of a batch; read them again from disk
+                self._generation = -1
+                raise
+            self._generation = generation + 1
+
+    @property
+    def _journal_path(self) -> Path:
+        return self.output_dir / BATCH_JOURNAL_FILE
+
+    def _commit_batch(self, batch: dict, vectors=None) -> None:
+        """Journals ``batch``, applies it to every file of the store, then drops the journal."""
+        temporary = self.output_dir / f"{BATCH_JOURNAL_FILE}.tmp"
+        with open(temporary, "wb") as f:
+            np.savez(
+                f,
+                batch=np.frombuffer(json.dumps(batch, ensure_ascii=False).encode("utf-8"), dtype=np.uint8),
+                vectors=np.asarray(vectors if vectors is not None else [], dtype=np.float32),
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self._journal_path)
+        self._apply_batch(batch, vectors)
+
+    def _replay_batch(self) -> None:
+        with np.load(self._journal_path) as journal:
+            batch = json.loads(journal["batch"].tobytes().decode("utf-8"))
+            vectors = journal["vectors"]
+        self._apply_batch(batch, vectors)
+
+    def _apply_batch(self, batch: dict, vectors) -> None:
+        """Writes a journaled batch; every step tolerates being repeated by a replay."""
+        self._applying = True
+        try:
+            if batch["op"] == "save":
+                ids = [record[0] for record in batch["records"]]
+                self.segments.append([tuple(record) for record in batch["records"]])
+                self.lexical_index.add(ids, [record[1] for record in batch["records"]])
+                self.metadata_index.add(ids, [record[2] for record in batch["records"]])
+                self.vector_index.add(ids, vectors)
+            else:
+                self.segments.delete(batch["ids"])
+                self.vector_index.delete(batch["ids"])
+                self.lexical_index.delete(batch["ids"])
+                self.metadata_index.delete(batch["ids"])
+            self._journal_path.unlink()
+        finally:
+            self._applying = False
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """
+        Lazily initializes and returns the embeddings model used to embed
+        chunk contents at save time.
+        """
+        if self._embeddings is None:
+            model_name = os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+            self._embeddings = GoogleGenerativeAIEmbeddings(model=model_name)
+        return self._embeddings
 
     def save(self, chunks: list[Chunk]):
-        for chunk in chunks:
-            file_path = (
-                self.output_dir / f"chunk_{chunk.metadata.get('chunk_index', 0)}.json"
+        if not chunks:
+            return
+
+        chunk_ids = [make_chunk_id(chunk) for chunk in chunks]
+        # One batched embedding call per save, made before locking so parallel
+        # writers only queue for the appends
+        vectors = self.embeddings.embed_documents([chunk.content for chunk in chunks])
+
+        with self._writing():
+            self._record_index_type()
+            self._commit_batch(
+                {"op": "save", "records": [
+                    [chunk_id, chunk.content, chunk.metadata] for chunk_id, chunk in zip(chunk_ids, chunks)
+                ]},
+                vectors,
             )
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(
-                    {
-                        "content": chunk.content,
-                        "metadata": chunk.metadata,
-                    },
-                    f,
-                    indent=4,
-                )
+
+    def _record_index_type(self) -> None:
+        info_path = self.output_dir / STORE_INFO_FILE
+        if not info_path.exists():
+            info_path.write_text(json.dumps({"index": self.index_type.value}), encoding="utf-8")
+
+    def get(self, chunk_id: str) -> Optional[Chunk]:
+        with self._reading():
+            record = self.segments.get(chunk_id)
+        if record is None:
+            return None
+        return Chunk(content=record["content"], metadata=record["metadata"], id=record["id"])
 
     def delete(self, chunk_id: str):
-        file_path = self.output_dir / f"chunk_{chunk_id}.json"
-        if file_path.exists():
-            file_path.unlink()
+        self.delete_many([chunk_id])
+
+    def delete_many(self, chunk_ids: list[str]):
+        if not chunk_ids:
+            return
+        with self._writing():
+            self._commit_batch({"op": "delete", "ids": list(chunk_ids)})
+
+    def search(
+        self,
+        query_embedding: list[float],
+        top_k: int = 5,
+        filter: dict = None,
+        include_embeddings: bool = False,
+    ) -> list[Chunk]:
+        """
+        Top-k search over the vector index (an exact scan for this store).
+        Filters use Chroma's ``where`` syntax. Conditions on indexed metadata
+        fields restrict the rows the vector index scores; every filter is then
+        checked exactly on the results, widening the candidate pool until
+        top_k matches are found or the index is exhausted.
+        """
+        with self._reading():
+            allowed_keys = self.metadata_index.candidate_keys(filter)
+            results = self._collect(
+                lambda fetch_k: self.vector_index.search(query_embedding, fetch_k, allowed_keys=allowed_keys),
+                len(self.vector_index), top_k, filter, allowed_keys,
+            )
+            if include_embeddings and results:
+                vectors = self.vector_index.get_vectors([chunk.id for chunk in results])
+                for chunk, vector in zip(results, vectors):
+                    chunk.embedding = vector.tolist()
+        return results
+
+    def search_many(
+        self,
+        query_embeddings: list[list[float]],
+        top_k: int = 5,
+        filter: dict = None,
+    ) -> list[list[Chunk]]:
+        """
+        ``search`` for several query embeddings. The first round scores all
+        queries against the index together; only queries whose filter rejects
+        too many results widen their search on their own.
+        """
+        if len(query_embeddings) == 0:
+            return []
+
+        def ranking(query_embedding, first_results):
+            return self._collect(
+                lambda fetch_k: first_results if fetch_k == top_k
+                else self.vector_index.search(query_embedding, fetch_k, allowed_keys=allowed_keys),
+                len(self.vector_index), top_k, filter, allowed_keys,
+            )
+
+        with self._reading():
+            allowed_keys = self.metadata_index.candidate_keys(filter)
+            first_round = self.vector_index.search_many(
+                np.asarray(query_embeddings, dtype=np.float32), top_k, allowed_keys=allowed_keys
+            )
+            return [ranking(query, results) for query, results in zip(query_embeddings, first_round)]
+
+    def lexical_search(self, query: str, top_k: int = 5, filter: dict = None) -> list[Chunk]:
+        """BM25 search over the chunk contents; needs no embedding call. Filters work as in ``search``."""
+        with self._reading():
+            allowed_keys = self.metadata_index.candidate_keys(filter)
+            return self._collect(
+                lambda fetch_k: self.lexical_index.search(query, fetch_k, allowed_keys=allowed_keys),
+                len(self.lexical_index), top_k, filter, allowed_keys,
+            )
+
+    def _collect(
+        self, search, live_count: int, top_k: int, filter: Optional[dict], allowed_keys=None
+    ) -> list[Chunk]:
+        """Reads the chunks of ranked ``(id, score)`` results, widening the search while filters reject them."""
+        if allowed_keys is not None:
+            live_count = min(live_count, len(allowed_keys))
+        fetch_k = top_k
+        while True:
+            results = []
+            for chunk_id, score in search(fetch_k):
+                chunk = self.get(chunk_id)
+                if chunk is None or not matches_where(chunk.metadata, filter):
+                    continue
+                chunk.score = score
+                results.append(chunk)
+                if len(results) == top_k:
+                    return results
+
+            if not filter or fetch_k >= live_count:
+                return results
+            fetch_k *= 4
+
+    def compact(self, batch_size: int = COMPACTION_BATCH_SIZE) -> CompactionReport:
+        """
+        Rewrites the live records into a new data directory and switches to it.
+
+        Records are copied in batches together with their stored vectors, so
+        nothing is re-embedded, and every index is rebuilt from the live rows
+        only. Stores opened meanwhile still read the old files: the switch is
+        one atomic rename of ``store.json``, made under the write lock once no
+        reader is mid-search, after which the old files are removed. Writers
+        are not held up while records are copied; a save or delete that
+        commits meanwhile aborts the run instead.
+        """
+        with self._reading():
+            started = self._generation
+        info = read_store_info(self.output_dir)
+        data_number = int(info.get("data", "data_000000").rsplit("_", 1)[1]) + 1
+        new_dir = self.output_dir / f"data_{data_number:06d}"
+        if info.get("data"):
+            old_dirs = [self.data_dir]
+        else:
+            old_dirs = [self.output_dir / name for name in self.data_dirs]
+
+        rebuilt = copy.copy(self)
+        # Flat indexes keep the precision they were written with
+        rebuilt.quantization = getattr(self.vector_index, "stored_quantization", None) or self.quantization
+        stored_rescore = getattr(self.vector_index, "stored_rescore", None)
+        rebuilt.rescore = self.rescore if stored_rescore is None else stored_rescore
+        if new_dir.exists():
+            shutil.rmtree(new_dir)  # left over by an interrupted run
+        rebuilt._open_indexes(new_dir)
+
+        sample_every = max(1, len(self.segments) // READ_SAMPLE_SIZE)
+        sample_ids = []
+        records = 0
+        batch = []
+        for record in self.segments:
+            if records % sample_every == 0:
+                sample_ids.append(record["id"])
+            records += 1
+            batch.append(record)
+            if len(batch) == batch_size:
+                rebuilt._copy_records(batch, self.vector_index.get_vectors([r["id"] for r in batch]))
+                batch = []
+        if batch:
+            rebuilt._copy_records(batch, self.vector_index.get_vectors([r["id"] for r in batch]))
+
+        with self.lock.exclusive() as generation:
+            if generation != started or self._journal_path.exists():
+                shutil.rmtree(new_dir, ignore_errors=True)
+                raise RuntimeError(f"'{self.output_dir}' changed while it was compacted; run the compaction again.")
+            read_before = _mean_read_seconds(self.segments.directory, sample_ids)
+            bytes_before = sum(_directory_bytes(path) for path in old_dirs)
+            write_store_info(self.output_dir, {**info, "index": self.index_type.value, "data": new_dir.name})
+            for path in old_dirs:
+                shutil.rmtree(path, ignore_errors=True)
+            self._open_indexes()
+            self._generation = generation + 1
+
+        return CompactionReport(
+            records=records,
+            bytes_before=bytes_before,
+            bytes_after=_directory_bytes(new_dir),
+            read_seconds_before=read_before,
+            read_seconds_after=_mean_read_seconds(self.segments.directory, sample_ids),
+        )
 
-    def search(self, query_embedding: list[float], top_k: int = 5) -> list[Chunk]:
-        raise NotImplementedError("Semantic search is not supported by FileSystemChunkStore.")
+    def _copy_records(self, records: List[dict], vectors) -> None:
+        ids = [record["id"] for record in records]
+        self.segments.append([(record["id"], record["content"], record["metadata"]) for record in records])
+        self.lexical_index.add(ids, [record["content"] for record in records])
+        self.metadata_index.add(ids, [record["metadata"] for record in records])
+        self.vector_index.add(ids, vectors)
 
     def clear(self):
-        if self.output_dir.exists():
-            shutil.rmtree(self.output_dir)
-            self.output_dir.mkdir(parents=True, exist_ok=True)
+        """Removes every chunk. The lock file stays, so writers waiting on it are not split from later ones."""
+        with self._writing():
+            for path in self.output_dir.iterdir() if self.output_dir.exists() else ():
+                if path.name == LOCK_FILE:
+                    continue
+                if path.is_dir():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink()
+            self._open_indexes()
 
@@ -0,0 +1,55 @@
+from pathlib import Path
+from typing import Optional
+from langchain_core.embeddings import Embeddings
+from domain.models.enums import LocalIndexType, VectorQuantization
+from infrastructure.adapters.chunk_stores.file_system_chunk_store import (
+    FileSystemChunkStore,
+)
+from infrastructure.adapters.vector_indexes.hnsw_index import (
+    DEFAULT_EF_CONSTRUCTION,
+    DEFAULT_EF_SEARCH,
+    DEFAULT_M,
+    HnswIndex,
+)
+
+HNSW_DIR = "hnsw"
+
+
+class HnswChunkStore(FileSystemChunkStore):
+    """
+    Local chunk store that answers searches from an HNSW graph instead of an
+    exact scan. Chunks live in the same segment files as FileSystemChunkStore;
+    only the vector index differs.
+    """
+
+    index_type = LocalIndexType.HNSW
+    index_options = ("m", "ef_construction", "ef_search")
+    data_dirs = FileSystemChunkStore.data_dirs + (HNSW_DIR,)
+
+    def __init__(
+        self,
+        output_dir: str = None,
+        embeddings: Embeddings = None,
+        quantization: VectorQuantization = VectorQuantization.FLOAT32,
+        m: int = DEFAULT_M,
+        ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+        ef_search: int = DEFAULT_EF_SEARCH,
+    ):
+        if VectorQuantization(quantization) != VectorQuantization.FLOAT32:
+            raise ValueError("The HNSW index stores float32 vectors; use the flat index for quantization.")
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        super().__init__(output_dir, embeddings, quantization)
+
+    def _open_indexes(self, data_dir: Optional[Path] = None) -> None:
+        super()._open_indexes(data_dir)
+        self.vector_index = HnswIndex(
+            self.data_dir / HNSW_DIR,
+            m=self.m,
+            ef_construction=self.ef_construction,
+            ef_search=self.ef_search,
+        )
+        # An existing graph keeps the parameters it was built with, also when compacted
+        self.m = self.vector_index.m
+        self.ef_construction = self.vector_index.ef_construction
@@ -0,0 +1,70 @@
+from pathlib import Path
+from typing import Optional
+from langchain_core.embeddings import Embeddings
+from domain.models.enums import LocalIndexType, VectorQuantization
+from infrastructure.adapters.chunk_stores.file_system_chunk_store import (
+    FileSystemChunkStore,
+)
+from infrastructure.adapters.vector_indexes.ivf_pq_index import (
+    DEFAULT_NLIST,
+    DEFAULT_NPROBE,
+    DEFAULT_PQ_M,
+    DEFAULT_RERANK_FACTOR,
+    DEFAULT_TRAIN_SIZE,
+    IvfPqIndex,
+)
+
+IVF_PQ_DIR = "ivf_pq"
+
+
+class IvfPqChunkStore(FileSystemChunkStore):
+    """
+    Local chunk store for very large corpora: vectors are searched through an
+    IVF-PQ index and only the reranked candidates touch the full-precision
+    vectors on disk. Chunks are searched exactly until enough are saved to
+    train the index, which then trains once on a sample of all of them.
+    """
+
+    index_type = LocalIndexType.IVF_PQ
+    index_options = ("nlist", "pq_m", "nprobe", "rerank_factor", "train_size")
+    data_dirs = FileSystemChunkStore.data_dirs + (IVF_PQ_DIR,)
+
+    def __init__(
+        self,
+        output_dir: str = None,
+        embeddings: Embeddings = None,
+        quantization: VectorQuantization = VectorQuantization.FLOAT32,
+        nlist: int = DEFAULT_NLIST,
+        pq_m: int = DEFAULT_PQ_M,
+        nprobe: int = DEFAULT_NPROBE,
+        rerank_factor: int = DEFAULT_RERANK_FACTOR,
+        train_size: int = DEFAULT_TRAIN_SIZE,
+    ):
+        if VectorQuantization(quantization) != VectorQuantization.FLOAT32:
+            raise ValueError("The IVF-PQ index quantizes vectors itself; use the flat index for --quantization.")
+        self.ivf_options = {
+            "nlist": nlist,
+            "pq_m": pq_m,
+            "nprobe": nprobe,
+            "rerank_factor": rerank_factor,
+            "train_size": train_size,
+        }
+        super().__init__(output_dir, embeddings, quantization)
+
+    def _open_indexes(self, data_dir: Optional[Path] = None) -> None:
+        super()._open_indexes(data_dir)
+        self.vector_index = IvfPqIndex(self.data_dir / IVF_PQ_DIR, **self.ivf_options)
+        # An index keeps the shape it was trained with, or first asked for, also when compacted
+        if self.vector_index.trained:
+            self.ivf_options = {
+                **self.ivf_options,
+                "nlist": self.vector_index.state["nlist"],
+                "pq_m": self.vector_index.state["pq_m"],
+            }
+        else:
+            self.ivf_options = {
+                **self.ivf_options,
+                "nlist": self.vector_index.nlist,
+                "pq_m": self.vector_index.pq_m,
+                "train_size": self.vector_index.train_size,
+            }
@@ -0,0 +1,45 @@
+from typing import Any, Dict, Optional
+from langchain_core.embeddings import Embeddings
+from domain.models.enums import LocalIndexType, VectorQuantization
+from infrastructure.adapters.chunk_stores.file_system_chunk_store import (
+    DEFAULT_OUTPUT_DIR,
+    FileSystemChunkStore,
+    read_index_type,
+)
+from infrastructure.adapters.chunk_stores.hnsw_chunk_store import HnswChunkStore
+from infrastructure.adapters.chunk_stores.ivf_pq_chunk_store import IvfPqChunkStore
+
+LOCAL_STORES = {
+    LocalIndexType.FLAT: FileSystemChunkStore,
+    LocalIndexType.HNSW: HnswChunkStore,
+    LocalIndexType.IVF_PQ: IvfPqChunkStore,
+}
+
+
+def open_local_chunk_store(
+    output_dir: str = None,
+    index_type: Optional[LocalIndexType] = None,
+    embeddings: Embeddings = None,
+    quantization: VectorQuantization = VectorQuantization.FLOAT32,
+    index_options: Optional[Dict[str, Any]] = None,
+) -> FileSystemChunkStore:
+    """
+    Opens a local chunk store with the index it was created with.
+
+    Without an explicit ``index_type`` the one recorded in the directory is
+    used (flat for new directories). Asking for a different index than the
+    directory already holds is an error, since its vectors would be missing.
+    """
+    output_dir = output_dir or DEFAULT_OUTPUT_DIR
+    existing = read_index_type(output_dir)
+    if index_type is not None and existing is not None and LocalIndexType(index_type) != existing:
+        raise ValueError(
+            f"'{output_dir}' holds a '{existing.value}' index; clean it before saving with '{LocalIndexType(index_type).value}'."
+        )
+    store_class = LOCAL_STORES[LocalIndexType(index_type or existing or LocalIndexType.FLAT)]
+
+    index_options = index_options or {}
+    unknown = sorted(set(index_options) - set(store_class.index_options))
+    if unknown:
+        raise ValueError(f"Unknown options for the '{store_class.index_type.value}' index: {', '.join(unknown)}")
+    return store_class(output_dir, embeddings=embeddings, quantization=quantization, **index_options)
@@ -0,0 +1,119 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from domain.services.metadata_filter import field_values
+from infrastructure.adapters.vector_indexes.flat_vector_index import (
+    TOMBSTONE_DTYPE,
+    TOMBSTONES_FILE,
+    deleted_mask,
+    id_key,
+)
+
+DEFAULT_INDEXED_FIELDS = ("source", "file_name", "header_path", "tags")
+POSTINGS_FILE = "postings.bin"
+# One entry per (field, value) of a chunk: the hashed term and the chunk key
+POSTING_DTYPE = np.dtype([("term", "<u8"), ("key", "<u8")])
+
+
+def term_key(field: str, value: Any) -> int:
+    return id_key(f"{field}\x00{json.dumps(value, sort_keys=True)}")
+
+
+class MetadataIndex:
+    """
+    Secondary index from metadata values to chunk keys.
+
+    Saves append ``(term, key)`` entries for every indexed field; a term hashes
+    a field name and one of its values, so list fields such as tags get an
+    entry per element. ``candidate_keys`` turns the indexable part of a filter
+    into the set of keys that may match, which the vector and lexical indexes
+    use to skip every other row before scoring. Deletes append tombstones
+    that hide the entries written before them, as in the vector and lexical
+    indexes. Candidates are still a superset: stale entries of re-saved
+    chunks are dropped by the liveness checks of the indexes and by the exact
+    filter check on the results.
+    """
+
+    def __init__(self, directory: str, fields: Sequence[str] = DEFAULT_INDEXED_FIELDS):
+        self.directory = Path(directory)
+        self.fields = tuple(fields)
+        self._postings: Optional[np.ndarray] = None
+
+    def add(self, ids: Sequence[str], metadatas: Sequence[Dict[str, Any]]) -> None:
+        entries = [
+            (term_key(field, value), id_key(chunk_id))
+            for chunk_id, metadata in zip(ids, metadatas)
+            for field in self.fields
+            for value in field_values(metadata, field)
+        ]
+        if not entries:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / POSTINGS_FILE, "ab") as f:
+            f.write(np.array(entries, dtype=POSTING_DTYPE).tobytes())
+        self._postings = None
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """Drops every entry written so far for ``ids``, without rewriting the postings."""
+        if len(ids) == 0:
+            return
+        path = self.directory / POSTINGS_FILE
+        position = path.stat().st_size // POSTING_DTYPE.itemsize if path.exists() else 0
+        tombstones = np.array([(id_key(chunk_id), position) for chunk_id in ids], dtype=TOMBSTONE_DTYPE)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / TOMBSTONES_FILE, "ab") as f:
+            f.write(tombstones.tobytes())
+        self._postings = None
+
+    @property
+    def postings(self) -> np.ndarray:
+        """The entries not deleted since, sorted by term; loaded once per process and refreshed after writes."""
+        if self._postings is None:
+            path = self.directory / POSTINGS_FILE
+            postings = np.fromfile(path, dtype=POSTING_DTYPE) if path.exists() else np.zeros(0, POSTING_DTYPE)
+            postings = postings[~deleted_mask(postings["key"], self.directory / TOMBSTONES_FILE)]
+            self._postings = postings[np.argsort(postings["term"], kind="stable")]
+        return self._postings
+
+    def _keys(self, field: str, values: Sequence[Any]) -> np.ndarray:
+        postings = self.postings
+        keys = []
+        for value in values:
+            term = np.uint64(term_key(field, value))
+            start = np.searchsorted(postings["term"], term, side="left")
+            stop = np.searchsorted(postings["term"], term, side="right")
+            keys.append(postings["key"][start:stop])
+        return np.unique(np.concatenate(keys)) if keys else np.zeros(0, np.uint64)
+
+    def candidate_keys(self, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        Sorted keys of the chunks that can match ``where``, or None when no
+        indexed condition narrows it down (the caller then scans everything).
+        """
+        if not where:
+            return None
+        narrowed = []
+        for field, condition in where.items():
+            if field == "$and":
+                narrowed.extend(
+                    keys for keys in (self.candidate_keys(clause) for clause in condition) if keys is not None
+                )
+            elif field == "$or":
+                branches = [self.candidate_keys(clause) for clause in condition]
+                if all(keys is not None for keys in branches):
+                    narrowed.append(np.unique(np.concatenate(branches)))
+            elif field in self.fields:
+                operator, operand = next(iter(condition.items())) if isinstance(condition, dict) else ("$eq", condition)
+                if operator == "$eq":
+                    narrowed.append(self._keys(field, [operand]))
+                elif operator == "$in":
+                    narrowed.append(self._keys(field, operand))
+        if not narrowed:
+            return None
+        keys = narrowed[0]
+        for other in narrowed[1:]:
+            keys = np.intersect1d(keys, other, assume_unique=True)
+        return keys
@@ -0,0 +1,270 @@
+import json
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from infrastructure.adapters.vector_indexes.flat_vector_index import id_key
+
+INDEX_FILE = "index.bin"
+SORTED_INDEX_PATTERN = re.compile(r"index\.sorted\.(\d+)\.bin$")
+SEGMENT_PATTERN = re.compile(r"segment_(\d{6})\.content$")
+DEFAULT_MAX_SEGMENT_BYTES = 256 * 1024 * 1024
+MIN_SORTED_TAIL = 65536
+INDEX_DTYPE = np.dtype([("key", "<u8"), ("segment", "<u4"), ("row", "<u4")])
+# Per row: (offset, length) into the content, metadata and ids columns
+OFFSETS_DTYPE = np.dtype([
+    ("content_offset", "<i8"), ("content_length", "<i8"),
+    ("metadata_offset", "<i8"), ("metadata_length", "<i8"),
+    ("id_offset", "<i8"), ("id_length", "<i8"),
+])
+COLUMNS = ("content", "metadata", "ids")
+
+
+def _map(path: Path) -> Optional[mmap.mmap]:
+    """Read-only memory map of a file, or None for empty files."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class SegmentReader:
+    """
+    Columnar, memory-mapped view of one segment.
+
+    Opening a segment maps its files and parses nothing. Content and ids are
+    returned as zero-copy ``memoryview`` slices of the maps, and metadata JSON
+    is only decoded for the rows that are actually materialized.
+    """
+
+    def __init__(self, prefix: str):
+        self.offsets = np.memmap(f"{prefix}.offsets", dtype=OFFSETS_DTYPE, mode="r")
+        self._maps = {column: _map(Path(f"{prefix}.{column}")) for column in COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def _slice(self, column: str, row: int, field: str) -> memoryview:
+        offset = int(self.offsets[row][f"{field}_offset"])
+        length = int(self.offsets[row][f"{field}_length"])
+        if length == 0:
+            return memoryview(b"")
+        return memoryview(self._maps[column])[offset:offset + length]
+
+    def content_view(self, row: int) -> memoryview:
+        return self._slice("content", row, "content")
+
+    def content(self, row: int) -> str:
+        return str(self.content_view(row), "utf-8")
+
+    def metadata(self, row: int) -> dict:
+        return json.loads(bytes(self._slice("metadata", row, "metadata")))
+
+    def id(self, row: int) -> str:
+        return str(self._slice("ids", row, "id"), "utf-8")
+
+
+class SegmentLog:
+    """
+    Append-only, columnar storage for chunk records.
+
+    Each segment keeps its rows in four files: ``.content`` (UTF-8 blob),
+    ``.metadata`` (JSON blob), ``.ids`` (UTF-8 blob) and ``.offsets``, a
+    fixed-width array of per-row offsets and lengths into the three blobs. A
+    batch is appended with one sequential write per file; a new segment starts
+    once the active content blob grows past ``max_segment_bytes``.
+
+    Ids are resolved through a binary ``(key, segment, row)`` log. The latest
+    entry for an id wins and ``segment == 0`` marks a deletion. The log is
+    periodically folded into a sorted snapshot, so a cold reader memory-maps
+    the snapshot and only scans the short unsorted tail.
+    """
+
+    def __init__(self, directory: str, max_segment_bytes: int = DEFAULT_MAX_SEGMENT_BYTES):
+        self.directory = Path(directory)
+        self.max_segment_bytes = max_segment_bytes
+        self._readers: Dict[int, SegmentReader] = {}
+        self._sorted: Optional[np.ndarray] = None
+        self._tail: Optional[np.ndarray] = None
+
+    def segment_prefix(self, segment: int) -> str:
+        return str(self.directory / f"segment_{segment:06d}")
+
+    def segments(self) -> list[int]:
+        return sorted(
+            int(match.group(1))
+            for match in (SEGMENT_PATTERN.search(p.name) for p in self.directory.glob("segment_*.content"))
+            if match
+        )
+
+    def _active_segment(self) -> Tuple[int, int]:
+        """Returns the segment to append to and its current row count."""
+        segments = self.segments()
+        if not segments:
+            return 1, 0
+        prefix = self.segment_prefix(segments[-1])
+        if os.path.getsize(f"{prefix}.content") >= self.max_segment_bytes:
+            return segments[-1] + 1, 0
+        return segments[-1], os.path.getsize(f"{prefix}.offsets") // OFFSETS_DTYPE.itemsize
+
+    def reader(self, segment: int) -> SegmentReader:
+        if segment not in self._readers:
+            self._readers[segment] = SegmentReader(self.segment_prefix(segment))
+        return self._readers[segment]
+
+    # --- Writes ---
+
+    def append(self, records: Sequence[Tuple[str, str, dict]]) -> None:
+        """
+        Appends ``(id, content, metadata)`` records as one batch: a single
+        buffered write per column file, then one write to the id log.
+        """
+        if not records:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segment, first_row = self._active_segment()
+        prefix = self.segment_prefix(segment)
+
+        sizes = {column: (os.path.getsize(f"{prefix}.{column}") if os.path.exists(f"{prefix}.{column}") else 0)
+                 for column in COLUMNS}
+        buffers = {column: [] for column in COLUMNS}
+        offsets = np.zeros(len(records), dtype=OFFSETS_DTYPE)
+        entries = np.zeros(len(records), dtype=INDEX_DTYPE)
+        for i, (record_id, content, metadata) in enumerate(records):
+            row = []
+            for column, value in zip(COLUMNS, (
+                content.encode("utf-8"),
+                json.dumps(metadata, ensure_ascii=False).encode("utf-8"),
+                record_id.encode("utf-8"),
+            )):
+                row.extend((sizes[column], len(value)))
+                sizes[column] += len(value)
+                buffers[column].append(value)
+            offsets[i] = tuple(row)
+            entries[i] = (id_key(record_id), segment, first_row + i)
+
+        for column in COLUMNS:
+            with open(f"{prefix}.{column}", "ab", buffering=1024 * 1024) as f:
+                f.write(b"".join(buffers[column]))
+        # Offsets go after the blobs and the id log after the offsets, so no
+        # reader can ever see a row whose bytes are not on disk yet
+        with open(f"{prefix}.offsets", "ab") as f:
+            f.write(offsets.tobytes())
+        self._readers.pop(segment, None)
+        self._append_entries(entries)
+
+    def delete(self, ids: Iterable[str]) -> None:
+        """Appends tombstones for the given ids."""
+        entries = np.array([(id_key(record_id), 0, 0) for record_id in ids], dtype=INDEX_DTYPE)
+        if len(entries):
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._append_entries(entries)
+
+    def _append_entries(self, entries: np.ndarray) -> None:
+        with open(self.directory / INDEX_FILE, "ab") as f:
+            f.write(entries.tobytes())
+        self._sorted = None
+        self._tail = None
+        self._maybe_fold_index()
+
+    # --- Id index ---
+
+    def _sorted_snapshot(self) -> Tuple[int, Optional[Path]]:
+        """Returns how many log entries the newest sorted snapshot covers, and its path."""
+        snapshots = [
+            (int(match.group(1)), p)
+            for p in self.directory.glob("index.sorted.*.bin")
+            if (match := SORTED_INDEX_PATTERN.search(p.name))
+        ]
+        return max(snapshots, default=(0, None))
+
+    def _maybe_fold_index(self) -> None:
+        """Rewrites the sorted snapshot once the unsorted tail gets long."""
+        covered, snapshot = self._sorted_snapshot()
+        total = os.path.getsize(self.directory / INDEX_FILE) // INDEX_DTYPE.itemsize
+        if total - covered < max(MIN_SORTED_TAIL, covered // 8):
+            return
+
+        entries = np.fromfile(self.directory / INDEX_FILE, dtype=INDEX_DTYPE)
+        latest = _latest_entries(entries)
+        latest = latest[latest["segment"] != 0]  # the snapshot covers the whole prefix, so tombstones can go
+
+        temporary = self.directory / f"index.sorted.{total}.tmp"
+        latest.tofile(temporary)
+        os.replace(temporary, self.directory / f"index.sorted.{total}.bin")
+        if snapshot is not None:
+            snapshot.unlink(missing_ok=True)
+
+    def _load_index(self) -> None:
+        covered, snapshot = self._sorted_snapshot()
+        self._sorted = (
+            np.memmap(snapshot, dtype=INDEX_DTYPE, mode="r")
+            if snapshot is not None and snapshot.stat().st_size else np.zeros(0, INDEX_DTYPE)
+        )
+        index_path = self.directory / INDEX_FILE
+        self._tail = (
+            np.fromfile(index_path, dtype=INDEX_DTYPE, offset=covered * INDEX_DTYPE.itemsize)
+            if index_path.exists() else np.zeros(0, INDEX_DTYPE)
+        )
+
+    def locate(self, record_id: str) -> Optional[Tuple[int, int]]:
+        """Returns the live ``(segment, row)`` of an id, or None if it is unknown or deleted."""
+        if self._sorted is None:
+            self._load_index()
+        key = id_key(record_id)
+
+        matches = np.flatnonzero(self._tail["key"] == key)
+        if len(matches):
+            entry = self._tail[matches[-1]]
+        else:
+            slot = np.searchsorted(self._sorted["key"], key)
+            if slot == len(self._sorted) or self._sorted[slot]["key"] != key:
+                return None
+            entry = self._sorted[slot]
+        if entry["segment"] == 0:
+            return None
+        return int(entry["segment"]), int(entry["row"])
+
+    # --- Reads ---
+
+    def get(self, record_id: str) -> Optional[dict]:
+        """Reads a record through the memory-mapped columns of its segment."""
+        location = self.locate(record_id)
+        if location is None:
+            return None
+        reader = self.reader(location[0])
+        row = location[1]
+        # Guard against 64-bit key collisions
+        if reader.id(row) != record_id:
+            return None
+        return {"id": record_id, "content": reader.content(row), "metadata": reader.metadata(row)}
+
+    def live_locations(self) -> np.ndarray:
+        """The latest ``(key, segment, row)`` entry of every live id, sorted by key."""
+        index_path = self.directory / INDEX_FILE
+        if not index_path.exists():
+            return np.zeros(0, INDEX_DTYPE)
+        latest = _latest_entries(np.fromfile(index_path, dtype=INDEX_DTYPE))
+        return latest[latest["segment"] != 0]
+
+    def __iter__(self) -> Iterator[dict]:
+        """Yields every live record in segment order."""
+        locations = self.live_locations()
+        locations = locations[np.lexsort((locations["row"], locations["segment"]))]
+        for segment, row in zip(locations["segment"], locations["row"]):
+            reader = self.reader(int(segment))
+            yield {"id": reader.id(int(row)), "content": reader.content(int(row)), "metadata": reader.metadata(int(row))}
+
+    def __len__(self) -> int:
+        return len(self.live_locations())
+
+
+def _latest_entries(entries: np.ndarray) -> np.ndarray:
+    """Keeps the last entry of every key, sorted by key."""
+    # np.unique keeps the first occurrence, so run it over the reversed log
+    _, first_in_reversed = np.unique(entries["key"][::-1], return_index=True)
+    return entries[::-1][first_in_reversed]
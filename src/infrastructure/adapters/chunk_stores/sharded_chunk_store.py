@@ -0,0 +1,187 @@
+import heapq
+import json
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from langchain_core.embeddings import Embeddings
+from application.ports.chunk_store import ChunkStore
+from domain.models.chunk import Chunk
+from domain.models.compaction import CompactionReport
+from domain.models.enums import LocalIndexType, StorageType, VectorQuantization
+from domain.services.chunk_identity import chunk_id as make_chunk_id
+from infrastructure.adapters.chunk_stores.chroma_chunk_store import (
+    DEFAULT_COLLECTION_NAME,
+    ChromaChunkStore,
+)
+from infrastructure.adapters.chunk_stores.chroma_client_registry import resolve_persist_directory
+from infrastructure.adapters.chunk_stores.file_system_chunk_store import DEFAULT_OUTPUT_DIR
+from infrastructure.adapters.chunk_stores.local_chunk_stores import open_local_chunk_store
+from infrastructure.adapters.vector_indexes.flat_vector_index import id_key
+
+SHARDS_FILE = "shards.json"
+SHARDS_DIR = "shards"
+
+
+def shard_index(chunk_id: str, shard_count: int) -> int:
+    """Stable shard of a chunk id: the same id always lands on the same shard."""
+    return id_key(chunk_id) % shard_count
+
+
+class ShardedChunkStore(ChunkStore):
+    """
+    Hash-partitions chunks across several stores of the same kind.
+
+    Saves group chunks by the hash of their content-addressed id and write
+    every shard concurrently; ``get`` and ``delete`` go straight to the one
+    shard owning an id. Searches fan out to all shards in parallel and merge
+    the per-shard rankings, each already sorted best first, with a k-way heap
+    merge on their scores.
+    """
+
+    def __init__(self, shards: Sequence[ChunkStore], layout_file: Optional[Path] = None):
+        if not shards:
+            raise ValueError("A sharded store needs at least one shard")
+        self.shards = list(shards)
+        # Records the shard count of the layout; removed by clear()
+        self.layout_file = layout_file
+        self._pool = ThreadPoolExecutor(max_workers=len(self.shards))
+
+    def _shard(self, chunk_id: str) -> ChunkStore:
+        return self.shards[shard_index(chunk_id, len(self.shards))]
+
+    def _fan_out(self, call: Callable[[ChunkStore], Any]) -> List[Any]:
+        return list(self._pool.map(call, self.shards))
+
+    def save(self, chunks: list[Chunk]):
+        partitions: Dict[int, List[Chunk]] = {}
+        for chunk in chunks:
+            partitions.setdefault(shard_index(make_chunk_id(chunk), len(self.shards)), []).append(chunk)
+        futures = [self._pool.submit(self.shards[shard].save, part) for shard, part in partitions.items()]
+        for future in futures:
+            future.result()
+
+    def get(self, chunk_id: str) -> Optional[Chunk]:
+        return self._shard(chunk_id).get(chunk_id)
+
+    def delete(self, chunk_id: str):
+        self._shard(chunk_id).delete(chunk_id)
+
+    def delete_many(self, chunk_ids: list[str]):
+        partitions: Dict[int, List[str]] = {}
+        for chunk_id in chunk_ids:
+            partitions.setdefault(shard_index(chunk_id, len(self.shards)), []).append(chunk_id)
+        futures = [self._pool.submit(self.shards[shard].delete_many, part) for shard, part in partitions.items()]
+        for future in futures:
+            future.result()
+
+    def search(
+        self,
+        query_embedding: list[float],
+        top_k: int = 5,
+        filter: Optional[dict] = None,
+        include_embeddings: bool = False,
+    ) -> list[Chunk]:
+        return _merge(
+            self._fan_out(
+                lambda shard: shard.search(
+                    query_embedding, top_k=top_k, filter=filter, include_embeddings=include_embeddings
+                )
+            ),
+            top_k,
+        )
+
+    def search_many(
+        self, query_embeddings: list[list[float]], top_k: int = 5, filter: Optional[dict] = None
+    ) -> list[list[Chunk]]:
+        per_shard = self._fan_out(lambda shard: shard.search_many(query_embeddings, top_k=top_k, filter=filter))
+        return [_merge([rankings[i] for rankings in per_shard], top_k) for i in range(len(query_embeddings))]
+
+    def lexical_search(self, query: str, top_k: int = 5, filter: Optional[dict] = None) -> list[Chunk]:
+        return _merge(self._fan_out(lambda shard: shard.lexical_search(query, top_k=top_k, filter=filter)), top_k)
+
+    def compact(self) -> CompactionReport:
+        """Compacts every shard in parallel and sums their reports."""
+        return CompactionReport.combine(self._fan_out(lambda shard: shard.compact()))
+
+    def clear(self):
+        self._fan_out(lambda shard: shard.clear())
+        if self.layout_file is not None:
+            self.layout_file.unlink(missing_ok=True)
+
+
+def _merge(rankings: List[List[Chunk]], top_k: int) -> List[Chunk]:
+    """
+    Merges per-shard rankings by descending score. Results without a score
+    keep their shard rank, so such rankings are interleaved best first.
+    """
+    keyed = [
+        [(-chunk.score if chunk.score is not None else rank, chunk) for rank, chunk in enumerate(ranking)]
+        for ranking in rankings
+    ]
+    return [chunk for _, chunk in islice(heapq.merge(*keyed, key=lambda entry: entry[0]), top_k)]
+
+
+def _read_shard_count(layout_file: Path) -> Optional[int]:
+    if not layout_file.exists():
+        return None
+    return json.loads(layout_file.read_text(encoding="utf-8"))["shards"]
+
+
+def open_sharded_chunk_store(
+    store_type: StorageType,
+    location: str = None,
+    shards: Optional[int] = None,
+    embeddings: Embeddings = None,
+    quantization: VectorQuantization = VectorQuantization.FLOAT32,
+    index_type: Optional[LocalIndexType] = None,
+    index_options: Optional[Dict[str, Any]] = None,
+    persist_directory: Optional[str] = None,
+) -> Optional[ShardedChunkStore]:
+    """
+    Opens a sharded store: ``shard_NNN`` directories under a local directory,
+    or ``<collection>_shard_NNN`` collections in one Chroma directory.
+
+    The shard count is recorded on first use, so later commands pick it up
+    without ``shards``. Returns None when the location is not sharded and no
+    count was asked for. A different count than the recorded one is an
+    error, since ids would be routed to the wrong shards.
+    """
+    if store_type == StorageType.LOCAL:
+        root = Path(location or DEFAULT_OUTPUT_DIR)
+        layout_file = root / SHARDS_FILE
+    else:
+        location = location or DEFAULT_COLLECTION_NAME
+        persist_directory = resolve_persist_directory(persist_directory)
+        layout_file = Path(persist_directory) / SHARDS_DIR / f"{location}.json"
+
+    recorded = _read_shard_count(layout_file)
+    if shards is not None and shards < 1:
+        raise ValueError(f"The shard count must be positive, got {shards}")
+    if shards is not None and recorded is not None and shards != recorded:
+        raise ValueError(f"'{location}' is split into {recorded} shards; clean it before saving with {shards}.")
+    shard_count = shards or recorded
+    if shard_count is None:
+        return None
+
+    if store_type == StorageType.LOCAL:
+        stores = [
+            open_local_chunk_store(
+                str(root / f"shard_{i:03d}"),
+                index_type=index_type,
+                embeddings=embeddings,
+                quantization=quantization,
+                index_options=index_options,
+            )
+            for i in range(shard_count)
+        ]
+    else:
+        stores = [
+            ChromaChunkStore(f"{location}_shard_{i:03d}", persist_directory=persist_directory)
+            for i in range(shard_count)
+        ]
+
+    if recorded is None:
+        layout_file.parent.mkdir(parents=True, exist_ok=True)
+        layout_file.write_text(json.dumps({"shards": shard_count}), encoding="utf-8")
+    return ShardedChunkStore(stores, layout_file=layout_file)
@@ -0,0 +1,139 @@
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_FILE = ".store.lock"
+# Bytes of the lock file holding the generation counter
+GENERATION_WIDTH = 20
+
+
+class StoreLock:
+    """
+    Readers-writer lock of a store, shared by every process and thread.
+
+    It is an advisory ``flock`` on a file that lives next to the data and is
+    never deleted, so the operating system releases it when a process dies.
+    The file also holds the store's generation, a counter bumped whenever an
+    exclusive section ends: a reader that finds a new generation knows other
+    writers committed since it opened the store. Sections are reentrant
+    within a thread, and a thread holding the exclusive lock may read.
+    Windows has no shared file locks, so there readers lock exclusively too.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[int]:
+        """Holds the lock alone and yields the generation it found; the section ends by bumping it."""
+        if getattr(self._local, "depth", 0):
+            if self._local.shared:
+                raise RuntimeError(f"'{self.path}' is held for reading; it cannot be upgraded to a write lock.")
+            yield self._local.generation
+            return
+        with self._hold(shared=False) as fd:
+            generation = _read_generation(fd)
+            try:
+                yield generation
+            finally:
+                _write_generation(fd, generation + 1)
+
+    @contextmanager
+    def shared(self) -> Iterator[int]:
+        """Holds the lock together with other readers and yields the current generation."""
+        if getattr(self._local, "depth", 0):
+            yield self._local.generation
+            return
+        with self._hold(shared=True) as fd:
+            yield _read_generation(fd)
+
+    def generation(self) -> int:
+        """
+        The generation, read without locking. Data opened after reading it is
+        at least that recent, so a caller who later finds a newer one reopens.
+        """
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return 0
+        try:
+            return _read_generation(fd)
+        finally:
+            os.close(fd)
+
+    @contextmanager
+    def _hold(self, shared: bool) -> Iterator[int]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            _lock(fd, shared)
+            self._local.depth = 1
+            self._local.shared = shared
+            self._local.generation = _read_generation(fd)
+            try:
+                yield fd
+            finally:
+                self._local.depth = 0
+                _unlock(fd)
+        finally:
+            os.close(fd)
+
+
+def claim(path: str) -> Optional[int]:
+    """
+    Locks ``path`` exclusively without waiting. Returns the descriptor that
+    holds the lock, released by closing it, or None if someone else holds it.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _lock(fd: int, shared: bool) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        return
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            # LK_LOCK gives up after ten seconds; keep waiting like flock does
+            continue
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _read_generation(fd: int) -> int:
+    os.lseek(fd, 0, os.SEEK_SET)
+    data = os.read(fd, GENERATION_WIDTH).strip()
+    return int(data) if data else 0
+
+
+def _write_generation(fd: int, generation: int) -> None:
+    # Fixed width, so the counter is rewritten in place and never shrinks into a torn value
+    os.lseek(fd, 0, os.SEEK_SET)
+    os.write(fd, str(generation).rjust(GENERATION_WIDTH).encode("ascii"))
@@ -1,7 +1,7 @@
 import concurrent.futures
 import threading
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Optional
+from typing import Collection, List, Optional
 from pathlib import Path
 from application.ports.document_loader import DocumentLoader
 from domain.models.document import Document
@@ -35,7 +35,9 @@ class MarkdownDocumentLoader(DocumentLoader):
                     self._markdown_converter_instance = MarkItDown()
         return self._markdown_converter_instance
 
-    def load(self, source: str, max_workers: Optional[int] = None) -> List[Document]:
+    def load(
+        self, source: str, exclude: Collection[str] = (), max_workers: Optional[int] = None
+    ) -> List[Document]:
         data_path = Path(source)
 
         if not data_path.exists():
@@ -46,6 +48,10 @@ class MarkdownDocumentLoader(DocumentLoader):
         if not all_files:
             raise FileNotFoundError(f"No files found in '{source}'")
 
+        # Files already ingested by an interrupted run are matched on their "source" metadata
+        excluded = set(exclude)
+        all_files = [p for p in all_files if str(p) not in excluded]
+
         documents = []
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = [executor.submit(self._process_file, file_path) for file_path in all_files]
@@ -0,0 +1,169 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+DEFAULT_EMBEDDING_MODEL = "models/embedding-001"
+DEFAULT_MAX_ENTRIES = 1024
+CACHE_DB_NAME = "query_embeddings.sqlite3"
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalizes a query so that trivially different spellings share a cache entry.
+    Applies NFKC normalization, case folding and whitespace collapsing.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Wraps an embeddings model and memoizes query embeddings.
+
+    Lookups go to an in-process LRU first and, when a cache directory is given,
+    to a SQLite file on disk second. Entries are keyed by the embedding model
+    name and the normalized query text, so switching models never returns stale
+    vectors. Document embeddings are passed through untouched.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        cache_dir: Optional[str] = None,
+    ):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._memory: OrderedDict[str, List[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        if cache_dir:
+            cache_path = Path(cache_dir)
+            cache_path.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(
+                cache_path / CACHE_DB_NAME, check_same_thread=False
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, embedding BLOB NOT NULL)"
+            )
+            self._connection.commit()
+
+    def cache_key(self, text: str) -> str:
+        """Returns the cache key for a query under the configured model."""
+        payload = f"{self.model_name}\x00{normalize_query(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self.cache_key(text)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        embedding = list(self.embeddings.embed_query(text))
+        self._store(key, embedding)
+        return list(embedding)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds several queries, answering what it can from the cache and the
+        rest with one batched request; repeated queries are embedded once.
+        """
+        keys = [self.cache_key(text) for text in texts]
+        embeddings = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key in embeddings or key in missing:
+                continue
+            cached = self._lookup(key)
+            if cached is None:
+                missing[key] = text
+            else:
+                embeddings[key] = cached
+
+        if missing:
+            for key, embedding in zip(missing, self._embed_query_batch(list(missing.values()))):
+                embedding = list(embedding)
+                self._store(key, embedding)
+                embeddings[key] = embedding
+        return [list(embeddings[key]) for key in keys]
+
+    def _embed_query_batch(self, texts: List[str]) -> List[List[float]]:
+        if isinstance(self.embeddings, GoogleGenerativeAIEmbeddings):
+            # The task type embed_query uses, so batched vectors match single ones
+            return self.embeddings.embed_documents(texts, task_type="RETRIEVAL_QUERY")
+        return [self.embeddings.embed_query(text) for text in texts]
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return list(embedding)
+
+            if self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT embedding FROM query_embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    embedding = np.frombuffer(row[0], dtype=np.float32).tolist()
+                    self._remember(key, embedding)
+                    self.hits += 1
+                    return list(embedding)
+
+            self.misses += 1
+            return None
+
+    def _store(self, key: str, embedding: List[float]) -> None:
+        with self._lock:
+            self._remember(key, embedding)
+            if self._connection is not None:
+                blob = np.asarray(embedding, dtype=np.float32).tobytes()
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, model, embedding) VALUES (?, ?, ?)",
+                    (key, self.model_name, blob),
+                )
+                self._connection.commit()
+
+    def _remember(self, key: str, embedding: List[float]) -> None:
+        """Inserts into the in-memory LRU, evicting the oldest entry when full."""
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+def build_query_embeddings(
+    model_name: Optional[str] = None, cache_dir: Optional[str] = None
+) -> CachedQueryEmbeddings:
+    """
+    Creates the cached query embeddings used by search and talk.
+    The model defaults to EMBEDDING_MODEL and the on-disk cache is enabled by
+    QUERY_EMBEDDING_CACHE_DIR; without it only the in-process LRU is used.
+    """
+    model_name = model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+    cache_dir = cache_dir or os.getenv("QUERY_EMBEDDING_CACHE_DIR")
+    max_entries = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+    return CachedQueryEmbeddings(
+        GoogleGenerativeAIEmbeddings(model=model_name),
+        model_name=model_name,
+        max_entries=max_entries,
+        cache_dir=cache_dir,
+    )
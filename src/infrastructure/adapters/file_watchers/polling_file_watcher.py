@@ -0,0 +1,80 @@
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+from application.ports.file_watcher import FileWatcher
+from domain.models.watch import FileState
+
+DEFAULT_POLL_INTERVAL_SECONDS = 1.0
+# Quiet time required after the last change before a snapshot is yielded
+DEFAULT_DEBOUNCE_SECONDS = 1.0
+
+
+class PollingFileWatcher(FileWatcher):
+    """
+    Watches a tree by polling the size and modification time of its files.
+
+    A poll is one ``os.scandir`` walk that reads no file contents, so an
+    idle tree of thousands of files costs a few milliseconds per interval
+    and needs no platform notification API. A burst of changes, such as a
+    checkout or an editor saving several files, is coalesced: a snapshot is
+    only yielded once no poll has seen a change for ``debounce_seconds``.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = DEFAULT_POLL_INTERVAL_SECONDS,
+        debounce_seconds: float = DEFAULT_DEBOUNCE_SECONDS,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if interval_seconds <= 0:
+            raise ValueError("The poll interval must be positive.")
+        if debounce_seconds < 0:
+            raise ValueError("The debounce period cannot be negative.")
+        self.interval_seconds = interval_seconds
+        self.debounce_seconds = debounce_seconds
+        self.sleep = sleep
+        self.clock = clock
+
+    def scan(self, source: str) -> Dict[str, FileState]:
+        root = Path(source)
+        if not root.is_dir():
+            raise FileNotFoundError(f"The folder '{source}' does not exist")
+        snapshot: Dict[str, FileState] = {}
+        # Paths are joined onto str(Path(source)) like the loader's rglob, so they match its "source" metadata
+        directories = [str(root)]
+        while directories:
+            try:
+                entries = list(os.scandir(directories.pop()))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        directories.append(entry.path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.path] = FileState(stat.st_mtime_ns, stat.st_size)
+                except FileNotFoundError:
+                    # Deleted between listing and stat; the next poll sees it gone
+                    continue
+        return snapshot
+
+    def watch(self, source: str) -> Iterator[Dict[str, FileState]]:
+        snapshot = self.scan(source)
+        yield snapshot
+        settled = snapshot
+        last_change = None
+        while True:
+            self.sleep(self.interval_seconds)
+            current = self.scan(source)
+            if current != snapshot:
+                snapshot = current
+                last_change = self.clock()
+            elif last_change is not None and self.clock() - last_change >= self.debounce_seconds:
+                last_change = None
+                # A burst that ended where it started (e.g. a temporary file created and removed) needs no sync
+                if snapshot != settled:
+                    settled = snapshot
+                    yield snapshot
@@ -0,0 +1,261 @@
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.infrastructure.adapters.vector_indexes.flat_vector_index import (
+    TOMBSTONE_DTYPE,
+    TOMBSTONES_FILE,
+    id_key,
+    live_mask,
+    write_manifest,
+)
+from src.infrastructure.adapters.vector_indexes.quantization import select_top_k
+
+MANIFEST_FILE = "manifest.json"
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+# Words, optionally joined by the punctuation of identifiers: ERR_AUTH_001,
+# database.pool.max_size, /api/v1/users, ECDHE-RSA-AES256-GCM-SHA512
+TOKEN_PATTERN = re.compile(r"\w+(?:[./:\-]\w+)*")
+PART_PATTERN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased tokens that keep identifiers whole. A compound identifier is
+    emitted both as itself and as its parts, so ``VALIDATION_ERROR`` matches
+    exactly and ``validation`` still finds it.
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group(0)
+        tokens.append(token)
+        parts = PART_PATTERN.findall(token)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def encode_varints(values) -> bytes:
+    """LEB128 encoding of non-negative integers: 7 bits per byte, high bit set on all but the last."""
+    values = np.asarray(values, dtype=np.uint64)
+    if len(values) == 0:
+        return b""
+    sizes = np.ones(len(values), dtype=np.int64)
+    remaining = values >> np.uint64(7)
+    while remaining.any():
+        sizes += remaining > 0
+        remaining >>= np.uint64(7)
+
+    starts = np.cumsum(sizes) - sizes
+    encoded = np.empty(int(sizes.sum()), dtype=np.uint8)
+    for i in range(int(sizes.max())):
+        has_byte = sizes > i
+        byte = (values[has_byte] >> np.uint64(7 * i)) & np.uint64(0x7F)
+        more = sizes[has_byte] > i + 1
+        encoded[starts[has_byte] + i] = byte.astype(np.uint8) | (more.astype(np.uint8) << 7)
+    return encoded.tobytes()
+
+
+def decode_varints(data) -> np.ndarray:
+    """Inverse of ``encode_varints``, vectorized over the whole buffer."""
+    data = np.frombuffer(data, dtype=np.uint8)
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    value_of_byte = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shifts = (7 * (np.arange(len(data)) - starts[value_of_byte])).astype(np.uint64)
+    return np.add.reduceat((data & 0x7F).astype(np.uint64) << shifts, starts)
+
+
+class BM25Index:
+    """
+    Append-only BM25 inverted index.
+
+    Every ``add`` writes one immutable block: its sorted vocabulary, one
+    posting list per term (delta-encoded document numbers followed by term
+    frequencies, both as varints), and the document ids, keys and lengths.
+    The manifest lists the blocks and is written last.
+
+    Re-added ids supersede their older documents and ``delete`` appends a
+    tombstone, exactly like the flat vector index. Document frequencies,
+    the document count and the average length are computed over live
+    documents at query time, so scores never drift after deletes.
+    """
+
+    def __init__(self, directory: str, k1: float = DEFAULT_K1, b: float = DEFAULT_B):
+        self.directory = Path(directory)
+        self.k1 = k1
+        self.b = b
+        self._blocks: Optional[List[dict]] = None
+        self._live: Optional[np.ndarray] = None
+
+    # --- Persistence ---
+
+    def _read_manifest(self) -> dict:
+        manifest_path = self.directory / MANIFEST_FILE
+        if not manifest_path.exists():
+            return {"blocks": []}
+        return json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    @property
+    def blocks(self) -> List[dict]:
+        """Lazily opens every block listed in the manifest."""
+        if self._blocks is None:
+            blocks = []
+            for entry in self._read_manifest()["blocks"]:
+                prefix = str(self.directory / entry["name"])
+                blocks.append({
+                    "terms": np.load(f"{prefix}.terms.npy"),
+                    "term_offsets": np.load(f"{prefix}.term_offsets.npy", mmap_mode="r"),
+                    "postings": np.memmap(f"{prefix}.postings.bin", dtype=np.uint8, mode="r")
+                    if entry["postings_bytes"] else np.zeros(0, np.uint8),
+                    "ids": np.load(f"{prefix}.ids.npy", mmap_mode="r"),
+                    "keys": np.load(f"{prefix}.keys.npy", mmap_mode="r"),
+                    "lengths": np.load(f"{prefix}.lengths.npy", mmap_mode="r"),
+                })
+            self._blocks = blocks
+        return self._blocks
+
+    def add(self, ids: Sequence[str], texts: Sequence[str]) -> None:
+        """Indexes one batch of documents as a new block."""
+        if len(ids) == 0:
+            return
+        if len(ids) != len(texts):
+            raise ValueError(f"Got {len(ids)} ids for {len(texts)} texts")
+
+        postings = {}
+        lengths = np.zeros(len(ids), dtype=np.uint32)
+        for doc, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths[doc] = len(tokens)
+            for term, frequency in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc, frequency))
+
+        terms = sorted(postings)
+        encoded = []
+        term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            docs, frequencies = zip(*postings[term])
+            deltas = np.diff(np.asarray(docs, dtype=np.uint64), prepend=np.uint64(0))
+            encoded.append(encode_varints(np.concatenate([deltas, np.asarray(frequencies, dtype=np.uint64)])))
+            term_offsets[i + 1] = term_offsets[i] + len(encoded[-1])
+
+        manifest = self._read_manifest()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"block_{len(manifest['blocks']) + 1:06d}"
+        prefix = str(self.directory / name)
+        np.save(f"{prefix}.terms.npy", np.array(terms, dtype=str))
+        np.save(f"{prefix}.term_offsets.npy", term_offsets)
+        with open(f"{prefix}.postings.bin", "wb") as f:
+            f.write(b"".join(encoded))
+        np.save(f"{prefix}.ids.npy", np.array(ids, dtype=str))
+        np.save(f"{prefix}.keys.npy", np.array([id_key(doc_id) for doc_id in ids], dtype=np.uint64))
+        np.save(f"{prefix}.lengths.npy", lengths)
+
+        # The manifest is written last, so a crash never exposes a partial block
+        manifest["blocks"].append({"name": name, "docs": len(ids), "terms": len(terms), "postings_bytes": int(term_offsets[-1])})
+        write_manifest(self.directory, manifest)
+        self._blocks = None
+        self._live = None
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """Marks ids as deleted without rewriting any block."""
+        if len(ids) == 0:
+            return
+        position = sum(len(block["keys"]) for block in self.blocks)
+        tombstones = np.array([(id_key(doc_id), position) for doc_id in ids], dtype=TOMBSTONE_DTYPE)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / TOMBSTONES_FILE, "ab") as f:
+            f.write(tombstones.tobytes())
+        self._live = None
+
+    # --- Search ---
+
+    @property
+    def live(self) -> np.ndarray:
+        """Boolean mask over all documents: True for the latest, non-deleted copy of each id."""
+        if self._live is None:
+            keys = np.concatenate([block["keys"] for block in self.blocks]) if self.blocks else np.empty(0, np.uint64)
+            self._live = live_mask(keys, self.directory / TOMBSTONES_FILE)
+        return self._live
+
+    def __len__(self) -> int:
+        return int(self.live.sum())
+
+    def _postings(self, block: dict, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Block-local document numbers and term frequencies of one term."""
+        slot = np.searchsorted(block["terms"], term)
+        if slot == len(block["terms"]) or block["terms"][slot] != term:
+            return np.zeros(0, np.int64), np.zeros(0, np.float32)
+        start, stop = block["term_offsets"][slot], block["term_offsets"][slot + 1]
+        values = decode_varints(block["postings"][start:stop])
+        half = len(values) // 2
+        return np.cumsum(values[:half]).astype(np.int64), values[half:].astype(np.float32)
+
+    def search(self, query: str, k: int, allowed_keys: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """
+        Returns up to k ``(id, score)`` pairs ordered by descending BM25 score.
+        With ``allowed_keys`` only documents of those ids are scored, while the
+        term statistics still come from the whole index.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.blocks or k <= 0:
+            return []
+
+        live = self.live
+        lengths = np.concatenate([np.asarray(block["lengths"], dtype=np.float32) for block in self.blocks])
+        document_count = int(live.sum())
+        if document_count == 0:
+            return []
+        average_length = float(lengths[live].mean()) or 1.0
+        length_norm = self.k1 * (1 - self.b + self.b * lengths / average_length)
+
+        eligible = live
+        if allowed_keys is not None:
+            keys = np.concatenate([block["keys"] for block in self.blocks])
+            eligible = live & np.isin(keys, allowed_keys)
+
+        block_offsets = np.cumsum([0] + [len(block["keys"]) for block in self.blocks])
+        matched_rows = []
+        matched_scores = []
+        for term in terms:
+            rows = []
+            frequencies = []
+            for offset, block in zip(block_offsets, self.blocks):
+                docs, term_frequencies = self._postings(block, term)
+                rows.append(docs + offset)
+                frequencies.append(term_frequencies)
+            rows = np.concatenate(rows)
+            frequencies = np.concatenate(frequencies)
+            alive = live[rows]
+            rows, frequencies = rows[alive], frequencies[alive]
+            if not len(rows):
+                continue
+
+            idf = math.log(1 + (document_count - len(rows) + 0.5) / (len(rows) + 0.5))
+            if allowed_keys is not None:
+                scored = eligible[rows]
+                rows, frequencies = rows[scored], frequencies[scored]
+            matched_rows.append(rows)
+            matched_scores.append(idf * frequencies * (self.k1 + 1) / (frequencies + length_norm[rows]))
+
+        if not matched_rows:
+            return []
+        rows, inverse = np.unique(np.concatenate(matched_rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(matched_scores)).astype(np.float32)
+        best, best_scores = select_top_k(scores, k)
+        return [(self._id_at(int(row)), float(score)) for row, score in zip(rows[best], best_scores)]
+
+    def _id_at(self, row: int) -> str:
+        for block in self.blocks:
+            if row < len(block["ids"]):
+                return str(block["ids"][row])
+            row -= len(block["ids"])
+        raise IndexError(row)
@@ -0,0 +1,104 @@
+from collections import Counter
+from dataclasses import replace
+from typing import List, Optional
+
+import numpy as np
+
+from application.ports.reranker import Reranker
+from src.domain.models.chunk import Chunk
+from src.infrastructure.adapters.lexical_indexes.bm25_index import (
+    DEFAULT_B,
+    DEFAULT_K1,
+    tokenize,
+)
+
+# Feature weights of the reranking score; each feature is min-max scaled over the candidates first
+DEFAULT_EMBEDDING_WEIGHT = 0.5
+DEFAULT_BM25_WEIGHT = 0.3
+DEFAULT_OVERLAP_WEIGHT = 0.2
+
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    spread = values.max() - values.min()
+    return (values - values.min()) / spread if spread > 0 else np.zeros_like(values)
+
+
+class FeatureReranker(Reranker):
+    """
+    CPU-only reranker that scores every candidate against the query in one
+    vectorized pass over three features:
+
+    * the share of distinct query terms the chunk contains,
+    * BM25 of the query with term statistics taken from the candidate pool,
+    * the cosine similarity of the stored chunk vector and the query vector.
+
+    Chunks without a stored vector (e.g. found only by keywords in a hybrid
+    search) get the lowest similarity of the pool, and without a query
+    embedding the score uses the lexical features alone.
+    """
+
+    def __init__(
+        self,
+        embedding_weight: float = DEFAULT_EMBEDDING_WEIGHT,
+        bm25_weight: float = DEFAULT_BM25_WEIGHT,
+        overlap_weight: float = DEFAULT_OVERLAP_WEIGHT,
+        k1: float = DEFAULT_K1,
+        b: float = DEFAULT_B,
+    ):
+        self.embedding_weight = embedding_weight
+        self.bm25_weight = bm25_weight
+        self.overlap_weight = overlap_weight
+        self.k1 = k1
+        self.b = b
+
+    def rerank(
+        self, query: str, query_embedding: Optional[List[float]], chunks: List[Chunk], top_k: int
+    ) -> List[Chunk]:
+        if not chunks:
+            return []
+        overlap, bm25 = self._lexical_features(query, chunks)
+        scores = self.overlap_weight * _min_max(overlap) + self.bm25_weight * _min_max(bm25)
+        if query_embedding is not None:
+            scores += self.embedding_weight * _min_max(self._similarities(query_embedding, chunks))
+
+        # A stable sort keeps the retrieval order between equal scores
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [replace(chunks[i], score=float(scores[i])) for i in order]
+
+    def _term_frequencies(self, query: str, chunks: List[Chunk]):
+        terms = list(dict.fromkeys(tokenize(query)))
+        frequencies = np.zeros((len(chunks), len(terms)), dtype=np.float32)
+        lengths = np.zeros(len(chunks), dtype=np.float32)
+        for row, chunk in enumerate(chunks):
+            counts = Counter(tokenize(chunk.content))
+            lengths[row] = sum(counts.values())
+            frequencies[row] = [counts[term] for term in terms]
+        return frequencies, lengths
+
+    def _lexical_features(self, query: str, chunks: List[Chunk]):
+        frequencies, lengths = self._term_frequencies(query, chunks)
+        if frequencies.shape[1] == 0:
+            zeros = np.zeros(len(chunks), dtype=np.float32)
+            return zeros, zeros
+        present = frequencies > 0
+        overlap = present.mean(axis=1)
+
+        documents = len(chunks)
+        document_frequency = present.sum(axis=0)
+        idf = np.log1p((documents - document_frequency + 0.5) / (document_frequency + 0.5))
+        length_norm = self.k1 * (1 - self.b + self.b * lengths / max(lengths.mean(), 1.0))
+        bm25 = (frequencies * (self.k1 + 1) / (frequencies + length_norm[:, None])) @ idf
+        return overlap, bm25
+
+    def _similarities(self, query_embedding: List[float], chunks: List[Chunk]) -> np.ndarray:
+        stored = [i for i, chunk in enumerate(chunks) if chunk.embedding is not None]
+        similarities = np.zeros(len(chunks), dtype=np.float32)
+        if not stored:
+            return similarities
+        vectors = np.asarray([chunks[i].embedding for i in stored], dtype=np.float32)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+        cosine = (vectors @ query) / np.where(norms > 0, norms, 1.0)
+        similarities[:] = cosine.min()
+        similarities[stored] = cosine
+        return similarities
@@ -0,0 +1,157 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from application.ports.run_journal import RunJournal
+from domain.models.chunk import Chunk
+from domain.models.enums import StorageType
+from domain.models.ingestion import IngestionCheckpoint
+from domain.services.chunk_identity import source_key
+from infrastructure.adapters.chunk_stores.chroma_client_registry import (
+    resolve_persist_directory,
+)
+from infrastructure.adapters.chunk_stores.store_lock import claim
+from infrastructure.adapters.chunk_stores.file_system_chunk_store import (
+    DEFAULT_OUTPUT_DIR,
+)
+
+JOURNAL_FILE = "ingest_journal.jsonl"
+CHROMA_JOURNAL_DIR = "journals"
+
+
+def journal_path(
+    storage_type: StorageType, location: str = None, persist_directory: str = None, source: str = None
+) -> Path:
+    """
+    Where the ingestion journal of a store lives: inside a local store's
+    directory, or next to the Chroma database, one file per collection.
+    With a source, each source gets its own journal, so runs ingesting
+    different sources into one store in parallel keep separate checkpoints.
+    """
+    suffix = f"-{source_key(os.path.abspath(source))}" if source else ""
+    if storage_type == StorageType.LOCAL:
+        return Path(location or DEFAULT_OUTPUT_DIR) / f"{Path(JOURNAL_FILE).stem}{suffix}.jsonl"
+    return Path(resolve_persist_directory(persist_directory)) / CHROMA_JOURNAL_DIR / f"{location}{suffix}.jsonl"
+
+
+def _normalized(run: Dict[str, Any]) -> Dict[str, Any]:
+    """The run as it reads back from JSON, so tuples, enums and key order compare equal."""
+    return json.loads(json.dumps(run, sort_keys=True, default=str))
+
+
+class JsonlRunJournal(RunJournal):
+    """
+    Append-only JSON lines journal of an ingestion run.
+
+    The first line describes the run, every ``commit`` appends one line with
+    the stored chunk ids, the files they completed and the chunks of a file
+    first split across batches, and ``finish`` appends a final marker. Each
+    line is flushed and fsynced before returning, so a crash loses at most
+    the line being written. An open run holds a lock
+    next to the journal, so a second run on the same journal fails instead
+    of overwriting it.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._writing = False
+        self._lock_fd: Optional[int] = None
+
+    def start(self, run: Dict[str, Any]) -> None:
+        self.close()
+        self._claim()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._writing = True
+        self._append({"type": "run", "run": _normalized(run)}, mode="w")
+
+    def resume(self, run: Dict[str, Any]) -> IngestionCheckpoint:
+        self.close()
+        self._claim()
+        try:
+            records, length = self._read()
+            if not records or records[0].get("type") != "run":
+                raise ValueError(f"No ingestion run to resume in '{self.path}'; save without --resume first.")
+            if records[0]["run"] != _normalized(run):
+                raise ValueError(
+                    f"'{self.path}' journals a different run ({records[0]['run']}); "
+                    "resume with the same source, strategy and config, or save without --resume."
+                )
+        except ValueError:
+            self.close()
+            raise
+
+        checkpoint = IngestionCheckpoint()
+        for record in records[1:]:
+            if record.get("type") == "batch":
+                checkpoint.committed_chunk_ids.update(record["chunks"])
+                checkpoint.completed_files.update(record["files"])
+                for file_name, chunks in record.get("partial", {}).items():
+                    checkpoint.partial_files[file_name] = [
+                        Chunk(content=chunk["content"], metadata=chunk["metadata"], id=chunk["id"]) for chunk in chunks
+                    ]
+            elif record.get("type") == "done":
+                checkpoint.finished = True
+
+        for file_name in checkpoint.completed_files:
+            checkpoint.partial_files.pop(file_name, None)
+
+        os.truncate(self.path, length)
+        self._writing = True
+        return checkpoint
+
+    def commit(
+        self,
+        chunk_ids: List[str],
+        completed_files: List[str],
+        partial_files: Optional[Dict[str, List[Chunk]]] = None,
+    ) -> None:
+        record = {"type": "batch", "chunks": list(chunk_ids), "files": list(completed_files)}
+        if partial_files:
+            record["partial"] = {
+                file_name: [{"content": chunk.content, "metadata": chunk.metadata, "id": chunk.id} for chunk in chunks]
+                for file_name, chunks in partial_files.items()
+            }
+        self._append(record)
+
+    def finish(self) -> None:
+        self._append({"type": "done"})
+        self.close()
+
+    def close(self) -> None:
+        self._writing = False
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _claim(self) -> None:
+        self._lock_fd = claim(f"{self.path}.lock")
+        if self._lock_fd is None:
+            raise ValueError(f"Another ingestion run is writing '{self.path}'; wait for it to finish.")
+
+    def _append(self, record: dict, mode: str = "a") -> None:
+        if not self._writing:
+            raise RuntimeError("The journal has no open run; call start or resume first.")
+        with open(self.path, mode, encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _read(self) -> Tuple[List[dict], int]:
+        """
+        The complete records and the byte length they span. Text after the
+        last newline is a write that was interrupted; its batch was never
+        committed, so it is left out (saving it again is idempotent).
+        """
+        if not self.path.exists():
+            return [], 0
+        content = self.path.read_bytes()
+        length = content.rfind(b"\n") + 1
+        records = []
+        for number, line in enumerate(content[:length].splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                raise ValueError(f"'{self.path}' is corrupt at line {number}.")
+        return records, length
@@ -0,0 +1,334 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.domain.models.enums import VectorQuantization
+from src.infrastructure.adapters.vector_indexes.quantization import (
+    DEFAULT_BLOCK_SIZE,
+    DEFAULT_RESCORE_FACTOR,
+    QuantizedVectors,
+    select_top_k_rows,
+)
+
+MANIFEST_FILE = "manifest.json"
+TOMBSTONES_FILE = "tombstones.bin"
+TOMBSTONE_DTYPE = np.dtype([("key", "<u8"), ("position", "<i8")])
+# Below this fraction of allowed rows, a filtered search gathers them instead of scanning
+SPARSE_FILTER_FRACTION = 0.5
+
+
+def id_key(chunk_id: str) -> int:
+    """Stable 64-bit key for a chunk id, used for vectorized liveness checks."""
+    return int.from_bytes(hashlib.blake2b(chunk_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def write_manifest(directory: Path, manifest: dict) -> None:
+    """Replaces a manifest atomically, so a reader never parses a half-written one."""
+    directory.mkdir(parents=True, exist_ok=True)
+    temporary = directory / f"{MANIFEST_FILE}.tmp"
+    temporary.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(temporary, directory / MANIFEST_FILE)
+
+
+def live_mask(keys: np.ndarray, tombstones_path: Path) -> np.ndarray:
+    """
+    True for the latest row of each key that was not deleted afterwards.
+    Tombstones record how many rows existed when the delete happened.
+    """
+    live = np.zeros(len(keys), dtype=bool)
+    if len(keys):
+        # The last occurrence of each key wins
+        _, last_in_reversed = np.unique(keys[::-1], return_index=True)
+        live[len(keys) - 1 - last_in_reversed] = True
+
+    return live & ~deleted_mask(keys, tombstones_path)
+
+
+def deleted_mask(keys: np.ndarray, tombstones_path: Path) -> np.ndarray:
+    """True for the rows whose key was deleted after the row was written."""
+    dead = np.zeros(len(keys), dtype=bool)
+    if len(keys) and tombstones_path.exists():
+        tombstones = np.fromfile(tombstones_path, dtype=TOMBSTONE_DTYPE)
+        order = np.argsort(tombstones["key"], kind="stable")
+        tomb_keys = tombstones["key"][order]
+        unique_keys, starts = np.unique(tomb_keys, return_index=True)
+        deleted_at = np.maximum.reduceat(tombstones["position"][order], starts)
+
+        slot = np.minimum(np.searchsorted(unique_keys, keys), len(unique_keys) - 1)
+        dead = (unique_keys[slot] == keys) & (deleted_at[slot] > np.arange(len(keys)))
+    return dead
+
+
+def live_rows(keys: np.ndarray, live: np.ndarray, ids: Sequence[str]) -> np.ndarray:
+    """The live row of each id, in the given order; raises KeyError for unknown ids."""
+    rows = np.flatnonzero(live)
+    order = np.argsort(keys[rows], kind="stable")
+    sorted_keys = keys[rows][order]
+    wanted = np.array([id_key(chunk_id) for chunk_id in ids], dtype=np.uint64)
+    slot = np.minimum(np.searchsorted(sorted_keys, wanted), max(len(sorted_keys) - 1, 0))
+    found = (sorted_keys[slot] == wanted) if len(sorted_keys) else np.zeros(len(wanted), dtype=bool)
+    if not found.all():
+        raise KeyError(ids[int(np.flatnonzero(~found)[0])])
+    return rows[order[slot]]
+
+
+class FlatVectorIndex:
+    """
+    Exact nearest-neighbour index over memory-mapped vector blocks.
+
+    Every ``add`` writes one immutable block (codes, optional scales, ids and
+    64-bit id keys) and the manifest lists the blocks in insertion order. Blocks
+    are opened with ``mmap`` and scanned in fixed-size row ranges, so only the
+    ids of the final top-k rows are ever turned into Python objects.
+
+    Re-adding an id supersedes its older rows and ``delete`` appends a tombstone;
+    both are resolved with one vectorized pass over the id keys.
+
+    With ``rescore`` a quantized block also keeps a float32 copy of its
+    vectors, used to rescore the quantized candidates exactly. It restores
+    full-precision recall but makes the block larger than a float32 one, so it
+    is off by default.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        quantization: VectorQuantization = VectorQuantization.FLOAT32,
+        rescore: bool = False,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        self.directory = Path(directory)
+        self.quantization = VectorQuantization(quantization)
+        self.rescore = rescore
+        self.block_size = block_size
+        self._blocks: Optional[List[dict]] = None
+        self._keys: Optional[np.ndarray] = None
+        self._live: Optional[np.ndarray] = None
+
+    # --- Persistence ---
+
+    def _read_manifest(self) -> dict:
+        manifest_path = self.directory / MANIFEST_FILE
+        if not manifest_path.exists():
+            return {"dim": None, "blocks": []}
+        return json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    def _write_manifest(self, manifest: dict) -> None:
+        write_manifest(self.directory, manifest)
+
+    @property
+    def blocks(self) -> List[dict]:
+        """Lazily opens every block listed in the manifest as memory maps."""
+        if self._blocks is None:
+            blocks = []
+            for entry in self._read_manifest()["blocks"]:
+                prefix = str(self.directory / entry["name"])
+                quantization = VectorQuantization(entry["quantization"])
+                full_precision_path = Path(f"{prefix}.float32.npy")
+                blocks.append({
+                    "vectors": QuantizedVectors.load(prefix, quantization),
+                    "full_precision": np.load(full_precision_path, mmap_mode="r")
+                    if full_precision_path.exists() else None,
+                    "ids": np.load(f"{prefix}.ids.npy", mmap_mode="r"),
+                    "keys": np.load(f"{prefix}.keys.npy", mmap_mode="r"),
+                })
+            self._blocks = blocks
+        return self._blocks
+
+    def _invalidate(self) -> None:
+        self._blocks = None
+        self._keys = None
+        self._live = None
+
+    def add(self, ids: Sequence[str], vectors) -> None:
+        """Appends one block of vectors; ids that already exist are superseded."""
+        if len(ids) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} ids for {len(vectors)} vectors")
+
+        manifest = self._read_manifest()
+        if manifest["dim"] is not None and manifest["dim"] != vectors.shape[1]:
+            raise ValueError(
+                f"Vector dimension {vectors.shape[1]} does not match index dimension {manifest['dim']}"
+            )
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"block_{len(manifest['blocks']) + 1:06d}"
+        prefix = str(self.directory / name)
+
+        QuantizedVectors.from_vectors(vectors, self.quantization).save(prefix)
+        if self.quantization != VectorQuantization.FLOAT32 and self.rescore:
+            np.save(f"{prefix}.float32.npy", vectors)
+        np.save(f"{prefix}.ids.npy", np.array(ids, dtype=str))
+        np.save(f"{prefix}.keys.npy", np.array([id_key(chunk_id) for chunk_id in ids], dtype=np.uint64))
+
+        # The manifest is written last, so a crash never exposes a partial block
+        manifest["dim"] = int(vectors.shape[1])
+        manifest["blocks"].append({"name": name, "quantization": self.quantization.value, "count": len(ids)})
+        self._write_manifest(manifest)
+        self._invalidate()
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """Marks ids as deleted without rewriting any block."""
+        if len(ids) == 0:
+            return
+        position = sum(len(block["keys"]) for block in self.blocks)
+        tombstones = np.array([(id_key(chunk_id), position) for chunk_id in ids], dtype=TOMBSTONE_DTYPE)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / TOMBSTONES_FILE, "ab") as f:
+            f.write(tombstones.tobytes())
+        self._live = None
+
+    # --- Liveness ---
+
+    @property
+    def live(self) -> np.ndarray:
+        """Boolean mask over all rows: True for the latest, non-deleted row of each id."""
+        if self._live is None:
+            self._live = live_mask(self.keys, self.directory / TOMBSTONES_FILE)
+        return self._live
+
+    @property
+    def keys(self) -> np.ndarray:
+        """The id key of every row, across blocks."""
+        if self._keys is None:
+            self._keys = np.concatenate([block["keys"] for block in self.blocks]) if self.blocks else np.empty(0, np.uint64)
+        return self._keys
+
+    def __len__(self) -> int:
+        return int(self.live.sum())
+
+    @property
+    def stored_quantization(self) -> Optional[VectorQuantization]:
+        """The quantization of the newest block, or None for an empty index."""
+        blocks = self._read_manifest()["blocks"]
+        return VectorQuantization(blocks[-1]["quantization"]) if blocks else None
+
+    @property
+    def stored_rescore(self) -> Optional[bool]:
+        """Whether the newest block kept a float32 copy, or None for an empty index."""
+        blocks = self._read_manifest()["blocks"]
+        return (self.directory / f"{blocks[-1]['name']}.float32.npy").exists() if blocks else None
+
+    # --- Search ---
+
+    def search(self, query, k: int, allowed_keys: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """
+        Returns up to k ``(id, score)`` pairs ordered by descending dot product.
+        With ``allowed_keys`` only rows of those ids are scored; a small
+        allowed set is gathered row by row instead of scanning the blocks.
+        """
+        return self.search_many(np.asarray(query, dtype=np.float32)[None, :], k, allowed_keys)[0]
+
+    def search_many(
+        self, queries, k: int, allowed_keys: Optional[np.ndarray] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        ``search`` for a (q, dim) matrix of queries in a single pass: every
+        block of rows is read once and scored against all queries with one
+        matrix product, instead of once per query.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        live = self.live
+        sparse = False
+        if allowed_keys is not None:
+            live = live & np.isin(self.keys, allowed_keys)
+            sparse = live.sum() < SPARSE_FILTER_FRACTION * len(live)
+        candidate_rows = []
+        candidate_scores = []
+        offset = 0
+        for block in self.blocks:
+            count = len(block["keys"])
+            rows, scores = self._search_block(block, queries, k, live[offset:offset + count], sparse)
+            candidate_rows.append(rows + offset)
+            candidate_scores.append(scores)
+            offset += count
+
+        if not candidate_rows:
+            return [[] for _ in queries]
+        rows = np.concatenate(candidate_rows, axis=1)
+        best, scores = select_top_k_rows(np.concatenate(candidate_scores, axis=1), k)
+        rows = np.take_along_axis(rows, best, axis=1)
+        # Masked rows score -inf and never make it into the results
+        return [
+            [(self._id_at(int(row)), float(score)) for row, score in zip(query_rows, query_scores) if np.isfinite(score)]
+            for query_rows, query_scores in zip(rows, scores)
+        ]
+
+    def _search_block(
+        self, block: dict, queries: np.ndarray, k: int, live: np.ndarray, sparse: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """The (q, k) best rows of one block for every query; missing candidates score -inf."""
+        vectors: QuantizedVectors = block["vectors"]
+        full_precision = block["full_precision"]
+        fetch_k = k * DEFAULT_RESCORE_FACTOR if full_precision is not None else k
+
+        candidate_rows = []
+        candidate_scores = []
+        if sparse:
+            # Score only the allowed rows, in sorted order for the memory map
+            allowed = np.flatnonzero(live)
+            for start in range(0, len(allowed), self.block_size):
+                rows = allowed[start:start + self.block_size]
+                best, top_scores = select_top_k_rows(vectors.scores_at(queries, rows), fetch_k)
+                candidate_rows.append(rows[best])
+                candidate_scores.append(top_scores)
+        else:
+            for start in range(0, len(vectors), self.block_size):
+                stop = min(start + self.block_size, len(vectors))
+                scores = vectors.scores(queries, start, stop)
+                scores[:, ~live[start:stop]] = -np.inf
+                rows, top_scores = select_top_k_rows(scores, fetch_k)
+                candidate_rows.append(rows + start)
+                candidate_scores.append(top_scores)
+
+        if not candidate_rows:
+            empty = np.empty((len(queries), 0), dtype=np.int64)
+            return empty, np.empty((len(queries), 0), dtype=np.float32)
+        rows = np.concatenate(candidate_rows, axis=1)
+        scores = np.concatenate(candidate_scores, axis=1)
+
+        if full_precision is not None and rows.size:
+            # Rescore the quantized candidates against the float32 vectors, reading
+            # each distinct row once (in sorted order) for all queries
+            unique_rows, positions = np.unique(rows, return_inverse=True)
+            positions = positions.reshape(rows.shape)
+            exact = queries @ np.asarray(full_precision[unique_rows], dtype=np.float32).T
+            rescored = np.take_along_axis(exact, positions, axis=1)
+            scores = np.where(np.isfinite(scores), rescored, -np.inf).astype(np.float32)
+
+        best, best_scores = select_top_k_rows(scores, k)
+        return np.take_along_axis(rows, best, axis=1), best_scores
+
+    def get_vectors(self, ids: Sequence[str]) -> np.ndarray:
+        """
+        The stored vectors of live ids as a (len(ids), dim) float32 array:
+        the full-precision copy when one was kept, else the dequantized codes.
+        """
+        rows = live_rows(self.keys, self.live, ids)
+        vectors = np.empty((len(ids), self._read_manifest()["dim"] or 0), dtype=np.float32)
+        offset = 0
+        for block in self.blocks:
+            count = len(block["keys"])
+            inside = (rows >= offset) & (rows < offset + count)
+            if inside.any():
+                local_rows = rows[inside] - offset
+                if block["full_precision"] is not None:
+                    vectors[inside] = block["full_precision"][local_rows]
+                else:
+                    vectors[inside] = block["vectors"].dequantize(local_rows)
+            offset += count
+        return vectors
+
+    def _id_at(self, row: int) -> str:
+        for block in self.blocks:
+            if row < len(block["ids"]):
+                return str(block["ids"][row])
+            row -= len(block["ids"])
+        raise IndexError(row)
@@ -0,0 +1,456 @@
+import heapq
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.infrastructure.adapters.vector_indexes.flat_vector_index import id_key
+
+DEFAULT_M = 16
+DEFAULT_EF_CONSTRUCTION = 100
+DEFAULT_EF_SEARCH = 50
+STATE_FILE = "hnsw.json"
+VECTORS_FILE = "vectors.f32"
+LEVELS_FILE = "levels.i8"
+KEYS_FILE = "keys.u64"
+IDS_FILE = "ids.jsonl"
+LEVEL0_FILE = "level0.i32"
+DELETED_FILE = "deleted.bool"
+# Rewriting the upper-layer log is not worth it below this many records
+MIN_UPPER_LOG_RECORDS = 1024
+
+
+class HnswIndex:
+    """
+    Hierarchical Navigable Small World graph for approximate inner-product search.
+
+    Nodes are inserted incrementally: each gets a random level, is linked to
+    its nearest neighbours on every layer up to that level (using the
+    neighbour-selection heuristic from the HNSW paper) and neighbour lists are
+    pruned back to ``m`` (``2 * m`` on the bottom layer). Deleted or superseded
+    ids stay in the graph as tombstones so it remains navigable, and are
+    filtered from results.
+
+    ``m`` and ``ef_construction`` are fixed when the graph is created;
+    ``ef_search`` can be changed at any time to trade speed for recall.
+
+    Filtered searches skip nodes outside the allowed ids. When so few nodes
+    are allowed that the graph walk would visit more than that anyway, they
+    are scored directly instead.
+
+    Saves are incremental: new nodes are appended to column files, changed
+    bottom-layer rows are rewritten in place and changed upper-layer lists are
+    appended to a log, so each batch writes about what it touched.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        m: int = DEFAULT_M,
+        ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+        ef_search: int = DEFAULT_EF_SEARCH,
+        seed: int = 0,
+    ):
+        self.directory = Path(directory)
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._rng = np.random.default_rng(seed)
+
+        self.count = 0
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.levels = np.zeros(0, dtype=np.int8)
+        self.level0 = np.zeros((0, 2 * m), dtype=np.int32)
+        self.level0_count = np.zeros(0, dtype=np.int32)
+        self.upper: List[Dict[int, List[int]]] = []
+        self.deleted = np.zeros(0, dtype=bool)
+        self.keys = np.zeros(0, dtype=np.uint64)
+        self.ids: List[str] = []
+        self.id_to_node: Dict[str, int] = {}
+        self.entry_point = -1
+        self.max_level = -1
+        # What the last save committed, and what changed since
+        self._state = {"ids_size": 0, "upper_log": "upper_000001.log", "upper_log_size": 0}
+        self._saved_count = 0
+        self._upper_records = 0
+        self._dirty_level0: set = set()
+        self._dirty_upper: set = set()
+        self._dirty_deleted: set = set()
+        self._load()
+
+    # --- Persistence ---
+
+    def _load(self) -> None:
+        state_path = self.directory / STATE_FILE
+        if not state_path.exists():
+            return
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+        self.m = state["m"]
+        self.ef_construction = state["ef_construction"]
+        self.count = state["count"]
+        self.entry_point = state["entry_point"]
+        self.max_level = state["max_level"]
+        self._state = state
+        self._saved_count = self.count
+
+        count, dim, width = self.count, state["dim"], 2 * self.m
+        self.vectors = np.fromfile(self.directory / VECTORS_FILE, dtype=np.float32, count=count * dim).reshape(count, dim)
+        self.levels = np.fromfile(self.directory / LEVELS_FILE, dtype=np.int8, count=count)
+        self.keys = np.fromfile(self.directory / KEYS_FILE, dtype=np.uint64, count=count)
+        with open(self.directory / IDS_FILE, "rb") as f:
+            self.ids = [json.loads(line) for line in f.read(state["ids_size"]).splitlines()]
+
+        # Rows rewritten by an add that crashed before its state file may link
+        # to nodes that were never committed; those links are dropped
+        level0 = np.fromfile(self.directory / LEVEL0_FILE, dtype=np.int32, count=count * width).reshape(count, width)
+        valid = (level0 >= 0) & (level0 < count)
+        order = np.argsort(~valid, axis=1, kind="stable")
+        self.level0 = np.take_along_axis(np.where(valid, level0, -1), order, axis=1)
+        self.level0_count = valid.sum(axis=1).astype(np.int32)
+
+        self.upper = [{} for _ in range(self.max_level)]
+        with open(self.directory / state["upper_log"], "rb") as f:
+            log = np.frombuffer(f.read(state["upper_log_size"]), dtype=np.int32)
+        position = 0
+        while position < len(log):
+            level, node, length = (int(value) for value in log[position:position + 3])
+            links = log[position + 3:position + 3 + length]
+            self.upper[level - 1][node] = links[links < count].tolist()
+            position += 3 + length
+        self._upper_records = int(state.get("upper_records", 0))
+
+        deleted_path = self.directory / DELETED_FILE
+        self.deleted = np.zeros(count, dtype=bool)
+        if deleted_path.exists():
+            flags = np.fromfile(deleted_path, dtype=bool, count=count)
+            self.deleted[:len(flags)] = flags
+        self._index_ids()
+
+    def _index_ids(self) -> None:
+        """Maps ids to their latest node; older nodes of a re-added id count as deleted."""
+        if self.count:
+            _, last_in_reversed = np.unique(self.keys[:self.count][::-1], return_index=True)
+            latest = np.zeros(self.count, dtype=bool)
+            latest[self.count - 1 - last_in_reversed] = True
+            self.deleted[:self.count] |= ~latest
+        self.id_to_node = {
+            chunk_id: node for node, chunk_id in enumerate(self.ids) if not self.deleted[node]
+        }
+
+    def _save(self) -> None:
+        """
+        Appends the nodes added since the last save and rewrites only the
+        neighbour rows and upper-layer lists that changed, so a save costs
+        what the batch touched rather than the size of the graph.
+
+        Node columns and the upper-layer log are append-only and the state file
+        is replaced last with their committed sizes, so leftovers of an
+        interrupted save are cut off before the next one.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        state = self._state
+        saved, count, dim, width = self._saved_count, self.count, self.vectors.shape[1], 2 * self.m
+
+        ids_data = b"".join(json.dumps(chunk_id).encode("utf-8") + b"\n" for chunk_id in self.ids[saved:count])
+        for name, committed, data in (
+            (VECTORS_FILE, saved * dim * 4, self.vectors[saved:count].tobytes()),
+            (LEVELS_FILE, saved, self.levels[saved:count].tobytes()),
+            (KEYS_FILE, saved * 8, self.keys[saved:count].tobytes()),
+            (IDS_FILE, state["ids_size"], ids_data),
+        ):
+            self._append(name, committed, data)
+
+        level0_path = self.directory / LEVEL0_FILE
+        self._append(LEVEL0_FILE, saved * width * 4, b"")
+        os.truncate(level0_path, count * width * 4)
+        if self._dirty_level0:
+            rows = np.array(sorted(self._dirty_level0), dtype=np.int64)
+            level0 = np.memmap(level0_path, dtype=np.int32, mode="r+", shape=(count, width))
+            level0[rows] = self.level0[rows]
+            level0.flush()
+            del level0
+
+        upper_log, upper_log_size = state["upper_log"], state["upper_log_size"]
+        total_upper = sum(len(layer) for layer in self.upper)
+        records = self._dirty_upper
+        if self._upper_records + len(records) > max(2 * total_upper, MIN_UPPER_LOG_RECORDS):
+            # Superseded records dominate the log: start a new one holding only current lists
+            upper_log = f"upper_{int(upper_log.rsplit('_', 1)[1].split('.')[0]) + 1:06d}.log"
+            upper_log_size, self._upper_records = 0, 0
+            records = {(level, node) for level, layer in enumerate(self.upper, start=1) for node in layer}
+        log = []
+        for level, node in sorted(records):
+            links = self.upper[level - 1][node]
+            log.extend([level, node, len(links), *links])
+        self._append(upper_log, upper_log_size, np.array(log, dtype=np.int32).tobytes())
+
+        self._state = {
+            "m": self.m,
+            "ef_construction": self.ef_construction,
+            "dim": dim,
+            "count": count,
+            "entry_point": self.entry_point,
+            "max_level": self.max_level,
+            "ids_size": state["ids_size"] + len(ids_data),
+            "upper_log": upper_log,
+            "upper_log_size": upper_log_size + 4 * len(log),
+            "upper_records": self._upper_records + len(records),
+        }
+        temporary = self.directory / f"{STATE_FILE}.tmp"
+        temporary.write_text(json.dumps(self._state), encoding="utf-8")
+        os.replace(temporary, self.directory / STATE_FILE)
+
+        if upper_log != state["upper_log"] and (self.directory / state["upper_log"]).exists():
+            os.remove(self.directory / state["upper_log"])
+        self._saved_count = count
+        self._upper_records = self._state["upper_records"]
+        self._dirty_level0, self._dirty_upper = set(), set()
+        self._save_deleted()
+
+    def _save_deleted(self) -> None:
+        """Writes the flags of explicitly deleted nodes in place; re-adds are derived from the keys."""
+        if not self._dirty_deleted:
+            return
+        path = self.directory / DELETED_FILE
+        self._append(DELETED_FILE, self._saved_count, b"")
+        os.truncate(path, self._saved_count)
+        rows = np.array(sorted(self._dirty_deleted), dtype=np.int64)
+        deleted = np.memmap(path, dtype=bool, mode="r+", shape=(self._saved_count,))
+        deleted[rows] = True
+        deleted.flush()
+        del deleted
+        self._dirty_deleted = set()
+
+    def _append(self, name: str, committed: int, data: bytes) -> None:
+        """Appends to a file after cutting it back to its committed size."""
+        path = self.directory / name
+        with open(path, "ab") as f:
+            if f.tell() > committed:
+                f.truncate(committed)
+            f.write(data)
+
+    # --- Graph primitives ---
+
+    def _grow(self, extra: int, dim: int) -> None:
+        """Makes room for ``extra`` more nodes, doubling capacity as needed."""
+        needed = self.count + extra
+        if self.vectors.shape[0] >= needed and self.vectors.shape[1] == dim:
+            return
+        capacity = max(needed, 2 * self.vectors.shape[0], 1024)
+
+        vectors = np.zeros((capacity, dim), dtype=np.float32)
+        if self.count:
+            vectors[:self.count] = self.vectors[:self.count]
+        levels = np.zeros(capacity, dtype=np.int8)
+        levels[:self.count] = self.levels[:self.count]
+        level0 = np.full((capacity, 2 * self.m), -1, dtype=np.int32)
+        level0[:self.count] = self.level0[:self.count]
+        level0_count = np.zeros(capacity, dtype=np.int32)
+        level0_count[:self.count] = self.level0_count[:self.count]
+        deleted = np.zeros(capacity, dtype=bool)
+        deleted[:self.count] = self.deleted[:self.count]
+        keys = np.zeros(capacity, dtype=np.uint64)
+        keys[:self.count] = self.keys[:self.count]
+
+        self.vectors, self.levels, self.level0 = vectors, levels, level0
+        self.level0_count, self.deleted, self.keys = level0_count, deleted, keys
+
+    def _neighbors(self, node: int, level: int) -> List[int]:
+        if level == 0:
+            return self.level0[node, :self.level0_count[node]].tolist()
+        return self.upper[level - 1].get(node, [])
+
+    def _set_neighbors(self, node: int, level: int, neighbors: List[int]) -> None:
+        if level == 0:
+            self.level0[node, :len(neighbors)] = neighbors
+            self.level0[node, len(neighbors):] = -1
+            self.level0_count[node] = len(neighbors)
+            self._dirty_level0.add(node)
+        else:
+            self.upper[level - 1][node] = list(neighbors)
+            self._dirty_upper.add((level, node))
+
+    def _search_layer(self, query: np.ndarray, entry_points: List[int], ef: int, level: int) -> List[Tuple[float, int]]:
+        """
+        Best-first search of one layer. Distances are negated inner products,
+        and the result is sorted from nearest to farthest.
+        """
+        visited = set(entry_points)
+        distances = (-(self.vectors[entry_points] @ query)).tolist()
+        candidates = list(zip(distances, entry_points))
+        heapq.heapify(candidates)
+        results = [(-distance, node) for distance, node in candidates]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            distance, node = heapq.heappop(candidates)
+            if distance > -results[0][0] and len(results) >= ef:
+                break
+            neighbors = [n for n in self._neighbors(node, level) if n not in visited]
+            if not neighbors:
+                continue
+            visited.update(neighbors)
+            for neighbor_distance, neighbor in zip((-(self.vectors[neighbors] @ query)).tolist(), neighbors):
+                if len(results) < ef or neighbor_distance < -results[0][0]:
+                    heapq.heappush(candidates, (neighbor_distance, neighbor))
+                    heapq.heappush(results, (-neighbor_distance, neighbor))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return sorted((-negative, node) for negative, node in results)
+
+    def _select_neighbors(self, candidates: List[Tuple[float, int]], limit: int) -> List[int]:
+        """
+        HNSW neighbour-selection heuristic: a candidate is kept only if it is
+        closer to the base vector than to every neighbour kept so far, which
+        favours links in different directions. Remaining slots are filled with
+        the closest discarded candidates.
+        """
+        nodes = [node for _, node in candidates]
+        if len(nodes) <= limit:
+            return nodes
+        # closer[i][j]: candidate i is nearer to candidate j than to the base vector
+        base_similarity = -np.array([distance for distance, _ in candidates], dtype=np.float32)
+        vectors = self.vectors[nodes]
+        closer = ((vectors @ vectors.T) > base_similarity[:, None]).tolist()
+
+        selected: List[int] = []
+        discarded: List[int] = []
+        for i in range(len(nodes)):
+            if len(selected) >= limit:
+                break
+            if any(closer[i][j] for j in selected):
+                discarded.append(i)
+            else:
+                selected.append(i)
+        return [nodes[i] for i in selected + discarded[:limit - len(selected)]]
+
+    def _link(self, node: int, level: int, new_neighbor: int, limit: int) -> None:
+        """Adds a back-link, re-selecting the neighbour list when it overflows."""
+        neighbors = self._neighbors(node, level) + [new_neighbor]
+        if len(neighbors) > limit:
+            distances = (-(self.vectors[neighbors] @ self.vectors[node])).tolist()
+            neighbors = self._select_neighbors(sorted(zip(distances, neighbors)), limit)
+        self._set_neighbors(node, level, neighbors)
+
+    def _insert(self, vector: np.ndarray, chunk_id: str) -> None:
+        node = self.count
+        level = int(-math.log(1.0 - self._rng.random()) / math.log(self.m))
+        self.vectors[node] = vector
+        self.levels[node] = level
+        self.keys[node] = id_key(chunk_id)
+        self.ids.append(chunk_id)
+        self.count += 1
+        while len(self.upper) < level:
+            self.upper.append({})
+
+        if self.entry_point < 0:
+            self.entry_point, self.max_level = node, level
+            for layer in range(level + 1):
+                self._set_neighbors(node, layer, [])
+            return
+
+        entry = [self.entry_point]
+        for layer in range(self.max_level, level, -1):
+            entry = [self._search_layer(vector, entry, 1, layer)[0][1]]
+
+        for layer in range(min(level, self.max_level), -1, -1):
+            candidates = self._search_layer(vector, entry, self.ef_construction, layer)
+            limit = 2 * self.m if layer == 0 else self.m
+            neighbors = self._select_neighbors(candidates, self.m)
+            self._set_neighbors(node, layer, neighbors)
+            for neighbor in neighbors:
+                self._link(neighbor, layer, node, limit)
+            entry = [candidate for _, candidate in candidates]
+
+        for layer in range(self.max_level + 1, level + 1):
+            self._set_neighbors(node, layer, [])
+        if level > self.max_level:
+            self.entry_point, self.max_level = node, level
+
+    # --- Public API ---
+
+    def add(self, ids: Sequence[str], vectors) -> None:
+        """Inserts vectors one by one; re-added ids tombstone their previous node."""
+        if len(ids) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} ids for {len(vectors)} vectors")
+        if self.count and vectors.shape[1] != self.vectors.shape[1]:
+            raise ValueError(
+                f"Vector dimension {vectors.shape[1]} does not match index dimension {self.vectors.shape[1]}"
+            )
+
+        self._grow(len(ids), vectors.shape[1])
+        for chunk_id, vector in zip(ids, vectors):
+            previous = self.id_to_node.get(chunk_id)
+            if previous is not None:
+                self.deleted[previous] = True
+            self._insert(vector, chunk_id)
+            self.id_to_node[chunk_id] = self.count - 1
+        self._save()
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """Tombstones the nodes of the given ids; they keep routing searches."""
+        changed = False
+        for chunk_id in ids:
+            node = self.id_to_node.pop(chunk_id, None)
+            if node is not None:
+                self.deleted[node] = True
+                self._dirty_deleted.add(node)
+                changed = True
+        if changed:
+            self._save_deleted()
+
+    def __len__(self) -> int:
+        return len(self.id_to_node)
+
+    def search(
+        self, query, k: int, ef_search: Optional[int] = None, allowed_keys: Optional[np.ndarray] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Returns up to k ``(id, score)`` pairs ordered by descending inner
+        product, restricted to the ids of ``allowed_keys`` when given.
+        """
+        if self.entry_point < 0 or k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        ef = max(ef_search or self.ef_search, k)
+
+        rejected = self.deleted
+        if allowed_keys is not None:
+            rejected = self.deleted[:self.count] | ~np.isin(self.keys[:self.count], allowed_keys)
+            allowed = np.flatnonzero(~rejected)
+            # A walk at this ef evaluates roughly ef * m vectors
+            if len(allowed) <= ef * self.m:
+                scores = self.vectors[allowed] @ query
+                top = np.argsort(-scores, kind="stable")[:k]
+                return [(self.ids[node], float(scores[i])) for i, node in zip(top, allowed[top])]
+
+        entry = [self.entry_point]
+        for layer in range(self.max_level, 0, -1):
+            entry = [self._search_layer(query, entry, 1, layer)[0][1]]
+
+        while True:
+            found = self._search_layer(query, entry, ef, 0)
+            results = [(self.ids[node], -distance) for distance, node in found if not rejected[node]]
+            # Tombstones and filtered nodes take up slots in the beam, so widen it until k results fit
+            if len(results) >= k or ef >= self.count:
+                return results[:k]
+            ef *= 2
+
+    def get_vectors(self, ids: Sequence[str]) -> np.ndarray:
+        """The vectors of live ids as a (len(ids), dim) float32 array."""
+        return self.vectors[[self.id_to_node[chunk_id] for chunk_id in ids]]
+
+    def search_many(
+        self, queries, k: int, ef_search: Optional[int] = None, allowed_keys: Optional[np.ndarray] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """``search`` for every row of a (q, dim) query matrix; each query walks its own path through the graph."""
+        return [self.search(query, k, ef_search, allowed_keys) for query in np.asarray(queries, dtype=np.float32)]
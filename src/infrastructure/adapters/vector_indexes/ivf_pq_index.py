@@ -0,0 +1,437 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.infrastructure.adapters.vector_indexes.flat_vector_index import (
+    TOMBSTONE_DTYPE,
+    TOMBSTONES_FILE,
+    id_key,
+    live_mask,
+    live_rows,
+)
+from src.infrastructure.adapters.vector_indexes.quantization import select_top_k
+
+DEFAULT_NLIST = 1024
+DEFAULT_PQ_M = 32
+DEFAULT_NPROBE = 16
+DEFAULT_RERANK_FACTOR = 8
+DEFAULT_TRAIN_SIZE = 65536
+# Reranking this many exact vectors is cheap, and it absorbs PQ ranking noise for small k
+MIN_RERANK_CANDIDATES = 64
+# Fewer training points per centroid than this gives unstable clusters
+MIN_POINTS_PER_CENTROID = 39
+MAX_CODEBOOK_SIZE = 256
+KMEANS_ITERATIONS = 20
+ASSIGN_BATCH = 8192
+# Stored rows encoded per batch when the index is trained after the fact
+ENCODE_BATCH = 65536
+STATE_FILE = "ivf.json"
+ID_OFFSETS_DTYPE = np.dtype([("offset", "<i8"), ("length", "<i8")])
+
+
+def kmeans(points: np.ndarray, k: int, rng: np.random.Generator, iterations: int = KMEANS_ITERATIONS) -> np.ndarray:
+    """
+    Lloyd's k-means with k-means++ seeding, which avoids starting several
+    centroids inside one cluster. Empty clusters are re-seeded with random points.
+    """
+    centroids = np.empty((k, points.shape[1]), dtype=np.float32)
+    centroids[0] = points[rng.integers(len(points))]
+    distances = ((points - centroids[0]) ** 2).sum(axis=1)
+    for i in range(1, k):
+        # Each new seed is drawn with probability proportional to its squared distance
+        total = distances.sum()
+        chosen = rng.choice(len(points), p=distances / total) if total > 0 else rng.integers(len(points))
+        centroids[i] = points[chosen]
+        np.minimum(distances, ((points - centroids[i]) ** 2).sum(axis=1), out=distances)
+
+    for _ in range(iterations):
+        assignment = nearest_centroids(points, centroids)
+        order = np.argsort(assignment, kind="stable")
+        clusters, starts, counts = np.unique(assignment[order], return_index=True, return_counts=True)
+        centroids[clusters] = np.add.reduceat(points[order], starts, axis=0) / counts[:, None]
+        empty = np.setdiff1d(np.arange(k), clusters)
+        if len(empty):
+            centroids[empty] = points[rng.choice(len(points), len(empty), replace=False)]
+    return centroids
+
+
+def nearest_centroids(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the closest centroid (L2) for every point, in bounded-memory batches."""
+    half_norms = 0.5 * (centroids * centroids).sum(axis=1)
+    assignment = np.empty(len(points), dtype=np.int64)
+    for start in range(0, len(points), ASSIGN_BATCH):
+        batch = np.asarray(points[start:start + ASSIGN_BATCH], dtype=np.float32)
+        # argmin ||x - c||^2 == argmax (x . c - ||c||^2 / 2)
+        assignment[start:start + len(batch)] = np.argmax(batch @ centroids.T - half_norms, axis=1)
+    return assignment
+
+
+class IvfPqIndex:
+    """
+    Inverted-file index with product-quantized residuals, for corpora too big
+    to scan exactly or to hold as a graph in memory.
+
+    Until enough vectors for ``nlist`` lists (or ``train_size``) are stored,
+    rows are only appended and searched exactly. The add that reaches that
+    point trains the index once, on a sample of every stored row: k-means
+    clusters the vectors into ``nlist`` coarse lists and ``pq_m``
+    sub-quantizers of up to 256 codewords are learned for the residuals. The
+    stored rows are then encoded, and from then on every vector is stored as
+    a list number and ``pq_m`` bytes, appended to its list's posting file,
+    while the float32 vectors go to an append-only file. ``train`` trains
+    earlier, on an explicit sample.
+
+    A query probes the ``nprobe`` lists whose centroids score best, scores
+    their postings from a per-query lookup table, and reranks the best
+    ``k * rerank_factor`` candidates exactly against the memory-mapped vectors.
+    Deletes and re-adds use the same tombstones as the flat index.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        nlist: int = DEFAULT_NLIST,
+        pq_m: int = DEFAULT_PQ_M,
+        nprobe: int = DEFAULT_NPROBE,
+        rerank_factor: int = DEFAULT_RERANK_FACTOR,
+        train_size: int = DEFAULT_TRAIN_SIZE,
+        seed: int = 0,
+    ):
+        self.directory = Path(directory)
+        self.nlist = nlist
+        self.pq_m = pq_m
+        self.nprobe = nprobe
+        self.rerank_factor = rerank_factor
+        self.train_size = train_size
+        self.seed = seed
+        self.state = self._read_state()
+        if "requested" in self.state:
+            # The shape asked for by the first add applies until training, also across reopens
+            self.nlist, self.pq_m, self.train_size = (
+                self.state["requested"][key] for key in ("nlist", "pq_m", "train_size")
+            )
+        self.coarse: Optional[np.ndarray] = None
+        self.codebooks: Optional[np.ndarray] = None
+        if self.trained:
+            self.coarse = np.load(self.directory / "coarse.npy")
+            self.codebooks = np.load(self.directory / "codebooks.npy")
+        self._live: Optional[np.ndarray] = None
+        self._maps: Dict[str, np.ndarray] = {}
+
+    # --- Persistence ---
+
+    def _read_state(self) -> dict:
+        state_path = self.directory / STATE_FILE
+        if not state_path.exists():
+            return {"dim": None, "nlist": None, "pq_m": None, "count": 0}
+        return json.loads(state_path.read_text(encoding="utf-8"))
+
+    def _write_state(self) -> None:
+        temporary = self.directory / f"{STATE_FILE}.tmp"
+        temporary.write_text(json.dumps(self.state), encoding="utf-8")
+        os.replace(temporary, self.directory / STATE_FILE)
+
+    @property
+    def trained(self) -> bool:
+        return self.state["nlist"] is not None
+
+    @property
+    def count(self) -> int:
+        """Rows made visible by the last completed add."""
+        return self.state["count"]
+
+    @property
+    def train_threshold(self) -> int:
+        """Stored rows at which the index trains itself: enough for every list, capped by ``train_size``."""
+        return min(self.train_size, self.nlist * MIN_POINTS_PER_CENTROID)
+
+    @staticmethod
+    def _list_name(list_number: int) -> str:
+        return f"lists/list_{list_number:06d}.bin"
+
+    def _posting_dtype(self) -> np.dtype:
+        return np.dtype([("row", "<i8"), ("code", "u1", (self.state["pq_m"],))])
+
+    def _map(self, name: str, dtype, shape: Optional[tuple] = None) -> np.ndarray:
+        """Cached read-only memory map of a file in the index directory."""
+        if name not in self._maps:
+            path = self.directory / name
+            if not path.exists() or path.stat().st_size == 0:
+                return np.zeros((0,) + (shape or (0,))[1:], dtype=dtype)
+            self._maps[name] = np.memmap(path, dtype=dtype, mode="r", shape=shape)
+        return self._maps[name]
+
+    def _column(self, name: str, dtype, shape_tail: tuple = ()) -> np.ndarray:
+        """The first ``count`` rows of an append-only column."""
+        if self.count == 0:
+            return np.zeros((0,) + shape_tail, dtype=dtype)
+        return self._map(name, dtype, (self.count,) + shape_tail)
+
+    def _discard_uncommitted(self) -> None:
+        """
+        Truncates the columns and postings an interrupted ``add`` appended
+        past the recorded count. New rows are numbered from the count, so
+        leftovers would misalign the columns and make stale postings visible.
+        """
+        if not self.trained:
+            # Postings of a training that did not complete
+            shutil.rmtree(self.directory / "lists", ignore_errors=True)
+        vectors_path = self.directory / "vectors.f32"
+        row_size = self.state["dim"] * np.dtype(np.float32).itemsize
+        if not vectors_path.exists() or vectors_path.stat().st_size <= self.count * row_size:
+            return  # vectors are appended first, so nothing else can be left over
+
+        ids_size = 0
+        if self.count:
+            last = np.fromfile(
+                self.directory / "id_offsets.bin", dtype=ID_OFFSETS_DTYPE, count=1,
+                offset=(self.count - 1) * ID_OFFSETS_DTYPE.itemsize,
+            )[0]
+            ids_size = int(last["offset"] + last["length"])
+        self._maps = {}
+        for name, size in (
+            ("vectors.f32", self.count * row_size),
+            ("keys.u64", self.count * np.dtype(np.uint64).itemsize),
+            ("ids.bin", ids_size),
+            ("id_offsets.bin", self.count * ID_OFFSETS_DTYPE.itemsize),
+        ):
+            path = self.directory / name
+            if path.exists() and path.stat().st_size > size:
+                os.truncate(path, size)
+        if not self.trained:
+            return
+
+        posting_dtype = self._posting_dtype()
+        for path in (self.directory / "lists").glob("list_*.bin"):
+            postings = np.fromfile(path, dtype=posting_dtype, count=path.stat().st_size // posting_dtype.itemsize)
+            # Rows only grow within a list, so the committed postings are a prefix
+            kept = int(np.searchsorted(postings["row"], self.count))
+            if kept * posting_dtype.itemsize < path.stat().st_size:
+                os.truncate(path, kept * posting_dtype.itemsize)
+
+    # --- Training ---
+
+    def train(self, sample=None) -> None:
+        """
+        Learns the coarse centroids and PQ codebooks, from ``sample`` or by
+        default from a sample of the stored rows, and encodes the rows stored so far.
+        """
+        if self.trained:
+            raise ValueError("The IVF-PQ index is already trained")
+        rng = np.random.default_rng(self.seed)
+        if sample is None:
+            rows = np.flatnonzero(self.live)
+            if len(rows) > self.train_size:
+                rows = np.sort(rng.choice(rows, self.train_size, replace=False))
+            sample = self._column("vectors.f32", np.float32, (self.state["dim"],))[rows]
+        sample = np.asarray(sample, dtype=np.float32)
+        if len(sample) > self.train_size:
+            sample = sample[rng.choice(len(sample), self.train_size, replace=False)]
+
+        dim = sample.shape[1]
+        nlist = max(1, min(self.nlist, len(sample) // MIN_POINTS_PER_CENTROID))
+        # Sub-quantizers must split the vector evenly
+        pq_m = max(m for m in range(1, min(self.pq_m, dim) + 1) if dim % m == 0)
+        dsub = dim // pq_m
+        ksub = min(MAX_CODEBOOK_SIZE, len(sample))
+
+        coarse = kmeans(sample, nlist, rng)
+        residuals = sample - coarse[nearest_centroids(sample, coarse)]
+        codebooks = np.stack([
+            kmeans(np.ascontiguousarray(residuals[:, j * dsub:(j + 1) * dsub]), ksub, rng)
+            for j in range(pq_m)
+        ])
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        np.save(self.directory / "coarse.npy", coarse)
+        np.save(self.directory / "codebooks.npy", codebooks)
+        self.coarse, self.codebooks = coarse, codebooks
+        self.state.update({"dim": dim, "nlist": nlist, "pq_m": pq_m})
+        self.state.pop("requested", None)
+        stored = self._column("vectors.f32", np.float32, (dim,))
+        for start in range(0, self.count, ENCODE_BATCH):
+            stop = min(start + ENCODE_BATCH, self.count)
+            self._append_postings(np.arange(start, stop), np.asarray(stored[start:stop], dtype=np.float32))
+        # Written last: until then the stored rows stay untrained and are searched exactly
+        self._write_state()
+        self._maps = {}
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Coarse list and PQ code of every vector."""
+        lists = nearest_centroids(vectors, self.coarse)
+        residuals = vectors - self.coarse[lists]
+        pq_m, _, dsub = self.codebooks.shape
+        codes = np.empty((len(vectors), pq_m), dtype=np.uint8)
+        for j in range(pq_m):
+            codes[:, j] = nearest_centroids(residuals[:, j * dsub:(j + 1) * dsub], self.codebooks[j])
+        return lists, codes
+
+    # --- Writes ---
+
+    def add(self, ids: Sequence[str], vectors) -> None:
+        """
+        Appends vectors, encoded once the index is trained; ids that already
+        exist are superseded. Trains the index when this add reaches ``train_threshold``.
+        """
+        if len(ids) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} ids for {len(vectors)} vectors")
+        if self.state["dim"] is not None and self.state["dim"] != vectors.shape[1]:
+            raise ValueError(
+                f"Vector dimension {vectors.shape[1]} does not match index dimension {self.state['dim']}"
+            )
+        if self.state["dim"] is None:
+            self.state["dim"] = vectors.shape[1]
+            self.state["requested"] = {"nlist": self.nlist, "pq_m": self.pq_m, "train_size": self.train_size}
+        self._discard_uncommitted()
+
+        rows = np.arange(self.count, self.count + len(ids), dtype=np.int64)
+        encoded_ids = [chunk_id.encode("utf-8") for chunk_id in ids]
+        id_offsets = np.zeros(len(ids), dtype=ID_OFFSETS_DTYPE)
+        id_offsets["length"] = [len(chunk_id) for chunk_id in encoded_ids]
+        ids_path = self.directory / "ids.bin"
+        id_offsets["offset"] = (ids_path.stat().st_size if ids_path.exists() else 0) + np.concatenate(
+            [[0], np.cumsum(id_offsets["length"])[:-1]]
+        )
+
+        # Columns are appended first and the state file last, so rows (and
+        # postings) beyond the recorded count are never visible after a crash
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name, data in (
+            ("vectors.f32", vectors.tobytes()),
+            ("keys.u64", np.array([id_key(chunk_id) for chunk_id in ids], dtype=np.uint64).tobytes()),
+            ("ids.bin", b"".join(encoded_ids)),
+            ("id_offsets.bin", id_offsets.tobytes()),
+        ):
+            with open(self.directory / name, "ab") as f:
+                f.write(data)
+        if self.trained:
+            self._append_postings(rows, vectors)
+
+        self.state["count"] = self.count + len(ids)
+        self._live = None
+        self._maps = {}
+        if not self.trained and self.count >= self.train_threshold:
+            self.train()
+        else:
+            self._write_state()
+
+    def _append_postings(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        lists, codes = self._encode(vectors)
+        (self.directory / "lists").mkdir(exist_ok=True)
+        postings = np.zeros(len(rows), dtype=self._posting_dtype())
+        postings["row"] = rows
+        postings["code"] = codes
+        order = np.argsort(lists, kind="stable")
+        list_numbers, starts = np.unique(lists[order], return_index=True)
+        for list_number, group in zip(list_numbers, np.split(order, starts[1:])):
+            with open(self.directory / self._list_name(int(list_number)), "ab") as f:
+                f.write(postings[group].tobytes())
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """Marks ids as deleted without rewriting any list."""
+        if len(ids) == 0:
+            return
+        tombstones = np.array([(id_key(chunk_id), self.count) for chunk_id in ids], dtype=TOMBSTONE_DTYPE)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / TOMBSTONES_FILE, "ab") as f:
+            f.write(tombstones.tobytes())
+        self._live = None
+
+    # --- Reads ---
+
+    @property
+    def live(self) -> np.ndarray:
+        """Boolean mask over all rows: True for the latest, non-deleted row of each id."""
+        if self._live is None:
+            self._live = live_mask(self._column("keys.u64", np.uint64), self.directory / TOMBSTONES_FILE)
+        return self._live
+
+    def __len__(self) -> int:
+        return int(self.live.sum())
+
+    def _postings(self, list_number: int) -> np.ndarray:
+        postings = self._map(self._list_name(list_number), self._posting_dtype())
+        return postings[postings["row"] < self.count]
+
+    def _id_at(self, row: int) -> str:
+        offset, length = self._column("id_offsets.bin", ID_OFFSETS_DTYPE)[row]
+        return self._map("ids.bin", np.uint8)[int(offset):int(offset + length)].tobytes().decode("utf-8")
+
+    def search(
+        self, query, k: int, nprobe: Optional[int] = None, allowed_keys: Optional[np.ndarray] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Returns up to k ``(id, score)`` pairs ordered by descending inner product.
+
+        An index that is not trained yet is scanned exactly. With
+        ``allowed_keys``, postings of other ids are dropped before their
+        codes are scored. When the allowed rows are no more than the probed
+        lists would hold on average, they are scored exactly instead, so a
+        narrow filter is not starved by clusters it barely appears in.
+        """
+        if self.count == 0 or k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        keys = self._column("keys.u64", np.uint64)
+        if not self.trained:
+            eligible = self.live if allowed_keys is None else self.live & np.isin(keys, allowed_keys)
+            return self._exact_search(query, k, np.flatnonzero(eligible))
+        pq_m, _, dsub = self.codebooks.shape
+        nprobe = nprobe or self.nprobe
+
+        if allowed_keys is not None:
+            allowed_rows = np.flatnonzero(self.live & np.isin(keys, allowed_keys))
+            if len(allowed_rows) * self.state["nlist"] <= self.count * nprobe:
+                return self._exact_search(query, k, allowed_rows)
+
+        coarse_scores = self.coarse @ query
+        probes, _ = select_top_k(coarse_scores, nprobe)
+        # q . (c + r) = q . c + sum_j q_j . codeword_j, so one table serves every list
+        table = np.einsum("jd,jkd->jk", query.reshape(pq_m, dsub), self.codebooks)
+
+        candidate_rows = []
+        candidate_scores = []
+        for list_number in probes:
+            postings = self._postings(int(list_number))
+            if allowed_keys is not None and len(postings):
+                postings = postings[np.isin(keys[postings["row"]], allowed_keys)]
+            if len(postings):
+                candidate_rows.append(np.asarray(postings["row"]))
+                candidate_scores.append(
+                    coarse_scores[list_number] + table[np.arange(pq_m), postings["code"]].sum(axis=1)
+                )
+        if not candidate_rows:
+            return []
+
+        rows = np.concatenate(candidate_rows)
+        scores = np.concatenate(candidate_scores)
+        alive = self.live[rows]
+        rows, scores = rows[alive], scores[alive]
+
+        # Rerank the best approximate candidates against the exact vectors
+        best, _ = select_top_k(scores, max(k * self.rerank_factor, MIN_RERANK_CANDIDATES))
+        return self._exact_search(query, k, np.sort(rows[best]))  # sorted reads are kinder to memory-mapped files
+
+    def search_many(
+        self, queries, k: int, nprobe: Optional[int] = None, allowed_keys: Optional[np.ndarray] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """``search`` for every row of a (q, dim) query matrix; each query probes its own lists."""
+        return [self.search(query, k, nprobe, allowed_keys) for query in np.asarray(queries, dtype=np.float32)]
+
+    def get_vectors(self, ids: Sequence[str]) -> np.ndarray:
+        """The full-precision vectors of live ids as a (len(ids), dim) float32 array."""
+        rows = live_rows(self._column("keys.u64", np.uint64), self.live, ids)
+        return np.asarray(self._column("vectors.f32", np.float32, (self.state["dim"],))[rows], dtype=np.float32)
+
+    def _exact_search(self, query: np.ndarray, k: int, rows: np.ndarray) -> List[Tuple[str, float]]:
+        vectors = self._column("vectors.f32", np.float32, (self.state["dim"],))
+        exact = np.asarray(vectors[rows], dtype=np.float32) @ query
+        top, top_scores = select_top_k(exact, k)
+        return [(self._id_at(int(row)), float(score)) for row, score in zip(rows[top], top_scores)]
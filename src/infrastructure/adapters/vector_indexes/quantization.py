@@ -0,0 +1,205 @@
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.domain.models.enums import VectorQuantization
+
+DEFAULT_BLOCK_SIZE = 4096
+DEFAULT_RESCORE_FACTOR = 4
+INT8_MAX = 127.0
+
+
+class QuantizedVectors:
+    """
+    A row-major matrix of embeddings stored at reduced precision.
+
+    float16 halves the footprint of float32 vectors. int8 quarters it and keeps
+    one float32 scale per vector, so every row is reconstructed as
+    ``codes[i] * scales[i]``. Queries stay in float32 and are scored directly
+    against the codes, one block of rows at a time, so no dequantized copy of
+    the matrix is ever materialized.
+    """
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        scales: Optional[np.ndarray] = None,
+        quantization: VectorQuantization = VectorQuantization.FLOAT32,
+    ):
+        if quantization == VectorQuantization.INT8 and scales is None:
+            raise ValueError("int8 vectors require per-vector scales")
+        self.codes = codes
+        self.scales = scales
+        self.quantization = VectorQuantization(quantization)
+
+    @classmethod
+    def from_vectors(
+        cls, vectors, quantization: VectorQuantization = VectorQuantization.FLOAT32
+    ) -> "QuantizedVectors":
+        """Quantizes a (n, dim) array of vectors."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2:
+            raise ValueError(f"Expected a 2-D array of vectors, got shape {vectors.shape}")
+
+        quantization = VectorQuantization(quantization)
+        if quantization == VectorQuantization.FLOAT32:
+            return cls(np.ascontiguousarray(vectors), None, quantization)
+        if quantization == VectorQuantization.FLOAT16:
+            return cls(vectors.astype(np.float16), None, quantization)
+
+        # Symmetric per-vector scaling: the largest component maps to +/-127
+        max_abs = np.abs(vectors).max(axis=1) if len(vectors) else np.zeros(0, np.float32)
+        scales = np.where(max_abs > 0, max_abs / INT8_MAX, 1.0).astype(np.float32)
+        codes = np.rint(vectors / scales[:, None]).clip(-INT8_MAX, INT8_MAX).astype(np.int8)
+        return cls(codes, scales, quantization)
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.codes.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the codes and scales."""
+        scale_bytes = self.scales.nbytes if self.scales is not None else 0
+        return int(self.codes.nbytes + scale_bytes)
+
+    def dequantize(self, rows=None) -> np.ndarray:
+        """Reconstructs float32 vectors for the given rows (all rows by default)."""
+        codes = self.codes if rows is None else self.codes[rows]
+        vectors = np.asarray(codes, dtype=np.float32)
+        if self.scales is not None:
+            scales = self.scales if rows is None else self.scales[rows]
+            vectors = vectors * np.asarray(scales, dtype=np.float32)[:, None]
+        return vectors
+
+    def scores(self, query, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Dot products between a float32 query and rows ``start:stop``.
+        For int8 the per-vector scale is applied after the dot product.
+        A (q, dim) matrix of queries is scored in one matrix product and
+        yields a (q, rows) matrix.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        block = np.asarray(self.codes[start:stop], dtype=np.float32)
+        scores = query @ block.T
+        if self.scales is not None:
+            scores *= self.scales[start:stop]
+        return scores
+
+    def scores_at(self, query, rows: np.ndarray) -> np.ndarray:
+        """Dot products between a float32 query (or query matrix) and the given rows only."""
+        query = np.asarray(query, dtype=np.float32)
+        scores = query @ np.asarray(self.codes[rows], dtype=np.float32).T
+        if self.scales is not None:
+            scores *= self.scales[rows]
+        return scores
+
+    def top_k(
+        self, query, k: int, block_size: int = DEFAULT_BLOCK_SIZE
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the rows and scores of the k best matches, best first.
+        Rows are scanned in blocks and each block only contributes its own top k
+        candidates, which keeps memory bounded for memory-mapped matrices.
+        """
+        candidate_rows = []
+        candidate_scores = []
+        for start in range(0, len(self), block_size):
+            block_scores = self.scores(query, start, start + block_size)
+            rows, scores = select_top_k(block_scores, k)
+            candidate_rows.append(rows + start)
+            candidate_scores.append(scores)
+
+        if not candidate_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        rows = np.concatenate(candidate_rows)
+        scores = np.concatenate(candidate_scores)
+        best, best_scores = select_top_k(scores, k)
+        return rows[best], best_scores
+
+    def search(
+        self,
+        query,
+        k: int,
+        full_precision: Optional[np.ndarray] = None,
+        rescore_factor: int = DEFAULT_RESCORE_FACTOR,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Searches the quantized rows and optionally rescores the candidates.
+
+        With ``full_precision`` (typically a float32 memmap that is never loaded
+        as a whole) the top ``k * rescore_factor`` quantized candidates are
+        rescored exactly and the best k are returned.
+        """
+        if full_precision is None or self.quantization == VectorQuantization.FLOAT32:
+            return self.top_k(query, k, block_size)
+
+        candidates, _ = self.top_k(query, k * rescore_factor, block_size)
+        order = np.sort(candidates)  # sorted reads are kinder to memory-mapped files
+        exact = np.asarray(full_precision[order], dtype=np.float32) @ np.asarray(query, dtype=np.float32)
+        best, best_scores = select_top_k(exact, k)
+        return order[best], best_scores
+
+    def save(self, path_prefix: str) -> None:
+        """Writes the codes (and scales) as .npy files next to ``path_prefix``."""
+        np.save(f"{path_prefix}.codes.npy", self.codes)
+        if self.scales is not None:
+            np.save(f"{path_prefix}.scales.npy", self.scales)
+
+    @classmethod
+    def load(
+        cls,
+        path_prefix: str,
+        quantization: VectorQuantization,
+        mmap_mode: Optional[str] = "r",
+    ) -> "QuantizedVectors":
+        """Opens vectors written by ``save``, memory-mapped by default."""
+        codes = np.load(f"{path_prefix}.codes.npy", mmap_mode=mmap_mode)
+        scales_path = Path(f"{path_prefix}.scales.npy")
+        scales = np.load(scales_path, mmap_mode=mmap_mode) if scales_path.exists() else None
+        return cls(codes, scales, quantization)
+
+
+def select_top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices and values of the k largest scores, best first, via argpartition."""
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=scores.dtype)
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return top.astype(np.int64), scores[top]
+
+
+def select_top_k_rows(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """``select_top_k`` for every row of a (q, n) score matrix at once; returns (q, k) arrays."""
+    if k <= 0 or scores.shape[1] == 0:
+        empty = np.empty((scores.shape[0], 0), dtype=np.int64)
+        return empty, np.empty((scores.shape[0], 0), dtype=scores.dtype)
+    if k < scores.shape[1]:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1).astype(np.int64)
+    return top, np.take_along_axis(scores, top, axis=1)
+
+
+def recall_at_k(exact_rows, approx_rows) -> float:
+    """
+    Mean fraction of the exact top-k rows that an approximate search returned.
+    Both arguments are sequences of per-query row lists.
+    """
+    recalls = []
+    for exact, approx in zip(exact_rows, approx_rows):
+        exact = set(np.asarray(exact).tolist())
+        if exact:
+            recalls.append(len(exact & set(np.asarray(approx).tolist())) / len(exact))
+    return float(np.mean(recalls)) if recalls else 0.0
@@ -0,0 +1,83 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+from application.ports.watch_manifest_store import WatchManifestStore
+from domain.models.enums import StorageType
+from domain.models.watch import FileState, IndexedFile, WatchManifest
+from domain.services.chunk_identity import source_key
+from infrastructure.adapters.chunk_stores.chroma_client_registry import (
+    resolve_persist_directory,
+)
+from infrastructure.adapters.chunk_stores.file_system_chunk_store import (
+    DEFAULT_OUTPUT_DIR,
+)
+
+MANIFEST_FILE = "watch_manifest.json"
+CHROMA_MANIFEST_DIR = "watch_manifests"
+
+
+def manifest_path(
+    storage_type: StorageType, location: str = None, persist_directory: str = None, source: str = None
+) -> Path:
+    """
+    Where the watch manifest of a store lives: inside a local store's
+    directory, or next to the Chroma database, one file per collection.
+    With a source, each watched source gets its own manifest, so watches of
+    different folders into one store do not take each other's files for
+    deleted ones.
+    """
+    suffix = f"-{source_key(os.path.abspath(source))}" if source else ""
+    if storage_type == StorageType.LOCAL:
+        return Path(location or DEFAULT_OUTPUT_DIR) / f"{Path(MANIFEST_FILE).stem}{suffix}.json"
+    return Path(resolve_persist_directory(persist_directory)) / CHROMA_MANIFEST_DIR / f"{location}{suffix}.json"
+
+
+def remove_manifests(storage_type: StorageType, location: str = None, persist_directory: str = None) -> None:
+    """Forgets the watch manifests of every source of a store, e.g. once the store was cleared."""
+    store_manifest = manifest_path(storage_type, location, persist_directory)
+    store_manifest.unlink(missing_ok=True)
+    if store_manifest.parent.exists():
+        for path in store_manifest.parent.glob(f"{store_manifest.stem}-*.json"):
+            path.unlink(missing_ok=True)
+
+
+class JsonWatchManifestStore(WatchManifestStore):
+    """
+    Keeps the watch manifest in one JSON file, replaced atomically.
+
+    Each write goes to a temporary file that is fsynced and renamed over the
+    previous one, so the manifest on disk always describes a whole sync.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def read(self) -> Optional[WatchManifest]:
+        if not self.path.exists():
+            return None
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            files = {
+                path: IndexedFile(FileState(*entry["state"]) if entry["state"] else None, entry["chunks"])
+                for path, entry in data["files"].items()
+            }
+            return WatchManifest(run=data["run"], files=files)
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            raise ValueError(f"'{self.path}' is not a valid watch manifest: {e}") from e
+
+    def write(self, manifest: WatchManifest) -> None:
+        data = {
+            "run": manifest.run,
+            "files": {
+                path: {"state": list(indexed.state) if indexed.state else None, "chunks": indexed.chunk_ids}
+                for path, indexed in manifest.files.items()
+            },
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
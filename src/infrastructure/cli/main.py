@@ -1,42 +1,83 @@
+import asyncio
 import json
 import argparse
 import sys
+import time
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
 
 from dotenv import load_dotenv
 
+from application.use_cases.batch_talk_use_case import BatchTalkUseCase, DEFAULT_CONCURRENCY
 from application.use_cases.chunking_use_case import ChunkingUseCase
+from application.use_cases.compression_use_case import (
+    CompressionUseCase,
+    DEFAULT_PROMPT_TOKENS_PER_SECOND,
+)
+from application.use_cases.ingestion_use_case import IngestionUseCase
 from application.use_cases.storage_use_case import StorageUseCase
-from application.use_cases.talk_use_case import TalkUseCase
+from application.use_cases.talk_use_case import DEFAULT_CHAT_MODEL, TalkUseCase
+from application.use_cases.watch_use_case import WatchUseCase
+from infrastructure.adapters.answer_caches.ttl_answer_cache import build_answer_cache
 from infrastructure.adapters.document_loaders.markdown_loader import (
     MarkdownDocumentLoader,
 )
+from infrastructure.adapters.file_watchers.polling_file_watcher import (
+    DEFAULT_DEBOUNCE_SECONDS,
+    DEFAULT_POLL_INTERVAL_SECONDS,
+    PollingFileWatcher,
+)
+from infrastructure.adapters.run_journals.jsonl_run_journal import (
+    JsonlRunJournal,
+    journal_path,
+)
+from infrastructure.adapters.watch_manifests.json_watch_manifest_store import (
+    JsonWatchManifestStore,
+    manifest_path,
+    remove_manifests,
+)
+from infrastructure.server.protocol import DEFAULT_SERVER_HOST, DEFAULT_SERVER_PORT
+from infrastructure.server.rag_client import RagClient
+from infrastructure.server.rag_server import serve
+from infrastructure.server.rag_service import RagService
 from domain.models.enums import (
     LengthBasedChunkingMode,
+    LocalIndexType,
+    SearchMode,
     SemanticChunkingThresholdType,
     StorageType,
+    VectorQuantization,
 )
+from domain.models.chunk import Chunk
 from domain.models.cli_config_classes import StorageConfig, ChunkingConfig, TalkConfig
+from domain.models.context import CompressionReport
+from domain.models.watch import SyncReport
+from domain.services.context_packing import DEFAULT_CONTEXT_TOKEN_BUDGET
+from domain.services.diversification import DEFAULT_MMR_LAMBDA
+from domain.services.metadata_filter import validate_where
 
 
-def run_chunking(chunk_config: ChunkingConfig, storage_config: StorageConfig):
-    """
-    Loads documents, chunks them according to a strategy, and saves them.
-    """
-    document_loader = MarkdownDocumentLoader()
-    chunking_use_case = ChunkingUseCase(document_loader)
-    storage_use_case = StorageUseCase(storage_config.storage_type, storage_config.location)
+# Queries embedded and searched together by `search --queries-file`
+SEARCH_BATCH_SIZE = 64
+
+
+def print_save_progress(saved: int, total: int):
+    """Prints a single, updating progress line while batches are written."""
+    print(f"\rSaved {saved}/{total} chunks", end="\n" if saved == total else "", flush=True)
 
+def parse_strategy_params(strategy: str, strategy_config: Dict[str, Any]) -> Dict[str, Any]:
+    """The strategy configuration with its string options converted to enums."""
     # Make a copy to avoid mutating the original dictionary
-    strategy_params = chunk_config.strategy_config.copy()
+    strategy_params = strategy_config.copy()
 
     # Safely convert string representations to Enum members
-    if chunk_config.strategy == "length_based" and "mode" in strategy_params:
+    if strategy == "length_based" and "mode" in strategy_params:
         try:
             strategy_params["mode"] = LengthBasedChunkingMode(strategy_params["mode"])
         except ValueError as e:
             raise ValueError(f"Invalid 'mode' for length_based strategy: {e}") from e
 
-    if chunk_config.strategy == "semantic" and "breakpoint_threshold_type" in strategy_params:
+    if strategy == "semantic" and "breakpoint_threshold_type" in strategy_params:
         try:
             strategy_params["breakpoint_threshold_type"] = SemanticChunkingThresholdType(
                 strategy_params["breakpoint_threshold_type"]
@@ -44,49 +85,303 @@ def run_chunking(chunk_config: ChunkingConfig, storage_config: StorageConfig):
         except ValueError as e:
             raise ValueError(f"Invalid 'breakpoint_threshold_type' for semantic strategy: {e}") from e
 
-    print(f"Running chunking strategy '{chunk_config.strategy}' on '{chunk_config.source_path}'...")
-    chunks = chunking_use_case.execute(
-        chunk_config.source_path, chunk_config.strategy, strategy_params
-    )
-    storage_use_case.save(chunks)
-
-    print(f"Successfully processed and saved {len(chunks)} chunks to '{storage_config.location}'.")
+    return strategy_params
 
-def run_talk(talk_config: TalkConfig, storage_config: StorageConfig):
+def run_chunking(chunk_config: ChunkingConfig, storage_config: StorageConfig):
     """
-    Searches for relevant chunks and generates an answer based on a query.
+    Loads documents, chunks them according to a strategy, and saves them.
     """
-    storage_use_case = StorageUseCase(storage_config.storage_type, storage_config.location)
-    talk_use_case = TalkUseCase()
-
-    print(f"Question: {talk_config.query}")
+    document_loader = MarkdownDocumentLoader()
+    chunking_use_case = ChunkingUseCase(document_loader)
+    storage_use_case = StorageUseCase(
+        storage_config.storage_type,
+        storage_config.location,
+        quantization=storage_config.quantization,
+        index_type=storage_config.index_type,
+        index_options=storage_config.index_options,
+        progress=print_save_progress,
+        persist_directory=storage_config.persist_directory,
+        shards=storage_config.shards,
+    )
 
-    relevant_chunks = storage_use_case.search(talk_config.query, talk_config.top_k)
-    answer = talk_use_case.execute(talk_config.query, relevant_chunks)
+    strategy_params = parse_strategy_params(chunk_config.strategy, chunk_config.strategy_config)
 
-    print(f"\nAnswer: {answer}")
+    journal = JsonlRunJournal(
+        journal_path(
+            storage_config.storage_type,
+            storage_config.location,
+            storage_config.persist_directory,
+            source=chunk_config.source_path,
+        )
+    )
+    ingestion_use_case = IngestionUseCase(chunking_use_case, storage_use_case, journal)
 
-def run_search(talk_config: TalkConfig, storage_config: StorageConfig):
+    print(f"Running chunking strategy '{chunk_config.strategy}' on '{chunk_config.source_path}'...")
+    report = ingestion_use_case.execute(
+        chunk_config.source_path, chunk_config.strategy, strategy_params, resume=chunk_config.resume
+    )
+    if chunk_config.resume:
+        print(
+            f"Resumed: skipped {report.files_skipped} completed files and "
+            f"{report.chunks_skipped} already saved chunks."
+        )
+
+    print(f"Successfully processed and saved {report.chunks_saved} chunks to '{storage_config.location}'.")
+
+def print_sync(report: SyncReport):
+    """Prints one line per sync that changed the store, skipped files or failed."""
+    if report.changed:
+        print(
+            f"[{time.strftime('%H:%M:%S')}] Indexed {report.files_indexed} files, removed {report.files_removed}: "
+            f"{report.chunks_saved} chunks saved, {report.chunks_deleted} deleted, "
+            f"{report.chunks_kept} unchanged kept ({report.seconds * 1000:.0f} ms).",
+            flush=True,
+        )
+    if report.files_skipped:
+        print(
+            f"[{time.strftime('%H:%M:%S')}] {report.files_skipped} changed files could not be loaded; "
+            f"their stored chunks are kept and they are retried on the next sync.",
+            flush=True,
+        )
+    if report.error:
+        print(f"[{time.strftime('%H:%M:%S')}] Sync failed, still watching: {report.error}", file=sys.stderr, flush=True)
+
+def run_watch(chunk_config: ChunkingConfig, storage_config: StorageConfig, interval: float, debounce: float):
     """
-    Performs a search for relevant chunks and displays them.
+    Indexes a source folder and keeps the store in step with it: changed
+    files are re-chunked and deleted files removed until interrupted.
     """
-    storage_use_case = StorageUseCase(storage_config.storage_type, storage_config.location)
-    relevant_chunks = storage_use_case.search(talk_config.query, talk_config.top_k)
+    storage_use_case = StorageUseCase(
+        storage_config.storage_type,
+        storage_config.location,
+        quantization=storage_config.quantization,
+        index_type=storage_config.index_type,
+        index_options=storage_config.index_options,
+        persist_directory=storage_config.persist_directory,
+        shards=storage_config.shards,
+    )
+    manifest_store = JsonWatchManifestStore(
+        manifest_path(
+            storage_config.storage_type,
+            storage_config.location,
+            storage_config.persist_directory,
+            source=chunk_config.source_path,
+        )
+    )
+    watch_use_case = WatchUseCase(
+        ChunkingUseCase(MarkdownDocumentLoader()),
+        storage_use_case,
+        manifest_store,
+        PollingFileWatcher(interval_seconds=interval, debounce_seconds=debounce),
+    )
+    strategy_params = parse_strategy_params(chunk_config.strategy, chunk_config.strategy_config)
+
+    print(
+        f"Watching '{chunk_config.source_path}' with strategy '{chunk_config.strategy}' "
+        f"(polling every {interval:g} s; Ctrl+C to stop)...",
+        flush=True,
+    )
+    try:
+        watch_use_case.run(chunk_config.source_path, chunk_config.strategy, strategy_params, on_sync=print_sync)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+def print_talk_events(events: Iterator[Dict[str, Any]]):
+    """Renders the events of a talk, whether answered here or by `cli serve`."""
+    answering = False
+    for event in events:
+        if event["type"] in ("token", "answer") and not answering:
+            print("\nAnswer: ", end="", flush=True)
+            answering = True
+        if event["type"] == "context":
+            print(
+                f"Context: {event['passages']} passages, ~{event['tokens']} tokens "
+                f"(from {event['input_chunks']} chunks, ~{event['input_tokens']} tokens)."
+            )
+        elif event["type"] == "compression":
+            report = CompressionReport(**{key: value for key, value in event.items() if key != "type"})
+            print(
+                f"Compressed: {report.sentences_after}/{report.sentences_before} sentences, "
+                f"~{report.tokens_before} -> ~{report.tokens_after} tokens ({report.ratio:.0%} kept) "
+                f"in {report.seconds * 1000:.0f} ms; estimated "
+                f"~{report.estimated_seconds_saved(DEFAULT_PROMPT_TOKENS_PER_SECOND) * 1000:.0f} ms less prompt "
+                f"processing (assuming {DEFAULT_PROMPT_TOKENS_PER_SECOND:.0f} tokens/s, not measured)."
+            )
+        elif event["type"] == "token":
+            print(event["text"], end="", flush=True)
+        elif event["type"] == "answer":
+            print(
+                f"\n\nTime to first token: {event['first_token_seconds'] * 1000:.0f} ms, "
+                f"total: {event['total_seconds'] * 1000:.0f} ms."
+            )
+            if event["cached"]:
+                print(
+                    f"Served from the answer cache (hit rate {event['hit_rate']:.0%} over {event['lookups']} lookups)."
+                )
 
+def print_search_results(query: str, relevant_chunks: List[Chunk]):
     if relevant_chunks:
-        print(f"Found {len(relevant_chunks)} relevant chunks for query: '{talk_config.query}'")
+        print(f"Found {len(relevant_chunks)} relevant chunks for query: '{query}'")
         for i, chunk in enumerate(relevant_chunks):
-            print(f"\n--- Chunk {i+1} (Score: {chunk.score if hasattr(chunk, 'score') else 'N/A'}) ---")
+            score = f"{chunk.score:.4f}" if chunk.score is not None else "N/A"
+            print(f"\n--- Chunk {i+1} (Score: {score}) ---")
             print(f"Content: {chunk.content}")
             print(f"Metadata: {chunk.metadata}")
     else:
         print("No relevant chunks found.")
 
+def connect_to_server(no_server: bool) -> Optional[RagClient]:
+    """The client of a running `cli serve`, or None to answer in this process."""
+    if no_server:
+        return None
+    client = RagClient()
+    return client if client.is_running() else None
+
+def run_talk(talk_config: TalkConfig, storage_config: StorageConfig, client: Optional[RagClient] = None):
+    """
+    Searches for relevant chunks and generates an answer based on a query,
+    on the running server when a client is given.
+    """
+    print(f"Question: {talk_config.query}")
+    print_talk_events((client or RagService()).talk(talk_config, storage_config))
+
+def run_search(talk_config: TalkConfig, storage_config: StorageConfig, client: Optional[RagClient] = None):
+    """
+    Performs a search for relevant chunks and displays them.
+    """
+    relevant_chunks = (client or RagService()).search(talk_config, storage_config)
+    print_search_results(talk_config.query, relevant_chunks)
+
+def read_queries(queries_file: str) -> Iterator[str]:
+    """
+    Yields the queries of a file: one per line, either plain text or a JSON
+    object with a "query" (or "question") field. Blank lines are skipped.
+    """
+    with open(queries_file, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                try:
+                    record = json.loads(line)
+                    line = record["query"] if "query" in record else record["question"]
+                except (json.JSONDecodeError, KeyError) as e:
+                    raise ValueError(f"Invalid query on line {line_number} of '{queries_file}': {e}") from e
+            yield line
+
+def run_batch_search(queries_file: str, talk_config: TalkConfig, storage_config: StorageConfig):
+    """
+    Searches every query of a file and streams one JSON line per query.
+    Queries are embedded and scored SEARCH_BATCH_SIZE at a time, so results
+    start printing before the whole file is read.
+    """
+    storage_use_case = StorageUseCase(
+        storage_config.storage_type,
+        storage_config.location,
+        quantization=storage_config.quantization,
+        index_type=storage_config.index_type,
+        index_options=storage_config.index_options,
+        persist_directory=storage_config.persist_directory,
+        shards=storage_config.shards,
+    )
+    queries = read_queries(queries_file)
+    while batch := list(islice(queries, SEARCH_BATCH_SIZE)):
+        rankings = storage_use_case.search_many(
+            batch, talk_config.top_k, talk_config.mode, filter=talk_config.where, mmr_lambda=talk_config.mmr_lambda,
+            rerank_candidates=talk_config.rerank_candidates,
+        )
+        for query, chunks in zip(batch, rankings):
+            results = [
+                {"id": chunk.id, "score": chunk.score, "content": chunk.content, "metadata": chunk.metadata}
+                for chunk in chunks
+            ]
+            print(json.dumps({"query": query, "results": results}, ensure_ascii=False), flush=True)
+
+def run_batch_talk(questions_file: str, concurrency: int, talk_config: TalkConfig, storage_config: StorageConfig):
+    """
+    Answers every question of a file concurrently and streams one JSON line
+    per question as soon as its answer is complete; "index" is the position
+    of the question in the file.
+    """
+    storage_use_case = StorageUseCase(
+        storage_config.storage_type,
+        storage_config.location,
+        quantization=storage_config.quantization,
+        index_type=storage_config.index_type,
+        index_options=storage_config.index_options,
+        persist_directory=storage_config.persist_directory,
+        shards=storage_config.shards,
+    )
+    answer_cache = build_answer_cache(DEFAULT_CHAT_MODEL, embeddings=storage_use_case.embeddings)
+    talk_use_case = TalkUseCase(context_tokens=talk_config.context_tokens, answer_cache=answer_cache)
+    compression_use_case = None
+    if talk_config.compress_tokens is not None:
+        compression_use_case = CompressionUseCase(storage_use_case.embeddings, talk_config.compress_tokens)
+    batch_talk_use_case = BatchTalkUseCase(
+        storage_use_case, talk_use_case, concurrency=concurrency, compression_use_case=compression_use_case
+    )
+
+    async def answer_all():
+        async for result in batch_talk_use_case.answer_all(
+            read_queries(questions_file),
+            talk_config.top_k,
+            talk_config.mode,
+            filter=talk_config.where,
+            mmr_lambda=talk_config.mmr_lambda,
+            rerank_candidates=talk_config.rerank_candidates,
+        ):
+            line = {"index": result.index, "question": result.question, "sources": result.sources}
+            if result.compression is not None:
+                line.update(
+                    compression_ratio=round(result.compression.ratio, 3),
+                    compression_ms=round(result.compression.seconds * 1000),
+                )
+            if result.error is not None:
+                line["error"] = result.error
+            else:
+                line.update(
+                    answer=result.answer.text,
+                    cached=result.answer.cached,
+                    first_token_ms=round(result.answer.first_token_seconds * 1000),
+                    total_ms=round(result.answer.total_seconds * 1000),
+                )
+            print(json.dumps(line, ensure_ascii=False), flush=True)
+
+    asyncio.run(answer_all())
+
+def format_bytes(size: int) -> str:
+    """Human-readable size, e.g. ``12.3 MB``."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def run_compaction(storage_config: StorageConfig):
+    """Rewrites the live records of a local store and reports what it reclaimed."""
+    storage_use_case = StorageUseCase(
+        storage_config.storage_type, storage_config.location, persist_directory=storage_config.persist_directory
+    )
+    print(f"Compacting '{storage_config.location}'...")
+    report = storage_use_case.compact()
+    print(
+        f"Rewrote {report.records} live records: {format_bytes(report.bytes_before)} -> "
+        f"{format_bytes(report.bytes_after)} ({format_bytes(report.bytes_reclaimed)} reclaimed)."
+    )
+    print(
+        f"Mean read latency: {report.read_seconds_before * 1e6:.1f} µs -> "
+        f"{report.read_seconds_after * 1e6:.1f} µs ({report.read_speedup:.2f}x)."
+    )
+
 def clean_storage(storage_config: StorageConfig):
     """Clears all data from the specified storage location."""
     print(f"Clearing storage at '{storage_config.location}' (type: {storage_config.storage_type.name})...")
-    storage = StorageUseCase(storage_config.storage_type, storage_config.location)
+    storage = StorageUseCase(
+        storage_config.storage_type, storage_config.location, persist_directory=storage_config.persist_directory
+    )
     storage.clear()
+    # A cleared store has none of the files a previous watch indexed
+    remove_manifests(storage_config.storage_type, storage_config.location, storage_config.persist_directory)
     print("Storage cleared successfully.")
 
 # --- CLI Argument Handling & Validation ---
@@ -106,28 +401,153 @@ def setup_arg_parser():
     parser_save.add_argument("strategy", choices=["length_based", "structure_based", "semantic"], help="Chunking strategy.")
     parser_save.add_argument("--config", default="{}", help="JSON string with strategy configuration.")
     parser_save.add_argument("--clean", action="store_true", help="Clean the destination before saving.")
+    parser_save.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted save of the same source, strategy and config without re-embedding what it stored.",
+    )
+    parser_save.add_argument(
+        "--quantization",
+        choices=[mode.value for mode in VectorQuantization],
+        default=VectorQuantization.FLOAT32.value,
+        help="Precision of the vectors stored in a local directory.",
+    )
+    parser_save.add_argument(
+        "--rescore",
+        action="store_true",
+        help="Also keep float32 copies of quantized vectors and rescore candidates with them: full-precision recall, larger than float32 on disk.",
+    )
+    parser_save.add_argument(
+        "--index",
+        choices=[index.value for index in LocalIndexType],
+        help="Vector index of a new local directory (default: the existing one, or flat).",
+    )
+    parser_save.add_argument(
+        "--shards",
+        type=int,
+        help="Hash-partition a new store into this many directories or collections, written and searched in parallel.",
+    )
+
+    # --- 'watch' command ---
+    parser_watch = subparsers.add_parser(
+        "watch", help="Index documents and keep re-indexing the files that change."
+    )
+    parser_watch.add_argument("source", help="Path to the folder with markdown files.")
+    parser_watch.add_argument("strategy", choices=["length_based", "structure_based", "semantic"], help="Chunking strategy.")
+    parser_watch.add_argument("--config", default="{}", help="JSON string with strategy configuration.")
+    parser_watch.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL_SECONDS,
+        help="Seconds between two polls of the folder.",
+    )
+    parser_watch.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE_SECONDS,
+        help="Seconds without changes to wait before indexing a burst of changes.",
+    )
 
     # --- 'talk' command ---
     parser_talk = subparsers.add_parser("talk", help="Ask a question about the documents.")
-    parser_talk.add_argument("query", help="Query string for searching.")
+    parser_talk.add_argument("query", nargs="?", help="Query string for searching.")
+    parser_talk.add_argument(
+        "--compress-tokens",
+        type=int,
+        help="Keep only the sentences most similar to the question, up to this many tokens, before prompting.",
+    )
+    parser_talk.add_argument(
+        "--questions-file",
+        help="Answer every question of this file (one per line, or JSON lines with a \"query\" or \"question\" field) and print JSON lines.",
+    )
+    parser_talk.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Answers generated at the same time with --questions-file.",
+    )
     parser_talk.add_argument("--top-k", type=int, default=5, help="Number of top relevant chunks to retrieve.")
+    parser_talk.add_argument(
+        "--context-tokens",
+        type=int,
+        default=DEFAULT_CONTEXT_TOKEN_BUDGET,
+        help="Token budget of the context sent to the model; merged passages are added best first until it is full.",
+    )
 
     # --- 'search' command ---
     parser_search = subparsers.add_parser("search", help="Search for relevant chunks.")
-    parser_search.add_argument("query", help="Query string for searching.")
+    parser_search.add_argument("query", nargs="?", help="Query string for searching.")
+    parser_search.add_argument(
+        "--queries-file",
+        help="Search every query of this file (one per line, or JSON lines with a \"query\" field) and print JSON lines.",
+    )
     parser_search.add_argument("--top-k", type=int, default=5, help="Number of top relevant chunks to retrieve.")
 
+    # --- 'serve' command ---
+    parser_serve = subparsers.add_parser(
+        "serve", help="Keep stores and models loaded and answer search and talk over HTTP."
+    )
+    parser_serve.add_argument("--host", default=DEFAULT_SERVER_HOST, help="Interface to listen on.")
+    parser_serve.add_argument("--port", type=int, default=DEFAULT_SERVER_PORT, help="Port to listen on.")
+
     # --- 'clean' command ---
     subparsers.add_parser("clean", help="Clean the storage location.")
 
+    # --- 'compact' command ---
+    subparsers.add_parser(
+        "compact", help="Rewrite a local store without its deleted and superseded records."
+    )
+
     # --- 'delete' command (placeholder) ---
-    subparsers.add_parser("delete", help="Delete specific documents (not implemented).")
+    parser_delete = subparsers.add_parser("delete", help="Delete specific documents (not implemented).")
+
+    for sub_parser in [parser_talk, parser_search]:
+        sub_parser.add_argument(
+            "--mode",
+            choices=[mode.value for mode in SearchMode],
+            default=SearchMode.VECTOR.value,
+            help="Retrieval mode: embeddings, BM25 keywords, or both fused by rank.",
+        )
+        sub_parser.add_argument(
+            "--where",
+            help='JSON metadata filter, e.g. \'{"source": "payments.md"}\' or \'{"tags": {"$in": ["ops"]}}\'.',
+        )
+        sub_parser.add_argument(
+            "--mmr",
+            type=float,
+            nargs="?",
+            const=DEFAULT_MMR_LAMBDA,
+            metavar="LAMBDA",
+            help=f"Diversify vector results with MMR; LAMBDA in [0, 1] trades relevance (1) for diversity (0), default {DEFAULT_MMR_LAMBDA}.",
+        )
+        sub_parser.add_argument(
+            "--rerank",
+            type=int,
+            metavar="N",
+            help="Retrieve N candidates and keep the --top-k best by a local reranker (keyword overlap, BM25 and embedding similarity).",
+        )
+        sub_parser.add_argument(
+            "--no-server",
+            action="store_true",
+            help="Answer in this process even when a `serve` is running at RAG_SERVER_URL.",
+        )
+
+    for sub_parser in [parser_save, parser_watch, parser_talk, parser_search]:
+        sub_parser.add_argument(
+            "--index-config",
+            default="{}",
+            help='JSON string with local index options, e.g. \'{"ef_search": 100}\' for hnsw or \'{"nprobe": 32}\' for ivf_pq.',
+        )
 
     # --- Common arguments for all subparsers ---
-    for sub_parser in [parser_save, parser_talk, parser_search, subparsers.choices['clean']]:
+    for sub_parser in [parser_save, parser_watch, parser_talk, parser_search, subparsers.choices['clean'], subparsers.choices['compact'], parser_delete]:
         storage_group = sub_parser.add_mutually_exclusive_group()
         storage_group.add_argument("--local-dir", help="Use local file system storage at this directory.", default="output_chunks")
         storage_group.add_argument("--chroma-collection", help="Use ChromaDB collection with this name.", default="default_collection")
+        sub_parser.add_argument(
+            "--chroma-dir",
+            help="ChromaDB persist directory (default: CHROMA_PERSIST_DIRECTORY or ./chroma_db).",
+        )
 
     return parser
 
@@ -138,6 +558,11 @@ def main():
     parser = setup_arg_parser()
     args = parser.parse_args()
 
+    if args.task == "serve":
+        # The storage options travel with every request, so the server takes none
+        serve(args.host, args.port)
+        return
+
     # Determine storage configuration from common arguments
     # The mutually exclusive group ensures only one is chosen.
     use_local = 'local_dir' in args and args.local_dir != "output_chunks"
@@ -148,11 +573,32 @@ def main():
         storage_type = StorageType.CHROMA
         location = args.chroma_collection
 
-    storage_config = StorageConfig(storage_type=storage_type, location=location)
-
     try:
+        try:
+            index_options = json.loads(getattr(args, "index_config", "{}"))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Error: Invalid JSON in --index-config string. Details: {e}") from e
+
+        index = getattr(args, "index", None)
+        quantization = VectorQuantization(getattr(args, "quantization", VectorQuantization.FLOAT32))
+        if getattr(args, "rescore", False) is True:
+            if quantization == VectorQuantization.FLOAT32:
+                raise ValueError("--rescore needs --quantization float16 or int8.")
+            index_options = {**index_options, "rescore": True}
+        storage_config = StorageConfig(
+            storage_type=storage_type,
+            location=location,
+            quantization=quantization,
+            index_type=LocalIndexType(index) if index else None,
+            index_options=index_options,
+            persist_directory=getattr(args, "chroma_dir", None),
+            shards=getattr(args, "shards", None),
+        )
+
         # --- Task Dispatching ---
         if args.task == "save":
+            if args.clean and args.resume:
+                raise ValueError("--resume continues what is already stored; it cannot be combined with --clean.")
             if args.clean:
                 clean_storage(storage_config)
 
@@ -165,24 +611,60 @@ def main():
             chunk_config = ChunkingConfig(
                 source_path=args.source,
                 strategy=args.strategy,
-                strategy_config=strategy_config_dict
+                strategy_config=strategy_config_dict,
+                resume=args.resume,
             )
             run_chunking(chunk_config, storage_config)
 
+        elif args.task == "watch":
+            try:
+                strategy_config_dict = json.loads(args.config)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Error: Invalid JSON in --config string. Details: {e}") from e
+            chunk_config = ChunkingConfig(
+                source_path=args.source, strategy=args.strategy, strategy_config=strategy_config_dict
+            )
+            run_watch(chunk_config, storage_config, args.interval, args.debounce)
+
         elif args.task in ["talk", "search"]:
-            talk_config = TalkConfig(query=args.query, top_k=args.top_k)
-            if args.task == "talk":
-                run_talk(talk_config, storage_config)
+            try:
+                where = json.loads(args.where) if args.where else None
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Error: Invalid JSON in --where string. Details: {e}") from e
+            validate_where(where)
+
+            queries_file = getattr(args, "queries_file", None)
+            if args.task == "search" and (args.query is None) == (queries_file is None):
+                raise ValueError("Pass either a query or --queries-file.")
+            questions_file = getattr(args, "questions_file", None)
+            if args.task == "talk" and (args.query is None) == (questions_file is None):
+                raise ValueError("Pass either a query or --questions-file.")
+
+            talk_config = TalkConfig(
+                query=args.query, top_k=args.top_k, mode=SearchMode(args.mode), where=where, mmr_lambda=args.mmr,
+                rerank_candidates=args.rerank,
+                context_tokens=getattr(args, "context_tokens", DEFAULT_CONTEXT_TOKEN_BUDGET),
+                compress_tokens=getattr(args, "compress_tokens", None),
+            )
+            if args.task == "talk" and questions_file:
+                run_batch_talk(questions_file, args.concurrency, talk_config, storage_config)
+            elif args.task == "talk":
+                run_talk(talk_config, storage_config, connect_to_server(args.no_server))
+            elif queries_file:
+                run_batch_search(queries_file, talk_config, storage_config)
             else:
-                run_search(talk_config, storage_config)
+                run_search(talk_config, storage_config, connect_to_server(args.no_server))
 
         elif args.task == "clean":
             clean_storage(storage_config)
 
+        elif args.task == "compact":
+            run_compaction(storage_config)
+
         elif args.task == "delete":
             print("Delete functionality is not yet implemented.")
 
-    except (ValueError, FileNotFoundError) as e:
+    except (ValueError, FileNotFoundError, RuntimeError) as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
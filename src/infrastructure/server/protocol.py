@@ -0,0 +1,61 @@
+import os
+from dataclasses import asdict, replace
+from typing import Any, Dict, Tuple
+from domain.models.chunk import Chunk
+from domain.models.cli_config_classes import StorageConfig, TalkConfig
+from domain.models.enums import LocalIndexType, SearchMode, StorageType, VectorQuantization
+from infrastructure.adapters.chunk_stores.chroma_client_registry import resolve_persist_directory
+from infrastructure.adapters.chunk_stores.file_system_chunk_store import DEFAULT_OUTPUT_DIR
+
+# What `cli serve` listens on and the other subcommands look for
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 8765
+
+
+def resolve_storage_paths(storage_config: StorageConfig) -> StorageConfig:
+    """
+    The config with its directories made absolute as the client sees them:
+    the server has its own working directory and environment, so a relative
+    ``--local-dir`` or an unset Chroma directory would point it elsewhere.
+    """
+    location = storage_config.location
+    if storage_config.storage_type == StorageType.LOCAL:
+        location = os.path.abspath(location or DEFAULT_OUTPUT_DIR)
+    return replace(
+        storage_config,
+        location=location,
+        persist_directory=os.path.abspath(resolve_persist_directory(storage_config.persist_directory)),
+    )
+
+
+def encode_request(talk_config: TalkConfig, storage_config: StorageConfig) -> Dict[str, Any]:
+    """The JSON body of a search or talk request; enums travel as their values."""
+    storage_config = resolve_storage_paths(storage_config)
+    storage = asdict(storage_config)
+    storage["storage_type"] = storage_config.storage_type.value
+    storage["quantization"] = VectorQuantization(storage_config.quantization).value
+    storage["index_type"] = storage_config.index_type.value if storage_config.index_type else None
+    talk = asdict(talk_config)
+    talk["mode"] = SearchMode(talk_config.mode).value
+    return {"talk": talk, "storage": storage}
+
+
+def decode_request(body: Dict[str, Any]) -> Tuple[TalkConfig, StorageConfig]:
+    try:
+        talk = dict(body["talk"])
+        storage = dict(body["storage"])
+        talk["mode"] = SearchMode(talk.get("mode", SearchMode.VECTOR.value))
+        storage["storage_type"] = StorageType(storage["storage_type"])
+        storage["quantization"] = VectorQuantization(storage.get("quantization", VectorQuantization.FLOAT32.value))
+        storage["index_type"] = LocalIndexType(storage["index_type"]) if storage.get("index_type") else None
+        return TalkConfig(**talk), StorageConfig(**storage)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Malformed request: {e}") from e
+
+
+def encode_chunk(chunk: Chunk) -> Dict[str, Any]:
+    return {"id": chunk.id, "score": chunk.score, "content": chunk.content, "metadata": chunk.metadata}
+
+
+def decode_chunk(data: Dict[str, Any]) -> Chunk:
+    return Chunk(content=data["content"], metadata=data["metadata"], score=data.get("score"), id=data.get("id"))
@@ -0,0 +1,70 @@
+import json
+import os
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Iterator, List, Optional
+
+from domain.models.chunk import Chunk
+from domain.models.cli_config_classes import StorageConfig, TalkConfig
+from infrastructure.server.protocol import (
+    DEFAULT_SERVER_HOST,
+    DEFAULT_SERVER_PORT,
+    decode_chunk,
+    encode_request,
+)
+
+# How long the CLI waits for a server before running the query itself
+DEFAULT_PROBE_TIMEOUT_SECONDS = 0.2
+
+
+def default_server_url() -> str:
+    return os.getenv("RAG_SERVER_URL", f"http://{DEFAULT_SERVER_HOST}:{DEFAULT_SERVER_PORT}")
+
+
+class RagClient:
+    """Forwards searches and talks to a running `cli serve`."""
+
+    def __init__(self, url: Optional[str] = None, timeout: Optional[float] = None):
+        self.url = (url or default_server_url()).rstrip("/")
+        self.timeout = timeout
+
+    def is_running(self, timeout: float = DEFAULT_PROBE_TIMEOUT_SECONDS) -> bool:
+        try:
+            with urllib.request.urlopen(f"{self.url}/health", timeout=timeout) as response:
+                return response.status == 200
+        except (OSError, ValueError):
+            return False
+
+    def search(self, talk_config: TalkConfig, storage_config: StorageConfig) -> List[Chunk]:
+        with self._post("/search", talk_config, storage_config) as response:
+            body = json.load(response)
+        return [decode_chunk(result) for result in body["results"]]
+
+    def talk(self, talk_config: TalkConfig, storage_config: StorageConfig) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the events of ``RagService.talk`` as the server streams them;
+        raises RuntimeError when the server reports a failure mid-stream.
+        """
+        with self._post("/talk", talk_config, storage_config) as response:
+            for line in response:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if event["type"] == "error":
+                    raise RuntimeError(f"The server at {self.url} failed: {event['error']}")
+                yield event
+
+    def _post(self, path: str, talk_config: TalkConfig, storage_config: StorageConfig):
+        request = urllib.request.Request(
+            f"{self.url}{path}",
+            data=json.dumps(encode_request(talk_config, storage_config)).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            error = json.load(e).get("error", e.reason)
+            if e.code == 400:
+                raise ValueError(error) from e
+            raise RuntimeError(f"The server at {self.url} failed: {error}") from e
@@ -0,0 +1,110 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from infrastructure.server.protocol import (
+    DEFAULT_SERVER_HOST,
+    DEFAULT_SERVER_PORT,
+    decode_request,
+    encode_chunk,
+)
+from infrastructure.server.rag_service import RagService
+
+
+class RagRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON over HTTP: GET /health, POST /search and POST /talk.
+
+    /talk answers with newline-delimited JSON events flushed as they are
+    produced, so the client prints tokens while the model is generating.
+    Bodies are delimited by closing the connection (HTTP/1.0), which keeps
+    the streaming free of chunked transfer encoding. A failure after the
+    stream started is sent as a final ``{"type": "error"}`` event, since the
+    status line is already out.
+    """
+
+    server: "RagServer"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": f"Unknown path '{self.path}'."})
+
+    def do_POST(self):
+        streaming = False
+        try:
+            talk_config, storage_config = decode_request(self._read_json())
+            if self.path == "/search":
+                chunks = self.server.service.search(talk_config, storage_config)
+                self._send_json(200, {"results": [encode_chunk(chunk) for chunk in chunks]})
+            elif self.path == "/talk":
+                events = self.server.service.talk(talk_config, storage_config)
+                # The first event carries the retrieval errors, before the status line is sent
+                first = next(events)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                streaming = True
+                self._write_event(first)
+                for event in events:
+                    self._write_event(event)
+            else:
+                self._send_json(404, {"error": f"Unknown path '{self.path}'."})
+        except Exception as e:
+            if streaming:
+                self._write_event({"type": "error", "error": f"{type(e).__name__}: {e}"})
+                self.close_connection = True
+            elif isinstance(e, (ValueError, FileNotFoundError)):
+                self._send_json(400, {"error": str(e)})
+            else:
+                self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Malformed request: {e}") from e
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _write_event(self, event: Dict[str, Any]) -> None:
+        self.wfile.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class RagServer(ThreadingHTTPServer):
+    """Serves a shared ``RagService``, one thread per request."""
+
+    daemon_threads = True
+
+    def __init__(self, service: RagService, host: str = DEFAULT_SERVER_HOST, port: int = DEFAULT_SERVER_PORT, quiet: bool = False):
+        self.service = service
+        self.quiet = quiet
+        super().__init__((host, port), RagRequestHandler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def serve(host: str = DEFAULT_SERVER_HOST, port: int = DEFAULT_SERVER_PORT, service: Optional[RagService] = None) -> None:
+    """Serves until interrupted."""
+    with RagServer(service or RagService(), host, port) as server:
+        print(f"Serving search and talk on {server.url} (Ctrl+C to stop).", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
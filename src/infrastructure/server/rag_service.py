@@ -0,0 +1,148 @@
+import json
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+
+from application.ports.answer_cache import AnswerCache
+from application.use_cases.compression_use_case import CompressionUseCase
+from application.use_cases.storage_use_case import StorageUseCase
+from application.use_cases.talk_use_case import DEFAULT_CHAT_MODEL, TalkUseCase
+from domain.models.chunk import Chunk
+from domain.models.cli_config_classes import StorageConfig, TalkConfig
+from domain.models.enums import SearchMode, VectorQuantization
+from infrastructure.adapters.answer_caches.ttl_answer_cache import build_answer_cache
+from infrastructure.adapters.embeddings.cached_query_embeddings import build_query_embeddings
+
+
+class RagService:
+    """
+    Runs searches and talks against stores it keeps open.
+
+    Every store is opened once per storage configuration and shares one
+    query embeddings client; the talk chain and the answer cache are built on
+    first use. The CLI uses a fresh service per invocation, while `cli serve`
+    keeps one alive for all requests, which is what removes the cold start.
+    """
+
+    def __init__(
+        self,
+        embeddings: Optional[Embeddings] = None,
+        chat_model: Optional[BaseChatModel] = None,
+        answer_cache: Optional[AnswerCache] = None,
+    ):
+        self._lock = threading.Lock()
+        self._stores: Dict[str, StorageUseCase] = {}
+        self._embeddings = embeddings
+        self._chat_model = chat_model
+        self._talk_use_cases: Dict[Any, TalkUseCase] = {}
+        self._answer_cache = answer_cache
+
+    @property
+    def embeddings(self) -> Embeddings:
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = build_query_embeddings()
+            return self._embeddings
+
+    def storage(self, storage_config: StorageConfig) -> StorageUseCase:
+        key = json.dumps(
+            [
+                storage_config.storage_type.value,
+                storage_config.location,
+                storage_config.persist_directory,
+                VectorQuantization(storage_config.quantization).value,
+                storage_config.index_type.value if storage_config.index_type else None,
+                storage_config.index_options,
+                storage_config.shards,
+            ],
+            sort_keys=True,
+        )
+        embeddings = self.embeddings
+        with self._lock:
+            if key not in self._stores:
+                self._stores[key] = StorageUseCase(
+                    storage_config.storage_type,
+                    storage_config.location,
+                    embeddings=embeddings,
+                    quantization=storage_config.quantization,
+                    index_type=storage_config.index_type,
+                    index_options=storage_config.index_options,
+                    persist_directory=storage_config.persist_directory,
+                    shards=storage_config.shards,
+                )
+            return self._stores[key]
+
+    def talk_use_case(self, context_tokens: Optional[int]) -> TalkUseCase:
+        embeddings = self.embeddings
+        with self._lock:
+            if self._answer_cache is None:
+                self._answer_cache = build_answer_cache(DEFAULT_CHAT_MODEL, embeddings=embeddings)
+            if context_tokens not in self._talk_use_cases:
+                self._talk_use_cases[context_tokens] = TalkUseCase(
+                    context_tokens=context_tokens, chat_model=self._chat_model, answer_cache=self._answer_cache
+                )
+            return self._talk_use_cases[context_tokens]
+
+    def search(
+        self, talk_config: TalkConfig, storage_config: StorageConfig, query_embedding: Optional[List[float]] = None
+    ) -> List[Chunk]:
+        return self.storage(storage_config).search(
+            talk_config.query,
+            talk_config.top_k,
+            talk_config.mode,
+            filter=talk_config.where,
+            mmr_lambda=talk_config.mmr_lambda,
+            rerank_candidates=talk_config.rerank_candidates,
+            query_embedding=query_embedding,
+        )
+
+    def talk(self, talk_config: TalkConfig, storage_config: StorageConfig) -> Iterator[Dict[str, Any]]:
+        """
+        Answers a question as a stream of events: "context" once packed,
+        "compression" when enabled, one "token" per streamed piece and a
+        final "answer" with the latencies.
+        """
+        talk_use_case = self.talk_use_case(talk_config.context_tokens)
+        query_embedding = None
+        if talk_config.compress_tokens is not None and talk_config.mode != SearchMode.LEXICAL:
+            # Embedded once, for retrieval and for scoring the sentences
+            query_embedding = self.storage(storage_config).embed_queries([talk_config.query])[0]
+        context = talk_use_case.pack(self.search(talk_config, storage_config, query_embedding))
+        yield {
+            "type": "context",
+            "passages": len(context.chunks),
+            "tokens": context.tokens,
+            "input_chunks": context.input_chunks,
+            "input_tokens": context.input_tokens,
+        }
+
+        if talk_config.compress_tokens is not None:
+            compression_use_case = CompressionUseCase(self.embeddings, talk_config.compress_tokens)
+            context, report = compression_use_case.compress(talk_config.query, context, query_embedding)
+            yield {
+                "type": "compression",
+                "tokens_before": report.tokens_before,
+                "tokens_after": report.tokens_after,
+                "sentences_before": report.sentences_before,
+                "sentences_after": report.sentences_after,
+                "seconds": report.seconds,
+            }
+
+        pieces = talk_use_case.timed_stream(talk_config.query, context)
+        while True:
+            try:
+                yield {"type": "token", "text": next(pieces)}
+            except StopIteration as finished:
+                answer = finished.value
+                break
+        stats = self._answer_cache.stats()
+        yield {
+            "type": "answer",
+            "first_token_seconds": answer.first_token_seconds,
+            "total_seconds": answer.total_seconds,
+            "cached": answer.cached,
+            "hit_rate": stats.hit_rate,
+            "lookups": stats.lookups,
+        }
@@ -51,8 +51,11 @@ def test_abc_methods_can_be_called_via_super():
         def delete(self, chunk_id: str):
             super().delete(chunk_id)
 
-        def search(self, query_embedding: list[float], top_k: int = 5) -> list[Chunk]:
-            return super().search(query_embedding, top_k)
+        def search(self, query_embedding: list[float], top_k: int = 5, filter: dict = None) -> list[Chunk]:
+            return super().search(query_embedding, top_k, filter)
+
+        def lexical_search(self, query: str, top_k: int = 5, filter: dict = None) -> list[Chunk]:
+            return super().lexical_search(query, top_k, filter)
 
         def clear(self):
             super().clear()
@@ -63,6 +66,7 @@ def test_abc_methods_can_be_called_via_super():
     super_store.get("some_id")
     super_store.delete("some_id")
     super_store.search([0.1])
+    super_store.lexical_search("query")
     super_store.clear()
     # No assertions needed, the goal is simply to execute the code.
 
@@ -119,6 +123,17 @@ def test_search_with_top_k(store: ConcreteTestChunkStore, sample_chunks: list[Ch
     search_results = store.search(query_embedding=[0.1, 0.2], top_k=1)
     assert len(search_results) == 1
 
+def test_search_with_filter(store: ConcreteTestChunkStore, sample_chunks: list[Chunk]):
+    """Tests that search only returns chunks matching the metadata filter."""
+    store.save(sample_chunks)
+    assert store.search([0.1, 0.2], filter={"document_path": "path2"}) == [sample_chunks[1]]
+
+def test_lexical_search(store: ConcreteTestChunkStore, sample_chunks: list[Chunk]):
+    """Tests the mock keyword search functionality."""
+    store.save(sample_chunks)
+    assert store.lexical_search("content 2", top_k=1) == [sample_chunks[0]]
+    assert store.lexical_search("missing") == []
+
 def test_clear(store: ConcreteTestChunkStore, sample_chunks: list[Chunk]):
     """Tests clearing all chunks from the store."""
     store.save(sample_chunks)
@@ -0,0 +1,160 @@
+import asyncio
+from typing import Any, AsyncIterator, List, Optional
+from unittest.mock import MagicMock
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from src.application.use_cases.batch_talk_use_case import BatchTalkUseCase
+from src.application.use_cases.compression_use_case import CompressionUseCase
+from src.application.use_cases.talk_use_case import NO_CONTEXT_ANSWER, TalkUseCase
+from src.domain.models.chunk import Chunk
+from tests.mocks.infrastructure.adapters.embeddings.keyword_embeddings import KeywordEmbeddings
+
+
+class EchoChatModel(BaseChatModel):
+    """Answers with the last word of the prompt after a delay, tracking how many calls overlap."""
+    delay: float = 0.02
+    active: int = 0
+    peak: int = 0
+    fail_on: Optional[str] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "echo"
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        # The template ends with "Answer:", the question sits right before the context
+        prompt = messages[-1].content
+        question = prompt.split("Question:")[1].split("Context:")[0].strip()
+        if question == self.fail_on:
+            raise RuntimeError("model overloaded")
+        return f"answer to {question}"
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._reply(messages)))])
+
+    async def _astream(
+        self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            reply = self._reply(messages)
+        finally:
+            self.active -= 1
+        for word in reply.split(" "):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+
+@pytest.fixture
+def storage():
+    storage = MagicMock()
+
+    async def asearch_many(questions, top_k, mode, filter, mmr_lambda, rerank_candidates, query_embeddings=None):
+        return [[Chunk(content=f"notes about {question}", metadata={"source": f"{question}.md"})] for question in questions]
+
+    storage.asearch_many.side_effect = asearch_many
+    storage.embed_queries.side_effect = KeywordEmbeddings().embed_documents
+    return storage
+
+
+def answer_all(batch_talk, questions):
+    async def collect():
+        return [result async for result in batch_talk.answer_all(questions)]
+    return asyncio.run(collect())
+
+
+def test_answers_every_question_with_bounded_concurrency(storage):
+    model = EchoChatModel()
+    batch_talk = BatchTalkUseCase(storage, TalkUseCase(chat_model=model), concurrency=3, batch_size=4)
+    questions = [f"q{i}" for i in range(10)]
+
+    results = answer_all(batch_talk, questions)
+
+    assert sorted(result.index for result in results) == list(range(10))
+    for result in results:
+        assert result.answer.text.strip() == f"answer to {result.question}"
+        assert result.sources == [f"{result.question}.md"]
+        assert result.answer.first_token_seconds <= result.answer.total_seconds
+    assert model.peak == 3
+    # Ten questions in batches of four
+    assert storage.asearch_many.call_count == 3
+
+
+def test_a_failed_question_does_not_stop_the_batch(storage):
+    batch_talk = BatchTalkUseCase(storage, TalkUseCase(chat_model=EchoChatModel(fail_on="q1")), concurrency=2)
+
+    results = {result.question: result for result in answer_all(batch_talk, ["q0", "q1", "q2"])}
+
+    assert results["q1"].error == "model overloaded"
+    assert results["q1"].answer is None
+    assert results["q0"].answer.text.strip() == "answer to q0"
+    assert results["q2"].answer.text.strip() == "answer to q2"
+
+
+def test_a_failed_retrieval_fails_only_its_questions(storage):
+    search = storage.asearch_many.side_effect
+
+    async def flaky_search(questions, *args, **kwargs):
+        if "q1" in questions:
+            raise ConnectionError("store unavailable")
+        return await search(questions, *args, **kwargs)
+
+    storage.asearch_many.side_effect = flaky_search
+    batch_talk = BatchTalkUseCase(storage, TalkUseCase(chat_model=EchoChatModel()), batch_size=2)
+
+    results = {result.question: result for result in answer_all(batch_talk, ["q0", "q1", "q2", "q3"])}
+
+    assert sorted(result.index for result in results.values()) == [0, 1, 2, 3]
+    assert results["q0"].error == results["q1"].error == "store unavailable"
+    assert results["q2"].answer.text.strip() == "answer to q2"
+    assert results["q3"].answer.text.strip() == "answer to q3"
+
+
+def test_an_unexpected_error_stops_the_batch(storage):
+    talk = TalkUseCase(chat_model=EchoChatModel())
+    talk.aanswer = MagicMock(side_effect=AttributeError("'NoneType' object has no attribute 'text'"))
+    batch_talk = BatchTalkUseCase(storage, talk)
+
+    with pytest.raises(AttributeError):
+        answer_all(batch_talk, ["q0", "q1"])
+
+
+def test_stopping_early_cancels_the_pending_answers(storage):
+    model = EchoChatModel(delay=0.2)
+    batch_talk = BatchTalkUseCase(storage, TalkUseCase(chat_model=model), concurrency=4)
+
+    async def first_then_stop():
+        results = batch_talk.answer_all([f"q{i}" for i in range(4)])
+        first = await anext(results)
+        await results.aclose()
+        return first, [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    first, left_running = asyncio.run(first_then_stop())
+
+    assert first.answer.text.strip() == f"answer to {first.question}"
+    assert left_running == []
+    assert model.active == 0
+
+
+def test_concurrency_must_be_positive(storage):
+    with pytest.raises(ValueError):
+        BatchTalkUseCase(storage, MagicMock(), concurrency=0)
+
+
+def test_compression_is_reported_per_question(storage):
+    embeddings = KeywordEmbeddings()
+    compression = CompressionUseCase(embeddings, token_budget=1, count_tokens=lambda text: len(text.split()))
+    batch_talk = BatchTalkUseCase(storage, TalkUseCase(chat_model=EchoChatModel()), compression_use_case=compression)
+
+    [result] = answer_all(batch_talk, ["q0"])
+
+    # The question embedded for retrieval is reused, only the sentences are embedded again
+    assert embeddings.query_calls == 0
+    assert storage.asearch_many.call_args.kwargs["query_embeddings"] == [KeywordEmbeddings().embed_query("q0")]
+    # "notes about q0" does not fit one token, so nothing is left to answer from
+    assert result.compression.tokens_before == 3
+    assert result.compression.tokens_after == 0
+    assert result.answer.text == NO_CONTEXT_ANSWER
@@ -0,0 +1,67 @@
+import pytest
+from src.application.use_cases.compression_use_case import CompressionUseCase
+from src.domain.models.chunk import Chunk
+from src.domain.services.context_packing import pack_context
+from tests.mocks.infrastructure.adapters.embeddings.keyword_embeddings import KeywordEmbeddings
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+@pytest.fixture
+def context():
+    return pack_context([
+        Chunk(
+            content="The deploy policy needs two approvals. Lunch is at noon. Every deploy is logged.",
+            metadata={"source": "ops.md"},
+        ),
+        Chunk(content="The office has plants. The cache expires hourly.", metadata={"source": "misc.md"}),
+    ], token_budget=None)
+
+
+def test_keeps_the_sentences_closest_to_the_question(context):
+    embeddings = KeywordEmbeddings()
+    compression = CompressionUseCase(embeddings, token_budget=10, count_tokens=count_words)
+
+    compressed, report = compression.compress("What is the deploy policy?", context)
+
+    assert compressed.content == "The deploy policy needs two approvals. Every deploy is logged."
+    assert [chunk.metadata["source"] for chunk in compressed.chunks] == ["ops.md"]
+    assert (report.sentences_before, report.sentences_after) == (5, 2)
+    assert (report.tokens_before, report.tokens_after) == (22, 10)
+    assert report.ratio == pytest.approx(10 / 22)
+    # One batched call for every sentence, one (cacheable) call for the question
+    assert embeddings.document_calls == 1
+    assert embeddings.query_calls == 1
+
+
+def test_reuses_the_query_embedding_of_retrieval(context):
+    embeddings = KeywordEmbeddings()
+    compression = CompressionUseCase(embeddings, token_budget=10, count_tokens=count_words)
+    query = "What is the deploy policy?"
+
+    compressed, _ = compression.compress(query, context, KeywordEmbeddings().embed_query(query))
+
+    assert compressed.content == "The deploy policy needs two approvals. Every deploy is logged."
+    assert embeddings.query_calls == 0
+    assert embeddings.document_calls == 1
+
+
+def test_context_within_budget_is_left_alone(context):
+    embeddings = KeywordEmbeddings()
+    compression = CompressionUseCase(embeddings, token_budget=100, count_tokens=count_words)
+
+    compressed, report = compression.compress("deploy?", context)
+
+    assert compressed is context
+    assert report.ratio == 1.0
+    assert embeddings.document_calls == 0
+
+
+def test_estimated_seconds_saved(context):
+    _, report = CompressionUseCase(KeywordEmbeddings(), token_budget=10, count_tokens=count_words).compress(
+        "deploy policy", context
+    )
+
+    assert report.estimated_seconds_saved(prompt_tokens_per_second=1.0) == pytest.approx(12 - report.seconds)
@@ -0,0 +1,107 @@
+from unittest.mock import MagicMock
+import pytest
+from src.application.use_cases.chunking_use_case import ChunkingUseCase
+from src.application.use_cases.ingestion_use_case import IngestionUseCase
+from src.domain.models.document import Document
+from src.infrastructure.adapters.chunk_stores.file_system_chunk_store import FileSystemChunkStore
+from src.infrastructure.adapters.run_journals.jsonl_run_journal import JsonlRunJournal
+from tests.mocks.infrastructure.adapters.embeddings.keyword_embeddings import KeywordEmbeddings
+
+STRATEGY_CONFIG = {"mode": "character", "chunk_size": 40, "chunk_overlap": 0}
+
+
+class InMemoryLoader:
+    """Serves fixed documents and records which files each load excluded."""
+    def __init__(self, documents):
+        self.documents = documents
+        self.excluded = []
+
+    def load(self, source, exclude=()):
+        self.excluded.append(set(exclude))
+        return [document for document in self.documents if document.metadata["source"] not in exclude]
+
+
+@pytest.fixture
+def loader():
+    return InMemoryLoader([
+        Document(content=" ".join(f"{topic} {i}" for i in range(24)), metadata={"source": f"{topic}.md"})
+        for topic in ["architecture", "api", "deploy", "database"]
+    ])
+
+
+@pytest.fixture
+def embeddings():
+    return KeywordEmbeddings()
+
+
+@pytest.fixture
+def store(tmp_path, embeddings):
+    return FileSystemChunkStore(output_dir=str(tmp_path / "store"), embeddings=embeddings)
+
+
+def make_ingestion(loader, store, tmp_path, fail_on_save=None):
+    storage = MagicMock()
+    saves = []
+
+    def save(chunks):
+        saves.append([chunk.content for chunk in chunks])
+        if len(saves) == fail_on_save:
+            raise RuntimeError("connection lost")
+        store.save(chunks)
+
+    storage.save.side_effect = save
+    journal = JsonlRunJournal(str(tmp_path / "journal.jsonl"))
+    return IngestionUseCase(ChunkingUseCase(loader), storage, journal, batch_size=4), saves
+
+
+def test_ingestion_saves_every_chunk_in_batches(loader, store, tmp_path):
+    ingestion, saves = make_ingestion(loader, store, tmp_path)
+
+    report = ingestion.execute("docs", "length_based", STRATEGY_CONFIG)
+
+    assert report.chunks_saved == sum(len(batch) for batch in saves)
+    assert all(len(batch) <= 4 for batch in saves)
+    assert report.files_completed == 4
+    assert len(store.lexical_search("database", top_k=100)) > 0
+
+
+def test_resume_skips_committed_work_without_re_embedding(loader, store, embeddings, tmp_path):
+    per_file = [
+        len(ChunkingUseCase(loader).chunk([document], "length_based", STRATEGY_CONFIG))
+        for document in loader.documents
+    ]
+    assert per_file[:2] == [10, 4]
+    # In batches of four the third batch completes architecture.md and holds the
+    # first two chunks of api.md, then the fourth save fails
+    interrupted, first_saves = make_ingestion(loader, store, tmp_path, fail_on_save=4)
+    with pytest.raises(RuntimeError):
+        interrupted.execute("docs", "length_based", STRATEGY_CONFIG)
+    embedded_before = embeddings.document_calls
+
+    resumed, resumed_saves = make_ingestion(loader, store, tmp_path)
+    report = resumed.execute("docs", "length_based", STRATEGY_CONFIG, resume=True)
+
+    # Completed files are not even loaded again, and api.md, which the third batch
+    # split, is not chunked again: its chunks come from the journal
+    assert loader.excluded[-1] == {"architecture.md", "api.md"}
+    assert report.files_skipped == 1
+    assert report.chunks_skipped == 2
+    assert report.chunks_saved == sum(per_file) - 12
+    assert embeddings.document_calls == embedded_before + len(resumed_saves)
+    saved_before = {content for batch in first_saves[:3] for content in batch}
+    assert not saved_before & {content for batch in resumed_saves for content in batch}
+
+
+def test_resume_requires_the_same_run(loader, store, tmp_path):
+    ingestion, _ = make_ingestion(loader, store, tmp_path)
+    ingestion.execute("docs", "length_based", STRATEGY_CONFIG)
+
+    with pytest.raises(ValueError, match="different run"):
+        ingestion.execute("docs", "length_based", {**STRATEGY_CONFIG, "chunk_size": 80}, resume=True)
+
+
+def test_resume_without_journal_fails(loader, store, tmp_path):
+    ingestion, _ = make_ingestion(loader, store, tmp_path)
+
+    with pytest.raises(ValueError, match="No ingestion run"):
+        ingestion.execute("docs", "length_based", STRATEGY_CONFIG, resume=True)
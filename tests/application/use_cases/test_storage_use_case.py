@@ -0,0 +1,201 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+import pytest
+from src.application.use_cases.storage_use_case import StorageUseCase
+from src.domain.models.chunk import Chunk
+from src.domain.models.enums import SearchMode, StorageType
+
+
+@pytest.fixture
+def mock_embeddings():
+    embeddings = MagicMock()
+    embeddings.embed_query.return_value = [0.1, 0.2, 0.3]
+    return embeddings
+
+
+@pytest.fixture
+def mock_chroma_store():
+    with patch("src.application.use_cases.storage_use_case.ChromaChunkStore") as mock_store:
+        yield mock_store
+
+
+def test_search_embeds_query_once_and_searches_by_vector(mock_chroma_store, mock_embeddings):
+    use_case = StorageUseCase(StorageType.CHROMA, "collection", embeddings=mock_embeddings)
+
+    use_case.search("What is hexagonal architecture?", top_k=3)
+
+    mock_embeddings.embed_query.assert_called_once_with("What is hexagonal architecture?")
+    mock_chroma_store.return_value.search.assert_called_once_with([0.1, 0.2, 0.3], top_k=3, filter=None)
+
+
+@patch("src.application.use_cases.storage_use_case.build_query_embeddings")
+def test_embeddings_are_created_lazily(mock_build, mock_chroma_store):
+    use_case = StorageUseCase(StorageType.CHROMA, "collection")
+    mock_build.assert_not_called()
+
+    use_case.search("query")
+    use_case.search("query")
+    mock_build.assert_called_once()
+
+
+def test_lexical_search_skips_embeddings(mock_chroma_store, mock_embeddings):
+    use_case = StorageUseCase(StorageType.CHROMA, "collection", embeddings=mock_embeddings)
+
+    use_case.search("VALIDATION_ERROR", top_k=3, mode=SearchMode.LEXICAL)
+
+    mock_embeddings.embed_query.assert_not_called()
+    mock_chroma_store.return_value.lexical_search.assert_called_once_with("VALIDATION_ERROR", top_k=3, filter=None)
+
+
+def test_hybrid_search_fuses_both_rankings(mock_chroma_store, mock_embeddings):
+    store = mock_chroma_store.return_value
+    store.lexical_search.return_value = [
+        Chunk(content="a", metadata={}, score=9.0, id="a"),
+        Chunk(content="b", metadata={}, score=3.0, id="b"),
+    ]
+    store.search.return_value = [
+        Chunk(content="b", metadata={}, score=0.9, id="b"),
+        Chunk(content="c", metadata={}, score=0.8, id="c"),
+    ]
+    use_case = StorageUseCase(StorageType.CHROMA, "collection", embeddings=mock_embeddings)
+
+    results = use_case.search("query", top_k=2, mode=SearchMode.HYBRID)
+
+    assert [chunk.id for chunk in results] == ["b", "a"]
+    store.lexical_search.assert_called_once_with("query", top_k=8, filter=None)
+    store.search.assert_called_once_with([0.1, 0.2, 0.3], top_k=8, filter=None)
+
+
+def test_search_passes_filter_to_every_ranking(mock_chroma_store, mock_embeddings):
+    store = mock_chroma_store.return_value
+    store.lexical_search.return_value = []
+    store.search.return_value = []
+    use_case = StorageUseCase(StorageType.CHROMA, "collection", embeddings=mock_embeddings)
+    where = {"source": "payments.md"}
+
+    use_case.search("query", top_k=2, mode=SearchMode.HYBRID, filter=where)
+
+    store.lexical_search.assert_called_once_with("query", top_k=8, filter=where)
+    store.search.assert_called_once_with([0.1, 0.2, 0.3], top_k=8, filter=where)
+
+
+def test_search_rejects_malformed_filter(mock_chroma_store, mock_embeddings):
+    use_case = StorageUseCase(StorageType.CHROMA, "collection", embeddings=mock_embeddings)
+
+    with pytest.raises(ValueError, match="\\$gt"):
+        use_case.search("query", filter={"source": {"$gt": "a"}})
+    mock_chroma_store.return_value.search.assert_not_called()
+
+
+def test_search_reuses_a_given_query_embedding(mock_chroma_store, mock_embeddings):
+    use_case = StorageUseCase(StorageType.CHROMA, "collection", embeddings=mock_embeddings)
+
+    use_case.search("query", top_k=3, query_embedding=[0.4])
+    use_case.search_many(["first"], top_k=3, query_embeddings=[[0.5]])
+
+    mock_embeddings.embed_query.assert_not_called()
+    mock_embeddings.embed_queries.assert_not_called()
+    mock_chroma_store.return_value.search.assert_called_once_with([0.4], top_k=3, filter=None)
+    mock_chroma_store.return_value.search_many.assert_called_once_with([[0.5]], top_k=3, filter=None)
+
+
+def test_search_many_embeds_all_queries_in_one_call(mock_chroma_store, mock_embeddings):
+    mock_embeddings.embed_queries.return_value = [[0.1], [0.2]]
+    store = mock_chroma_store.return_value
+    store.search_many.return_value = [[Chunk(content="a", metadata={}, id="a")], []]
+    use_case = StorageUseCase(StorageType.CHROMA, "collection", embeddings=mock_embeddings)
+
+    results = use_case.search_many(["first", "second"], top_k=3, filter={"source": "a.md"})
+
+    assert [[chunk.id for chunk in ranking] for ranking in results] == [["a"], []]
+    mock_embeddings.embed_queries.assert_called_once_with(["first", "second"])
+    mock_embeddings.embed_query.assert_not_called()
+    store.search_many.assert_called_once_with([[0.1], [0.2]], top_k=3, filter={"source": "a.md"})
+    store.search.assert_not_called()
+
+
+def test_hybrid_search_many_fuses_per_query(mock_chroma_store, mock_embeddings):
+    mock_embeddings.embed_queries.return_value = [[0.1], [0.2]]
+    store = mock_chroma_store.return_value
+    store.search_many.return_value = [
+        [Chunk(content="b", metadata={}, id="b")],
+        [Chunk(content="c", metadata={}, id="c")],
+    ]
+    store.lexical_search.side_effect = lambda query, top_k, filter: [Chunk(content=query, metadata={}, id=query)]
+    use_case = StorageUseCase(StorageType.CHROMA, "collection", embeddings=mock_embeddings)
+
+    results = use_case.search_many(["x", "y"], top_k=2, mode=SearchMode.HYBRID)
+
+    assert [{chunk.id for chunk in ranking} for ranking in results] == [{"x", "b"}, {"y", "c"}]
+    store.search_many.assert_called_once_with([[0.1], [0.2]], top_k=8, filter=None)
+
+
+def test_mmr_search_diversifies_a_deeper_candidate_pool(mock_chroma_store, mock_embeddings):
+    mock_embeddings.embed_query.return_value = [1.0, 0.0, 0.0]
+    store = mock_chroma_store.return_value
+    store.search.return_value = [
+        Chunk(content="best", metadata={}, score=1.0, id="a", embedding=[1.0, 0.0, 0.0]),
+        Chunk(content="near copy", metadata={}, score=0.99, id="b", embedding=[0.99, 0.01, 0.0]),
+        Chunk(content="different", metadata={}, score=0.7, id="c", embedding=[0.7, 0.0, 0.7]),
+    ]
+    use_case = StorageUseCase(StorageType.CHROMA, "collection", embeddings=mock_embeddings)
+
+    results = use_case.search("query", top_k=2, mmr_lambda=0.3)
+
+    assert [chunk.id for chunk in results] == ["a", "c"]
+    assert [chunk.score for chunk in results] == [1.0, 0.7]
+    assert all(chunk.embedding is None for chunk in results)
+    store.search.assert_called_once_with([1.0, 0.0, 0.0], top_k=8, filter=None, include_embeddings=True)
+
+
+def test_mmr_needs_vector_mode(mock_chroma_store, mock_embeddings):
+    use_case = StorageUseCase(StorageType.CHROMA, "collection", embeddings=mock_embeddings)
+
+    with pytest.raises(ValueError, match="MMR"):
+        use_case.search("query", mode=SearchMode.HYBRID, mmr_lambda=0.5)
+
+
+def test_asearch_many_runs_the_batched_search(mock_chroma_store, mock_embeddings):
+    mock_embeddings.embed_queries.return_value = [[0.1], [0.2]]
+    store = mock_chroma_store.return_value
+    store.search_many.return_value = [[Chunk(content="a", metadata={})], []]
+    use_case = StorageUseCase(StorageType.CHROMA, "collection", embeddings=mock_embeddings)
+
+    rankings = asyncio.run(use_case.asearch_many(["first", "second"], top_k=2))
+
+    assert rankings == store.search_many.return_value
+    store.search_many.assert_called_once_with([[0.1], [0.2]], top_k=2, filter=None)
+
+
+@pytest.mark.parametrize("mode", [SearchMode.VECTOR, SearchMode.LEXICAL, SearchMode.HYBRID])
+def test_rerank_retrieves_candidates_and_keeps_top_k(tmp_path, mode):
+    from src.infrastructure.adapters.chunk_stores.file_system_chunk_store import FileSystemChunkStore
+    from tests.mocks.infrastructure.adapters.embeddings.keyword_embeddings import KeywordEmbeddings
+
+    embeddings = KeywordEmbeddings()
+    use_case = StorageUseCase(StorageType.LOCAL, str(tmp_path), embeddings=embeddings)
+    use_case.chunk_store = FileSystemChunkStore(str(tmp_path), embeddings=embeddings)
+    use_case.save([
+        Chunk(content=text, metadata={"source": f"{i}.md"})
+        for i, text in enumerate(["api error codes", "deploy policy", "api architecture", "database cache", "test api error"])
+    ])
+    use_case.reranker = MagicMock(wraps=use_case.reranker)
+
+    results = use_case.search("api error", top_k=2, mode=mode, rerank_candidates=4)
+
+    pool = use_case.reranker.rerank.call_args.args[2]
+    # Only three chunks contain a query term, so BM25 alone finds fewer candidates
+    assert len(pool) == (3 if mode == SearchMode.LEXICAL else 4)
+    if mode == SearchMode.VECTOR:
+        assert all(chunk.embedding is not None for chunk in pool)
+    assert {chunk.content for chunk in results} == {"api error codes", "test api error"}
+    assert all(chunk.embedding is None for chunk in results)
+
+
+def test_rerank_rejects_mmr_and_small_pools(mock_chroma_store, mock_embeddings):
+    use_case = StorageUseCase(StorageType.CHROMA, "collection", embeddings=mock_embeddings)
+
+    with pytest.raises(ValueError):
+        use_case.search("query", top_k=5, rerank_candidates=3)
+    with pytest.raises(ValueError):
+        use_case.search("query", top_k=2, rerank_candidates=10, mmr_lambda=0.5)
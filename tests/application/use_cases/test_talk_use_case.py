@@ -0,0 +1,78 @@
+import time
+from typing import Any, Iterator, List, Optional
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk
+from src.application.use_cases.talk_use_case import NO_CONTEXT_ANSWER, TalkUseCase
+from src.domain.models.chunk import Chunk
+from src.infrastructure.adapters.answer_caches.ttl_answer_cache import TtlAnswerCache
+
+
+class SlowFakeChatModel(GenericFakeChatModel):
+    """Streams its answer word by word, waiting before each word like a remote model."""
+    delay: float = 0.02
+
+    def _stream(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        for chunk in super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            time.sleep(self.delay)
+            yield chunk
+
+
+def fake_model(answer: str, delay: float = 0.0) -> SlowFakeChatModel:
+    return SlowFakeChatModel(messages=iter([AIMessage(content=answer)]), delay=delay)
+
+
+CHUNKS = [Chunk(content="Payments are retried three times.", metadata={"source": "payments.md"})]
+
+
+def test_execute_answers_from_the_packed_context():
+    talk = TalkUseCase(chat_model=fake_model("Three times."))
+
+    assert talk.execute("How often are payments retried?", CHUNKS) == "Three times."
+
+
+def test_stream_yields_the_answer_in_pieces():
+    talk = TalkUseCase(chat_model=fake_model("They are retried three times."))
+
+    pieces = list(talk.stream("How often?", talk.pack(CHUNKS)))
+
+    assert len(pieces) > 1
+    assert "".join(pieces) == "They are retried three times."
+
+
+def test_answer_streaming_reports_first_token_and_total_latency():
+    talk = TalkUseCase(chat_model=fake_model("one two three four", delay=0.02))
+    received = []
+
+    answer = talk.answer_streaming("Count", talk.pack(CHUNKS), on_token=received.append)
+
+    assert answer.text == "one two three four" == "".join(received)
+    assert 0.02 <= answer.first_token_seconds < answer.total_seconds
+    # Seven streamed pieces: four words and the three spaces between them
+    assert answer.total_seconds >= 7 * 0.02
+
+
+def test_stream_without_context_skips_the_model():
+    talk = TalkUseCase(chat_model=fake_model("unused"))
+
+    assert list(talk.stream("Anything?", talk.pack([]))) == [NO_CONTEXT_ANSWER]
+
+
+def test_cached_answers_skip_the_model():
+    cache = TtlAnswerCache("fake")
+    talk = TalkUseCase(chat_model=fake_model("Three times."), answer_cache=cache)
+    context = talk.pack(CHUNKS)
+
+    first = talk.answer_streaming("How often?", context, on_token=lambda piece: None)
+    # The fake model has a single answer; a second generation would fail
+    second = talk.answer_streaming("how often?", context, on_token=lambda piece: None)
+
+    assert not first.cached
+    assert second.cached and second.text == "Three times."
+    assert talk.answer("How often?", context) == "Three times."
+    assert cache.stats().hits == 2
+
+    # Another context, e.g. after the index changed, misses
+    assert cache.get("How often?", talk.pack(CHUNKS + [Chunk(content="new", metadata={})]).digest) is None
@@ -0,0 +1,202 @@
+from pathlib import Path
+import pytest
+from src.application.use_cases.chunking_use_case import ChunkingUseCase
+from src.application.use_cases.storage_use_case import StorageUseCase
+from src.application.use_cases.watch_use_case import WatchUseCase
+from src.domain.models.document import Document
+from src.domain.models.enums import StorageType
+from src.infrastructure.adapters.chunk_stores.file_system_chunk_store import FileSystemChunkStore
+from src.infrastructure.adapters.file_watchers.polling_file_watcher import PollingFileWatcher
+from src.infrastructure.adapters.watch_manifests.json_watch_manifest_store import JsonWatchManifestStore
+from tests.mocks.infrastructure.adapters.embeddings.keyword_embeddings import KeywordEmbeddings
+
+STRATEGY_CONFIG = {"mode": "character", "chunk_size": 40, "chunk_overlap": 0}
+
+
+class TextFileLoader:
+    """Reads every file of a tree as one document and records the files each load read."""
+    def __init__(self):
+        self.loaded = []
+
+    def load(self, source, exclude=()):
+        paths = [str(path) for path in sorted(Path(source).rglob("*")) if path.is_file() and str(path) not in exclude]
+        self.loaded.append(paths)
+        return [Document(content=Path(path).read_text(), metadata={"source": path}) for path in paths]
+
+
+def write_topic(docs: Path, topic: str, count: int = 12):
+    (docs / f"{topic}.md").write_text(" ".join(f"{topic} {i}" for i in range(count)))
+
+
+@pytest.fixture
+def docs(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for topic in ["architecture", "api", "deploy"]:
+        write_topic(docs, topic)
+    return docs
+
+
+@pytest.fixture
+def embeddings():
+    return KeywordEmbeddings()
+
+
+@pytest.fixture
+def store(tmp_path, embeddings):
+    return FileSystemChunkStore(output_dir=str(tmp_path / "store"), embeddings=embeddings)
+
+
+def make_watch(store, tmp_path, loader=None):
+    storage = StorageUseCase(StorageType.LOCAL, str(tmp_path / "store"), embeddings=store.embeddings)
+    storage.chunk_store = store
+    manifest_store = JsonWatchManifestStore(str(tmp_path / "store" / "watch_manifest.json"))
+    return WatchUseCase(ChunkingUseCase(loader or TextFileLoader()), storage, manifest_store, PollingFileWatcher())
+
+
+def stored_sources(store, topic):
+    return {chunk.metadata["source"] for chunk in store.lexical_search(topic, top_k=100)}
+
+
+def test_first_sync_indexes_every_file_and_an_idle_sync_does_nothing(docs, store, embeddings, tmp_path):
+    watch = make_watch(store, tmp_path)
+
+    first = watch.sync(str(docs), "length_based", STRATEGY_CONFIG)
+    embedded = embeddings.document_calls
+    idle = watch.sync(str(docs), "length_based", STRATEGY_CONFIG)
+
+    assert first.files_indexed == 3 and first.chunks_saved > 0
+    assert stored_sources(store, "deploy") == {str(docs / "deploy.md")}
+    assert not idle.changed
+    assert embeddings.document_calls == embedded
+
+
+def test_changed_file_re_embeds_only_its_new_chunks(docs, store, embeddings, tmp_path):
+    loader = TextFileLoader()
+    watch = make_watch(store, tmp_path, loader)
+    watch.sync(str(docs), "length_based", STRATEGY_CONFIG)
+
+    # The first chunks of api.md keep their content, the tail is rewritten
+    (docs / "api.md").write_text(" ".join(f"api {i}" for i in range(8)) + " database cache")
+    report = watch.sync(str(docs), "length_based", STRATEGY_CONFIG)
+
+    assert loader.loaded[-1] == [str(docs / "api.md")]
+    assert report.files_indexed == 1
+    assert report.chunks_kept > 0
+    assert report.chunks_saved == 1
+    assert report.chunks_deleted > 0
+    assert stored_sources(store, "database") == {str(docs / "api.md")}
+    assert not any("api 11" in chunk.content for chunk in store.lexical_search("api", top_k=100))
+
+
+def test_deleted_file_loses_its_chunks(docs, store, tmp_path):
+    watch = make_watch(store, tmp_path)
+    watch.sync(str(docs), "length_based", STRATEGY_CONFIG)
+
+    (docs / "deploy.md").unlink()
+    report = watch.sync(str(docs), "length_based", STRATEGY_CONFIG)
+
+    assert report.files_removed == 1 and report.chunks_deleted > 0
+    assert stored_sources(store, "deploy") == set()
+    assert stored_sources(store, "architecture") == {str(docs / "architecture.md")}
+
+
+def test_restarted_watch_resumes_from_the_manifest(docs, store, embeddings, tmp_path):
+    make_watch(store, tmp_path).sync(str(docs), "length_based", STRATEGY_CONFIG)
+    embedded = embeddings.document_calls
+    write_topic(docs, "database")
+
+    report = make_watch(store, tmp_path).sync(str(docs), "length_based", STRATEGY_CONFIG)
+
+    assert report.files_indexed == 1
+    assert embeddings.document_calls == embedded + 1
+
+
+def test_new_strategy_config_re_chunks_every_file(docs, store, tmp_path):
+    make_watch(store, tmp_path).sync(str(docs), "length_based", STRATEGY_CONFIG)
+
+    report = make_watch(store, tmp_path).sync(str(docs), "length_based", {**STRATEGY_CONFIG, "chunk_size": 80})
+
+    assert report.files_indexed == 3
+    assert report.chunks_saved > 0 and report.chunks_deleted > 0
+
+
+def test_run_syncs_after_each_settled_change(docs, store, tmp_path):
+    watch = make_watch(store, tmp_path)
+    reports = []
+
+    def on_sync(report):
+        reports.append(report)
+        if len(reports) == 2:
+            raise KeyboardInterrupt
+
+    polls = iter([lambda: write_topic(docs, "database"), lambda: None, lambda: None])
+
+    def sleep(seconds):
+        next(polls, lambda: None)()
+
+    watch.watcher = PollingFileWatcher(interval_seconds=1, debounce_seconds=0, sleep=sleep)
+    with pytest.raises(KeyboardInterrupt):
+        watch.run(str(docs), "length_based", STRATEGY_CONFIG, on_sync=on_sync)
+
+    assert [report.files_indexed for report in reports] == [3, 1]
+
+
+class FlakyLoader(TextFileLoader):
+    """Fails to read the files in ``unreadable``, reporting and skipping them like the markdown loader."""
+    def __init__(self):
+        super().__init__()
+        self.unreadable = set()
+
+    def load(self, source, exclude=()):
+        return [document for document in super().load(source, exclude) if document.metadata["source"] not in self.unreadable]
+
+
+def test_a_file_that_fails_to_load_keeps_its_chunks_and_is_retried(docs, store, tmp_path):
+    loader = FlakyLoader()
+    watch = make_watch(store, tmp_path, loader)
+    watch.sync(str(docs), "length_based", STRATEGY_CONFIG)
+
+    write_topic(docs, "api", count=20)
+    loader.unreadable.add(str(docs / "api.md"))
+    failed = watch.sync(str(docs), "length_based", STRATEGY_CONFIG)
+
+    assert failed.files_skipped == 1 and failed.chunks_deleted == 0
+    assert stored_sources(store, "api") == {str(docs / "api.md")}
+
+    loader.unreadable.clear()
+    retried = watch.sync(str(docs), "length_based", STRATEGY_CONFIG)
+    assert retried.files_indexed == 1 and retried.files_skipped == 0
+    assert any("api 19" in chunk.content for chunk in store.lexical_search("api", top_k=100))
+
+
+def test_run_reports_a_failed_sync_and_keeps_watching(docs, store, tmp_path):
+    watch = make_watch(store, tmp_path)
+    reports = []
+    save = watch.storage_use_case.save
+    failures = iter([ConnectionError("embedding service unavailable")])
+
+    def flaky_save(chunks):
+        failure = next(failures, None)
+        if failure is not None:
+            raise failure
+        save(chunks)
+
+    def on_sync(report):
+        reports.append(report)
+        if len(reports) == 2:
+            raise KeyboardInterrupt
+
+    polls = iter([lambda: write_topic(docs, "database"), lambda: None, lambda: None])
+
+    def sleep(seconds):
+        next(polls, lambda: None)()
+
+    watch.storage_use_case.save = flaky_save
+    watch.watcher = PollingFileWatcher(interval_seconds=1, debounce_seconds=0, sleep=sleep)
+    with pytest.raises(KeyboardInterrupt):
+        watch.run(str(docs), "length_based", STRATEGY_CONFIG, on_sync=on_sync)
+
+    assert reports[0].error == "ConnectionError: embedding service unavailable"
+    # Nothing was committed by the failed sync, so the next one indexes every file
+    assert reports[1].error is None and reports[1].files_indexed == 4
@@ -0,0 +1,91 @@
+import pytest
+from src.domain.models.chunk import Chunk
+from src.domain.services.context_packing import estimate_tokens, pack_context
+from src.domain.strategies.length_based_chunking import LengthBasedChunkingStrategy
+from src.domain.models.document import Document
+
+TEXT = "Payments are retried three times with exponential backoff before the order is cancelled. "
+
+
+def count_words(text: str) -> int:
+    """A token counter that counts words, so budgets in tests are easy to read."""
+    return len(text.split())
+
+
+def test_overlapping_chunks_merge_by_offset():
+    document = Document(content=TEXT * 3, metadata={"source": "payments.md"})
+    chunks = LengthBasedChunkingStrategy(chunk_size=100, chunk_overlap=30).chunk([document])
+    assert len(chunks) > 2
+
+    # Retrieved out of document order, as a ranking would return them
+    packed = pack_context(list(reversed(chunks)), token_budget=None)
+
+    assert [chunk.content for chunk in packed.chunks] == [(TEXT * 3).strip()]
+    assert packed.tokens < packed.input_tokens
+
+
+def test_adjacent_chunks_merge_by_index_and_drop_textual_overlap():
+    chunks = [
+        Chunk(content="retries use exponential backoff and", metadata={"source": "a.md", "chunk_index": 4}, score=0.9),
+        Chunk(content="the deploy policy needs two approvals", metadata={"source": "b.md", "chunk_index": 0}, score=0.8),
+        Chunk(content="exponential backoff and a jittered delay", metadata={"source": "a.md", "chunk_index": 5}, score=0.7),
+    ]
+
+    packed = pack_context(chunks, token_budget=None, count_tokens=count_words)
+
+    assert [chunk.content for chunk in packed.chunks] == [
+        "retries use exponential backoff and a jittered delay",
+        "the deploy policy needs two approvals",
+    ]
+    # A merged passage keeps the best score of its chunks
+    assert packed.chunks[0].score == 0.9
+
+
+def test_non_adjacent_chunks_and_other_sources_stay_apart():
+    chunks = [
+        Chunk(content="first section", metadata={"source": "a.md", "chunk_index": 1}),
+        Chunk(content="third section", metadata={"source": "a.md", "chunk_index": 3}),
+        Chunk(content="second section", metadata={"source": "b.md", "chunk_index": 2}),
+    ]
+
+    packed = pack_context(chunks, token_budget=None)
+
+    assert [chunk.content for chunk in packed.chunks] == ["first section", "third section", "second section"]
+
+
+def test_exact_duplicates_are_dropped():
+    chunks = [
+        Chunk(content="api error codes", metadata={"source": "a.md"}),
+        Chunk(content="api error codes", metadata={"source": "copy.md"}),
+    ]
+
+    packed = pack_context(chunks, token_budget=None)
+
+    assert len(packed.chunks) == 1
+    assert packed.chunks[0].metadata["source"] == "a.md"
+
+
+def test_budget_is_filled_in_score_order():
+    chunks = [
+        Chunk(content="one two three four", metadata={"source": "a.md"}),
+        Chunk(content="five six seven eight nine ten", metadata={"source": "b.md"}),
+        Chunk(content="eleven twelve", metadata={"source": "c.md"}),
+    ]
+
+    packed = pack_context(chunks, token_budget=7, count_tokens=count_words)
+
+    # The second chunk does not fit, but the smaller third one still does
+    assert [chunk.metadata["source"] for chunk in packed.chunks] == ["a.md", "c.md"]
+    assert packed.tokens == 6
+    assert packed.tokens_saved == 6
+    assert packed.content == "one two three four\n\neleven twelve"
+
+
+def test_invalid_budget():
+    with pytest.raises(ValueError):
+        pack_context([], token_budget=0)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcdefgh") == 2
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from src.domain.services.diversification import maximal_marginal_relevance
+
+
+@pytest.fixture
+def candidates():
+    # Two near-copies of the best match and one different, slightly less relevant chunk
+    return [[1.0, 0.0, 0.0], [0.99, 0.01, 0.0], [0.7, 0.0, 0.7], [0.0, 1.0, 0.0]]
+
+
+def test_pure_relevance_keeps_similarity_order(candidates):
+    assert maximal_marginal_relevance([1.0, 0.0, 0.0], candidates, 3, lambda_mult=1.0) == [0, 1, 2]
+
+
+def test_near_duplicates_are_skipped(candidates):
+    assert maximal_marginal_relevance([1.0, 0.0, 0.0], candidates[:3], 2, lambda_mult=0.3) == [0, 2]
+    # Leaning harder on diversity prefers the unrelated chunk over both
+    assert maximal_marginal_relevance([1.0, 0.0, 0.0], candidates, 2, lambda_mult=0.3) == [0, 3]
+
+
+def test_every_candidate_is_picked_once(candidates):
+    picked = maximal_marginal_relevance([1.0, 0.0, 0.0], candidates, 10, lambda_mult=0.3)
+    assert sorted(picked) == [0, 1, 2, 3]
+
+
+def test_scale_does_not_matter(candidates):
+    scaled = (np.asarray(candidates) * np.array([[3.0], [0.5], [2.0], [1.0]])).tolist()
+    assert maximal_marginal_relevance([2.0, 0.0, 0.0], scaled, 2) == maximal_marginal_relevance([1.0, 0.0, 0.0], candidates, 2)
+
+
+def test_invalid_lambda_and_empty_candidates():
+    with pytest.raises(ValueError, match="lambda"):
+        maximal_marginal_relevance([1.0], [[1.0]], 1, lambda_mult=1.5)
+    assert maximal_marginal_relevance([1.0], [], 3) == []
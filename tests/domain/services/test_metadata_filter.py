@@ -0,0 +1,41 @@
+import pytest
+from src.domain.services.metadata_filter import matches_where, validate_where
+
+METADATA = {"source": "api.md", "team": "payments", "tags": ["ops", "api"]}
+
+
+@pytest.mark.parametrize("where, expected", [
+    (None, True),
+    ({"source": "api.md"}, True),
+    ({"source": "api.md", "team": "search"}, False),
+    ({"team": {"$ne": "search"}}, True),
+    ({"team": {"$in": ["search", "payments"]}}, True),
+    ({"team": {"$nin": ["payments"]}}, False),
+    ({"tags": "ops"}, True),
+    ({"tags": {"$in": ["docs", "api"]}}, True),
+    ({"tags": {"$nin": ["api"]}}, False),
+    ({"missing": {"$ne": "x"}}, True),
+    ({"$or": [{"team": "search"}, {"tags": "api"}]}, True),
+    ({"$and": [{"team": "payments"}, {"source": "guide.md"}]}, False),
+])
+def test_matches_where(where, expected):
+    assert matches_where(METADATA, where) is expected
+
+
+@pytest.mark.parametrize("where", [
+    {},
+    ["source"],
+    {"$not": {"source": "a.md"}},
+    {"source": {"$gt": "a"}},
+    {"source": {"$eq": "a", "$ne": "b"}},
+    {"tags": {"$in": "ops"}},
+    {"$and": []},
+    {"$or": [{"source": {"$like": "a"}}]},
+])
+def test_validate_where_rejects_malformed_filters(where):
+    with pytest.raises(ValueError):
+        validate_where(where)
+
+
+def test_validate_where_accepts_chroma_syntax():
+    validate_where({"$and": [{"source": "a.md"}, {"tags": {"$in": ["ops"]}}], "team": {"$ne": "search"}})
@@ -0,0 +1,31 @@
+import pytest
+from src.domain.models.chunk import Chunk
+from src.domain.services.rank_fusion import reciprocal_rank_fusion
+
+
+def chunk(chunk_id: str, score: float = None) -> Chunk:
+    return Chunk(content=f"content {chunk_id}", metadata={}, score=score, id=chunk_id)
+
+
+def test_chunks_found_by_both_rankings_win():
+    lexical = [chunk("a", 12.0), chunk("b", 9.0), chunk("c", 1.0)]
+    vector = [chunk("c", 0.9), chunk("d", 0.8), chunk("b", 0.7)]
+
+    fused = reciprocal_rank_fusion([lexical, vector])
+
+    assert [c.id for c in fused] == ["c", "b", "a", "d"]
+    assert fused[0].score == pytest.approx(1 / 63 + 1 / 61)
+
+
+def test_inputs_are_not_mutated():
+    lexical = [chunk("a", 12.0)]
+    reciprocal_rank_fusion([lexical, []])
+    assert lexical[0].score == 12.0
+
+
+def test_chunks_without_ids_are_matched_by_content():
+    fused = reciprocal_rank_fusion([
+        [Chunk(content="same", metadata={"source": "x.md"})],
+        [Chunk(content="same", metadata={"source": "x.md"})],
+    ])
+    assert len(fused) == 1
@@ -0,0 +1,26 @@
+from src.domain.services.sentence_compression import select_sentences, split_sentences
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def test_split_sentences_on_punctuation_and_lines():
+    text = "Deploys need approval. Who approves? The lead!\n- step one\n\n# Heading"
+
+    assert split_sentences(text) == ["Deploys need approval.", "Who approves?", "The lead!", "- step one", "# Heading"]
+
+
+def test_select_keeps_most_similar_sentences_in_original_order():
+    sentences = ["alpha beta", "gamma", "delta epsilon zeta", "eta"]
+    embeddings = [[0.0, 1.0], [0.9, 0.1], [0.0, 1.0], [1.0, 0.0]]
+
+    assert select_sentences(sentences, [1.0, 0.0], embeddings, 2, count_words) == [1, 3]
+
+
+def test_select_skips_sentences_that_do_not_fit():
+    sentences = ["one two three", "four", "five six"]
+    embeddings = [[1.0, 0.0], [0.5, 0.5], [0.8, 0.2]]
+
+    # The best sentence takes three of four tokens; the third no longer fits but the second does
+    assert select_sentences(sentences, [1.0, 0.0], embeddings, 4, count_words) == [0, 1]
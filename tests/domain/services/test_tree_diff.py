@@ -0,0 +1,13 @@
+from src.domain.models.watch import FileState
+from src.domain.services.tree_diff import diff_tree
+
+
+def test_diff_tree_finds_new_modified_and_removed_files():
+    indexed = {"a.md": FileState(1, 10), "b.md": FileState(1, 10), "c.md": FileState(1, 10)}
+    current = {"a.md": FileState(1, 10), "b.md": FileState(2, 10), "d.md": FileState(1, 5)}
+
+    assert diff_tree(indexed, current) == (["b.md", "d.md"], ["c.md"])
+
+
+def test_file_without_indexed_state_is_always_changed():
+    assert diff_tree({"a.md": None}, {"a.md": FileState(1, 10)}) == (["a.md"], [])
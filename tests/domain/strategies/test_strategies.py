@@ -54,6 +54,12 @@ def test_structure_based_chunking(markdown_document):
     assert "Header 1" in chunks[0].metadata
 
 
+def test_structure_based_chunking_records_header_path():
+    document = Document(content="# Setup\n\nIntro.\n\n## Install\n\nRun it.", metadata={"source": "guide.md"})
+    chunks = StructureBasedChunkingStrategy().chunk([document])
+    assert [chunk.metadata["header_path"] for chunk in chunks] == ["Setup", "Setup > Install"]
+
+
 def test_semantic_chunking(sample_document):
     mock_embedding_model = MagicMock()
     mock_embedding_model.embed_documents.return_value = [
@@ -1,3 +1,4 @@
+import pytest
 from src.domain.models.document import Document
 from src.domain.models.chunk import Chunk
 
@@ -12,3 +13,28 @@ def test_chunk_creation():
     chunk = Chunk(content="Test chunk", metadata={"doc_id": "123", "chunk_index": 0})
     assert chunk.content == "Test chunk"
     assert chunk.metadata == {"doc_id": "123", "chunk_index": 0}
+
+
+def test_chunk_id_is_content_addressed():
+    from src.domain.services.chunk_identity import chunk_id
+
+    first = Chunk(content="Same text", metadata={"source": "a.md", "chunk_index": 0})
+    moved = Chunk(content="Same text", metadata={"source": "a.md", "chunk_index": 7})
+    other_source = Chunk(content="Same text", metadata={"source": "b.md", "chunk_index": 0})
+
+    assert chunk_id(first) == chunk_id(moved)
+    assert chunk_id(first) != chunk_id(other_source)
+    assert chunk_id(Chunk(content="x", metadata={}, id="explicit")) == "explicit"
+
+
+def test_compaction_report_combines_shards():
+    from src.domain.models.compaction import CompactionReport
+
+    combined = CompactionReport.combine([
+        CompactionReport(records=1, bytes_before=100, bytes_after=40, read_seconds_before=4.0, read_seconds_after=2.0),
+        CompactionReport(records=3, bytes_before=300, bytes_after=200, read_seconds_before=2.0, read_seconds_after=1.0),
+    ])
+
+    assert (combined.records, combined.bytes_reclaimed) == (4, 160)
+    assert combined.read_seconds_before == pytest.approx(2.5)
+    assert combined.read_speedup == pytest.approx(2.0)
@@ -0,0 +1,73 @@
+import pytest
+from src.infrastructure.adapters.answer_caches.ttl_answer_cache import TtlAnswerCache
+from tests.mocks.infrastructure.adapters.embeddings.keyword_embeddings import KeywordEmbeddings
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_exact_hit_ignores_case_and_whitespace(clock):
+    cache = TtlAnswerCache("model", clock=clock)
+    cache.put("How do I deploy?", "context-1", "Run the pipeline.")
+
+    assert cache.get("  how do i   DEPLOY? ", "context-1") == "Run the pipeline."
+    assert cache.get("How do I deploy?", "context-2") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 1)
+    assert stats.hit_rate == 0.5
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TtlAnswerCache("model", ttl_seconds=60, clock=clock)
+    cache.put("question", "context", "answer")
+
+    clock.now += 61
+    assert cache.get("question", "context") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TtlAnswerCache("model", max_entries=2, clock=clock)
+    cache.put("first", "context", "1")
+    cache.put("second", "context", "2")
+    cache.get("first", "context")
+    cache.put("third", "context", "3")
+
+    assert cache.get("second", "context") is None
+    assert cache.get("first", "context") == "1"
+    assert cache.get("third", "context") == "3"
+
+
+def test_semantic_hit_needs_similar_question_and_same_context(clock):
+    embeddings = KeywordEmbeddings()
+    cache = TtlAnswerCache("model", embeddings=embeddings, similarity_threshold=0.9, clock=clock)
+    cache.put("What is the deploy policy?", "context", "Two approvals.")
+
+    assert cache.get("Which policy applies to a deploy?", "context") == "Two approvals."
+    assert cache.get("Which policy applies to a deploy?", "other-context") is None
+    assert cache.get("What is the cache policy?", "context") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.semantic_hits, stats.misses) == (0, 1, 2)
+
+
+def test_semantic_layer_requires_embeddings():
+    with pytest.raises(ValueError):
+        TtlAnswerCache("model", similarity_threshold=0.9)
+
+
+def test_answers_persist_across_instances(tmp_path, clock):
+    TtlAnswerCache("model", cache_dir=str(tmp_path), clock=clock).put("question", "context", "answer")
+
+    assert TtlAnswerCache("model", cache_dir=str(tmp_path), clock=clock).get("question", "context") == "answer"
+    assert TtlAnswerCache("other-model", cache_dir=str(tmp_path), clock=clock).get("question", "context") is None
+    clock.now += 2 * 24 * 60 * 60
+    assert TtlAnswerCache("model", cache_dir=str(tmp_path), clock=clock).get("question", "context") is None
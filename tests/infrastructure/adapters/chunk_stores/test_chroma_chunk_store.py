@@ -1,7 +1,7 @@
 from unittest.mock import MagicMock, patch, call
 import pytest
-import os
 from src.domain.models.chunk import Chunk
+from src.domain.services.chunk_identity import chunk_id
 from src.infrastructure.adapters.chunk_stores.chroma_chunk_store import ChromaChunkStore
 
 @pytest.fixture
@@ -20,32 +20,50 @@ def mock_chroma():
         mock_chroma.return_value = mock_vector_store
         yield mock_chroma
 
+@pytest.fixture(autouse=True)
+def mock_get_client():
+    """Mock the shared client registry so no real Chroma client starts"""
+    with patch('src.infrastructure.adapters.chunk_stores.chroma_chunk_store.get_client') as mock_get_client:
+        yield mock_get_client
+
 @pytest.fixture
 def chroma_chunk_store(mock_embedding_model, mock_chroma, tmp_path):
     """Create a ChromaChunkStore with mocked dependencies"""
     store = ChromaChunkStore(collection_name="test_collection", persist_directory=str(tmp_path))
     yield store
 
-def test_initialization(mock_embedding_model, mock_chroma, tmp_path):
-    """Test that ChromaChunkStore initializes correctly"""
+def test_initialization(mock_embedding_model, mock_chroma, mock_get_client, tmp_path):
+    """Test that ChromaChunkStore opens its collection through the shared client on first use"""
     store = ChromaChunkStore(collection_name="test_collection", persist_directory=str(tmp_path))
     
     assert store.collection_name == "test_collection"
     assert store.persist_directory == str(tmp_path)
+    mock_chroma.assert_not_called()
+
+    store.vector_store
     mock_embedding_model.assert_called_once_with(model="models/embedding-001")
+    mock_get_client.assert_called_once_with(str(tmp_path))
     mock_chroma.assert_called_once_with(
         collection_name="test_collection",
-        persist_directory=str(tmp_path),
+        client=mock_get_client.return_value,
         embedding_function=mock_embedding_model.return_value,
     )
 
-def test_initialization_default_params(mock_embedding_model, mock_chroma):
+def test_initialization_default_params(mock_embedding_model, mock_chroma, monkeypatch):
     """Test initialization with default parameters"""
+    monkeypatch.delenv("CHROMA_PERSIST_DIRECTORY", raising=False)
     store = ChromaChunkStore()
     
     assert store.collection_name == "rag_docs"
     assert store.persist_directory == "./chroma_db"
 
+def test_persist_directory_from_environment(mock_embedding_model, mock_chroma, monkeypatch):
+    """Test that CHROMA_PERSIST_DIRECTORY overrides the default directory"""
+    monkeypatch.setenv("CHROMA_PERSIST_DIRECTORY", "/mnt/nvme/chroma")
+
+    assert ChromaChunkStore().persist_directory == "/mnt/nvme/chroma"
+    assert ChromaChunkStore(persist_directory="./other").persist_directory == "./other"
+
 def test_save_chunks(chroma_chunk_store):
     """Test saving chunks to the store"""
     chunks = [
@@ -58,7 +76,7 @@ def test_save_chunks(chroma_chunk_store):
     args, kwargs = chroma_chunk_store.vector_store.add_documents.call_args
     
     assert len(kwargs['documents']) == 2
-    assert kwargs['ids'] == ["path1_0", "path2_1"]
+    assert kwargs['ids'] == [chunk_id(chunk) for chunk in chunks]
     # Verify document content
     assert kwargs['documents'][0].page_content == "content1"
     assert kwargs['documents'][1].page_content == "content2"
@@ -74,7 +92,7 @@ def test_save_chunks_with_missing_metadata(chroma_chunk_store):
     args, kwargs = chroma_chunk_store.vector_store.add_documents.call_args
     
     assert len(kwargs['documents']) == 1
-    assert kwargs['ids'] == ["doc_0"]
+    assert kwargs['ids'] == [chunk_id(chunks[0])]
 
 def test_get_chunk(chroma_chunk_store):
     """Test retrieving a chunk by ID"""
@@ -146,6 +164,11 @@ def test_delete_chunk(chroma_chunk_store):
         where_document=None
     )
 
+def test_delete_many_batches_ids(chroma_chunk_store):
+    chroma_chunk_store._max_batch_size = 2
+    chroma_chunk_store.delete_many(["1", "2", "3"])
+    assert [c.kwargs["ids"] for c in chroma_chunk_store.vector_store.delete.call_args_list] == [["1", "2"], ["3"]]
+
 def test_delete_chunk_with_optional_params(chroma_chunk_store):
     """Test delete method with optional parameters"""
     chroma_chunk_store.delete(
@@ -159,58 +182,67 @@ def test_delete_chunk_with_optional_params(chroma_chunk_store):
         where_document={"content": "test"}
     )
 
-def test_search(chroma_chunk_store):
+def query_results(*rankings):
+    """Chroma query results for rankings of (id, content, metadata, distance) tuples"""
+    return {
+        "ids": [[entry[0] for entry in ranking] for ranking in rankings],
+        "documents": [[entry[1] for entry in ranking] for ranking in rankings],
+        "metadatas": [[entry[2] for entry in ranking] for ranking in rankings],
+        "distances": [[entry[3] for entry in ranking] for ranking in rankings],
+    }
+
+@pytest.fixture
+def collection(chroma_chunk_store):
+    """The mocked Chroma collection, with relevance = 1 - distance"""
+    chroma_chunk_store.vector_store._select_relevance_score_fn.return_value = lambda distance: 1.0 - distance
+    return chroma_chunk_store.vector_store._collection
+
+def test_search(chroma_chunk_store, collection):
     """Test searching for similar chunks"""
-    # Mocking the Document object returned by similarity_search_by_vector
-    mock_doc = MagicMock()
-    mock_doc.page_content = "searched_content"
-    mock_doc.metadata = {"source": "searched_source"}
-    chroma_chunk_store.vector_store.similarity_search_by_vector.return_value = [mock_doc]
+    collection.query.return_value = query_results([("a", "searched_content", {"source": "searched_source"}, 0.25)])
 
     results = chroma_chunk_store.search(query_embedding=[0.1, 0.2, 0.3])
     
     assert len(results) == 1
     assert results[0].content == "searched_content"
     assert results[0].metadata["source"] == "searched_source"
-    chroma_chunk_store.vector_store.similarity_search_by_vector.assert_called_once_with(
-        embedding=[0.1, 0.2, 0.3],
-        k=5,
+    assert results[0].id == "a"
+    assert results[0].score == pytest.approx(0.75)
+    assert results[0].embedding is None
+    collection.query.assert_called_once_with(
+        query_embeddings=[[0.1, 0.2, 0.3]],
+        n_results=5,
         where=None,
-        where_document=None,
+        include=["documents", "metadatas", "distances"],
     )
 
-def test_search_with_optional_params(chroma_chunk_store):
+def test_search_with_optional_params(chroma_chunk_store, collection):
     """Test search method with all optional parameters"""
-    mock_doc = MagicMock()
-    mock_doc.page_content = "searched_content"
-    mock_doc.metadata = {"source": "searched_source"}
-    chroma_chunk_store.vector_store.similarity_search_by_vector.return_value = [mock_doc]
+    results = query_results([("a", "searched_content", {"source": "test"}, 0.5)])
+    results["embeddings"] = [[[1.0, 0.0, 0.0]]]
+    collection.query.return_value = results
 
     results = chroma_chunk_store.search(
         query_embedding=[0.1, 0.2, 0.3],
         top_k=10,
-        where={"source": "test"},
-        where_document={"content": "test"}
+        filter={"source": "test", "team": "ops"},
+        include_embeddings=True,
     )
     
     assert len(results) == 1
-    chroma_chunk_store.vector_store.similarity_search_by_vector.assert_called_once_with(
-        embedding=[0.1, 0.2, 0.3],
-        k=10,
-        where={"source": "test"},
-        where_document={"content": "test"},
+    assert results[0].embedding == [1.0, 0.0, 0.0]
+    collection.query.assert_called_once_with(
+        query_embeddings=[[0.1, 0.2, 0.3]],
+        n_results=10,
+        where={"$and": [{"source": "test"}, {"team": "ops"}]},
+        include=["documents", "metadatas", "distances", "embeddings"],
     )
 
-def test_search_multiple_results(chroma_chunk_store):
-    """Test search returning multiple results"""
-    mock_docs = []
-    for i in range(3):
-        mock_doc = MagicMock()
-        mock_doc.page_content = f"content_{i}"
-        mock_doc.metadata = {"source": f"source_{i}"}
-        mock_docs.append(mock_doc)
-    
-    chroma_chunk_store.vector_store.similarity_search_by_vector.return_value = mock_docs
+def test_search_multiple_results(chroma_chunk_store, collection):
+    """Test search returning multiple results, best first"""
+    collection.query.return_value = query_results(
+        [(f"id_{i}", f"content_{i}", {"source": f"source_{i}"}, 0.1 * i) for i in range(3)]
+    )
 
     results = chroma_chunk_store.search(query_embedding=[0.1, 0.2, 0.3])
     
@@ -218,42 +250,52 @@ def test_search_multiple_results(chroma_chunk_store):
     for i, result in enumerate(results):
         assert result.content == f"content_{i}"
         assert result.metadata["source"] == f"source_{i}"
+    assert [result.score for result in results] == pytest.approx([1.0, 0.9, 0.8])
+
+def test_search_many_sends_one_query_request(chroma_chunk_store, collection):
+    collection.query.return_value = query_results(
+        [("a", "first", {"source": "x.md"}, 0.1), ("b", "second", None, 0.2)],
+        [("c", "third", {"source": "y.md"}, 0.3)],
+    )
+
+    results = chroma_chunk_store.search_many([[0.1, 0.2], [0.3, 0.4]], top_k=2, filter={"source": "x.md", "team": "ops"})
+
+    assert [[chunk.content for chunk in ranking] for ranking in results] == [["first", "second"], ["third"]]
+    assert results[0][1].metadata == {}
+    assert results[1][0].score == pytest.approx(0.7)
+    collection.query.assert_called_once_with(
+        query_embeddings=[[0.1, 0.2], [0.3, 0.4]],
+        n_results=2,
+        where={"$and": [{"source": "x.md"}, {"team": "ops"}]},
+        include=["documents", "metadatas", "distances"],
+    )
 
 def test_clear_collection(mock_embedding_model, mock_chroma, tmp_path):
     """Test clearing a collection successfully"""
     store = ChromaChunkStore(collection_name="test_collection", persist_directory=str(tmp_path))
-    
-    # Reset the mock to clear the initialization call
-    mock_chroma.reset_mock()
+    vector_store = store.vector_store
     
     store.clear()
     
     # Should delete the collection
-    store.vector_store.delete_collection.assert_called_once()
+    vector_store.delete_collection.assert_called_once()
     
-    # Should recreate the vector store
-    mock_chroma.assert_called_once_with(
-        collection_name="test_collection",
-        persist_directory=str(tmp_path),
-        embedding_function=store.embeddings,
-    )
+    # Should reopen the collection lazily on next access
+    mock_chroma.reset_mock()
+    store.vector_store
+    mock_chroma.assert_called_once()
 
 def test_clear_collection_handles_exception(mock_embedding_model, mock_chroma, tmp_path):
     """Test that clear handles exception when collection doesn't exist"""
     store = ChromaChunkStore(collection_name="test_collection", persist_directory=str(tmp_path))
-    store.vector_store.delete_collection.side_effect = Exception("Collection not found")
-    
-    # Reset mock to clear the initialization call
-    mock_chroma.reset_mock()
+    vector_store = store.vector_store
+    vector_store.delete_collection.side_effect = Exception("Collection not found")
     
     # Should not raise an exception
     store.clear()
     
     # Ensure we tried to delete
-    store.vector_store.delete_collection.assert_called_once()
-    
-    # Should NOT recreate the vector store when exception occurs (based on the except: pass logic)
-    mock_chroma.assert_not_called()
+    vector_store.delete_collection.assert_called_once()
 
 @patch('src.infrastructure.adapters.chunk_stores.chroma_chunk_store.shutil.rmtree')
 @patch('src.infrastructure.adapters.chunk_stores.chroma_chunk_store.os.path.exists')
@@ -304,4 +346,83 @@ def test_clear_empty_collection_name(mock_exists, mock_rmtree, mock_embedding_mo
     
     # Empty string is falsy, so should go to else branch
     mock_exists.assert_called_once_with(str(tmp_path))
-    mock_rmtree.assert_called_once_with(str(tmp_path))
\ No newline at end of file
+    mock_rmtree.assert_called_once_with(str(tmp_path))
+def test_lexical_search_reads_ranked_chunks_back_from_chroma(mock_embedding_model, mock_chroma, tmp_path):
+    store = ChromaChunkStore(collection_name="test_collection")
+    store.persist_directory = str(tmp_path)
+    api_chunk = Chunk(content="Return VALIDATION_ERROR for bad input", metadata={"source": "api.md", "chunk_index": 0})
+    store.save([api_chunk, Chunk(content="Deploy on Fridays", metadata={"source": "policy.md", "chunk_index": 0})])
+    mock_chroma.return_value.get.return_value = {
+        "ids": [chunk_id(api_chunk)],
+        "documents": ["Return VALIDATION_ERROR for bad input"],
+        "metadatas": [{"source": "api.md", "chunk_index": 0}],
+    }
+
+    results = store.lexical_search("validation_error", top_k=1, filter={"source": "api.md"})
+
+    mock_chroma.return_value.get.assert_called_once_with(ids=[chunk_id(api_chunk)], where={"source": "api.md"})
+    assert [(chunk.id, chunk.content) for chunk in results] == [(chunk_id(api_chunk), "Return VALIDATION_ERROR for bad input")]
+    assert results[0].score > 0
+
+def test_lexical_search_sends_multi_field_filters_as_and(mock_embedding_model, mock_chroma, tmp_path):
+    store = ChromaChunkStore(collection_name="test_collection")
+    store.persist_directory = str(tmp_path)
+    policy_chunk = Chunk(content="Deploy on Fridays", metadata={"source": "policy.md", "chunk_index": 0})
+    store.save([policy_chunk])
+    mock_chroma.return_value.get.return_value = {"ids": [], "documents": [], "metadatas": []}
+
+    store.lexical_search("deploy", filter={"source": "policy.md", "team": {"$in": ["ops"]}})
+
+    mock_chroma.return_value.get.assert_called_once_with(
+        ids=[chunk_id(policy_chunk)],
+        where={"$and": [{"source": "policy.md"}, {"team": {"$in": ["ops"]}}]},
+    )
+
+def test_save_upserts_in_parallel_batches_with_progress(mock_embedding_model, mock_chroma, tmp_path):
+    progress = MagicMock()
+    store = ChromaChunkStore(collection_name="test_collection", max_batch_size=2, progress=progress)
+    store.persist_directory = str(tmp_path)
+    chunks = [Chunk(content=f"content {i}", metadata={"source": "a.md", "chunk_index": 0}) for i in range(5)]
+
+    store.save(chunks + chunks[:1])
+
+    calls = mock_chroma.return_value.add_documents.call_args_list
+    assert sorted(len(batch.kwargs["ids"]) for batch in calls) == [1, 2, 2]
+    # Same-source chunks with one chunk_index still get distinct ids, and duplicates collapse
+    assert sorted(i for batch in calls for i in batch.kwargs["ids"]) == sorted(chunk_id(chunk) for chunk in chunks)
+    assert progress.call_args_list[-1] == call(5, 5)
+    assert progress.call_count == 3
+
+def test_save_uses_the_client_batch_limit(mock_embedding_model, mock_chroma, tmp_path):
+    mock_chroma.return_value._client.get_max_batch_size.return_value = 3
+    store = ChromaChunkStore(collection_name="test_collection")
+    store.persist_directory = str(tmp_path)
+
+    store.save([Chunk(content=f"content {i}", metadata={}) for i in range(7)])
+
+    assert store.max_batch_size == 3
+    assert mock_chroma.return_value.add_documents.call_count == 3
+
+def test_clear_removes_lexical_index(mock_embedding_model, mock_chroma, tmp_path):
+    store = ChromaChunkStore(collection_name="test_collection")
+    store.persist_directory = str(tmp_path)
+    store.save([Chunk(content="Deploy on Fridays", metadata={"source": "policy.md", "chunk_index": 0})])
+
+    store.clear()
+
+    assert store.lexical_search("deploy") == []
+
+def test_lexical_search_sees_saves_of_other_stores(mock_embedding_model, mock_chroma, tmp_path):
+    reader = ChromaChunkStore(collection_name="test_collection", persist_directory=str(tmp_path))
+    writer = ChromaChunkStore(collection_name="test_collection", persist_directory=str(tmp_path))
+    mock_chroma.return_value.get.return_value = {"ids": [], "documents": [], "metadatas": []}
+    assert reader.lexical_search("deploy") == []
+    policy_chunk = Chunk(content="Deploy on Fridays", metadata={"source": "policy.md", "chunk_index": 0})
+
+    writer.save([policy_chunk])
+    mock_chroma.return_value.get.return_value = {
+        "ids": [chunk_id(policy_chunk)], "documents": ["Deploy on Fridays"], "metadatas": [{"source": "policy.md"}],
+    }
+
+    assert [chunk.id for chunk in reader.lexical_search("deploy")] == [chunk_id(policy_chunk)]
+    assert (tmp_path / "locks" / "test_collection.lock").exists()
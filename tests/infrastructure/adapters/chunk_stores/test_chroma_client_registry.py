@@ -0,0 +1,39 @@
+import pytest
+from src.infrastructure.adapters.chunk_stores.chroma_client_registry import (
+    get_client,
+    release_client,
+    resolve_persist_directory,
+)
+
+
+@pytest.fixture
+def persist_directory(tmp_path):
+    directory = str(tmp_path / "chroma")
+    yield directory
+    release_client(directory)
+
+
+def test_one_client_per_directory(persist_directory, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    client = get_client(persist_directory)
+
+    assert get_client("./chroma") is client
+    assert get_client(persist_directory).get_or_create_collection("team_docs").name == "team_docs"
+    assert [collection.name for collection in client.list_collections()] == ["team_docs"]
+
+
+def test_released_client_is_replaced(persist_directory):
+    client = get_client(persist_directory)
+    release_client(persist_directory)
+
+    assert get_client(persist_directory) is not client
+
+
+def test_resolve_persist_directory(monkeypatch):
+    monkeypatch.delenv("CHROMA_PERSIST_DIRECTORY", raising=False)
+    assert resolve_persist_directory() == "./chroma_db"
+
+    monkeypatch.setenv("CHROMA_PERSIST_DIRECTORY", "/mnt/nvme/chroma")
+    assert resolve_persist_directory() == "/mnt/nvme/chroma"
+    assert resolve_persist_directory("./local") == "./local"
@@ -1,15 +1,37 @@
 
-import json
-import os
-from unittest.mock import MagicMock, mock_open, patch
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
 import pytest
 from pathlib import Path
 from src.domain.models.chunk import Chunk
-from src.infrastructure.adapters.chunk_stores.file_system_chunk_store import FileSystemChunkStore
+from src.infrastructure.adapters.chunk_stores.file_system_chunk_store import (
+    BATCH_JOURNAL_FILE,
+    FileSystemChunkStore,
+)
+from src.infrastructure.adapters.chunk_stores.store_lock import LOCK_FILE
+from src.infrastructure.adapters.vector_indexes.flat_vector_index import id_key
+from src.domain.models.enums import VectorQuantization
+from src.domain.services.chunk_identity import chunk_id
+from tests.mocks.infrastructure.adapters.embeddings.keyword_embeddings import KeywordEmbeddings
 
 @pytest.fixture
-def chunk_store(tmp_path):
-    return FileSystemChunkStore(output_dir=str(tmp_path))
+def embeddings():
+    return KeywordEmbeddings()
+
+@pytest.fixture
+def chunk_store(tmp_path, embeddings):
+    return FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+
+@pytest.fixture
+def indexed_store(chunk_store):
+    chunk_store.save([
+        Chunk(metadata={"chunk_index": 0, "source": "a.md"}, content="architecture architecture guide"),
+        Chunk(metadata={"chunk_index": 1, "source": "a.md"}, content="api error codes"),
+        Chunk(metadata={"chunk_index": 2, "source": "b.md"}, content="deploy policy"),
+        Chunk(metadata={"chunk_index": 3, "source": "b.md"}, content="architecture of the api"),
+    ])
+    return chunk_store
 
 def test_save(chunk_store, tmp_path):
     chunks = [
@@ -18,14 +40,22 @@ def test_save(chunk_store, tmp_path):
     ]
     chunk_store.save(chunks)
 
-    # Verify file content
+    # Verify records are readable by their content-addressed ids
     for chunk in chunks:
-        file_path = tmp_path / f"chunk_{chunk.metadata['chunk_index']}.json"
-        assert file_path.exists()
-        with open(file_path) as f:
-            data = json.load(f)
-            assert data["content"] == chunk.content
-            assert data["metadata"] == chunk.metadata
+        stored = chunk_store.get(chunk_id(chunk))
+        assert stored is not None
+        assert stored.content == chunk.content
+        assert stored.metadata == chunk.metadata
+    assert [p.name for p in (tmp_path / "segments").glob("*.content")] == ["segment_000001.content"]
+
+def test_chunks_with_same_index_do_not_overwrite(chunk_store):
+    chunks = [
+        Chunk(metadata={"chunk_index": 0, "source": "a.md"}, content="first document"),
+        Chunk(metadata={"chunk_index": 0, "source": "b.md"}, content="second document"),
+    ]
+    chunk_store.save(chunks)
+    assert chunk_store.get(chunk_id(chunks[0])).content == "first document"
+    assert chunk_store.get(chunk_id(chunks[1])).content == "second document"
 
 def test_get_is_stubbed(chunk_store):
     assert chunk_store.get("some_id") is None
@@ -52,15 +82,305 @@ def test_initialization_handles_existing_directory(mock_mkdir):
     FileSystemChunkStore(output_dir="existing_dir")
     mock_mkdir.assert_called_once_with(parents=True, exist_ok=True)
 
-@patch("builtins.open", new_callable=mock_open)
-@patch("json.dump")
-def test_save_writes_correct_data(mock_json_dump, mock_file):
-    store = FileSystemChunkStore(output_dir="test_dir")
-    chunks = [Chunk(metadata={"chunk_index": "test_id"}, content="test_content")]
-    store.save(chunks)
-
-    mock_file.assert_called_once_with(Path("test_dir") / "chunk_test_id.json", "w", encoding="utf-8")
-    mock_json_dump.assert_called_once()
-    # More detailed assertions can be added here to check the content of what's being written
-    args, kwargs = mock_json_dump.call_args
-    assert args[0]['content'] == 'test_content'
+def test_save_writes_one_batch_per_file(chunk_store, tmp_path):
+    chunks = [Chunk(metadata={"chunk_index": i}, content=f"test_content {i}") for i in range(3)]
+    with patch("builtins.open", side_effect=open) as spy:
+        chunk_store.save(chunks)
+
+    # One append per segment column and one to the id -> location log
+    appended = [Path(call.args[0]).name for call in spy.call_args_list if call.args[1:2] == ("ab",)]
+    assert sorted(appended) == sorted([
+        "segment_000001.content", "segment_000001.metadata", "segment_000001.ids",
+        "segment_000001.offsets", "index.bin",
+    ])
+
+def test_save_embeds_in_one_batch(chunk_store, embeddings):
+    chunk_store.save([
+        Chunk(metadata={"chunk_index": 0}, content="content1"),
+        Chunk(metadata={"chunk_index": 1}, content="content2"),
+    ])
+    assert embeddings.document_calls == 1
+    assert len(chunk_store.vector_index) == 2
+
+def test_search_returns_best_matches_with_scores(indexed_store, embeddings):
+    results = indexed_store.search(embeddings.embed_query("architecture"), top_k=2)
+
+    assert [chunk.metadata["chunk_index"] for chunk in results] == [0, 3]
+    assert results[0].score > results[1].score
+
+def test_search_with_filter(indexed_store, embeddings):
+    results = indexed_store.search(embeddings.embed_query("architecture"), top_k=2, filter={"source": "b.md"})
+
+    assert [chunk.metadata["chunk_index"] for chunk in results] == [3, 2]
+
+def test_search_can_return_stored_embeddings(indexed_store, embeddings):
+    results = indexed_store.search(embeddings.embed_query("architecture"), top_k=2, include_embeddings=True)
+
+    for chunk in results:
+        assert chunk.embedding == pytest.approx(embeddings.embed_query(chunk.content), abs=1e-6)
+    assert indexed_store.search(embeddings.embed_query("architecture"), top_k=1)[0].embedding is None
+
+def test_search_many_matches_single_searches(indexed_store, embeddings):
+    queries = [embeddings.embed_query(text) for text in ["architecture", "api error", "deploy"]]
+
+    for filter in [None, {"source": "b.md"}]:
+        batched = indexed_store.search_many(queries, top_k=2, filter=filter)
+        expected = [indexed_store.search(query, top_k=2, filter=filter) for query in queries]
+        assert [[chunk.id for chunk in ranking] for ranking in batched] == [[chunk.id for chunk in ranking] for ranking in expected]
+    assert indexed_store.search_many([], top_k=2) == []
+
+def test_search_skips_deleted_chunks(indexed_store, embeddings):
+    deleted = indexed_store.search(embeddings.embed_query("architecture"), top_k=1)[0]
+    indexed_store.delete(deleted.id)
+
+    results = indexed_store.search(embeddings.embed_query("architecture"), top_k=1)
+
+    assert results[0].metadata["chunk_index"] == 3
+    assert indexed_store.get(deleted.id) is None
+    assert len(indexed_store.vector_index) == 3
+
+def test_delete_many_removes_chunks_in_one_write(indexed_store):
+    deleted = [chunk.id for chunk in indexed_store.lexical_search("architecture", top_k=2)]
+
+    indexed_store.delete_many(deleted)
+
+    assert all(indexed_store.get(deleted_id) is None for deleted_id in deleted)
+    assert len(indexed_store.vector_index) == 2
+    assert not {chunk.id for chunk in indexed_store.lexical_search("architecture", top_k=10)} & set(deleted)
+
+def test_resaving_same_chunks_is_idempotent(indexed_store, embeddings):
+    indexed_store.save([Chunk(metadata={"chunk_index": 1, "source": "a.md"}, content="api error codes")])
+
+    results = indexed_store.search(embeddings.embed_query("architecture"), top_k=10)
+
+    assert len(results) == 4
+    assert len(indexed_store.vector_index) == 4
+    assert len(indexed_store.segments) == 4
+
+def test_search_survives_reopen(indexed_store, tmp_path, embeddings):
+    reopened = FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+    results = reopened.search(embeddings.embed_query("deploy"), top_k=1)
+    assert results[0].content == "deploy policy"
+
+@pytest.mark.parametrize("quantization", [VectorQuantization.FLOAT16, VectorQuantization.INT8])
+def test_quantized_search_matches_float32(tmp_path, embeddings, quantization):
+    chunks = [Chunk(metadata={"chunk_index": i}, content=text) for i, text in enumerate(
+        ["architecture guide", "api error", "deploy policy", "database cache", "test policy"]
+    )]
+    exact = FileSystemChunkStore(output_dir=str(tmp_path / "exact"), embeddings=embeddings)
+    quantized = FileSystemChunkStore(output_dir=str(tmp_path / "quantized"), embeddings=embeddings, quantization=quantization)
+    exact.save(chunks)
+    quantized.save(chunks)
+
+    query = embeddings.embed_query("policy")
+    assert [c.content for c in quantized.search(query, top_k=3)] == [c.content for c in exact.search(query, top_k=3)]
+
+def test_clear_removes_vectors(indexed_store, embeddings):
+    indexed_store.clear()
+    assert indexed_store.search(embeddings.embed_query("architecture")) == []
+
+def test_lexical_search_matches_keywords(indexed_store):
+    results = indexed_store.lexical_search("error codes", top_k=2)
+
+    assert [chunk.metadata["chunk_index"] for chunk in results] == [1]
+    assert results[0].score > 0
+
+def test_lexical_search_with_filter_and_delete(indexed_store):
+    indexed_store.delete(indexed_store.lexical_search("architecture", top_k=1)[0].id)
+
+    results = indexed_store.lexical_search("architecture", top_k=2, filter={"source": "b.md"})
+
+    assert [chunk.metadata["chunk_index"] for chunk in results] == [3]
+
+def test_filtered_search_only_scores_indexed_matches(indexed_store, embeddings):
+    search = MagicMock(wraps=indexed_store.vector_index.search)
+    indexed_store.vector_index.search = search
+
+    indexed_store.search(embeddings.embed_query("architecture"), top_k=2, filter={"source": "b.md"})
+
+    allowed_keys = search.call_args.kwargs["allowed_keys"]
+    assert len(allowed_keys) == 2
+
+def test_search_with_tag_and_logical_filters(chunk_store, embeddings):
+    chunk_store.save([
+        Chunk(metadata={"chunk_index": 0, "source": "a.md", "tags": ["ops", "api"]}, content="api error"),
+        Chunk(metadata={"chunk_index": 1, "source": "a.md", "tags": ["docs"]}, content="api guide"),
+        Chunk(metadata={"chunk_index": 2, "source": "b.md", "tags": ["ops"]}, content="deploy api"),
+    ])
+    query = embeddings.embed_query("api")
+
+    tagged = chunk_store.search(query, top_k=5, filter={"tags": {"$in": ["ops"]}})
+    scoped = chunk_store.search(query, top_k=5, filter={"$and": [{"tags": "ops"}, {"source": {"$ne": "b.md"}}]})
+
+    assert sorted(chunk.metadata["chunk_index"] for chunk in tagged) == [0, 2]
+    assert [chunk.metadata["chunk_index"] for chunk in scoped] == [0]
+
+def test_filter_on_unindexed_field_falls_back_to_exact_check(indexed_store, embeddings):
+    results = indexed_store.search(embeddings.embed_query("architecture"), top_k=5, filter={"chunk_index": {"$in": [2, 3]}})
+
+    assert [chunk.metadata["chunk_index"] for chunk in results] == [3, 2]
+
+def test_compact_drops_dead_records_and_keeps_results(indexed_store, embeddings, tmp_path):
+    query = embeddings.embed_query("architecture api")
+    indexed_store.delete(indexed_store.search(embeddings.embed_query("deploy"), top_k=1)[0].id)
+    for _ in range(3):
+        # Re-saving identical chunks supersedes their previous rows
+        indexed_store.save([Chunk(metadata={"chunk_index": 0, "source": "a.md"}, content="architecture architecture guide")])
+    expected = [(chunk.id, chunk.score) for chunk in indexed_store.search(query, top_k=3)]
+    lexical = [chunk.id for chunk in indexed_store.lexical_search("api", top_k=3)]
+    embedding_calls = embeddings.document_calls
+
+    report = indexed_store.compact()
+
+    assert report.records == 3
+    assert report.bytes_reclaimed > 0
+    assert report.read_seconds_before > 0 and report.read_seconds_after > 0
+    assert embeddings.document_calls == embedding_calls
+    assert [(chunk.id, chunk.score) for chunk in indexed_store.search(query, top_k=3)] == [
+        (chunk_id, pytest.approx(score)) for chunk_id, score in expected
+    ]
+    assert [chunk.id for chunk in indexed_store.lexical_search("api", top_k=3)] == lexical
+    assert len(indexed_store.search(query, top_k=3, filter={"source": "b.md"})) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == [LOCK_FILE, "data_000001", "store.json"]
+
+    reopened = FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+    assert [chunk.id for chunk in reopened.search(query, top_k=3)] == [chunk_id for chunk_id, _ in expected]
+    reopened.save([Chunk(metadata={"chunk_index": 9}, content="deploy cache")])
+    assert reopened.compact().records == 4
+    assert sorted(p.name for p in tmp_path.iterdir()) == [LOCK_FILE, "data_000002", "store.json"]
+
+
+def test_compact_keeps_quantization(tmp_path, embeddings):
+    store = FileSystemChunkStore(
+        output_dir=str(tmp_path), embeddings=embeddings, quantization=VectorQuantization.INT8, rescore=True
+    )
+    store.save([Chunk(metadata={}, content=text) for text in ["api error", "deploy policy"]])
+
+    reopened = FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+    reopened.compact()
+
+    assert reopened.vector_index.stored_quantization == VectorQuantization.INT8
+    assert reopened.vector_index.stored_rescore is True
+
+
+def test_compact_aborts_when_the_store_changes(indexed_store, embeddings, tmp_path, monkeypatch):
+    copy_records = FileSystemChunkStore._copy_records
+
+    def save_meanwhile(self, records, vectors):
+        copy_records(self, records, vectors)
+        indexed_store.delete(records[0]["id"])
+
+    monkeypatch.setattr(FileSystemChunkStore, "_copy_records", save_meanwhile)
+
+    with pytest.raises(RuntimeError, match="changed"):
+        indexed_store.compact()
+    assert not (tmp_path / "data_000001").exists()
+    assert (tmp_path / "segments").exists()
+
+
+def test_stores_sharing_a_directory_see_each_others_commits(tmp_path, embeddings):
+    writer = FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+    reader = FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+    chunk = Chunk(metadata={"source": "a.md"}, content="deploy policy")
+
+    writer.save([chunk])
+    assert [found.id for found in reader.search(embeddings.embed_query("deploy"), top_k=1)] == [chunk_id(chunk)]
+
+    reader.delete(chunk_id(chunk))
+    assert writer.get(chunk_id(chunk)) is None
+    assert writer.lexical_search("deploy") == []
+
+
+def test_parallel_writers_lose_no_chunks(tmp_path, embeddings):
+    chunks = [Chunk(metadata={"writer": i % 4}, content=f"shared note {i}") for i in range(40)]
+
+    def ingest(writer):
+        # Every worker opens its own store, as separate processes would
+        store = FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+        for start in range(writer * 10, writer * 10 + 10, 2):
+            store.save(chunks[start:start + 2])
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(ingest, range(4)))
+
+    reopened = FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+    assert all(reopened.get(chunk_id(chunk)) is not None for chunk in chunks)
+    assert len(reopened.lexical_search("shared", top_k=100)) == 40
+    assert len(reopened.search(embeddings.embed_query("note"), top_k=100)) == 40
+
+
+def test_readers_only_see_whole_batches(tmp_path, embeddings):
+    writer = FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+    reader = FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+    done = threading.Event()
+    seen = []
+
+    def read():
+        while not done.is_set():
+            seen.append(len(reader.lexical_search("batch", top_k=1000)))
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    try:
+        for batch in range(20):
+            writer.save([Chunk(metadata={}, content=f"batch {batch} part {part}") for part in range(5)])
+    finally:
+        done.set()
+        thread.join()
+
+    assert seen and all(count % 5 == 0 for count in seen)
+
+
+def test_delete_removes_chunks_from_the_metadata_index(indexed_store, tmp_path, embeddings):
+    [deploy] = indexed_store.lexical_search("deploy", top_k=1)
+    [architecture] = indexed_store.lexical_search("architecture of the api", top_k=1, filter={"source": "b.md"})
+
+    indexed_store.delete(deploy.id)
+
+    reopened = FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+    for store in (indexed_store, reopened):
+        assert store.metadata_index.candidate_keys({"source": "b.md"}).tolist() == [id_key(architecture.id)]
+
+
+def test_a_save_failing_midway_is_completed_by_the_next_store(tmp_path, embeddings, monkeypatch):
+    writer = FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+    chunk = Chunk(metadata={"source": "a.md"}, content="deploy policy")
+
+    def crash(ids, vectors):
+        raise OSError("disk full")
+
+    # The segments, lexical and metadata files are written, the vectors are not
+    monkeypatch.setattr(writer.vector_index, "add", crash)
+    with pytest.raises(OSError, match="disk full"):
+        writer.save([chunk])
+    assert (tmp_path / BATCH_JOURNAL_FILE).exists()
+
+    reader = FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+    assert [found.id for found in reader.search(embeddings.embed_query("deploy"), top_k=1)] == [chunk_id(chunk)]
+    assert [found.id for found in reader.lexical_search("deploy")] == [chunk_id(chunk)]
+    assert not (tmp_path / BATCH_JOURNAL_FILE).exists()
+    # The failed writer reopens its indexes instead of trusting the half-written ones
+    assert [found.id for found in writer.search(embeddings.embed_query("deploy"), top_k=1)] == [chunk_id(chunk)]
+
+
+def test_a_failed_delete_is_completed_before_the_next_write(indexed_store, tmp_path, embeddings, monkeypatch):
+    doomed = indexed_store.lexical_search("api", top_k=1)[0].id
+
+    def crash(ids):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(indexed_store.lexical_index, "delete", crash)
+    with pytest.raises(OSError, match="disk full"):
+        indexed_store.delete(doomed)
+
+    other = FileSystemChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+    other.save([Chunk(metadata={}, content="unrelated note")])
+    assert len(other.lexical_index) == 4  # three of the indexed chunks and the new one
+    assert not (tmp_path / BATCH_JOURNAL_FILE).exists()
+
+
+def test_clear_keeps_the_lock_file(indexed_store, tmp_path):
+    indexed_store.clear()
+
+    assert [path.name for path in tmp_path.iterdir()] == [LOCK_FILE]
+    assert indexed_store.lexical_search("api") == []
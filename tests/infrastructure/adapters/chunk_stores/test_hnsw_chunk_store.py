@@ -0,0 +1,78 @@
+import pytest
+from src.domain.models.chunk import Chunk
+from src.domain.models.enums import LocalIndexType, VectorQuantization
+from src.infrastructure.adapters.chunk_stores.hnsw_chunk_store import HnswChunkStore
+from src.domain.services.chunk_identity import chunk_id
+from src.infrastructure.adapters.chunk_stores.local_chunk_stores import open_local_chunk_store
+from tests.mocks.infrastructure.adapters.embeddings.keyword_embeddings import KeywordEmbeddings
+
+CHUNKS = [
+    Chunk(metadata={"chunk_index": 0, "source": "a.md"}, content="architecture architecture guide"),
+    Chunk(metadata={"chunk_index": 1, "source": "a.md"}, content="api error codes"),
+    Chunk(metadata={"chunk_index": 2, "source": "b.md"}, content="deploy policy"),
+    Chunk(metadata={"chunk_index": 3, "source": "b.md"}, content="architecture of the api"),
+]
+
+@pytest.fixture
+def embeddings():
+    return KeywordEmbeddings()
+
+@pytest.fixture
+def chunk_store(tmp_path, embeddings):
+    store = HnswChunkStore(output_dir=str(tmp_path), embeddings=embeddings, ef_search=16)
+    store.save(CHUNKS)
+    return store
+
+def test_search_returns_best_matches_with_scores(chunk_store, embeddings):
+    results = chunk_store.search(embeddings.embed_query("architecture"), top_k=2)
+
+    assert [chunk.metadata["chunk_index"] for chunk in results] == [0, 3]
+    assert results[0].score > results[1].score
+
+def test_search_with_filter_and_delete(chunk_store, embeddings):
+    chunk_store.delete(chunk_store.search(embeddings.embed_query("architecture"), top_k=1)[0].id)
+
+    results = chunk_store.search(embeddings.embed_query("architecture"), top_k=2, filter={"source": "b.md"})
+
+    assert [chunk.metadata["chunk_index"] for chunk in results] == [3, 2]
+
+def test_quantization_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="float32"):
+        HnswChunkStore(output_dir=str(tmp_path), quantization=VectorQuantization.INT8)
+
+def test_open_uses_recorded_index(chunk_store, tmp_path, embeddings):
+    reopened = open_local_chunk_store(str(tmp_path), embeddings=embeddings, index_options={"ef_search": 32})
+
+    assert reopened.index_type == LocalIndexType.HNSW
+    assert reopened.vector_index.ef_search == 32
+    assert reopened.search(embeddings.embed_query("deploy"), top_k=1)[0].content == "deploy policy"
+
+def test_open_defaults_to_flat(tmp_path):
+    assert open_local_chunk_store(str(tmp_path / "new")).index_type == LocalIndexType.FLAT
+
+def test_open_rejects_a_different_index(chunk_store, tmp_path):
+    with pytest.raises(ValueError, match="holds a 'hnsw' index"):
+        open_local_chunk_store(str(tmp_path), index_type=LocalIndexType.FLAT)
+
+def test_open_rejects_unknown_options(tmp_path):
+    with pytest.raises(ValueError, match="ef_search"):
+        open_local_chunk_store(str(tmp_path), index_type=LocalIndexType.FLAT, index_options={"ef_search": 10})
+
+def test_clear_forgets_index_type(chunk_store, tmp_path):
+    chunk_store.clear()
+    assert open_local_chunk_store(str(tmp_path), index_type=LocalIndexType.FLAT).index_type == LocalIndexType.FLAT
+
+
+def test_compact_rebuilds_the_graph_with_its_parameters(tmp_path, embeddings):
+    store = HnswChunkStore(output_dir=str(tmp_path), embeddings=embeddings, m=4)
+    chunks = [Chunk(metadata={"chunk_index": i}, content=text) for i, text in enumerate(["api error", "deploy policy", "test cache"])]
+    store.save(chunks)
+    store.delete(chunk_id(chunks[1]))
+
+    reopened = HnswChunkStore(output_dir=str(tmp_path), embeddings=embeddings)
+    report = reopened.compact()
+
+    assert report.records == 2
+    assert reopened.vector_index.m == 4
+    assert len(reopened.vector_index) == 2
+    assert reopened.search(embeddings.embed_query("api"), top_k=1)[0].content == "api error"
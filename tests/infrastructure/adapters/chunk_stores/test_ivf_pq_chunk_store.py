@@ -0,0 +1,47 @@
+import pytest
+from src.domain.models.chunk import Chunk
+from src.domain.models.enums import LocalIndexType, VectorQuantization
+from src.infrastructure.adapters.chunk_stores.ivf_pq_chunk_store import IvfPqChunkStore
+from src.infrastructure.adapters.chunk_stores.local_chunk_stores import open_local_chunk_store
+from tests.mocks.infrastructure.adapters.embeddings.keyword_embeddings import KeywordEmbeddings
+
+@pytest.fixture
+def embeddings():
+    return KeywordEmbeddings()
+
+@pytest.fixture
+def chunk_store(tmp_path, embeddings):
+    store = open_local_chunk_store(
+        str(tmp_path), index_type=LocalIndexType.IVF_PQ, embeddings=embeddings, index_options={"nprobe": 4}
+    )
+    store.save([
+        Chunk(metadata={"chunk_index": 0, "source": "a.md"}, content="architecture architecture guide"),
+        Chunk(metadata={"chunk_index": 1, "source": "a.md"}, content="api error codes"),
+        Chunk(metadata={"chunk_index": 2, "source": "b.md"}, content="deploy policy"),
+        Chunk(metadata={"chunk_index": 3, "source": "b.md"}, content="architecture of the api"),
+    ])
+    return store
+
+def test_search_returns_best_matches_with_scores(chunk_store, embeddings):
+    results = chunk_store.search(embeddings.embed_query("architecture"), top_k=2)
+
+    assert [chunk.metadata["chunk_index"] for chunk in results] == [0, 3]
+    assert results[0].score > results[1].score
+
+def test_search_with_filter_and_delete(chunk_store, embeddings):
+    chunk_store.delete(chunk_store.search(embeddings.embed_query("architecture"), top_k=1)[0].id)
+
+    results = chunk_store.search(embeddings.embed_query("architecture"), top_k=2, filter={"source": "b.md"})
+
+    assert [chunk.metadata["chunk_index"] for chunk in results] == [3, 2]
+
+def test_reopen_keeps_index_and_takes_query_options(chunk_store, tmp_path, embeddings):
+    reopened = open_local_chunk_store(str(tmp_path), embeddings=embeddings, index_options={"nprobe": 1})
+
+    assert reopened.index_type == LocalIndexType.IVF_PQ
+    assert reopened.vector_index.nprobe == 1
+    assert reopened.search(embeddings.embed_query("deploy"), top_k=1)[0].content == "deploy policy"
+
+def test_quantization_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="quantizes vectors itself"):
+        IvfPqChunkStore(output_dir=str(tmp_path), quantization=VectorQuantization.INT8)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from src.infrastructure.adapters.chunk_stores.metadata_index import MetadataIndex
+from src.infrastructure.adapters.vector_indexes.flat_vector_index import id_key
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = MetadataIndex(str(tmp_path / "metadata"))
+    index.add(["a", "b"], [
+        {"source": "api.md", "tags": ["ops", "api"]},
+        {"source": "guide.md", "tags": ["docs"]},
+    ])
+    index.add(["c"], [{"source": "api.md", "header_path": "Setup > Install"}])
+    return index
+
+
+def keys(*ids):
+    return sorted(id_key(chunk_id) for chunk_id in ids)
+
+
+def test_equality_and_in_conditions(index):
+    assert index.candidate_keys({"source": "api.md"}).tolist() == keys("a", "c")
+    assert index.candidate_keys({"tags": {"$in": ["docs", "api"]}}).tolist() == keys("a", "b")
+    assert index.candidate_keys({"header_path": "Setup > Install"}).tolist() == keys("c")
+    assert index.candidate_keys({"source": "missing.md"}).tolist() == []
+
+
+def test_logical_operators(index):
+    assert index.candidate_keys({"source": "api.md", "tags": "ops"}).tolist() == keys("a")
+    assert index.candidate_keys({"$or": [{"source": "guide.md"}, {"tags": "ops"}]}).tolist() == keys("a", "b")
+    assert index.candidate_keys({"$and": [{"source": "api.md"}, {"chunk_index": 2}]}).tolist() == keys("a", "c")
+
+
+@pytest.mark.parametrize("where", [
+    None,
+    {"chunk_index": 2},
+    {"source": {"$ne": "api.md"}},
+    {"$or": [{"source": "api.md"}, {"chunk_index": 2}]},
+])
+def test_unindexable_filters_do_not_narrow(index, where):
+    assert index.candidate_keys(where) is None
+
+
+def test_postings_survive_reopen(index, tmp_path):
+    reopened = MetadataIndex(str(tmp_path / "metadata"))
+    assert reopened.candidate_keys({"tags": "ops"}).dtype == np.uint64
+    assert reopened.candidate_keys({"tags": "ops"}).tolist() == keys("a")
+
+
+def test_deleted_chunks_leave_the_candidates_until_saved_again(index, tmp_path):
+    index.delete(["a"])
+    assert index.candidate_keys({"source": "api.md"}).tolist() == keys("c")
+    assert MetadataIndex(str(tmp_path / "metadata")).candidate_keys({"tags": "ops"}).tolist() == []
+
+    index.add(["a"], [{"source": "api.md", "tags": ["ops"]}])
+    assert index.candidate_keys({"tags": "ops"}).tolist() == keys("a")
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from src.infrastructure.adapters.chunk_stores import segment_log
+from src.infrastructure.adapters.chunk_stores.segment_log import SegmentLog
+
+
+@pytest.fixture
+def log(tmp_path):
+    return SegmentLog(str(tmp_path / "segments"))
+
+
+def test_append_and_get(log):
+    log.append([("a", "alpha", {"n": 1}), ("b", "béta", {"n": 2})])
+
+    assert log.get("b") == {"id": "b", "content": "béta", "metadata": {"n": 2}}
+    assert log.get("a")["content"] == "alpha"
+    assert log.get("missing") is None
+    assert len(log) == 2
+
+
+def test_columns_are_zero_copy_views(log):
+    log.append([("a", "alpha", {"n": 1}), ("b", "", {})])
+    segment, row = log.locate("a")
+    reader = log.reader(segment)
+
+    view = reader.content_view(row)
+    assert isinstance(view, memoryview)
+    assert bytes(view) == b"alpha"
+    assert reader.content(log.locate("b")[1]) == ""
+    assert len(reader) == 2
+
+
+def test_latest_record_wins(log):
+    log.append([("a", "old", {})])
+    log.append([("a", "new", {})])
+    assert log.get("a")["content"] == "new"
+    assert len(log) == 1
+
+
+def test_delete_writes_tombstone(log):
+    log.append([("a", "alpha", {}), ("b", "beta", {})])
+    log.delete(["a"])
+    assert log.get("a") is None
+    assert len(log) == 1
+
+    log.append([("a", "revived", {})])
+    assert log.get("a")["content"] == "revived"
+
+
+def test_rolls_over_to_new_segment(tmp_path):
+    log = SegmentLog(str(tmp_path), max_segment_bytes=50)
+    log.append([("a", "x" * 60, {})])
+    log.append([("b", "y", {})])
+
+    assert log.segments() == [1, 2]
+    assert log.get("a")["content"] == "x" * 60
+    assert log.get("b") == {"id": "b", "content": "y", "metadata": {}}
+
+
+def test_index_is_folded_into_sorted_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(segment_log, "MIN_SORTED_TAIL", 4)
+    log = SegmentLog(str(tmp_path))
+    log.append([(f"id{i}", f"content {i}", {"i": i}) for i in range(5)])
+    log.delete(["id1"])
+    log.append([("id0", "updated", {})])
+
+    snapshots = list(tmp_path.glob("index.sorted.*.bin"))
+    assert [p.name for p in snapshots] == ["index.sorted.5.bin"]
+
+    reopened = SegmentLog(str(tmp_path))
+    assert reopened.get("id0")["content"] == "updated"
+    assert reopened.get("id1") is None
+    assert reopened.get("id4")["metadata"] == {"i": 4}
+    assert isinstance(reopened._sorted, np.memmap)
+
+
+def test_iterates_live_records_in_order(log):
+    log.append([("a", "alpha", {}), ("b", "beta", {})])
+    log.append([("c", "gamma", {})])
+    log.delete(["b"])
+    assert [record["id"] for record in log] == ["a", "c"]
@@ -0,0 +1,116 @@
+import pytest
+from src.domain.models.chunk import Chunk
+from src.domain.models.enums import StorageType
+from src.domain.services.chunk_identity import chunk_id
+from src.infrastructure.adapters.chunk_stores.file_system_chunk_store import FileSystemChunkStore
+from src.infrastructure.adapters.chunk_stores.sharded_chunk_store import (
+    ShardedChunkStore,
+    open_sharded_chunk_store,
+    shard_index,
+)
+from tests.mocks.infrastructure.adapters.embeddings.keyword_embeddings import KeywordEmbeddings
+
+TEXTS = [
+    "architecture architecture guide", "api error codes", "deploy policy", "architecture of the api",
+    "database cache", "test policy", "api cache error", "deploy architecture", "error policy",
+]
+
+
+@pytest.fixture
+def embeddings():
+    return KeywordEmbeddings()
+
+
+@pytest.fixture
+def chunks():
+    return [Chunk(metadata={"chunk_index": i, "source": f"{i % 2}.md"}, content=text) for i, text in enumerate(TEXTS)]
+
+
+@pytest.fixture
+def sharded_store(tmp_path, embeddings, chunks):
+    store = open_sharded_chunk_store(StorageType.LOCAL, str(tmp_path / "sharded"), shards=3, embeddings=embeddings)
+    store.save(chunks)
+    return store
+
+
+def test_chunks_are_partitioned_by_id(sharded_store, chunks):
+    assert sum(len(shard.segments) for shard in sharded_store.shards) == len(chunks)
+    for chunk in chunks:
+        owner = sharded_store.shards[shard_index(chunk_id(chunk), 3)]
+        assert owner.get(chunk_id(chunk)).content == chunk.content
+        assert sharded_store.get(chunk_id(chunk)).content == chunk.content
+
+
+def test_fan_out_search_matches_a_single_store(sharded_store, tmp_path, embeddings, chunks):
+    single = FileSystemChunkStore(str(tmp_path / "single"), embeddings=embeddings)
+    single.save(chunks)
+    query = embeddings.embed_query("architecture api")
+
+    expected = single.search(query, top_k=4)
+    results = sharded_store.search(query, top_k=4)
+
+    # Tied scores may come back in either order
+    assert [chunk.score for chunk in results] == pytest.approx([chunk.score for chunk in expected])
+    assert {chunk.content for chunk in results} == {chunk.content for chunk in expected}
+    filtered = sharded_store.search(query, top_k=4, filter={"source": "1.md"})
+    assert {c.content for c in filtered} == {c.content for c in single.search(query, top_k=4, filter={"source": "1.md"})}
+
+def test_search_many_merges_each_query(sharded_store, embeddings):
+    queries = [embeddings.embed_query(text) for text in ["architecture api", "policy"]]
+
+    results = sharded_store.search_many(queries, top_k=3)
+
+    for query, ranking in zip(queries, results):
+        expected = sharded_store.search(query, top_k=3)
+        assert [chunk.score for chunk in ranking] == pytest.approx([chunk.score for chunk in expected])
+
+def test_lexical_search_and_delete(sharded_store, chunks):
+    sharded_store.delete(chunk_id(chunks[2]))
+
+    results = sharded_store.lexical_search("deploy", top_k=5)
+
+    assert [chunk.content for chunk in results] == ["deploy architecture"]
+
+def test_delete_many_removes_from_every_owning_shard(sharded_store, chunks):
+    sharded_store.delete_many([chunk_id(chunk) for chunk in chunks[1:]])
+
+    assert all(sharded_store.get(chunk_id(chunk)) is None for chunk in chunks[1:])
+    assert sharded_store.get(chunk_id(chunks[0])) is not None
+
+
+def test_layout_is_recorded(sharded_store, tmp_path, embeddings):
+    reopened = open_sharded_chunk_store(StorageType.LOCAL, str(tmp_path / "sharded"), embeddings=embeddings)
+    assert len(reopened.shards) == 3
+
+    with pytest.raises(ValueError, match="split into 3 shards"):
+        open_sharded_chunk_store(StorageType.LOCAL, str(tmp_path / "sharded"), shards=4)
+    assert open_sharded_chunk_store(StorageType.LOCAL, str(tmp_path / "plain")) is None
+
+
+def test_clear_removes_every_shard_and_the_layout(sharded_store, tmp_path, embeddings):
+    sharded_store.clear()
+
+    assert sharded_store.search(embeddings.embed_query("architecture")) == []
+    assert open_sharded_chunk_store(StorageType.LOCAL, str(tmp_path / "sharded")) is None
+
+
+def test_unscored_rankings_are_interleaved_by_rank():
+    class RankedStore(FileSystemChunkStore):
+        def __init__(self, names):
+            self.names = names
+
+        def search(self, query_embedding, top_k=5, filter=None, include_embeddings=False):
+            return [Chunk(content=name, metadata={}) for name in self.names][:top_k]
+
+    store = ShardedChunkStore([RankedStore(["a1", "a2", "a3"]), RankedStore(["b1"])])
+
+    assert [chunk.content for chunk in store.search([0.1], top_k=3)] == ["a1", "b1", "a2"]
+
+
+def test_compact_covers_every_shard(sharded_store, chunks):
+    sharded_store.delete(chunk_id(chunks[0]))
+
+    report = sharded_store.compact()
+
+    assert report.records == len(chunks) - 1
+    assert all((shard.output_dir / "data_000001").exists() for shard in sharded_store.shards)
@@ -0,0 +1,80 @@
+import os
+import threading
+import pytest
+from src.infrastructure.adapters.chunk_stores.store_lock import StoreLock, claim
+
+
+@pytest.fixture
+def lock(tmp_path):
+    return StoreLock(str(tmp_path / "store" / ".store.lock"))
+
+
+def test_every_exclusive_section_bumps_the_generation(lock):
+    assert lock.generation() == 0
+    with lock.shared() as generation:
+        assert generation == 0
+    with lock.exclusive() as generation:
+        assert generation == 0
+    with lock.exclusive():
+        pass
+
+    assert lock.generation() == 2
+    with lock.shared() as generation:
+        assert generation == 2
+
+
+def test_sections_are_reentrant_within_a_thread(lock):
+    with lock.exclusive() as generation:
+        with lock.shared() as nested:
+            assert nested == generation
+        with lock.exclusive() as nested:
+            assert nested == generation
+
+    assert lock.generation() == 1
+    with lock.shared():
+        with pytest.raises(RuntimeError, match="cannot be upgraded"):
+            with lock.exclusive():
+                pass
+
+
+def test_writers_wait_for_each_other(lock):
+    entered = threading.Event()
+    release = threading.Event()
+    events = []
+
+    def hold():
+        with lock.exclusive():
+            entered.set()
+            release.wait()
+            events.append("first")
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    entered.wait()
+
+    def write():
+        with lock.exclusive():
+            events.append("second")
+
+    second = threading.Thread(target=write)
+    second.start()
+    second.join(0.2)
+    assert events == []
+    release.set()
+    thread.join()
+    second.join()
+
+    assert events == ["first", "second"]
+    assert lock.generation() == 2
+
+
+def test_claim_fails_while_held(tmp_path):
+    path = str(tmp_path / "run.lock")
+    fd = claim(path)
+
+    assert fd is not None
+    assert claim(path) is None
+    os.close(fd)
+    again = claim(path)
+    assert again is not None
+    os.close(again)
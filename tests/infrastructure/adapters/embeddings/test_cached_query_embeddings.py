@@ -0,0 +1,91 @@
+from unittest.mock import MagicMock
+import pytest
+from src.infrastructure.adapters.embeddings.cached_query_embeddings import (
+    CachedQueryEmbeddings,
+    normalize_query,
+)
+
+
+@pytest.fixture
+def mock_embeddings():
+    """Embeddings model whose vectors depend on the query length"""
+    embeddings = MagicMock()
+    embeddings.embed_query.side_effect = lambda text: [float(len(text)), 1.0]
+    embeddings.embed_documents.side_effect = lambda texts: [[1.0, 0.0] for _ in texts]
+    return embeddings
+
+
+def test_normalize_query():
+    assert normalize_query("  What IS   Hexagonal\tArchitecture? ") == "what is hexagonal architecture?"
+
+
+def test_repeated_query_skips_model(mock_embeddings):
+    cache = CachedQueryEmbeddings(mock_embeddings, model_name="test-model")
+
+    first = cache.embed_query("What is HNSW?")
+    second = cache.embed_query("  what is   hnsw? ")
+
+    assert first == second
+    mock_embeddings.embed_query.assert_called_once_with("What is HNSW?")
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cached_vector_is_not_shared_with_callers(mock_embeddings):
+    cache = CachedQueryEmbeddings(mock_embeddings, model_name="test-model")
+    cache.embed_query("query").append(99.0)
+    assert cache.embed_query("query") == [5.0, 1.0]
+
+
+def test_lru_evicts_oldest_entry(mock_embeddings):
+    cache = CachedQueryEmbeddings(mock_embeddings, model_name="test-model", max_entries=2)
+
+    cache.embed_query("a")
+    cache.embed_query("b")
+    cache.embed_query("a")  # refreshes "a"
+    cache.embed_query("c")  # evicts "b"
+    cache.embed_query("a")
+    cache.embed_query("b")
+
+    called_with = [call.args[0] for call in mock_embeddings.embed_query.call_args_list]
+    assert called_with == ["a", "b", "c", "b"]
+
+
+def test_keys_depend_on_model(mock_embeddings):
+    first = CachedQueryEmbeddings(mock_embeddings, model_name="model-a")
+    second = CachedQueryEmbeddings(mock_embeddings, model_name="model-b")
+    assert first.cache_key("query") != second.cache_key("query")
+    assert first.cache_key("Query ") == first.cache_key("query")
+
+
+def test_disk_cache_survives_new_instance(mock_embeddings, tmp_path):
+    CachedQueryEmbeddings(mock_embeddings, model_name="test-model", cache_dir=str(tmp_path)).embed_query("query")
+
+    reopened = CachedQueryEmbeddings(mock_embeddings, model_name="test-model", cache_dir=str(tmp_path))
+    assert reopened.embed_query("QUERY") == [5.0, 1.0]
+    mock_embeddings.embed_query.assert_called_once()
+    assert reopened.hits == 1
+
+
+def test_embed_documents_is_not_cached(mock_embeddings):
+    cache = CachedQueryEmbeddings(mock_embeddings, model_name="test-model")
+    cache.embed_documents(["a", "b"])
+    cache.embed_documents(["a", "b"])
+    assert mock_embeddings.embed_documents.call_count == 2
+
+
+def test_embed_queries_batches_only_cache_misses():
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    model = MagicMock(spec=GoogleGenerativeAIEmbeddings)
+    model.embed_query.side_effect = lambda text: [float(len(text)), 1.0]
+    model.embed_documents.side_effect = lambda texts, task_type=None: [[float(len(text)), 1.0] for text in texts]
+    cache = CachedQueryEmbeddings(model, model_name="test-model")
+    cache.embed_query("cached")
+
+    vectors = cache.embed_queries(["cached", "new one", "New  one", "other"])
+
+    assert vectors == [[6.0, 1.0], [7.0, 1.0], [7.0, 1.0], [5.0, 1.0]]
+    model.embed_documents.assert_called_once_with(["new one", "other"], task_type="RETRIEVAL_QUERY")
+    assert cache.embed_queries(["other"]) == [[5.0, 1.0]]
+    model.embed_documents.assert_called_once()
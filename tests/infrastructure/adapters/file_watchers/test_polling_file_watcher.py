@@ -0,0 +1,45 @@
+import os
+import pytest
+from src.infrastructure.adapters.file_watchers.polling_file_watcher import PollingFileWatcher
+
+
+def test_scan_lists_nested_files_with_size_and_mtime(tmp_path):
+    (tmp_path / "guides").mkdir()
+    (tmp_path / "a.md").write_text("alpha")
+    (tmp_path / "guides" / "b.md").write_text("beta!")
+
+    snapshot = PollingFileWatcher().scan(str(tmp_path))
+
+    assert set(snapshot) == {str(tmp_path / "a.md"), str(tmp_path / "guides" / "b.md")}
+    assert snapshot[str(tmp_path / "a.md")].size == 5
+    assert snapshot[str(tmp_path / "a.md")].mtime_ns == os.stat(tmp_path / "a.md").st_mtime_ns
+
+
+def test_scan_of_a_missing_folder_fails(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        PollingFileWatcher().scan(str(tmp_path / "missing"))
+
+
+def test_watch_yields_once_per_burst_after_the_debounce(tmp_path):
+    now = [0.0]
+    changes = {
+        1: lambda: (tmp_path / "a.md").write_text("one"),
+        2: lambda: (tmp_path / "b.md").write_text("two"),
+        3: lambda: (tmp_path / "c.md").write_text("three"),
+    }
+    polls = [0]
+
+    def sleep(seconds):
+        polls[0] += 1
+        now[0] += seconds
+        changes.get(polls[0], lambda: None)()
+
+    watcher = PollingFileWatcher(interval_seconds=1, debounce_seconds=2, sleep=sleep, clock=lambda: now[0])
+    snapshots = watcher.watch(str(tmp_path))
+
+    assert next(snapshots) == {}
+    settled = next(snapshots)
+
+    # Three changes on consecutive polls, then two quiet polls
+    assert set(settled) == {str(tmp_path / name) for name in ["a.md", "b.md", "c.md"]}
+    assert polls[0] == 5
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from src.infrastructure.adapters.lexical_indexes.bm25_index import (
+    BM25Index,
+    decode_varints,
+    encode_varints,
+    tokenize,
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = BM25Index(str(tmp_path / "lexical"))
+    index.add(["errors", "pool", "users"], [
+        "Invalid payloads return 400 with VALIDATION_ERROR in the error body.",
+        "Raise database.pool.max_size when the pool is exhausted under load.",
+        "GET /api/v1/users lists users; the error format follows the standards.",
+    ])
+    index.add(["retries"], ["Set MAX_RETRIES and RETRY_COUNT to control retry behaviour on error."])
+    return index
+
+
+def test_tokenize_keeps_identifiers_and_their_parts():
+    assert tokenize("VALIDATION_ERROR at /api/v1/users") == [
+        "validation_error", "validation", "error", "at", "api/v1/users", "api", "v1", "users",
+    ]
+    assert tokenize("database.pool.max_size")[0] == "database.pool.max_size"
+
+
+@pytest.mark.parametrize("values", [[], [0], [1, 127, 128, 16383, 16384, 2**40]])
+def test_varints_round_trip(values):
+    encoded = encode_varints(values)
+    assert decode_varints(encoded).tolist() == values
+    if values:
+        assert len(encode_varints([127])) == 1 and len(encode_varints([128])) == 2
+
+
+def test_exact_identifier_ranks_first(index):
+    assert index.search("VALIDATION_ERROR", 3)[0][0] == "errors"
+    assert index.search("database.pool.max_size", 3)[0][0] == "pool"
+    assert index.search("/api/v1/users", 3)[0][0] == "users"
+    assert index.search("MAX_RETRIES", 3)[0][0] == "retries"
+
+
+def test_common_terms_score_lower_than_rare_ones(index):
+    scores = dict(index.search("error validation_error", 4))
+    assert set(scores) == {"errors", "users", "retries"}  # every document mentioning "error"
+    assert scores["errors"] > 2 * max(score for doc, score in scores.items() if doc != "errors")
+
+
+def test_unknown_terms_return_nothing(index):
+    assert index.search("kubernetes", 3) == []
+    assert index.search("", 3) == []
+
+
+def test_delete_readd_and_reopen(index, tmp_path):
+    index.delete(["errors"])
+    assert "errors" not in dict(index.search("validation_error error", 4))
+    assert len(index) == 3
+
+    index.add(["errors"], ["VALIDATION_ERROR is returned for invalid payloads."])
+    reopened = BM25Index(str(tmp_path / "lexical"))
+    assert len(reopened) == 4
+    assert reopened.search("VALIDATION_ERROR", 1)[0][0] == "errors"
+
+
+def test_superseded_documents_do_not_count(index):
+    before = dict(index.search("pool", 1))["pool"]
+    index.add(["pool"], ["Nothing about connections here."])
+    assert index.search("pool", 1) == []
+    assert len(index) == 4
+    assert before > 0
+
+
+def test_postings_are_compressed(index, tmp_path):
+    postings = sum(p.stat().st_size for p in (tmp_path / "lexical").glob("*.postings.bin"))
+    terms = sum(len(block["terms"]) for block in index.blocks)
+    # Two one-byte varints per posting for these small documents
+    assert postings <= 2 * sum(len(set(tokenize(t))) for t in [
+        "Invalid payloads return 400 with VALIDATION_ERROR in the error body.",
+        "Raise database.pool.max_size when the pool is exhausted under load.",
+        "GET /api/v1/users lists users; the error format follows the standards.",
+        "Set MAX_RETRIES and RETRY_COUNT to control retry behaviour on error.",
+    ])
+    assert terms > 0
+
+
+def test_allowed_keys_restrict_results_but_not_statistics(index):
+    from src.infrastructure.adapters.vector_indexes.flat_vector_index import id_key
+
+    unfiltered = dict(index.search("error", 10))
+    results = index.search("error", 10, allowed_keys=np.array([id_key("users"), id_key("pool")], dtype=np.uint64))
+
+    assert [doc_id for doc_id, _ in results] == ["users"]
+    assert results[0][1] == pytest.approx(unfiltered["users"])
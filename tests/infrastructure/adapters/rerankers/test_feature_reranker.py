@@ -0,0 +1,41 @@
+import pytest
+from src.domain.models.chunk import Chunk
+from src.infrastructure.adapters.rerankers.feature_reranker import FeatureReranker
+
+
+@pytest.fixture
+def chunks():
+    return [
+        Chunk(content="the deploy pipeline", metadata={}, id="a", embedding=[0.0, 1.0]),
+        Chunk(content="rollback a failed deploy with the deploy tool", metadata={}, id="b", embedding=[1.0, 0.1]),
+        Chunk(content="cache settings", metadata={}, id="c", embedding=[0.2, 1.0]),
+    ]
+
+
+def test_lexical_features_rank_term_matches_first(chunks):
+    ranked = FeatureReranker().rerank("rollback deploy", None, chunks, top_k=3)
+
+    assert [chunk.id for chunk in ranked] == ["b", "a", "c"]
+    assert ranked[0].score > ranked[1].score > ranked[2].score
+
+
+def test_embedding_feature_can_outweigh_keywords(chunks):
+    reranker = FeatureReranker(embedding_weight=1.0, bm25_weight=0.0, overlap_weight=0.0)
+
+    ranked = reranker.rerank("rollback deploy", [0.0, 1.0], chunks, top_k=2)
+
+    assert [chunk.id for chunk in ranked] == ["a", "c"]
+
+
+def test_chunks_without_vectors_get_the_lowest_similarity(chunks):
+    chunks[0].embedding = None
+    reranker = FeatureReranker(embedding_weight=1.0, bm25_weight=0.0, overlap_weight=0.0)
+
+    ranked = reranker.rerank("query", [0.0, 1.0], chunks, top_k=3)
+
+    assert ranked[0].id == "c"
+    assert ranked[-1].score == ranked[-2].score == 0.0
+
+
+def test_rerank_of_no_candidates():
+    assert FeatureReranker().rerank("query", None, [], top_k=3) == []
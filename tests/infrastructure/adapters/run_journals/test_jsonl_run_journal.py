@@ -0,0 +1,111 @@
+from pathlib import Path
+import pytest
+from src.domain.models.chunk import Chunk
+from src.domain.models.enums import StorageType
+from src.infrastructure.adapters.run_journals.jsonl_run_journal import (
+    JsonlRunJournal,
+    journal_path,
+)
+
+RUN = {"source": "docs", "strategy": "length_based", "config": {"chunk_size": 100}}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "journal.jsonl"
+
+
+def test_resume_returns_committed_batches(path):
+    journal = JsonlRunJournal(str(path))
+    journal.start(RUN)
+    journal.commit(["a", "b"], ["one.md"])
+    journal.commit(["c"], [])
+    journal.close()
+
+    checkpoint = JsonlRunJournal(str(path)).resume(RUN)
+
+    assert checkpoint.committed_chunk_ids == {"a", "b", "c"}
+    assert checkpoint.completed_files == {"one.md"}
+    assert not checkpoint.finished
+
+
+def test_resume_returns_the_chunks_of_split_files(path):
+    chunks = [Chunk(content=text, metadata={"source": "two.md"}) for text in ["first", "second"]]
+    journal = JsonlRunJournal(str(path))
+    journal.start(RUN)
+    journal.commit(["a"], [], {"one.md": [Chunk(content="only", metadata={"source": "one.md"})]})
+    journal.commit(["b"], ["one.md"], {"two.md": chunks})
+    journal.close()
+
+    checkpoint = JsonlRunJournal(str(path)).resume(RUN)
+
+    # one.md was completed later, so only two.md is still split
+    assert list(checkpoint.partial_files) == ["two.md"]
+    assert [chunk.content for chunk in checkpoint.partial_files["two.md"]] == ["first", "second"]
+    assert checkpoint.partial_files["two.md"][0].metadata == {"source": "two.md"}
+
+
+def test_resume_ignores_and_truncates_a_torn_last_line(path):
+    journal = JsonlRunJournal(str(path))
+    journal.start(RUN)
+    journal.commit(["a"], ["one.md"])
+    journal.close()
+    with open(path, "a") as file:
+        file.write('{"type": "batch", "chunks": ["b"')
+
+    resumed = JsonlRunJournal(str(path))
+    assert resumed.resume(RUN).committed_chunk_ids == {"a"}
+    resumed.commit(["b"], ["two.md"])
+    resumed.finish()
+
+    checkpoint = JsonlRunJournal(str(path)).resume(RUN)
+    assert checkpoint.committed_chunk_ids == {"a", "b"}
+    assert checkpoint.finished
+
+
+def test_start_discards_the_previous_run(path):
+    journal = JsonlRunJournal(str(path))
+    journal.start(RUN)
+    journal.commit(["a"], ["one.md"])
+    journal.start(RUN)
+    journal.close()
+
+    assert JsonlRunJournal(str(path)).resume(RUN).committed_chunk_ids == set()
+
+
+def test_resume_rejects_a_different_or_missing_run(path):
+    with pytest.raises(ValueError, match="No ingestion run"):
+        JsonlRunJournal(str(path)).resume(RUN)
+
+    journal = JsonlRunJournal(str(path))
+    journal.start(RUN)
+    journal.close()
+    with pytest.raises(ValueError, match="different run"):
+        JsonlRunJournal(str(path)).resume({**RUN, "strategy": "semantic"})
+
+
+def test_journal_path_per_store():
+    assert journal_path(StorageType.LOCAL, "out") == Path("out") / "ingest_journal.jsonl"
+    assert journal_path(StorageType.CHROMA, "docs", "db") == Path("db") / "journals" / "docs.jsonl"
+
+
+def test_journal_path_per_source(tmp_path):
+    docs = journal_path(StorageType.LOCAL, "out", source=str(tmp_path / "docs"))
+    notes = journal_path(StorageType.LOCAL, "out", source=str(tmp_path / "notes"))
+
+    assert docs.parent == Path("out") and docs.name.startswith("ingest_journal-")
+    assert docs != notes
+    assert journal_path(StorageType.LOCAL, "out", source=str(tmp_path / "docs")) == docs
+    assert journal_path(StorageType.CHROMA, "docs", "db", source="docs").parent == Path("db") / "journals"
+
+
+def test_second_run_on_a_journal_fails_until_the_first_closes(path):
+    first = JsonlRunJournal(str(path))
+    first.start(RUN)
+
+    with pytest.raises(ValueError, match="Another ingestion run"):
+        JsonlRunJournal(str(path)).start(RUN)
+    first.commit(["a"], [])
+    first.finish()
+
+    assert JsonlRunJournal(str(path)).resume(RUN).committed_chunk_ids == {"a"}
@@ -0,0 +1,145 @@
+from unittest.mock import MagicMock
+import numpy as np
+import pytest
+from src.domain.models.enums import VectorQuantization
+from src.infrastructure.adapters.vector_indexes.flat_vector_index import FlatVectorIndex
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((300, 16)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def index(tmp_path, vectors):
+    index = FlatVectorIndex(str(tmp_path / "vectors"), block_size=32)
+    index.add([f"id{i}" for i in range(200)], vectors[:200])
+    index.add([f"id{i}" for i in range(200, 300)], vectors[200:])
+    return index
+
+
+def test_search_across_blocks_is_exact(index, vectors):
+    results = index.search(vectors[250], 5)
+
+    expected = np.argsort(-(vectors @ vectors[250]))[:5]
+    assert [chunk_id for chunk_id, _ in results] == [f"id{i}" for i in expected]
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_empty_index(tmp_path):
+    index = FlatVectorIndex(str(tmp_path / "empty"))
+    assert index.search([0.1, 0.2], 3) == []
+    assert len(index) == 0
+
+
+def test_dimension_mismatch_is_rejected(index):
+    with pytest.raises(ValueError, match="dimension"):
+        index.add(["x"], np.ones((1, 4), dtype=np.float32))
+
+
+def test_delete_and_readd(index, vectors, tmp_path):
+    index.delete(["id10"])
+    assert "id10" not in [chunk_id for chunk_id, _ in index.search(vectors[10], 3)]
+    assert len(index) == 299
+
+    index.add(["id10"], vectors[10:11])
+    reopened = FlatVectorIndex(str(tmp_path / "vectors"))
+    assert reopened.search(vectors[10], 1)[0][0] == "id10"
+    assert len(reopened) == 300
+
+
+def test_readd_supersedes_previous_row(index, vectors):
+    index.add(["id0"], vectors[1:2])
+    results = dict(index.search(vectors[1], 2))
+    assert results["id0"] == pytest.approx(1.0, abs=1e-5)
+    assert len(index) == 300
+
+
+def test_quantized_blocks_are_rescored(tmp_path, vectors):
+    index = FlatVectorIndex(str(tmp_path / "int8"), VectorQuantization.INT8, rescore=True)
+    index.add([f"id{i}" for i in range(300)], vectors)
+
+    results = index.search(vectors[42], 3)
+
+    assert results[0] == ("id42", pytest.approx(1.0, abs=1e-5))
+    assert (tmp_path / "int8" / "block_000001.float32.npy").exists()
+    assert index.stored_rescore is True
+
+
+@pytest.mark.parametrize("quantization, max_ratio", [(VectorQuantization.FLOAT16, 0.55), (VectorQuantization.INT8, 0.3)])
+def test_quantized_index_is_smaller_on_disk(tmp_path, quantization, max_ratio):
+    rng = np.random.default_rng(3)
+    vectors = rng.standard_normal((2000, 256)).astype(np.float32)
+    ids = [f"id{i}" for i in range(len(vectors))]
+
+    def disk_size(index):
+        index.add(ids, vectors)
+        return sum(path.stat().st_size for path in index.directory.iterdir())
+
+    exact = disk_size(FlatVectorIndex(str(tmp_path / "float32")))
+    quantized_index = FlatVectorIndex(str(tmp_path / quantization.value), quantization)
+
+    assert disk_size(quantized_index) < max_ratio * exact
+    assert quantized_index.stored_rescore is False
+    assert quantized_index.search(vectors[5], 1)[0][0] == "id5"
+
+
+def test_filtered_search_scores_only_allowed_rows(index, vectors, monkeypatch):
+    from src.infrastructure.adapters.vector_indexes.flat_vector_index import id_key
+    from src.infrastructure.adapters.vector_indexes.quantization import QuantizedVectors
+
+    allowed = [3, 150, 250, 299]
+    monkeypatch.setattr(QuantizedVectors, "scores", MagicMock(side_effect=AssertionError("full scan")))
+
+    results = index.search(vectors[0], 2, allowed_keys=np.array([id_key(f"id{i}") for i in allowed], dtype=np.uint64))
+
+    expected = sorted(allowed, key=lambda i: -float(vectors[i] @ vectors[0]))[:2]
+    assert [chunk_id for chunk_id, _ in results] == [f"id{i}" for i in expected]
+
+
+@pytest.mark.parametrize("quantization", [VectorQuantization.FLOAT32, VectorQuantization.INT8])
+def test_search_many_matches_single_searches(tmp_path, vectors, quantization):
+    from src.infrastructure.adapters.vector_indexes.flat_vector_index import id_key
+
+    index = FlatVectorIndex(str(tmp_path / "vectors"), quantization, block_size=32)
+    index.add([f"id{i}" for i in range(200)], vectors[:200])
+    index.add([f"id{i}" for i in range(200, 300)], vectors[200:])
+    index.delete(["id7"])
+    queries = vectors[[7, 42, 250]]
+
+    allowed = np.array([id_key(f"id{i}") for i in range(0, 300, 3)], dtype=np.uint64)
+    for allowed_keys in [None, allowed]:
+        batched = index.search_many(queries, 4, allowed_keys=allowed_keys)
+        for query, ranking in zip(queries, batched):
+            single = index.search(query, 4, allowed_keys=allowed_keys)
+            assert [chunk_id for chunk_id, _ in ranking] == [chunk_id for chunk_id, _ in single]
+            # Matrix and vector products may round differently in the last bit
+            assert [score for _, score in ranking] == pytest.approx([score for _, score in single], abs=1e-5)
+
+
+def test_search_many_reads_each_block_once(index, vectors, monkeypatch):
+    from src.infrastructure.adapters.vector_indexes.quantization import QuantizedVectors
+
+    scores = MagicMock(side_effect=QuantizedVectors.scores, autospec=True)
+    monkeypatch.setattr(QuantizedVectors, "scores", lambda self, *args: scores(self, *args))
+
+    results = index.search_many(vectors[:10], 3)
+
+    assert [ranking[0][0] for ranking in results] == [f"id{i}" for i in range(10)]
+    # 300 rows in blocks of 32 rows: one matrix product per block, not per query
+    assert scores.call_count == 7 + 4
+
+
+def test_get_vectors_returns_live_rows(tmp_path, vectors):
+    index = FlatVectorIndex(str(tmp_path / "int8"), VectorQuantization.INT8, rescore=False)
+    index.add([f"id{i}" for i in range(300)], vectors)
+    index.add(["id5"], vectors[6:7])
+
+    found = index.get_vectors(["id9", "id5"])
+
+    np.testing.assert_allclose(found, vectors[[9, 6]], atol=0.02)
+    index.delete(["id9"])
+    with pytest.raises(KeyError):
+        index.get_vectors(["id9"])
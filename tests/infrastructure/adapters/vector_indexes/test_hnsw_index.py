@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+from src.infrastructure.adapters.vector_indexes.hnsw_index import HnswIndex
+from src.infrastructure.adapters.vector_indexes.quantization import recall_at_k
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(3)
+    topics = rng.standard_normal((20, 32)).astype(np.float32)
+    vectors = topics[rng.integers(0, 20, 1000)] + 0.5 * rng.standard_normal((1000, 32)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def index(tmp_path, vectors):
+    index = HnswIndex(str(tmp_path / "hnsw"), m=8, ef_construction=64)
+    # Two batches exercise incremental insertion into an existing graph
+    index.add([f"id{i}" for i in range(600)], vectors[:600])
+    index.add([f"id{i}" for i in range(600, 1000)], vectors[600:])
+    return index
+
+
+def test_recall_against_exact_search(index, vectors):
+    queries = vectors[:50] + 0.1
+    exact = [[f"id{i}" for i in np.argsort(-(vectors @ query))[:10]] for query in queries]
+    approx = [[chunk_id for chunk_id, _ in index.search(query, 10, ef_search=64)] for query in queries]
+
+    assert recall_at_k(exact, approx) >= 0.9
+
+
+def test_finds_exact_match_with_its_score(index, vectors):
+    chunk_id, score = index.search(vectors[123], 1)[0]
+    assert chunk_id == "id123"
+    assert score == pytest.approx(1.0, abs=1e-5)
+
+
+def test_delete_and_readd(index, vectors):
+    index.delete(["id123"])
+    assert "id123" not in [chunk_id for chunk_id, _ in index.search(vectors[123], 10)]
+    assert len(index) == 999
+
+    index.add(["id123"], vectors[123:124])
+    assert index.search(vectors[123], 1)[0][0] == "id123"
+    assert len(index) == 1000
+
+
+def test_readded_id_replaces_previous_vector(index, vectors):
+    index.add(["id5"], vectors[700:701])
+    results = [chunk_id for chunk_id, _ in index.search(vectors[700], 2)]
+    assert sorted(results) == ["id5", "id700"]
+    assert len(index) == 1000
+
+
+def test_returns_k_live_results_despite_tombstones(index, vectors):
+    nearest = [chunk_id for chunk_id, _ in index.search(vectors[0], 20)]
+    index.delete(nearest[:15])
+    assert len(index.search(vectors[0], 10, ef_search=10)) == 10
+
+
+def test_graph_survives_reopen(index, tmp_path, vectors):
+    index.delete(["id7"])
+    reopened = HnswIndex(str(tmp_path / "hnsw"))
+
+    assert reopened.m == 8
+    assert len(reopened) == 999
+    assert reopened.search(vectors[42], 5) == index.search(vectors[42], 5)
+
+    reopened.add(["new"], vectors[7:8])
+    assert reopened.search(vectors[7], 1)[0][0] == "new"
+
+
+def test_empty_index(tmp_path):
+    index = HnswIndex(str(tmp_path / "empty"))
+    assert index.search([0.1, 0.2], 3) == []
+    assert len(index) == 0
+
+
+def test_dimension_mismatch_is_rejected(index):
+    with pytest.raises(ValueError, match="dimension"):
+        index.add(["x"], np.ones((1, 4), dtype=np.float32))
+
+
+def allowed_keys(ids):
+    from src.infrastructure.adapters.vector_indexes.flat_vector_index import id_key
+    return np.array([id_key(f"id{i}") for i in ids], dtype=np.uint64)
+
+
+@pytest.mark.parametrize("allowed", [range(0, 1000, 50), range(0, 1000, 2)])
+def test_filtered_search_returns_only_allowed_ids(index, vectors, allowed, tmp_path):
+    allowed = list(allowed)
+    query = vectors[7] + 0.1
+    exact = [f"id{i}" for i in sorted(allowed, key=lambda i: -float(vectors[i] @ query))[:10]]
+
+    # Small allowed sets are scored directly, large ones filter the graph walk
+    reopened = HnswIndex(str(tmp_path / "hnsw"))
+    results = [chunk_id for chunk_id, _ in reopened.search(query, 10, allowed_keys=allowed_keys(allowed))]
+
+    assert set(results) <= {f"id{i}" for i in allowed}
+    assert recall_at_k([exact], [results]) >= 0.9
+
+
+def test_get_vectors_follows_readds(index, vectors):
+    index.add(["id3"], vectors[4:5])
+
+    np.testing.assert_array_equal(index.get_vectors(["id900", "id3"]), vectors[[900, 4]])
+
+
+def test_save_writes_only_what_the_batch_touched(index, vectors, monkeypatch):
+    appended = []
+    append = HnswIndex._append
+
+    def counting_append(self, name, committed, data):
+        appended.append(len(data))
+        append(self, name, committed, data)
+
+    monkeypatch.setattr(HnswIndex, "_append", counting_append)
+
+    index.add(["new"], vectors[7:8])
+
+    # One 32-dimensional node and a few upper-layer lists, not the 1000-node graph again
+    assert sum(appended) < 1024
+    assert (index.directory / "vectors.f32").stat().st_size == 1001 * 32 * 4
+
+
+def test_interrupted_save_is_discarded_on_reopen(index, tmp_path, vectors, monkeypatch):
+    from src.infrastructure.adapters.vector_indexes import hnsw_index
+
+    def crash(source, target):
+        raise OSError("disk gone")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(hnsw_index.os, "replace", crash)
+        with pytest.raises(OSError):
+            index.add([f"ghost{i}" for i in range(50)], vectors[:50] + 0.01)
+
+    reopened = HnswIndex(str(tmp_path / "hnsw"))
+    assert len(reopened) == 1000
+    assert not any(chunk_id.startswith("ghost") for chunk_id, _ in reopened.search(vectors[3], 10))
+
+    reopened.add(["new"], vectors[7:8])
+    again = HnswIndex(str(tmp_path / "hnsw"))
+    assert sorted(chunk_id for chunk_id, _ in again.search(vectors[7], 2)) == ["id7", "new"]
+    np.testing.assert_array_equal(again.get_vectors(["new", "id999"]), vectors[[7, 999]])
@@ -0,0 +1,186 @@
+import numpy as np
+import pytest
+from src.infrastructure.adapters.vector_indexes.ivf_pq_index import IvfPqIndex, kmeans, nearest_centroids
+from src.infrastructure.adapters.vector_indexes.quantization import recall_at_k
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(5)
+    topics = rng.standard_normal((16, 32)).astype(np.float32)
+    vectors = topics[rng.integers(0, 16, 2000)] + 0.3 * rng.standard_normal((2000, 32)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def index(tmp_path, vectors):
+    index = IvfPqIndex(str(tmp_path / "ivf"), nlist=16, pq_m=8, nprobe=4)
+    index.add([f"id{i}" for i in range(1500)], vectors[:1500])
+    # The second batch is encoded with the codebooks trained on the first
+    index.add([f"id{i}" for i in range(1500, 2000)], vectors[1500:])
+    return index
+
+
+def test_kmeans_recovers_separated_clusters():
+    rng = np.random.default_rng(0)
+    centers = np.array([[10.0, 0.0], [0.0, 10.0], [-10.0, -10.0]], dtype=np.float32)
+    points = centers[np.repeat(np.arange(3), 50)] + rng.standard_normal((150, 2)).astype(np.float32)
+
+    centroids = kmeans(points, 3, rng)
+
+    assert sorted(nearest_centroids(centers, centroids).tolist()) == [0, 1, 2]
+
+
+def test_training_is_recorded(index, tmp_path):
+    assert index.state == {"dim": 32, "nlist": 16, "pq_m": 8, "count": 2000}
+    assert index.codebooks.shape == (8, 256, 4)
+
+
+def test_small_batches_are_searched_exactly_until_the_index_trains(tmp_path, vectors):
+    index = IvfPqIndex(str(tmp_path / "batched"), nlist=8, pq_m=7)
+    for start in range(0, 300, 100):
+        index.add([f"id{i}" for i in range(start, start + 100)], vectors[start:start + 100])
+
+    # 8 lists need 8 * 39 points, so three batches of 100 are not enough yet
+    assert not index.trained
+    assert index.search(vectors[3], 1) == [("id3", pytest.approx(1.0, abs=1e-5))]
+
+    # A reopen without options still trains with the shape the first add asked for
+    reopened = IvfPqIndex(str(tmp_path / "batched"))
+    reopened.add([f"id{i}" for i in range(300, 400)], vectors[300:400])
+
+    # Trained once on all 400 rows, not shrunk to what one batch supports; 7 does not divide 32
+    assert reopened.state == {"dim": 32, "nlist": 8, "pq_m": 4, "count": 400}
+    assert [chunk_id for chunk_id, _ in reopened.search(vectors[3], 1)] == ["id3"]
+    assert [chunk_id for chunk_id, _ in IvfPqIndex(str(tmp_path / "batched")).search(vectors[399], 1)] == ["id399"]
+
+
+def test_a_training_interrupted_before_the_state_file_is_redone(tmp_path, vectors, monkeypatch):
+    directory = tmp_path / "interrupted"
+    index = IvfPqIndex(str(directory), nlist=8)
+    index.add([f"id{i}" for i in range(300)], vectors[:300])
+
+    def crash(self):
+        raise OSError("disk full")
+
+    # The batch and the postings of every row are written, the state file is not
+    with monkeypatch.context() as patched:
+        patched.setattr(IvfPqIndex, "_write_state", crash)
+        with pytest.raises(OSError):
+            index.add([f"id{i}" for i in range(300, 400)], vectors[300:400])
+
+    reopened = IvfPqIndex(str(directory))
+    assert not reopened.trained and len(reopened) == 300
+    reopened.add([f"id{i}" for i in range(300, 400)], vectors[300:400])
+    assert reopened.state["count"] == 400 and reopened.trained
+    # Every row has exactly one posting
+    assert sum(len(reopened._postings(number)) for number in range(8)) == 400
+
+
+def test_explicit_training_on_a_sample(tmp_path, vectors):
+    index = IvfPqIndex(str(tmp_path / "sampled"), nlist=1024)
+    index.train(vectors[:200])
+    index.add([f"id{i}" for i in range(100)], vectors[:100])
+
+    # 200 points only support five coarse lists
+    assert index.state["nlist"] == 5
+    assert index.search(vectors[3], 1)[0][0] == "id3"
+
+
+def test_recall_against_exact_search(index, vectors):
+    queries = vectors[:50]
+    exact = [[f"id{i}" for i in np.argsort(-(vectors @ query))[:10]] for query in queries]
+    approx = [[chunk_id for chunk_id, _ in index.search(query, 10)] for query in queries]
+
+    assert recall_at_k(exact, approx) >= 0.9
+
+
+def test_scores_are_exact_after_rerank(index, vectors):
+    chunk_id, score = index.search(vectors[1700], 1)[0]
+    assert chunk_id == "id1700"
+    assert score == pytest.approx(1.0, abs=1e-5)
+
+
+def test_more_probes_never_lose_recall(index, vectors):
+    queries = vectors[::40]
+    exact = [[f"id{i}" for i in np.argsort(-(vectors @ query))[:10]] for query in queries]
+    recalls = [
+        recall_at_k(exact, [[chunk_id for chunk_id, _ in index.search(query, 10, nprobe=nprobe)] for query in queries])
+        for nprobe in (1, 16)
+    ]
+    assert recalls[1] >= recalls[0]
+    # Probing every list leaves only the PQ ranking as a source of error
+    assert recalls[1] >= 0.95
+
+
+def test_delete_readd_and_reopen(index, tmp_path, vectors):
+    index.delete(["id10"])
+    assert "id10" not in [chunk_id for chunk_id, _ in index.search(vectors[10], 5)]
+    assert len(index) == 1999
+
+    index.add(["id10"], vectors[20:21])
+    reopened = IvfPqIndex(str(tmp_path / "ivf"))
+    assert len(reopened) == 2000
+    assert reopened.nlist == 1024  # construction options do not override the trained state
+    assert sorted(chunk_id for chunk_id, _ in reopened.search(vectors[20], 2)) == ["id10", "id20"]
+
+
+def test_rows_past_the_recorded_count_are_ignored(index, tmp_path, vectors):
+    # Simulate a crash after the columns and postings were appended but before the state file
+    state = (tmp_path / "ivf" / "ivf.json").read_text()
+    index.add(["ghost"], vectors[30:31])
+    (tmp_path / "ivf" / "ivf.json").write_text(state)
+
+    reopened = IvfPqIndex(str(tmp_path / "ivf"))
+    assert "ghost" not in [chunk_id for chunk_id, _ in reopened.search(vectors[30], 5)]
+    assert len(reopened) == 2000
+
+
+def test_add_after_a_crash_discards_the_leftover_rows(index, tmp_path, vectors):
+    directory = tmp_path / "ivf"
+    # Simulate a crash after the columns and postings were appended but before the state file
+    state = (directory / "ivf.json").read_text()
+    index.add(["ghost"], vectors[30:31])
+    (directory / "ivf.json").write_text(state)
+
+    reopened = IvfPqIndex(str(directory))
+    reopened.add(["id_new"], vectors[40:41])
+
+    assert (directory / "vectors.f32").stat().st_size == 2001 * 32 * vectors.itemsize
+    assert (directory / "keys.u64").stat().st_size == 2001 * 8
+    assert sorted(chunk_id for chunk_id, _ in reopened.search(vectors[40], 2)) == ["id40", "id_new"]
+    assert "ghost" not in [chunk_id for chunk_id, _ in reopened.search(vectors[30], 5)]
+    np.testing.assert_array_equal(reopened.get_vectors(["id_new", "id1999"]), vectors[[40, 1999]])
+    assert len(reopened) == 2001
+
+
+def test_empty_index(tmp_path):
+    index = IvfPqIndex(str(tmp_path / "empty"))
+    assert index.search([0.1, 0.2], 3) == []
+    assert len(index) == 0
+
+
+def test_dimension_mismatch_is_rejected(index):
+    with pytest.raises(ValueError, match="dimension"):
+        index.add(["x"], np.ones((1, 4), dtype=np.float32))
+
+
+@pytest.mark.parametrize("allowed", [range(0, 2000, 100), range(0, 2000, 2)])
+def test_filtered_search_returns_only_allowed_ids(index, vectors, allowed):
+    from src.infrastructure.adapters.vector_indexes.flat_vector_index import id_key
+
+    allowed = list(allowed)
+    query = vectors[11] + 0.1
+    exact = [f"id{i}" for i in sorted(allowed, key=lambda i: -float(vectors[i] @ query))[:10]]
+    keys = np.array([id_key(f"id{i}") for i in allowed], dtype=np.uint64)
+
+    results = [chunk_id for chunk_id, _ in index.search(query, 10, allowed_keys=keys)]
+
+    assert set(results) <= {f"id{i}" for i in allowed}
+    assert recall_at_k([exact], [results]) >= 0.9
+
+
+def test_get_vectors_reads_full_precision_rows(index, vectors):
+    index.add(["id3"], vectors[4:5])
+
+    np.testing.assert_array_equal(index.get_vectors(["id1700", "id3"]), vectors[[1700, 4]])
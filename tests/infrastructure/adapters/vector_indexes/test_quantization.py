@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from src.domain.models.enums import VectorQuantization
+from src.infrastructure.adapters.vector_indexes.quantization import (
+    QuantizedVectors,
+    recall_at_k,
+    select_top_k,
+    select_top_k_rows,
+)
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(42)
+    vectors = rng.standard_normal((500, 32)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize(
+    "quantization, ratio",
+    [(VectorQuantization.FLOAT16, 2.0), (VectorQuantization.INT8, 32 / 9)],
+)
+def test_quantization_shrinks_footprint(vectors, quantization, ratio):
+    full = QuantizedVectors.from_vectors(vectors)
+    quantized = QuantizedVectors.from_vectors(vectors, quantization)
+    assert full.nbytes / quantized.nbytes == pytest.approx(ratio)
+
+
+@pytest.mark.parametrize("quantization", list(VectorQuantization))
+def test_dequantize_is_close_to_original(vectors, quantization):
+    quantized = QuantizedVectors.from_vectors(vectors, quantization)
+    assert np.abs(quantized.dequantize() - vectors).max() < 0.01
+
+
+def test_int8_scores_match_dequantized_dot_product(vectors):
+    quantized = QuantizedVectors.from_vectors(vectors, VectorQuantization.INT8)
+    query = vectors[7]
+    np.testing.assert_allclose(quantized.scores(query), quantized.dequantize() @ query, rtol=1e-5, atol=1e-6)
+
+
+def test_int8_requires_scales():
+    with pytest.raises(ValueError, match="scales"):
+        QuantizedVectors(np.zeros((1, 2), dtype=np.int8), None, VectorQuantization.INT8)
+
+
+def test_blocked_top_k_matches_full_sort(vectors):
+    quantized = QuantizedVectors.from_vectors(vectors)
+    query = vectors[3]
+
+    rows, scores = quantized.top_k(query, k=10, block_size=64)
+
+    expected = np.argsort(-(vectors @ query))[:10]
+    assert rows.tolist() == expected.tolist()
+    assert rows[0] == 3
+    assert np.all(np.diff(scores) <= 0)
+
+
+@pytest.mark.parametrize("quantization", [VectorQuantization.FLOAT16, VectorQuantization.INT8])
+def test_rescoring_restores_exact_ranking(vectors, quantization):
+    exact = QuantizedVectors.from_vectors(vectors)
+    quantized = QuantizedVectors.from_vectors(vectors, quantization)
+    queries = vectors[:20]
+
+    exact_rows = [exact.top_k(query, 10)[0] for query in queries]
+    rescored = [quantized.search(query, 10, full_precision=vectors)[0] for query in queries]
+
+    assert recall_at_k(exact_rows, rescored) == 1.0
+    _, scores = quantized.search(queries[0], 10, full_precision=vectors)
+    np.testing.assert_allclose(scores, exact.top_k(queries[0], 10)[1], rtol=1e-6)
+
+
+def test_save_and_load_memory_maps(vectors, tmp_path):
+    quantized = QuantizedVectors.from_vectors(vectors, VectorQuantization.INT8)
+    quantized.save(str(tmp_path / "index"))
+
+    loaded = QuantizedVectors.load(str(tmp_path / "index"), VectorQuantization.INT8)
+
+    assert isinstance(loaded.codes, np.memmap)
+    np.testing.assert_array_equal(loaded.codes, quantized.codes)
+    np.testing.assert_array_equal(loaded.scores(vectors[0]), quantized.scores(vectors[0]))
+
+
+def test_select_top_k_handles_small_inputs():
+    rows, scores = select_top_k(np.array([0.1, 0.9, 0.5], dtype=np.float32), 5)
+    assert rows.tolist() == [1, 2, 0]
+    assert select_top_k(np.array([], dtype=np.float32), 3)[0].size == 0
+
+
+def test_select_top_k_rows_matches_select_top_k():
+    scores = np.random.default_rng(3).standard_normal((4, 50)).astype(np.float32)
+    rows, top_scores = select_top_k_rows(scores, 6)
+    for query_scores, query_rows, query_top in zip(scores, rows, top_scores):
+        expected_rows, expected_scores = select_top_k(query_scores, 6)
+        assert query_rows.tolist() == expected_rows.tolist()
+        np.testing.assert_array_equal(query_top, expected_scores)
+    assert select_top_k_rows(scores, 80)[0].shape == (4, 50)
+
+
+def test_recall_at_k():
+    assert recall_at_k([[1, 2], [3, 4]], [[2, 1], [3, 5]]) == 0.75
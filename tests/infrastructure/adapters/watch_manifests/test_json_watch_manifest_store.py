@@ -0,0 +1,51 @@
+from pathlib import Path
+import pytest
+from src.domain.models.enums import StorageType
+from src.domain.models.watch import FileState, IndexedFile, WatchManifest
+from src.infrastructure.adapters.watch_manifests.json_watch_manifest_store import (
+    JsonWatchManifestStore,
+    manifest_path,
+    remove_manifests,
+)
+
+
+def test_manifest_round_trips(tmp_path):
+    store = JsonWatchManifestStore(str(tmp_path / "watch_manifest.json"))
+    manifest = WatchManifest(
+        run={"source": "docs", "strategy": "length_based", "config": {}},
+        files={"docs/a.md": IndexedFile(FileState(123, 45), ["id1", "id2"]), "docs/b.md": IndexedFile(None, [])},
+    )
+
+    assert store.read() is None
+    store.write(manifest)
+
+    read = store.read()
+    assert read.run == manifest.run
+    assert read.files["docs/a.md"].state == FileState(123, 45)
+    assert read.files["docs/a.md"].chunk_ids == ["id1", "id2"]
+    assert read.files["docs/b.md"].state is None
+    assert not (tmp_path / "watch_manifest.json.tmp").exists()
+
+
+def test_corrupt_manifest_is_a_value_error(tmp_path):
+    (tmp_path / "watch_manifest.json").write_text("{not json")
+
+    with pytest.raises(ValueError, match="not a valid watch manifest"):
+        JsonWatchManifestStore(str(tmp_path / "watch_manifest.json")).read()
+
+
+def test_manifest_path_per_store(tmp_path):
+    assert manifest_path(StorageType.LOCAL, "chunks") == Path("chunks") / "watch_manifest.json"
+    assert manifest_path(StorageType.CHROMA, "docs", str(tmp_path)) == tmp_path / "watch_manifests" / "docs.json"
+
+
+def test_remove_manifests_forgets_every_source(tmp_path):
+    paths = [manifest_path(StorageType.CHROMA, "docs", str(tmp_path), source=source) for source in ["a", "b", None]]
+    other = manifest_path(StorageType.CHROMA, "other", str(tmp_path), source="a")
+    for path in paths + [other]:
+        JsonWatchManifestStore(str(path)).write(WatchManifest(run={}))
+
+    remove_manifests(StorageType.CHROMA, "docs", str(tmp_path))
+
+    assert len(set(paths)) == 3 and not any(path.exists() for path in paths)
+    assert other.exists()
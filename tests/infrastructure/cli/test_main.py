@@ -1,114 +1,124 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from src.infrastructure.cli import main
-# Import the actual classes for isinstance checks
-from src.infrastructure.adapters.chunk_stores.chroma_chunk_store import ChromaChunkStore
-from src.infrastructure.adapters.chunk_stores.file_system_chunk_store import FileSystemChunkStore
+from src.domain.models.enums import LocalIndexType, StorageType, VectorQuantization
 
+# The configs main builds, which it imports without the src. prefix
+ChunkingConfig = main.ChunkingConfig
+StorageConfig = main.StorageConfig
 
-@pytest.fixture(autouse=True)
-def cleanup_mocks():
-    # Restore the original classes after each test
-    yield
-    main.ChromaChunkStore = ChromaChunkStore
-    main.FileSystemChunkStore = FileSystemChunkStore
 
-@patch('argparse.ArgumentParser.parse_args')
 @patch('src.infrastructure.cli.main.run_chunking')
-@patch('src.infrastructure.cli.main.ChromaChunkStore')
-@patch('src.infrastructure.cli.main.FileSystemChunkStore')
-def test_main_save_task(mock_file_store, mock_chroma_store, mock_run_chunking, mock_parse_args):
+def test_main_save_task(mock_run_chunking):
     # Test saving to ChromaDB
-    mock_parse_args.return_value = MagicMock(
-        task='save', source='some/path', local=False, collection_name='test_collection',
-        strategy='semantic', config='{}', loader_mode='single'
-    )
-    main.main()
-    mock_chroma_store.assert_called_with('test_collection')
-    mock_run_chunking.assert_called()
+    with patch('sys.argv', ['cli', 'save', 'some/path', 'semantic', '--chroma-collection', 'test_collection']):
+        main.main()
+    chunk_config, storage_config = mock_run_chunking.call_args[0]
+    assert chunk_config == ChunkingConfig(source_path='some/path', strategy='semantic', strategy_config={})
+    assert storage_config.storage_type == StorageType.CHROMA
+    assert storage_config.location == 'test_collection'
 
     # Test saving to FileSystem
-    mock_parse_args.return_value = MagicMock(
-        task='save', source='some/path', local=True, output_dir='output',
-        strategy='semantic', config='{}', loader_mode='single'
-    )
-    main.main()
-    mock_file_store.assert_called_with('output')
-    mock_run_chunking.assert_called()
-
-@patch('argparse.ArgumentParser.parse_args')
-@patch('src.infrastructure.cli.main.ChromaChunkStore', autospec=True)
-def test_main_clean_task_chroma(mock_chroma_store_class, mock_parse_args):
-    main.ChromaChunkStore = mock_chroma_store_class
-    mock_store_instance = MagicMock(spec=ChromaChunkStore)
-    mock_chroma_store_class.return_value = mock_store_instance
-    
-    mock_parse_args.return_value = MagicMock(
-        task='clean', local=False, collection_name='test_collection', output_dir='output_chunks'
-    )
-    
-    main.main()
-    
-    mock_store_instance.clear.assert_called_once()
-
-@patch('argparse.ArgumentParser.parse_args')
-@patch('src.infrastructure.cli.main.FileSystemChunkStore', autospec=True)
-def test_main_clean_task_filesystem(mock_file_store_class, mock_parse_args):
-    main.FileSystemChunkStore = mock_file_store_class
-    mock_store_instance = MagicMock(spec=FileSystemChunkStore)
-    mock_file_store_class.return_value = mock_store_instance
-
-    mock_parse_args.return_value = MagicMock(
-        task='clean', local=True, output_dir='output', collection_name='default_collection'
-    )
+    argv = ['cli', 'save', 'some/path', 'semantic', '--local-dir', 'output', '--index', 'hnsw', '--shards', '4']
+    with patch('sys.argv', argv):
+        main.main()
+    storage_config = mock_run_chunking.call_args[0][1]
+    assert storage_config.storage_type == StorageType.LOCAL
+    assert storage_config.location == 'output'
+    assert storage_config.index_type == LocalIndexType.HNSW
+    assert storage_config.shards == 4
 
-    main.main()
-    
-    mock_store_instance.clear.assert_called_once()
+@patch('src.infrastructure.cli.main.remove_manifests')
+@patch('src.infrastructure.cli.main.StorageUseCase')
+def test_main_clean_task_chroma(mock_storage_use_case, mock_remove_manifests):
+    with patch('sys.argv', ['cli', 'clean', '--chroma-collection', 'test_collection']):
+        main.main()
 
+    mock_storage_use_case.assert_called_once_with(StorageType.CHROMA, 'test_collection', persist_directory=None)
+    mock_storage_use_case.return_value.clear.assert_called_once()
+    mock_remove_manifests.assert_called_once_with(StorageType.CHROMA, 'test_collection', None)
 
+@patch('src.infrastructure.cli.main.remove_manifests')
+@patch('src.infrastructure.cli.main.StorageUseCase')
+def test_main_clean_task_filesystem(mock_storage_use_case, mock_remove_manifests):
+    with patch('sys.argv', ['cli', 'clean', '--local-dir', 'output']):
+        main.main()
+
+    mock_storage_use_case.assert_called_once_with(StorageType.LOCAL, 'output', persist_directory=None)
+    mock_storage_use_case.return_value.clear.assert_called_once()
+
+
+@patch('src.infrastructure.cli.main.JsonlRunJournal')
+@patch('src.infrastructure.cli.main.IngestionUseCase')
+@patch('src.infrastructure.cli.main.StorageUseCase')
 @patch('src.infrastructure.cli.main.MarkdownDocumentLoader')
 @patch('src.infrastructure.cli.main.ChunkingUseCase')
-def test_run_chunking(mock_use_case, mock_loader):
-    mock_args = MagicMock(
-        source='some/path', strategy='semantic', config='{}', loader_mode='single'
+def test_run_chunking(mock_use_case, mock_loader, mock_storage_use_case, mock_ingestion, mock_journal):
+    mock_ingestion.return_value.execute.return_value = MagicMock(chunks_saved=3)
+    chunk_config = ChunkingConfig(source_path='some/path', strategy='semantic', strategy_config={})
+    storage_config = StorageConfig(
+        StorageType.LOCAL, 'output', quantization=VectorQuantization.INT8, index_type=LocalIndexType.HNSW, shards=2
     )
-    mock_chunk_store = MagicMock()
-    
-    main.run_chunking(mock_args, mock_chunk_store)
+
+    main.run_chunking(chunk_config, storage_config)
 
     mock_loader.assert_called_once()
-    mock_use_case.assert_called_once()
-    mock_chunk_store.save.assert_called_once()
-
-def test_setup_common_arguments():
-    parser = main.argparse.ArgumentParser()
-    main.setup_common_arguments(parser)
-    # Very basic check to see if arguments are added
-    actions = [action.dest for action in parser._actions]
-    assert 'source' in actions
-    assert 'strategy' in actions
-    assert 'config' in actions
-    assert 'loader_mode' in actions
-
-# You can add more tests for other tasks (search, delete) and error conditions
-@patch('argparse.ArgumentParser.parse_args')
-def test_main_search_task(mock_parse_args, capsys):
-    mock_parse_args.return_value = MagicMock(task='search', local=False, collection_name='test_collection', output_dir='output_chunks')
-    main.main()
-    captured = capsys.readouterr()
-    assert "Search functionality not yet implemented." in captured.out
+    mock_use_case.assert_called_once_with(mock_loader.return_value)
+    _, kwargs = mock_storage_use_case.call_args
+    assert kwargs['quantization'] == VectorQuantization.INT8
+    assert kwargs['index_type'] == LocalIndexType.HNSW
+    assert kwargs['shards'] == 2
+    mock_ingestion.return_value.execute.assert_called_once_with('some/path', 'semantic', {}, resume=False)
 
-@patch('argparse.ArgumentParser.parse_args')
-def test_main_delete_task(mock_parse_args, capsys):
-    mock_parse_args.return_value = MagicMock(task='delete', local=False, collection_name='test_collection', output_dir='output_chunks')
-    main.main()
-    captured = capsys.readouterr()
-    assert "Delete functionality not yet implemented." in captured.out
+def test_setup_arg_parser():
+    parser = main.setup_arg_parser()
+    args = parser.parse_args(['save', 'some/path', 'semantic', '--config', '{"breakpoint_threshold_type": "percentile"}'])
+    assert args.task == 'save'
+    assert args.source == 'some/path'
+    assert args.strategy == 'semantic'
+    assert args.config == '{"breakpoint_threshold_type": "percentile"}'
+    assert args.local_dir == 'output_chunks'
+    assert args.chroma_collection == 'default_collection'
 
-@patch('argparse.ArgumentParser.parse_args')
-def test_main_save_no_source(mock_parse_args, capsys):
-    mock_parse_args.return_value = MagicMock(task='save', source=None, local=False, collection_name='test_collection', output_dir='output_chunks')
-    main.main()
+def test_main_search_task_needs_a_query(capsys):
+    with patch('sys.argv', ['cli', 'search', '--no-server']), pytest.raises(SystemExit):
+        main.main()
+    assert "Pass either a query or --queries-file." in capsys.readouterr().err
+
+def test_main_delete_task(capsys):
+    with patch('sys.argv', ['cli', 'delete', '--chroma-collection', 'test_collection']):
+        main.main()
     captured = capsys.readouterr()
-    assert "Error: 'source' argument is required" in captured.out
\ No newline at end of file
+    assert "Delete functionality is not yet implemented." in captured.out
+
+def test_main_save_no_source(capsys):
+    with patch('sys.argv', ['cli', 'save']), pytest.raises(SystemExit):
+        main.main()
+    assert "the following arguments are required: source" in capsys.readouterr().err
+
+@patch('src.infrastructure.cli.main.run_talk')
+def test_main_talk_task_passes_the_talk_options(mock_run_talk):
+    argv = [
+        'cli', 'talk', 'what is the api?', '--local-dir', 'chunks', '--rerank', '20',
+        '--context-tokens', '500', '--compress-tokens', '200',
+    ]
+    with patch('sys.argv', argv):
+        main.main()
+    talk_config = mock_run_talk.call_args[0][0]
+    assert talk_config.query == 'what is the api?'
+    assert talk_config.rerank_candidates == 20
+    assert talk_config.context_tokens == 500
+    assert talk_config.compress_tokens == 200
+
+@patch('src.infrastructure.cli.main.run_chunking')
+def test_main_save_rescore_is_an_index_option(mock_run_chunking, capsys):
+    argv = ['cli', 'save', 'data', 'length_based', '--local-dir', 'chunks', '--quantization', 'int8', '--rescore']
+    with patch('sys.argv', argv):
+        main.main()
+    storage_config = mock_run_chunking.call_args[0][1]
+    assert storage_config.index_options == {"rescore": True}
+
+    with patch('sys.argv', argv[:-3] + ['--rescore']), pytest.raises(SystemExit):
+        main.main()
+    assert "--rescore needs --quantization" in capsys.readouterr().err
+    mock_run_chunking.assert_called_once()
@@ -0,0 +1,143 @@
+import threading
+from dataclasses import asdict
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from src.domain.models.chunk import Chunk
+from src.domain.models.cli_config_classes import StorageConfig, TalkConfig
+from src.domain.models.enums import LocalIndexType, SearchMode, StorageType, VectorQuantization
+from src.infrastructure.adapters.answer_caches.ttl_answer_cache import TtlAnswerCache
+from src.infrastructure.adapters.chunk_stores.file_system_chunk_store import FileSystemChunkStore
+from src.infrastructure.adapters.chunk_stores.sharded_chunk_store import ShardedChunkStore
+from src.infrastructure.server.protocol import decode_chunk, decode_request, encode_chunk, encode_request
+from src.infrastructure.server.rag_client import RagClient
+from src.infrastructure.server.rag_server import RagServer
+from src.infrastructure.server.rag_service import RagService
+from tests.mocks.infrastructure.adapters.embeddings.keyword_embeddings import KeywordEmbeddings
+
+
+@pytest.fixture
+def storage_config(tmp_path):
+    FileSystemChunkStore(str(tmp_path), embeddings=KeywordEmbeddings()).save([
+        Chunk(content="The api returns json.", metadata={"source": "api.md"}),
+        Chunk(content="The architecture has three layers.", metadata={"source": "architecture.md"}),
+    ])
+    return StorageConfig(storage_type=StorageType.LOCAL, location=str(tmp_path))
+
+
+@pytest.fixture
+def server():
+    service = RagService(
+        embeddings=KeywordEmbeddings(),
+        chat_model=GenericFakeChatModel(messages=iter([AIMessage(content="It returns json.")] * 10)),
+        answer_cache=TtlAnswerCache("fake"),
+    )
+    server = RagServer(service, port=0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_request_round_trips_through_json(tmp_path):
+    talk_config = TalkConfig(query="api", top_k=3, mode=SearchMode.HYBRID, where={"source": "api.md"}, context_tokens=None)
+    storage_config = StorageConfig(
+        storage_type=StorageType.LOCAL,
+        location=str(tmp_path / "chunks"),
+        quantization=VectorQuantization.INT8,
+        index_type=LocalIndexType.HNSW,
+        index_options={"ef_search": 50},
+        persist_directory=str(tmp_path / "chroma"),
+    )
+
+    decoded_talk, decoded_storage = decode_request(encode_request(talk_config, storage_config))
+
+    # The server imports the config classes under their own module path, so compare the fields
+    assert asdict(decoded_talk) == asdict(talk_config)
+    assert asdict(decoded_storage) == asdict(storage_config)
+
+
+def test_request_carries_the_client_directories(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CHROMA_PERSIST_DIRECTORY", "client_chroma")
+    talk_config = TalkConfig(query="api", top_k=3)
+
+    _, local = decode_request(encode_request(talk_config, StorageConfig(StorageType.LOCAL, "chunks")))
+    _, chroma = decode_request(encode_request(talk_config, StorageConfig(StorageType.CHROMA, "docs")))
+
+    assert local.location == str(tmp_path / "chunks")
+    # Collection names are not paths; the Chroma directory comes from the client's environment
+    assert chroma.location == "docs"
+    assert chroma.persist_directory == str(tmp_path / "client_chroma")
+
+
+def test_chunk_round_trips_through_json():
+    chunk = Chunk(content="text", metadata={"source": "a.md"}, score=0.5, id="abc")
+
+    assert asdict(decode_chunk(encode_chunk(chunk))) == asdict(chunk)
+
+
+def test_malformed_request_is_a_value_error():
+    with pytest.raises(ValueError, match="Malformed request"):
+        decode_request({"talk": {"query": "api"}})
+
+
+def test_service_opens_a_store_per_full_storage_config(tmp_path):
+    service = RagService(embeddings=KeywordEmbeddings())
+    location = str(tmp_path / "chunks")
+
+    sharded = service.storage(StorageConfig(StorageType.LOCAL, location, shards=2))
+    assert type(sharded.chunk_store).__name__ == ShardedChunkStore.__name__
+    assert service.storage(StorageConfig(StorageType.LOCAL, location, shards=2)) is sharded
+
+    # The store options are part of the key, so a different config is opened separately
+    quantized = service.storage(StorageConfig(StorageType.LOCAL, location, quantization=VectorQuantization.INT8, shards=2))
+    assert quantized is not sharded
+    assert len(service._stores) == 2
+
+
+def test_client_detects_a_running_server(server):
+    assert RagClient(server.url).is_running()
+    assert not RagClient("http://127.0.0.1:9").is_running()
+
+
+def test_search_is_forwarded_to_the_server(server, storage_config):
+    chunks = RagClient(server.url).search(TalkConfig(query="api", top_k=1), storage_config)
+
+    assert [chunk.content for chunk in chunks] == ["The api returns json."]
+    assert chunks[0].score is not None
+
+
+def test_talk_streams_events_and_reuses_the_warm_store(server, storage_config):
+    client = RagClient(server.url)
+    events = list(client.talk(TalkConfig(query="api", top_k=1), storage_config))
+
+    assert [event["type"] for event in events][0] == "context"
+    assert events[0]["passages"] == 1
+    assert "".join(event["text"] for event in events if event["type"] == "token") == "It returns json."
+    assert events[-1]["type"] == "answer" and not events[-1]["cached"]
+
+    # The second request hits the same open store and the shared answer cache
+    again = list(client.talk(TalkConfig(query="api", top_k=1), storage_config))
+    assert again[-1]["cached"]
+    assert len(server.service._stores) == 1
+
+
+def test_invalid_request_is_reported_as_a_value_error(server, storage_config):
+    with pytest.raises(ValueError, match="MMR"):
+        RagClient(server.url).search(TalkConfig(query="api", top_k=1, mode=SearchMode.LEXICAL, mmr_lambda=0.5), storage_config)
+
+
+def test_failure_mid_stream_is_raised_by_the_client(server, storage_config, monkeypatch):
+    def failing_talk(talk_config, storage_config):
+        yield {"type": "context", "passages": 1}
+        raise ConnectionError("model unavailable")
+
+    monkeypatch.setattr(server.service, "talk", failing_talk)
+    events = []
+
+    with pytest.raises(RuntimeError, match="ConnectionError: model unavailable"):
+        for event in RagClient(server.url).talk(TalkConfig(query="api", top_k=1), storage_config):
+            events.append(event)
+    assert events == [{"type": "context", "passages": 1}]
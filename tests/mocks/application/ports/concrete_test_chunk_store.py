@@ -1,5 +1,6 @@
 from src.application.ports.chunk_store import ChunkStore
 from src.domain.models.chunk import Chunk
+from src.domain.services.metadata_filter import matches_where
 
 # --- Test Implementation of the ABC for most tests ---
 class ConcreteTestChunkStore(ChunkStore):
@@ -21,9 +22,19 @@ class ConcreteTestChunkStore(ChunkStore):
         if chunk_id in self.chunks:
             del self.chunks[chunk_id]
 
-    def search(self, query_embedding: list[float], top_k: int = 5) -> list[Chunk]:
-        # This is a simplistic mock search, returning all chunks up to top_k
-        return list(self.chunks.values())[:top_k]
+    def search(
+        self, query_embedding: list[float], top_k: int = 5, filter: dict = None, include_embeddings: bool = False
+    ) -> list[Chunk]:
+        # This is a simplistic mock search, returning all matching chunks up to top_k
+        return [chunk for chunk in self.chunks.values() if matches_where(chunk.metadata, filter)][:top_k]
+
+    def lexical_search(self, query: str, top_k: int = 5, filter: dict = None) -> list[Chunk]:
+        # Keeps the chunks whose content contains any query word
+        words = query.lower().split()
+        return [
+            chunk for chunk in self.chunks.values()
+            if any(word in chunk.content.lower() for word in words) and matches_where(chunk.metadata, filter)
+        ][:top_k]
 
     def clear(self):
         self.chunks.clear()
\ No newline at end of file
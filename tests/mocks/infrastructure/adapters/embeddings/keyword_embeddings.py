@@ -0,0 +1,29 @@
+import math
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_VOCABULARY = ["architecture", "api", "error", "policy", "test", "deploy", "database", "cache"]
+
+
+# --- Deterministic embeddings for store and use case tests ---
+class KeywordEmbeddings(Embeddings):
+    """Embeds text as normalized keyword counts, so similar texts get similar vectors."""
+    def __init__(self, vocabulary: list[str] = None):
+        self.vocabulary = vocabulary or DEFAULT_VOCABULARY
+        self.document_calls = 0
+        self.query_calls = 0
+
+    def _embed(self, text: str) -> list[float]:
+        words = text.lower().split()
+        counts = [float(sum(word.strip(".,?!") == term for word in words)) for term in self.vocabulary]
+        # A small constant component keeps texts without keywords at a non-zero norm
+        counts.append(0.1)
+        norm = math.sqrt(sum(value * value for value in counts))
+        return [value / norm for value in counts]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.document_calls += 1
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        self.query_calls += 1
+        return self._embed(text)